@@ -10,6 +10,9 @@ from typing import Any
 
 import plotly.graph_objects as go
 
+from chart_export_cache import export_figure_bytes
+from chart_render_service import ChartJob, render_chart_batch
+
 # ============================================================================
 # FEATURE 6: Break-Even Detailed Chart - Detaillierter Break-Even
 # ============================================================================
@@ -388,8 +391,8 @@ def _export_plotly_fig_to_bytes(
         PNG Bytes
     """
     try:
-        img_bytes = fig.to_image(format="png", width=1200, height=600, scale=2)
-        return img_bytes
+        return export_figure_bytes(
+            fig, format="png", width=1200, height=600, scale=2)
     except Exception as e:
         print(f"Fehler beim Export: {e}")
         return b""
@@ -411,24 +414,33 @@ def create_all_advanced_charts(
     Returns:
         Dict mit Chart-Bytes für PDF-Export
     """
-    charts = {}
+    figures = {}
 
     # Break-Even Detailed
     try:
-        fig_breakeven = create_break_even_detailed_chart(
+        figures['break_even_detailed_chart_bytes'] = create_break_even_detailed_chart(
             analysis_results, texts)
-        charts['break_even_detailed_chart_bytes'] = _export_plotly_fig_to_bytes(
-            fig_breakeven, texts)
     except Exception as e:
         print(f"Fehler bei Break-Even Chart: {e}")
 
     # Lifecycle Cost
     try:
-        fig_lifecycle = create_lifecycle_cost_chart(
+        figures['lifecycle_cost_chart_bytes'] = create_lifecycle_cost_chart(
             analysis_results, project_data, texts)
-        charts['lifecycle_cost_chart_bytes'] = _export_plotly_fig_to_bytes(
-            fig_lifecycle, texts)
     except Exception as e:
         print(f"Fehler bei Lifecycle Chart: {e}")
 
+    # Alle Figuren in einem Batch über den warmen Renderer exportieren
+    errors = {}
+    charts = render_chart_batch(
+        {
+            chart_key: ChartJob(fig, format="png", width=1200, height=600, scale=2)
+            for chart_key, fig in figures.items()
+        },
+        errors,
+    )
+    for chart_key, error in errors.items():
+        print(f"Fehler beim Export: {error}")
+        charts[chart_key] = b""
+
     return charts
@@ -23,6 +23,8 @@ import streamlit as st
 from plotly.subplots import make_subplots
 
 from calculations import AdvancedCalculationsIntegrator
+from chart_export_cache import export_figure_bytes
+from chart_render_service import LazyChart
 from debug_tools import debug_log, init_debug_mode, render_debug_toolbar
 from financial_calculations import calculate_payback_years
 
@@ -39,6 +41,7 @@ from live_preview_helpers import (
     _calculate_final_price_with_modifications,
     _get_pricing_modifications_from_session,
 )
+from scenario_sweep import SweepBase, kwp_axis, roi_heat_map, run_scenario_sweep
 from ui_state_manager import (
     commit_widget_value,
     ensure_session_defaults,
@@ -1977,7 +1980,11 @@ def _apply_custom_style_to_fig(
         fig.update_layout(colorway=final_colorway)
 
 
-_PLOT_EXPORT_CACHE: dict[str, bytes] = {}
+def _lazy_chart_bytes(fig: go.Figure | None) -> LazyChart | None:
+    """Handle für ``*_chart_bytes``: exportiert wird erst beim PDF-Bau im Batch."""
+    if fig is None:
+        return None
+    return LazyChart(fig, format="png", width=800, height=480, scale=1.5)
 
 
 def _export_plotly_fig_to_bytes(
@@ -1985,24 +1992,11 @@ def _export_plotly_fig_to_bytes(
 ) -> bytes | None:
     if fig is None:
         return None
-    # Cache-Key über die Figure-Struktur ableiten
     try:
-        fig_json = fig.to_json()
-        cache_key = fig_json  # bereits JSON-String
-        cached = _PLOT_EXPORT_CACHE.get(cache_key)
-        if cached:
-            return cached
-    except Exception:
-        cache_key = None
-    try:
-        # Reduzierte Auflösung für schnellere Erstellung im Dashboard
-        img = fig.to_image(format="png", scale=1.5, width=800, height=480)
-        if cache_key:
-            # Soft-LRU: einfache Größe begrenzen
-            if len(_PLOT_EXPORT_CACHE) > 64:
-                _PLOT_EXPORT_CACHE.clear()
-            _PLOT_EXPORT_CACHE[cache_key] = img
-        return img
+        # Reduzierte Auflösung für schnellere Erstellung im Dashboard;
+        # identische Diagramme kommen aus dem gemeinsamen Export-Cache
+        return export_figure_bytes(
+            fig, format="png", scale=1.5, width=800, height=480)
     except Exception as e:
         if "kaleido" in str(e).lower(
         ) and "st" in globals() and hasattr(st, "warning"):
@@ -2406,8 +2400,7 @@ def render_daily_production_switcher(
             fig,
             use_container_width=True,
             key="analysis_daily_prod_switcher_key_v7_2d")
-    analysis_results["daily_production_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-        fig, texts)
+    analysis_results["daily_production_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_tariff_cube_switcher(
@@ -2452,8 +2445,7 @@ def render_tariff_cube_switcher(
                 fig,
                 use_container_width=True,
                 key="analysis_daily_prod_switcher_key_v7_2d")
-        analysis_results["daily_production_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts)
+        analysis_results["daily_production_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         st.error("Fehler beim Erstellen des Tagesproduktions-Diagramms")
 
@@ -2506,8 +2498,7 @@ def render_weekly_production_switcher(
                 fig,
                 use_container_width=True,
                 key="analysis_weekly_prod_switcher_key_v7_2d")
-        analysis_results["weekly_production_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts)
+        analysis_results["weekly_production_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         st.error("Fehler beim Erstellen des Wochenproduktions-Diagramms")
 
@@ -2608,8 +2599,7 @@ def render_yearly_production_switcher(
                 fig,
                 use_container_width=True,
                 key="analysis_yearly_prod_switcher_key_v7_2d")
-        analysis_results["yearly_production_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts)
+        analysis_results["yearly_production_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         st.error("Fehler beim Erstellen des Jahresproduktions-Diagramms")
 
@@ -2638,28 +2628,27 @@ def render_project_roi_matrix_switcher(
     ):
         annual_financial_benefit_year1_val = 700.0
 
-    # ROI für verschiedene Szenarien berechnen
+    # ROI für verschiedene Szenarien in einem Szenario-Sweep berechnen
     scenarios = ["Konservativ", "Realistisch", "Optimistisch"]
     factors = [0.8, 1.0, 1.2]
-    roi_values = []
-
-    for factor in factors:
-        adjusted_benefit = annual_financial_benefit_year1_val * factor
-        years_to_break_even = (
-            total_investment_netto_val / adjusted_benefit
-            if adjusted_benefit > 0
-            else 999
-        )
-        roi_20_years = (
-            (
-                (adjusted_benefit * 20 - total_investment_netto_val)
-                / total_investment_netto_val
-            )
-            * 100
-            if total_investment_netto_val > 0
-            else 0
-        )
-        roi_values.append(max(0, roi_20_years))
+    sweep_base = SweepBase.from_results(
+        {
+            **analysis_results,
+            "total_investment_netto": total_investment_netto_val,
+            "annual_financial_benefit_year1": annual_financial_benefit_year1_val,
+        },
+        (st.session_state.get("project_data", {}) or {}).get("project_details"),
+        load_admin_setting("global_constants", {}),
+    )
+    roi_sweep = run_scenario_sweep(
+        sweep_base,
+        scenarios=[
+            {"name": name, "production_factor": factor}
+            for name, factor in zip(scenarios, factors, strict=True)
+        ],
+        years=20,
+    )
+    roi_values = roi_sweep["roi_percent"].clip(lower=0).fillna(0).tolist()
 
     # Daten für universelle Diagrammfunktion
     chart_data = {"labels": scenarios, "values": roi_values}
@@ -2686,8 +2675,38 @@ def render_project_roi_matrix_switcher(
                 use_container_width=True,
                 key="analysis_project_roi_matrix_switcher_key_v7_2d",
             )
-        analysis_results["project_roi_matrix_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts)
+            # ROI-Matrix: Anlagengröße x Strompreissteigerung (ein Batch)
+            roi_grid = roi_heat_map(
+                sweep_base,
+                kwp_axis(sweep_base.anlage_kwp),
+                np.linspace(0.0, 0.06, 13),
+                years=20,
+            )
+            heatmap = go.Figure(
+                go.Heatmap(
+                    z=roi_grid.to_numpy(),
+                    x=roi_grid.columns,
+                    y=roi_grid.index * 100,
+                    colorscale="RdYlGn",
+                    colorbar=dict(title="ROI (%)"),
+                    hovertemplate="%{x} kWp, %{y:.1f} %/a: %{z:.0f} %<extra></extra>",
+                )
+            )
+            heatmap.update_layout(
+                title=get_text(
+                    texts,
+                    "viz_project_roi_heatmap_title_switcher",
+                    "ROI nach 20 Jahren: Anlagengröße x Strompreissteigerung",
+                ),
+                xaxis_title="Anlagengröße (kWp)",
+                yaxis_title="Strompreissteigerung (% p.a.)",
+            )
+            st.plotly_chart(
+                heatmap,
+                use_container_width=True,
+                key="analysis_project_roi_heatmap_switcher_key",
+            )
+        analysis_results["project_roi_matrix_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         st.error("Fehler beim Erstellen des ROI-Diagramms")
 
@@ -2808,8 +2827,7 @@ def render_feed_in_revenue_switcher(
                 use_container_width=True,
                 key="analysis_feed_in_revenue_switcher_key_v7_2d",
             )
-        analysis_results["feed_in_revenue_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts)
+        analysis_results["feed_in_revenue_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         st.error("Fehler beim Erstellen des Einspeisevergütungs-Diagramms")
 
@@ -3040,8 +3058,7 @@ def render_production_vs_consumption_switcher(
             fig,
             use_container_width=True,
             key="analysis_prod_vs_cons_switcher_key_v7_2d")
-        analysis_results["prod_vs_cons_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts)
+        analysis_results["prod_vs_cons_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_tariff_cube_switcher(
@@ -3112,8 +3129,7 @@ def render_tariff_cube_switcher(
             use_container_width=True,
             key="analysis_tariff_cube_switcher_plot_key_v6_final",
         )
-    analysis_results["tariff_cube_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-        fig, texts)
+    analysis_results["tariff_cube_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
     # Chart-Daten für universelle Funktion vorbereiten
     chart_data = {
@@ -3146,8 +3162,7 @@ def render_tariff_cube_switcher(
                 fig,
                 use_container_width=True,
                 key="analysis_tariff_cube_switcher_plot")
-        analysis_results["tariff_cube_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts)
+        analysis_results["tariff_cube_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         analysis_results["tariff_cube_switcher_chart_bytes"] = None
 
@@ -3256,8 +3271,7 @@ def render_co2_savings_value_switcher(
                 use_container_width=True,
                 key="analysis_co2_savings_value_switcher_plot",
             )
-        analysis_results["co2_savings_value_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts)
+        analysis_results["co2_savings_value_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         analysis_results["co2_savings_value_switcher_chart_bytes"] = None
 
@@ -3979,9 +3993,7 @@ def render_co2_savings_value_switcher(
                 use_container_width=True,
                 key="analysis_co2_savings_value_switcher_key_v6_final",
             )
-        analysis_results["co2_savings_value_switcher_chart_bytes"] = (
-            _export_plotly_fig_to_bytes(fig, texts)
-        )
+        analysis_results["co2_savings_value_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         st.warning("CO₂-Diagramm konnte nicht erstellt werden.")
         analysis_results["co2_savings_value_switcher_chart_bytes"] = None
@@ -4134,8 +4146,7 @@ def render_investment_value_switcher(
             fig,
             use_container_width=True,
             key="analysis_investment_value_switcher_plot")
-    analysis_results["investment_value_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-        fig, texts)
+    analysis_results["investment_value_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_storage_effect_switcher(
@@ -4242,8 +4253,7 @@ def render_storage_effect_switcher(
             fig,
             use_container_width=True,
             key="analysis_storage_effect_switcher_plot")
-    analysis_results["storage_effect_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-        fig, texts)
+    analysis_results["storage_effect_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_selfuse_stack_switcher(
@@ -4354,8 +4364,7 @@ def render_selfuse_stack_switcher(
             use_container_width=True,
             key="analysis_selfuse_stack_switcher_key_v6_final",
         )
-    analysis_results["selfuse_stack_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-        fig, texts)
+    analysis_results["selfuse_stack_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_cost_growth_switcher(
@@ -4435,8 +4444,7 @@ def render_cost_growth_switcher(
             use_container_width=True,
             key="analysis_cost_growth_switcher_key_v6_final",
         )
-    analysis_results["cost_growth_switcher_chart_bytes"] = _export_plotly_fig_to_bytes(
-        fig, texts)
+    analysis_results["cost_growth_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_selfuse_ratio_switcher(
@@ -4522,9 +4530,7 @@ def render_selfuse_ratio_switcher(
             use_container_width=True,
             key="analysis_selfuse_ratio_switcher_key_v6_final",
         )
-    analysis_results["selfuse_ratio_switcher_chart_bytes"] = (
-        _export_plotly_fig_to_bytes(fig, texts)
-    )
+    analysis_results["selfuse_ratio_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_roi_comparison_switcher(
@@ -4602,9 +4608,7 @@ def render_roi_comparison_switcher(
             use_container_width=True,
             key="analysis_roi_comparison_switcher_key_v6_final",
         )
-    analysis_results["roi_comparison_switcher_chart_bytes"] = (
-        _export_plotly_fig_to_bytes(fig, texts)
-    )
+    analysis_results["roi_comparison_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_scenario_comparison_switcher(
@@ -4618,22 +4622,12 @@ def render_scenario_comparison_switcher(
         "Szenarienvergleich – Invest/Ertrag/Bonus (Illustrativ)",
     )
     base_invest_raw = get_final_investment_amount(analysis_results)
-    benefits_raw = analysis_results.get("annual_benefits_sim", [])
     bonus_raw = analysis_results.get("one_time_bonus_eur")
     base_invest = float(
         base_invest_raw
         if isinstance(base_invest_raw, (int, float)) and base_invest_raw > 0
         else 10000.0
     )
-    base_ertrag_total = (
-        sum(
-            float(b)
-            for b in benefits_raw
-            if isinstance(b, (int, float)) and not math.isnan(b) and not math.isinf(b)
-        )
-        if isinstance(benefits_raw, list) and benefits_raw
-        else base_invest * 0.07 * 20
-    )
     base_bonus = float(
         bonus_raw if isinstance(
             bonus_raw, (int, float)) else 0.0)
@@ -4642,12 +4636,27 @@ def render_scenario_comparison_switcher(
         get_text(texts, "scenario_optimistic_switcher", "Optimistisch"),
         get_text(texts, "scenario_pessimistic_switcher", "Pessimistisch"),
     ]
-    invest_opts = [base_invest, base_invest * 0.9, base_invest * 1.1]
-    ertrag_opts = [
-        base_ertrag_total,
-        base_ertrag_total * 1.15,
-        base_ertrag_total * 0.85,
-    ]
+    # Invest +-10 %, Ertrag +-15 % als ein Szenario-Sweep; ohne Ergebnisdaten
+    # illustrativ 7 % Jahresnutzen auf die Investition
+    sweep_base = SweepBase.from_results(
+        {
+            "annual_financial_benefit_year1": base_invest * 0.07,
+            **analysis_results,
+            "total_investment_netto": base_invest,
+        },
+        (st.session_state.get("project_data", {}) or {}).get("project_details"),
+        load_admin_setting("global_constants", {}),
+    )
+    scenario_sweep = run_scenario_sweep(
+        sweep_base,
+        scenarios=[
+            {"name": labels[0]},
+            {"name": labels[1], "investment_factor": 0.9, "production_factor": 1.15},
+            {"name": labels[2], "investment_factor": 1.1, "production_factor": 0.85},
+        ],
+    )
+    invest_opts = scenario_sweep["investment"].tolist()
+    ertrag_opts = scenario_sweep["total_benefit"].tolist()
     bonus_opts = [base_bonus, base_bonus + 500, max(0, base_bonus - 500)]
     #  PROFESSIONELLER 2D SZENARIENVERGLEICH
     # Kategorien und Daten definieren
@@ -4689,9 +4698,7 @@ def render_scenario_comparison_switcher(
             use_container_width=True,
             key="analysis_scenario_comp_switcher_key_v6_final",
         )
-    analysis_results["scenario_comparison_switcher_chart_bytes"] = (
-        _export_plotly_fig_to_bytes(fig, texts)
-    )
+    analysis_results["scenario_comparison_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_tariff_comparison_switcher(
@@ -4788,9 +4795,7 @@ def render_tariff_comparison_switcher(
             use_container_width=True,
             key="analysis_tariff_comp_switcher_key_v6_final",
         )
-    analysis_results["tariff_comparison_switcher_chart_bytes"] = (
-        _export_plotly_fig_to_bytes(fig, texts)
-    )
+    analysis_results["tariff_comparison_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def render_income_projection_switcher(
@@ -4865,9 +4870,7 @@ def render_income_projection_switcher(
             use_container_width=True,
             key="analysis_income_proj_switcher_key_v6_final",
         )
-    analysis_results["income_projection_switcher_chart_bytes"] = (
-        _export_plotly_fig_to_bytes(fig, texts)
-    )
+    analysis_results["income_projection_switcher_chart_bytes"] = _lazy_chart_bytes(fig)
 
 
 def _create_monthly_production_consumption_chart(
@@ -5447,8 +5450,7 @@ def _render_consumption_coverage_pie(
             use_container_width=True,
             key=f"{chart_key_prefix}_four_type_chart_final",
         )
-        analysis_results_local[f"{chart_key_prefix}_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts_local)
+        analysis_results_local[f"{chart_key_prefix}_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         st.info(
             get_text(
@@ -5608,8 +5610,7 @@ def _render_pv_usage_pie(
             use_container_width=True,
             key=f"{chart_key_prefix}_four_type_chart_final",
         )
-        analysis_results_local[f"{chart_key_prefix}_chart_bytes"] = _export_plotly_fig_to_bytes(
-            fig, texts_local)
+        analysis_results_local[f"{chart_key_prefix}_chart_bytes"] = _lazy_chart_bytes(fig)
     else:
         st.info(
             get_text(
@@ -5921,11 +5922,8 @@ def render_advanced_economics(
     # NPV mit verschiedenen Diskontierungsraten
     with st.expander("NPV-Sensitivitätsanalyse", expanded=False):
         discount_rates = np.arange(0.01, 0.10, 0.01)
-        npv_values = []
-
-        for rate in discount_rates:
-            npv = integrator.calculate_npv_sensitivity(calc_results, rate)
-            npv_values.append(npv)
+        npv_values = integrator.calculate_npv_sensitivity_table(
+            calc_results, discount_rates).tolist()
 
         fig = go.Figure()
         fig.add_trace(
@@ -6484,9 +6482,9 @@ def render_financial_scenarios(
             n_simulations = st.number_input(
                 "Anzahl Simulationen",
                 min_value=100,
-                max_value=10000,
-                value=1000,
-                step=100,
+                max_value=100000,
+                value=10000,
+                step=1000,
                 key=f"n_simulations_{unique_session_id}",
             )
 
@@ -6515,10 +6513,13 @@ def render_financial_scenarios(
             # NPV-Verteilung
             fig = go.Figure()
 
+            # Vorberechnete Klassen statt aller Einzelwerte an den Browser
+            edges = mc_results["histogram"]["bin_edges"]
             fig.add_trace(
-                go.Histogram(
-                    x=mc_results["npv_distribution"],
-                    nbinsx=50,
+                go.Bar(
+                    x=[(lo + hi) / 2 for lo, hi in zip(edges[:-1], edges[1:], strict=True)],
+                    y=mc_results["histogram"]["counts"],
+                    width=[hi - lo for lo, hi in zip(edges[:-1], edges[1:], strict=True)],
                     name="NPV-Verteilung",
                     marker_color="#3B82F6",
                     opacity=0.7,
@@ -8331,9 +8332,7 @@ def render_analysis(
                     use_container_width=True,
                     key="analysis_monthly_comp_chart_final_v8_corrected",
                 )
-            results_for_display["monthly_prod_cons_chart_bytes"] = (
-                _export_plotly_fig_to_bytes(fig_monthly_comp, texts)
-            )
+            results_for_display["monthly_prod_cons_chart_bytes"] = _lazy_chart_bytes(fig_monthly_comp)
         else:
             st.info(
                 get_text(
@@ -8364,9 +8363,7 @@ def render_analysis(
                     use_container_width=True,
                     key="analysis_cost_proj_chart_final_v8_corrected",
                 )
-            results_for_display["cost_projection_chart_bytes"] = (
-                _export_plotly_fig_to_bytes(fig_cost_projection, texts)
-            )
+            results_for_display["cost_projection_chart_bytes"] = _lazy_chart_bytes(fig_cost_projection)
         else:
             st.info(
                 get_text(
@@ -8476,9 +8473,7 @@ def render_analysis(
                     use_container_width=True,
                     key="analysis_cum_cashflow_chart_final_v8_corrected",
                 )
-            results_for_display["cumulative_cashflow_chart_bytes"] = (
-                _export_plotly_fig_to_bytes(fig_cum_cf, texts)
-            )
+            results_for_display["cumulative_cashflow_chart_bytes"] = _lazy_chart_bytes(fig_cum_cf)
         else:
             st.info(
                 get_text(
@@ -4,9 +4,13 @@
 import base64
 import os
 import sqlite3
+import threading
+import time
 import traceback
 from typing import Any
 
+from db_pool import run_schema_init_once
+
 try:
     from database import get_db_connection, init_db
     DB_AVAILABLE = True
@@ -17,6 +21,20 @@ except ImportError as e:
     DB_AVAILABLE = False
     print(f"brand_logo_db.py: Database nicht verfügbar: {e}")
 
+# Prozess-Cache der aktiven Logos samt Such-Indexen für get_logos_for_brands.
+# Wird bei Schreibzugriffen dieses Prozesses verworfen; die TTL deckt
+# Änderungen aus anderen Prozessen ab.
+LOGO_CACHE_TTL_SECONDS = 60.0
+_logo_index_cache: tuple[float, tuple[dict, dict, dict]] | None = None
+_logo_index_lock = threading.Lock()
+
+
+def invalidate_logo_cache() -> None:
+    """Verwirft den Logo-Cache (nach Änderungen an brand_logos)."""
+    global _logo_index_cache
+    with _logo_index_lock:
+        _logo_index_cache = None
+
 
 def create_brand_logos_table(conn: sqlite3.Connection):
     """Erstellt die Tabelle für Marken-Logos"""
@@ -41,6 +59,11 @@ def create_brand_logos_table(conn: sqlite3.Connection):
     print("Tabelle 'brand_logos' erstellt oder bereits vorhanden.")
 
 
+def _ensure_brand_logos_table(conn: sqlite3.Connection):
+    """create_brand_logos_table einmal pro Datenbankdatei statt bei jedem Zugriff."""
+    run_schema_init_once(conn, "brand_logos", create_brand_logos_table)
+
+
 def add_brand_logo(
         brand_name: str,
         logo_base64: str,
@@ -62,7 +85,7 @@ def add_brand_logo(
             return False
 
         # Tabelle erstellen falls sie nicht existiert
-        create_brand_logos_table(conn)
+        _ensure_brand_logos_table(conn)
 
         cursor = conn.cursor()
 
@@ -93,6 +116,7 @@ def add_brand_logo(
             print(f"Neues Logo für Marke '{brand_name}' hinzugefügt")
 
         conn.commit()
+        invalidate_logo_cache()
         conn.close()
         return True
 
@@ -113,7 +137,7 @@ def get_brand_logo(brand_name: str) -> dict[str, Any] | None:
             return None
 
         # Tabelle erstellen falls sie nicht existiert
-        create_brand_logos_table(conn)
+        _ensure_brand_logos_table(conn)
 
         cursor = conn.cursor()
         cursor.execute("""
@@ -160,7 +184,7 @@ def list_all_brand_logos() -> list[dict[str, Any]]:
             return []
 
         # Tabelle erstellen falls sie nicht existiert
-        create_brand_logos_table(conn)
+        _ensure_brand_logos_table(conn)
 
         cursor = conn.cursor()
         cursor.execute("""
@@ -214,6 +238,7 @@ def delete_brand_logo(brand_name: str) -> bool:
 
         deleted_count = cursor.rowcount
         conn.commit()
+        invalidate_logo_cache()
         conn.close()
 
         if deleted_count > 0:
@@ -286,6 +311,7 @@ def update_logo_position(brand_name: str, position_x: float, position_y: float,
 
         updated_count = cursor.rowcount
         conn.commit()
+        invalidate_logo_cache()
         conn.close()
 
         if updated_count > 0:
@@ -352,6 +378,35 @@ def _fetch_all_brand_rows(conn) -> dict[str, dict[str, Any]]:
     return data
 
 
+def _get_logo_indexes() -> tuple[dict, dict, dict] | None:
+    """Aktive Logos als (exakt, normalisiert, Basis ohne Suffix)-Indexe, gecacht."""
+    global _logo_index_cache
+    with _logo_index_lock:
+        cached = _logo_index_cache
+    if cached is not None and time.monotonic() - cached[0] < LOGO_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    conn = get_db_connection()
+    if not conn:
+        return None
+    _ensure_brand_logos_table(conn)
+    # Alle aktiven Logos einmal holen
+    all_rows = _fetch_all_brand_rows(conn)
+    conn.close()
+
+    # Indexe bauen
+    index_exact = {k: v for k, v in all_rows.items()}
+    index_norm = {_normalize_brand_key(k): v for k, v in all_rows.items()}
+    index_base = {
+        _normalize_brand_key(
+            _base_brand_without_suffix(k)): v for k,
+        v in all_rows.items()}
+    indexes = (index_exact, index_norm, index_base)
+    with _logo_index_lock:
+        _logo_index_cache = (time.monotonic(), indexes)
+    return indexes
+
+
 def get_logos_for_brands(brand_names: list[str]) -> dict[str, dict[str, Any]]:
     """Holt Logos für eine Liste von Herstellern.
     Erweitert: Versucht auch Varianten ohne funktionale Suffixe zu matchen.
@@ -365,21 +420,10 @@ def get_logos_for_brands(brand_names: list[str]) -> dict[str, dict[str, Any]]:
     if not DB_AVAILABLE:
         return {}
     try:
-        conn = get_db_connection()
-        if not conn:
+        indexes = _get_logo_indexes()
+        if indexes is None:
             return {}
-        create_brand_logos_table(conn)
-        # Alle aktiven Logos einmal holen
-        all_rows = _fetch_all_brand_rows(conn)
-        conn.close()
-
-        # Indexe bauen
-        index_exact = {k: v for k, v in all_rows.items()}
-        index_norm = {_normalize_brand_key(k): v for k, v in all_rows.items()}
-        index_base = {
-            _normalize_brand_key(
-                _base_brand_without_suffix(k)): v for k,
-            v in all_rows.items()}
+        index_exact, index_norm, index_base = indexes
 
         result: dict[str, dict[str, Any]] = {}
         for wanted in brand_names:
@@ -387,17 +431,17 @@ def get_logos_for_brands(brand_names: list[str]) -> dict[str, dict[str, Any]]:
                 continue
             # 1. Exakt
             if wanted in index_exact:
-                result[wanted] = index_exact[wanted]
+                result[wanted] = dict(index_exact[wanted])
                 continue
             norm = _normalize_brand_key(wanted)
             base = _normalize_brand_key(_base_brand_without_suffix(wanted))
             # 2. Normalisiert (Spaces entfernt, lower)
             if norm in index_norm:
-                result[wanted] = index_norm[norm]
+                result[wanted] = dict(index_norm[norm])
                 continue
             # 3. Basis ohne Suffix
             if base in index_base:
-                result[wanted] = index_base[base]
+                result[wanted] = dict(index_base[base])
                 continue
             # 4. Versuche zusätzlich Groß/Klein Variation des Basis-Originals
             # (bereits durch lower abgedeckt – hier keine Extra-Logik nötig)
@@ -428,6 +472,7 @@ def deactivate_brand_logo(brand_name: str) -> bool:
 
         updated_count = cursor.rowcount
         conn.commit()
+        invalidate_logo_cache()
         conn.close()
 
         if updated_count > 0:
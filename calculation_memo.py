@@ -0,0 +1,210 @@
+"""
+Memoisierung von ``perform_calculations``
+=========================================
+
+``analysis.render_analysis`` ruft ``perform_calculations`` bei jedem
+Streamlit-Rerun auf, auch wenn sich nur ein Diagramm-Schalter geändert hat;
+Angebotsdetails, PDF-Platzhalter und Mehrfachangebote rechnen dieselben
+Eingaben erneut. Dieses Modul hält die Ergebnisse in einem begrenzten
+prozessweiten LRU:
+
+- Schlüssel ist ein SHA-256 über die kanonische JSON-Form der Eingaben
+  (siehe :func:`make_fingerprint`)
+- gespeichert und herausgegeben werden strukturelle Kopien, damit Aufrufer,
+  die das Ergebnis verändern, den Cache nicht verfälschen
+- Einträge verfallen nach ``ttl_seconds`` (Preis-Matrix und PVGIS haben
+  eigene, zeitbasierte Caches, deren Änderungen sonst nicht sichtbar wären)
+
+Abschalten zum Debuggen über ``CALCULATION_MEMO_DISABLED=1`` oder pro Aufruf
+mit ``perform_calculations(..., use_cache=False)``.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_TTL_SECONDS = 300.0
+
+# Unveränderliche Typen, die ohne Kopie herausgegeben werden können
+_IMMUTABLE = (str, bytes, int, float, complex, bool, type(None))
+
+
+def _canonical_default(value: Any) -> Any:
+    """Fallback für json.dumps: NumPy, Datumswerte, Mengen."""
+    if hasattr(value, "item") and callable(value.item):
+        try:
+            return value.item()
+        except (TypeError, ValueError):
+            pass
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+def make_fingerprint(inputs: Any) -> str:
+    """SHA-256 über die kanonische JSON-Form (sortierte Schlüssel) der Eingaben."""
+    payload = json.dumps(
+        inputs, sort_keys=True, separators=(",", ":"),
+        ensure_ascii=False, default=_canonical_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def copy_result(value: Any) -> Any:
+    """Strukturelle Kopie eines Berechnungsergebnisses.
+
+    Deutlich schneller als ``copy.deepcopy`` für die verschachtelten
+    dict/list-Strukturen aus ``perform_calculations``; Arrays und DataFrames
+    werden über ihr eigenes ``copy()`` kopiert.
+    """
+    if isinstance(value, _IMMUTABLE):
+        return value
+    if isinstance(value, dict):
+        return {k: copy_result(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_result(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(copy_result(v) for v in value)
+    if hasattr(value, "copy") and hasattr(value, "dtype"):
+        return value.copy()  # NumPy-Array
+    if hasattr(value, "copy") and hasattr(value, "to_dict"):
+        return value.copy(deep=True)  # pandas
+    return copy.deepcopy(value)
+
+
+class CalculationMemo:
+    """Begrenzter LRU für Berechnungsergebnisse mit Ablaufzeit."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Inhalt des zuletzt gehashten texts-Dicts und dessen Digest
+        self._texts_items: tuple[Any, ...] | None = None
+        self._texts_digest = ""
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+    def texts_fingerprint(self, texts: dict[str, Any] | None) -> str:
+        """Digest der UI-Texte; unveränderter Inhalt wird nur einmal gehasht.
+
+        Verglichen wird der Inhalt (nicht die Identität), damit auch
+        Änderungen am selben Dict erkannt werden.
+        """
+        if not texts:
+            return ""
+        items = tuple(texts.items())
+        with self._lock:
+            if items == self._texts_items:
+                return self._texts_digest
+        digest = make_fingerprint(texts)
+        with self._lock:
+            self._texts_items = items
+            self._texts_digest = digest
+        return digest
+
+    def get(self, key: str) -> Any | None:
+        """Kopie des gespeicherten Werts oder None (zählt Treffer/Fehlschläge)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and (
+                    time.monotonic() - entry[0] > self.ttl_seconds):
+                del self._entries[key]
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            value = entry[1]
+        return copy_result(value)
+
+    def put(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        stored = copy_result(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_calculation_memo: CalculationMemo | None = None
+_calculation_memo_lock = threading.Lock()
+
+
+def get_calculation_memo() -> CalculationMemo:
+    """Prozessweite Instanz (Größe/TTL aus ``CALCULATION_MEMO_SIZE``/``_TTL``)."""
+    global _calculation_memo
+    if _calculation_memo is None:
+        with _calculation_memo_lock:
+            if _calculation_memo is None:
+                _calculation_memo = CalculationMemo(
+                    max_entries=int(os.environ.get(
+                        "CALCULATION_MEMO_SIZE", DEFAULT_MAX_ENTRIES)),
+                    ttl_seconds=float(os.environ.get(
+                        "CALCULATION_MEMO_TTL", DEFAULT_TTL_SECONDS)),
+                )
+    return _calculation_memo
+
+
+def configure_calculation_memo(**kwargs: Any) -> CalculationMemo:
+    """Ersetzt die prozessweite Instanz (z.B. kleinere Größe in Tests)."""
+    global _calculation_memo
+    with _calculation_memo_lock:
+        _calculation_memo = CalculationMemo(**kwargs)
+    return _calculation_memo
+
+
+def calculation_memo_disabled() -> bool:
+    """True, wenn ``CALCULATION_MEMO_DISABLED`` gesetzt ist (Debugging)."""
+    return os.environ.get("CALCULATION_MEMO_DISABLED", "").strip().lower() in (
+        "1", "true", "yes", "on")
+
+
+def clear_calculation_memo() -> None:
+    get_calculation_memo().clear()
+
+
+def get_calculation_memo_stats() -> dict[str, Any]:
+    return get_calculation_memo().get_stats()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+calculation_worker.py
+Dauerhafter Rechen-Prozess für die Electron-Bridges.
+
+``calculations_cli.py``, ``calculation_bridge.py`` und
+``multi_offer_generator_cli.py`` starten pro Anfrage einen neuen Interpreter
+und importieren ``calculations`` (pandas, numpy, ...) jedes Mal neu. Dieser
+Worker wird einmal gestartet und beantwortet danach beliebig viele Anfragen:
+Importe, Admin-Einstellungen (``database.AdminSettingsSnapshot``) und der
+Produktkatalog (``product_db.ProductCatalogCache``) bleiben warm.
+
+Protokoll: eine JSON-Nachricht pro Zeile (JSON-RPC-ähnlich) über
+stdin/stdout oder einen Unix-Socket.
+
+    -> {"id": 1, "method": "calculate_live_pricing", "params": {...}}
+    <- PROGRESS:{"id": 1, "current": 1, "total": 3, "percentage": 33.3, "message": "..."}
+    <- {"id": 1, "result": {...}}
+    <- {"id": 1, "error": {"code": -32601, "message": "..."}}
+
+Anfragen laufen parallel in einem Thread-Pool; Antworten können daher in
+anderer Reihenfolge als die Anfragen kommen und werden über ``id``
+zugeordnet. Nach dem Start meldet der Worker ``{"method": "ready", ...}``.
+
+Methoden:
+    perform_calculations         Eingabe wie calculations_cli.py
+    bridge_perform_calculations  {"configuration": ...} wie calculation_bridge.py
+    calculate_live_pricing       {"base_results": ..., "modifications": ...}
+    generate_multi_offers        {"config": ..., "output_dir": ...} mit PROGRESS
+    reload                       Caches für Einstellungen/Produkte verwerfen
+    stats, ping, shutdown
+
+Usage:
+    python calculation_worker.py [--socket PATH] [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TextIO
+
+# Add project root to Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+PROGRESS_PREFIX = "PROGRESS:"
+
+# JSON-RPC Fehlercodes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+ProgressFn = Callable[[int, int, str], None]
+Handler = Callable[[dict[str, Any], ProgressFn], Any]
+
+
+def json_default(obj: Any) -> Any:
+    """Serialisierung für datetime, numpy-Skalare und -Arrays."""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(
+        f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+# --- Methoden -----------------------------------------------------------------
+
+def _perform_calculations(params: dict[str, Any], progress: ProgressFn) -> Any:
+    from calculations_cli import run_calculations
+    return run_calculations(params)
+
+
+def _bridge_perform_calculations(
+        params: dict[str, Any], progress: ProgressFn) -> Any:
+    from calculation_bridge import perform_full_calculations
+    return perform_full_calculations(params.get('configuration') or {})
+
+
+def _calculate_live_pricing(params: dict[str, Any], progress: ProgressFn) -> Any:
+    from calculation_bridge import calculate_live_pricing
+    return calculate_live_pricing(
+        params.get('base_results') or {}, params.get('modifications') or {})
+
+
+def _generate_multi_offers(params: dict[str, Any], progress: ProgressFn) -> Any:
+    from multi_offer_generator_cli import generate_multi_offers
+    return generate_multi_offers(
+        params.get('config') or {},
+        params.get('output_dir'),
+        progress=progress,
+        debug=bool(params.get('debug')))
+
+
+def _reload(params: dict[str, Any], progress: ProgressFn) -> Any:
+    import database
+    import product_db
+
+    database.invalidate_admin_settings_cache()
+    if product_db.enable_product_catalog_cache(False) is None:
+        product_db.enable_product_catalog_cache(True)
+    return {'reloaded': True}
+
+
+DEFAULT_HANDLERS: dict[str, Handler] = {
+    'perform_calculations': _perform_calculations,
+    'bridge_perform_calculations': _bridge_perform_calculations,
+    'calculate_live_pricing': _calculate_live_pricing,
+    'generate_multi_offers': _generate_multi_offers,
+    'reload': _reload,
+}
+
+
+def warm_up() -> dict[str, Any]:
+    """Importiert die Rechenmodule und lädt Einstellungen und Produktkatalog vor."""
+    start = time.perf_counter()
+    info: dict[str, Any] = {}
+    try:
+        import calculation_bridge  # noqa: F401  (importiert auch calculations)
+        import calculations_cli  # noqa: F401
+    except (ImportError, SystemExit) as e:
+        info['import_error'] = str(e)
+    try:
+        import database
+        import product_db
+
+        database.load_admin_setting('global_constants')
+        product_db.enable_product_catalog_cache(True)
+        info['products'] = len(product_db.list_products())
+    except Exception as e:
+        info['cache_error'] = str(e)
+    info['warm_up_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return info
+
+
+# --- Server -------------------------------------------------------------------
+
+class CalculationWorker:
+    """Verteilt zeilenweise JSON-Anfragen auf einen Thread-Pool."""
+
+    def __init__(self, handlers: dict[str, Handler] | None = None,
+                 max_workers: int = 4):
+        self.handlers = dict(DEFAULT_HANDLERS if handlers is None else handlers)
+        self.handlers.setdefault('ping', lambda params, progress: {'pong': True})
+        self.handlers.setdefault('stats', lambda params, progress: self.get_stats())
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='calc-worker')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stopping = threading.Event()
+        self._started = time.time()
+        self._stats: dict[str, Any] = {'requests': 0, 'errors': 0, 'methods': {}}
+
+    # Ausgabe -----------------------------------------------------------------
+
+    @staticmethod
+    def _write(out: TextIO, out_lock: threading.Lock, line: str) -> None:
+        with out_lock:
+            try:
+                out.write(line + '\n')
+                out.flush()
+            except (BrokenPipeError, OSError, ValueError):
+                pass
+
+    def _send(self, out: TextIO, out_lock: threading.Lock,
+              message: dict[str, Any]) -> None:
+        try:
+            line = json.dumps(message, ensure_ascii=False, default=json_default)
+        except (TypeError, ValueError) as e:
+            line = json.dumps({
+                'id': message.get('id'),
+                'error': {'code': INTERNAL_ERROR,
+                          'message': f'Result not serializable: {e}'}})
+        self._write(out, out_lock, line)
+
+    # Verarbeitung ------------------------------------------------------------
+
+    def _run(self, request_id: Any, method: str, params: dict[str, Any],
+             out: TextIO, out_lock: threading.Lock) -> None:
+        def progress(current: int, total: int, message: str = 'Processing') -> None:
+            data = {
+                'id': request_id,
+                'current': current,
+                'total': total,
+                'percentage': round((current / total) * 100, 1) if total > 0 else 0,
+                'message': message,
+            }
+            self._write(out, out_lock, PROGRESS_PREFIX + json.dumps(data))
+
+        start = time.perf_counter()
+        try:
+            result = self.handlers[method](params, progress)
+            response = {'id': request_id, 'result': result}
+            failed = False
+        except BaseException as e:
+            # auch SystemExit/KeyboardInterrupt aus Handlern: der Zähler für
+            # laufende Anfragen muss in jedem Fall sinken
+            response = {'id': request_id, 'error': {
+                'code': INTERNAL_ERROR,
+                'message': str(e) or type(e).__name__,
+                'data': traceback.format_exc()}}
+            failed = True
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self._in_flight -= 1
+            self._stats['errors'] += int(failed)
+            method_stats = self._stats['methods'].setdefault(
+                method, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            method_stats['count'] += 1
+            method_stats['total_ms'] += elapsed_ms
+            method_stats['max_ms'] = max(method_stats['max_ms'], elapsed_ms)
+        self._send(out, out_lock, response)
+
+    def handle_line(self, line: str, out: TextIO,
+                    out_lock: threading.Lock) -> None:
+        """Verarbeitet eine Eingabezeile; die Antwort kommt asynchron."""
+        line = line.strip()
+        if not line:
+            return
+        with self._lock:
+            self._stats['requests'] += 1
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            with self._lock:
+                self._stats['errors'] += 1
+            self._send(out, out_lock, {'id': None, 'error': {
+                'code': PARSE_ERROR, 'message': f'Invalid JSON: {e}'}})
+            return
+        if not isinstance(request, dict) or not isinstance(
+                request.get('method'), str):
+            with self._lock:
+                self._stats['errors'] += 1
+            self._send(out, out_lock, {
+                'id': request.get('id') if isinstance(request, dict) else None,
+                'error': {'code': INVALID_REQUEST,
+                          'message': 'Expected an object with "method"'}})
+            return
+
+        request_id = request.get('id')
+        method = request['method']
+        params = request.get('params') or {}
+
+        if method == 'shutdown':
+            self._stopping.set()
+            self._send(out, out_lock, {'id': request_id, 'result': {'stopping': True}})
+            return
+        if method not in self.handlers:
+            with self._lock:
+                self._stats['errors'] += 1
+            self._send(out, out_lock, {'id': request_id, 'error': {
+                'code': METHOD_NOT_FOUND, 'message': f'Unknown method: {method}'}})
+            return
+
+        with self._lock:
+            self._in_flight += 1
+        self._executor.submit(self._run, request_id, method, params, out, out_lock)
+
+    def serve_stream(self, reader: TextIO, out: TextIO,
+                     out_lock: threading.Lock | None = None) -> None:
+        """Liest Anfragen bis EOF oder ``shutdown``."""
+        out_lock = out_lock or threading.Lock()
+        for line in reader:
+            self.handle_line(line, out, out_lock)
+            if self._stopping.is_set():
+                break
+
+    def serve_unix_socket(self, path: str) -> None:
+        """Nimmt mehrere Verbindungen an; jede hat ihre eigene Antwortzeile."""
+        if os.path.exists(path):
+            os.remove(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen()
+        server.settimeout(0.5)
+
+        def client(conn: socket.socket) -> None:
+            with conn, conn.makefile('r', encoding='utf-8') as reader, \
+                    conn.makefile('w', encoding='utf-8') as writer:
+                self.serve_stream(reader, writer)
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    conn, _ = server.accept()
+                except TimeoutError:
+                    continue
+                threading.Thread(target=client, args=(conn,), daemon=True).start()
+        finally:
+            server.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+    def close(self, wait: bool = True) -> None:
+        self._stopping.set()
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            methods = {
+                name: {**m, 'avg_ms': m['total_ms'] / m['count'] if m['count'] else 0.0}
+                for name, m in self._stats['methods'].items()}
+            stats = {
+                'requests': self._stats['requests'],
+                'errors': self._stats['errors'],
+                'in_flight': self._in_flight,
+                'uptime_s': round(time.time() - self._started, 1),
+                'methods': methods,
+            }
+        try:
+            import database
+            import product_db
+            stats['admin_settings_cache'] = database.get_admin_settings_cache_stats()
+            stats['product_catalog_cache'] = product_db.get_product_catalog_cache_stats()
+        except Exception:
+            pass
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Persistent calculation worker (line-delimited JSON-RPC)')
+    parser.add_argument(
+        '--socket',
+        help='Unix socket path (default: stdin/stdout)')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=int(os.environ.get('CALC_WORKER_THREADS', '4')),
+        help='Number of concurrently processed requests')
+    args = parser.parse_args()
+
+    # Rechenmodule schreiben Diagnosen per print(); stdout gehört dem Protokoll
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    info = warm_up()
+    worker = CalculationWorker(max_workers=args.workers)
+    out_lock = threading.Lock()
+    ready = {'method': 'ready', 'params': {'pid': os.getpid(), **info}}
+
+    worker._send(protocol_out, out_lock, ready)
+    try:
+        if args.socket:
+            worker.serve_unix_socket(args.socket)
+        else:
+            worker.serve_stream(sys.stdin, protocol_out, out_lock)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close(wait=True)
+
+
+if __name__ == '__main__':
+    main()
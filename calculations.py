@@ -13,7 +13,18 @@ from typing import Any
 import numpy as np
 import requests  # Für HTTP-Anfragen an PVGIS
 
+from calculation_memo import (
+    calculation_memo_disabled,
+    get_calculation_memo,
+    make_fingerprint,
+)
+from cashflow_projection import (
+    growth_index,
+    project_cash_flows,
+    project_savings,
+)
 from financial_calculations import calculate_final_price
+from scenario_sweep import SweepBase, run_scenario_sweep, scenario_cash_flow_table
 
 # Import der erweiterten PV-Berechnungsalgorithmen
 try:
@@ -95,6 +106,9 @@ def Dummy_load_admin_setting_calc(key, default=None):
             "marktwert_strom_eur_per_kwh_after_eeg": 0.03,
             "storage_cycles_per_year": 250,
             "storage_efficiency": 0.9,
+            "storage_max_c_rate": 0.5,
+            "self_consumption_simulation_mode": "monthly",  # oder "hourly"
+            "load_profile_type": "H0",  # H0 Haushalt, G0 Gewerbe
             "eauto_annual_km": 10000,
             "eauto_consumption_kwh_per_100km": 18.0,
             "eauto_pv_share_percent": 30.0,
@@ -261,6 +275,16 @@ except Exception:
         Dummy_get_product_by_model_name_calc,
     )
 
+try:
+    from database import get_admin_settings_version
+except ImportError:
+    get_admin_settings_version = None
+
+try:
+    from product_db import get_product_catalog_version
+except ImportError:
+    get_product_catalog_version = None
+
 
 # Old cache implementation removed - now using MatrixLoader class
 
@@ -1818,18 +1842,39 @@ class AdvancedCalculationsIntegrator:
         self, calc_results: dict[str, Any], discount_rate: float
     ) -> float:
         """NPV-Sensitivitätsanalyse"""
-        investment = calc_results.get("total_investment_netto", 20000)
-        annual_benefit = calc_results.get(
-            "annual_financial_benefit_year1", 1500)
-        lifetime = 25
+        return float(self.calculate_npv_sensitivity_table(
+            calc_results, [discount_rate])[0])
+
+    def calculate_npv_sensitivity_table(
+        self, calc_results: dict[str, Any], discount_rates: Any
+    ) -> np.ndarray:
+        """NPV für mehrere Diskontierungsraten in einem Szenario-Sweep"""
+        sweep = run_scenario_sweep(
+            self._sweep_base(calc_results),
+            {"discount_rate": np.asarray(discount_rates, dtype=float)},
+            years=25,
+        )
+        return sweep["npv"].to_numpy()
 
-        # NPV berechnen
-        npv = -investment
-        for year in range(1, lifetime + 1):
-            discounted_benefit = annual_benefit / (1 + discount_rate) ** year
-            npv += discounted_benefit
+    def _sweep_base(self, calc_results: dict[str, Any]) -> SweepBase:
+        """Sweep-Basis; fehlende Werte wie bisher 20.000 € Invest, 1.500 € Nutzen.
 
-        return npv
+        Globale Konstanten (Inflation, Einspeisedauer, Zinssatz, ...) kommen
+        wie in perform_calculations aus den Admin-Einstellungen.
+        """
+        global_constants = real_load_admin_setting("global_constants")
+        if not isinstance(global_constants, dict) or not global_constants:
+            global_constants = Dummy_load_admin_setting_calc("global_constants")
+        calc_results = calc_results or {}
+        return SweepBase.from_results(
+            {
+                "total_investment_netto": 20000,
+                "annual_financial_benefit_year1": 1500,
+                **calc_results,
+            },
+            calc_results.get("project_details"),
+            global_constants,
+        )
 
     def calculate_irr_advanced(
             self, calc_results: dict[str, Any]) -> dict[str, Any]:
@@ -1839,30 +1884,22 @@ class AdvancedCalculationsIntegrator:
             "annual_financial_benefit_year1", 1500)
         lifetime = 25
 
-        # Cash Flow generieren
-        cash_flows = [-investment] + [annual_benefit] * lifetime
-
-        # IRR iterativ berechnen
-        irr = 0.0
-        try:
-            # Vereinfachte IRR-Berechnung
-            for rate in np.arange(0.01, 0.20, 0.001):
-                npv = sum(cf / (1 + rate) ** i for i,
-                          cf in enumerate(cash_flows))
-                if abs(npv) < 100:  # Nahe null
-                    irr = rate
-                    break
-        except BaseException:
-            irr = 0.05  # Fallback
+        # Cash Flow generieren (Jahr 0 = Investition), PI mit 4 % diskontiert
+        projection = project_savings(
+            investment=investment,
+            annual_savings=annual_benefit,
+            years=lifetime,
+            discount_rate=0.04,
+        )
+        irr = float(projection.irr()[0])
+        if not math.isfinite(irr):
+            irr = 0.0  # Kein Vorzeichenwechsel, keine Rendite
 
         # MIRR (vereinfacht)
-        finance_rate = 0.04
-        reinvest_rate = 0.03
         mirr = ((annual_benefit * lifetime / investment) ** (1 / lifetime)) - 1
 
         # Profitability Index
-        pi = (sum(annual_benefit / (1 + 0.04) **
-                  year for year in range(1, lifetime + 1)) / investment)
+        pi = (float(projection.npv()[0]) + investment) / investment
 
         return {
             "irr": irr * 100,
@@ -2206,167 +2243,62 @@ class AdvancedCalculationsIntegrator:
     def run_monte_carlo_simulation(
         self, calc_results: dict[str, Any], n_simulations: int, confidence_level: int
     ) -> dict[str, Any]:
-        """Monte-Carlo-Simulation für Risikobewertung"""
-        np.random.seed(42)  # Für reproduzierbare Ergebnisse
-
-        base_investment = calc_results.get("total_investment_netto", 20000)
-        base_annual_benefit = calc_results.get(
-            "annual_financial_benefit_year1", 1500)
-        lifetime = 25
-
-        npv_distribution = []
-
-        for _ in range(n_simulations):
-            # Variationen der Parameter (normalverteilt)
-            investment = np.random.normal(
-                base_investment, base_investment * 0.1)
-            annual_benefit = np.random.normal(
-                base_annual_benefit, base_annual_benefit * 0.15
-            )
-            discount_rate = np.random.normal(0.04, 0.01)
-
-            # NPV berechnen
-            npv = -investment
-            for year in range(1, lifetime + 1):
-                npv += annual_benefit / (1 + discount_rate) ** year
-
-            npv_distribution.append(npv)
+        """Monte-Carlo-Simulation für Risikobewertung (vektorisiert, siehe
+        monte_carlo_engine). Liefert Perzentile und Histogramm-Klassen statt
+        aller Einzelwerte."""
+        from monte_carlo_engine import run_monte_carlo
 
-        npv_distribution = np.array(npv_distribution)
-
-        # Statistiken
-        npv_mean = np.mean(npv_distribution)
-        npv_std = np.std(npv_distribution)
-
-        # Konfidenzintervall
-        alpha = (100 - confidence_level) / 2
-        npv_lower_bound = np.percentile(npv_distribution, alpha)
-        npv_upper_bound = np.percentile(npv_distribution, 100 - alpha)
-
-        # Value at Risk
-        var_5 = np.percentile(npv_distribution, 5)
-
-        # Erfolgswahrscheinlichkeit
-        success_probability = (
-            npv_distribution > 0).sum() / n_simulations * 100
-
-        # Sensitivitätsanalyse (vereinfacht)
-        sensitivity_analysis = [
-            {"parameter": "Investitionskosten", "impact": -0.8},
-            {"parameter": "Jährlicher Nutzen", "impact": 0.9},
-            {"parameter": "Diskontierungsrate", "impact": -0.4},
-            {"parameter": "Strompreissteigerung", "impact": 0.6},
-            {"parameter": "Anlagenlebensdauer", "impact": 0.3},
-        ]
-
-        return {
-            "npv_distribution": npv_distribution.tolist(),
-            "npv_mean": npv_mean,
-            "npv_std": npv_std,
-            "npv_lower_bound": npv_lower_bound,
-            "npv_upper_bound": npv_upper_bound,
-            "var_5": var_5,
-            "success_probability": success_probability,
-            "sensitivity_analysis": sensitivity_analysis,
-        }
+        return run_monte_carlo(
+            calc_results, n_simulations, confidence_level,
+            include_distribution=False)
 
     def calculate_subsidy_scenarios(
         self, calc_results: dict[str, Any]
     ) -> dict[str, Any]:
         """Förderszenarien berechnen"""
-        base_investment = calc_results.get("total_investment_netto", 20000)
-        annual_benefit = calc_results.get(
-            "annual_financial_benefit_year1", 1500)
+        base = self._sweep_base(calc_results)
         years = 25
 
         # Verschiedene Förderszenarien
-        scenarios = {
-            "Jahr": list(range(1, years + 1)),
-            "Ohne Förderung": [],
-            "KfW-Kredit (1%)": [],
-            "Zuschuss 10%": [],
-            "Kombination": [],
-        }
-
-        # Cashflow für jedes Szenario berechnen
-        for year in range(1, years + 1):
-            # Ohne Förderung
-            if year == 1:
-                cf_none = -base_investment + annual_benefit
-            else:
-                cf_none = scenarios["Ohne Förderung"][-1] + annual_benefit
-            scenarios["Ohne Förderung"].append(cf_none)
-
-            # KfW-Kredit (vereinfacht)
-            if year == 1:
-                cf_kfw = (
-                    -base_investment * 0.2
-                    + annual_benefit
-                    - base_investment * 0.8 * 0.01
-                )  # 80% Kredit, 1% Zinsen
-            else:
-                cf_kfw = (
-                    scenarios["KfW-Kredit (1%)"][-1]
-                    + annual_benefit
-                    - base_investment * 0.8 * 0.01
-                )
-            scenarios["KfW-Kredit (1%)"].append(cf_kfw)
-
-            # 10% Zuschuss
-            if year == 1:
-                cf_grant = -base_investment * 0.9 + annual_benefit
-            else:
-                cf_grant = scenarios["Zuschuss 10%"][-1] + annual_benefit
-            scenarios["Zuschuss 10%"].append(cf_grant)
-
-            # Kombination
-            if year == 1:
-                cf_combo = (
-                    -base_investment * 0.8
-                    + annual_benefit
-                    - base_investment * 0.7 * 0.005
-                )  # 20% Zuschuss + günstiger Kredit
-            else:
-                cf_combo = (
-                    scenarios["Kombination"][-1]
-                    + annual_benefit
-                    - base_investment * 0.7 * 0.005
-                )
-            scenarios["Kombination"].append(cf_combo)
+        subsidy_scenarios = [
+            {"name": "Ohne Förderung"},
+            # 80% Kredit, 1% Zinsen
+            {"name": "KfW-Kredit (1%)", "financed_share": 0.8, "financing_rate": 0.01},
+            {"name": "Zuschuss 10%", "subsidy_share": 0.1},
+            # 20% Zuschuss + günstiger Kredit über 70% der Bruttoinvestition
+            {"name": "Kombination", "subsidy_share": 0.2,
+             "financed_share": 0.875, "financing_rate": 0.005},
+        ]
+        sweep = run_scenario_sweep(base, scenarios=subsidy_scenarios, years=years)
+        # Zinsvorteil gegenüber demselben Kredit zum Marktzins
+        market_rate = run_scenario_sweep(
+            base,
+            scenarios=[{**s, "financing_rate": base.financing_rate}
+                       for s in subsidy_scenarios],
+            years=years,
+        )
+        term = min(base.financing_years, years)
+        interest_advantage = (
+            market_rate["loan_annuity"] - sweep["loan_annuity"]) * term
+
+        # Kumulierter Cashflow je Szenario (ab Jahr 1)
+        cash_flows = scenario_cash_flow_table(
+            base, scenarios=subsidy_scenarios, years=years)
+        cash_flows = cash_flows[cash_flows["year"] > 0]
+        scenarios: dict[str, list[Any]] = {"Jahr": list(range(1, years + 1))}
+        for name, group in cash_flows.groupby("scenario", sort=False):
+            scenarios[name] = group["cumulative_cash_flow"].tolist()
 
         # Vergleichstabelle
         comparison = [
             {
-                "Szenario": "Ohne Förderung",
-                "NPV": float(scenarios["Ohne Förderung"][-1]),
-                "IRR": 5.2,
-                "Amortisation": 13.3,
-                "Förderung": 0.0,
-            },
-            {
-                "Szenario": "KfW-Kredit",
-                "NPV": float(scenarios["KfW-Kredit (1%)"][-1]),
-                "IRR": 7.1,
-                "Amortisation": 11.8,
-                # Zinsvorteil
-                "Förderung": float(base_investment * 0.8 * 0.03),
-            },
-            {
-                "Szenario": "Zuschuss 10%",
-                "NPV": float(scenarios["Zuschuss 10%"][-1]),
-                "IRR": 8.4,
-                "Amortisation": 10.2,
-                "Förderung": float(base_investment * 0.1),
-            },
-            {
-                "Szenario": "Kombination",
-                "NPV": float(scenarios["Kombination"][-1]),
-                "IRR": 9.8,
-                "Amortisation": 8.9,
-                "Förderung": float(
-                    base_investment * 0.2 + base_investment * 0.7 * 0.025
-                ),  # Zuschuss + Zinsvorteil
-            },
+                "Szenario": row["scenario"],
+                "NPV": float(row["npv"]),
+                "IRR": float(row["irr_percent"]),
+                "Amortisation": float(row["payback_years"]),
+                "Förderung": float(row["subsidy_eur"] + interest_advantage[i]),
+            }
+            for i, row in sweep.iterrows()
         ]
 
         return {"scenarios": scenarios, "comparison": comparison}
@@ -2630,8 +2562,15 @@ def get_pvgis_data(
     texts: dict[str, str] | None = None,
     errors_list: list[str] | None = None,
     debug_mode_enabled: bool = False,
+    include_hourly: bool = False,
+    hourly_reference_year: int = 2020,
 ) -> dict[str, Any] | None:
-    """Holt PV-Produktionsdaten von der PVGIS API."""
+    """Holt PV-Produktionsdaten von der PVGIS API.
+
+    Mit ``include_hourly=True`` wird die stündliche Leistungsreihe eines
+    Referenzjahres angefordert und als ``hourly_production_kwh`` (8760 Werte)
+    mitgeliefert; fehlende Monats-/Jahressummen werden daraus abgeleitet.
+    """
     local_errors: list[str] = []  # Für interne Fehler dieser Funktion
     # Sicherstellen, dass texts ein Dict ist
     texts = texts if texts is not None else {}
@@ -2662,11 +2601,36 @@ def get_pvgis_data(
         # Bereinigt
         return None
 
+    # Persistenter Cache: Ergebnisse werden auf 1 kWp normiert gespeichert
+    # und linear auf die angefragte Leistung skaliert.
+    from pvgis_cache import get_pvgis_cache, make_cache_key, scale_result
+
+    pvgis_cache = get_pvgis_cache()
+    cache_key = make_cache_key(
+        latitude,
+        longitude,
+        tilt,
+        azimuth,
+        system_loss_percent,
+        include_hourly=include_hourly,
+        hourly_reference_year=hourly_reference_year,
+    )
+    cached_result = pvgis_cache.get(cache_key)
+    if cached_result is not None:
+        return scale_result(cached_result, peak_power_kwp)
+    if not pvgis_cache.network_allowed:
+        effective_errors_list.append(
+            (texts.get(
+                "pvgis_replay_miss",
+                "PVGIS: Offline-Replay aktiv, aber keine Aufzeichnung für diesen Standort vorhanden.",
+            ) or "") + f" ({cache_key})")
+        return None
+
     base_url = "https://re.jrc.ec.europa.eu/api/seriescalc"
     params = {
         "lat": latitude,
         "lon": longitude,
-        "peakpower": peak_power_kwp,
+        "peakpower": 1.0,  # normiert, Skalierung über scale_result
         "loss": system_loss_percent,
         "pvtechchoice": "crystSi",
         "mountingplace": "building",
@@ -2675,6 +2639,15 @@ def get_pvgis_data(
         "outputformat": "json",
         "browser": 0,  # Wichtig, um HTML-Antworten zu vermeiden
     }
+    if include_hourly:
+        # Stündliche PV-Leistung (P in W) für genau ein Referenzjahr
+        params.update(
+            {
+                "pvcalculation": 1,
+                "startyear": hourly_reference_year,
+                "endyear": hourly_reference_year,
+            }
+        )
 
     # if debug_mode_enabled: # Bereinigt
     #     try:
@@ -2727,10 +2700,26 @@ def get_pvgis_data(
             .get("Yield_y", 0.0)
         )  # Korrigierter Key 'Yield_y'
 
+        hourly_production_kwh = None
+        hourly_rows = data.get("outputs", {}).get("hourly", [])
+        if include_hourly and hourly_rows:
+            from hourly_simulation import aggregate_monthly, fold_hourly_series
+
+            # P ist die mittlere Leistung der Stunde in W -> kWh je Stunde
+            hourly_production_kwh = fold_hourly_series(
+                [float(row.get("P", 0.0) or 0.0) / 1000.0 for row in hourly_rows]
+            )
+            if not monthly_production_kwh or len(monthly_production_kwh) != 12:
+                monthly_production_kwh = aggregate_monthly(hourly_production_kwh)
+            if not annual_production_kwh:
+                annual_production_kwh = float(hourly_production_kwh.sum())
+            if not specific_yield_kwh_kwp_pa:
+                specific_yield_kwh_kwp_pa = annual_production_kwh  # 1 kWp
+
         if (
             not monthly_production_kwh
             or len(monthly_production_kwh) != 12
-            or (annual_production_kwh == 0.0 and peak_power_kwp > 0)
+            or annual_production_kwh == 0.0
         ):
             error_msg_pvgis = (
                 texts.get(
@@ -2745,7 +2734,7 @@ def get_pvgis_data(
             effective_errors_list.append(error_msg_pvgis)
             return None
 
-        return {
+        pvgis_result = {
             "monthly_production_kwh": monthly_production_kwh,
             "annual_production_kwh": annual_production_kwh,
             "specific_yield_kwh_kwp_pa": specific_yield_kwh_kwp_pa,
@@ -2753,6 +2742,10 @@ def get_pvgis_data(
                 "source", "PVGIS-TMY"
             ),  # Quelle der Daten (z.B. TMY, ERA5)
         }
+        if hourly_production_kwh is not None:
+            pvgis_result["hourly_production_kwh"] = hourly_production_kwh.tolist()
+        pvgis_cache.put(cache_key, pvgis_result)
+        return scale_result(pvgis_result, peak_power_kwp)
 
     except requests.exceptions.HTTPError as e_http:
         status_code_val = (
@@ -2810,12 +2803,158 @@ def get_pvgis_data(
     return None
 
 
+def _store_calculation_results_in_session(
+    results: dict[str, Any],
+    app_debug_mode_is_enabled: bool = False,
+    update_enhanced_pricing: bool = True,
+) -> None:
+    """Legt Ergebnisse und Backup mit Zeitstempel im Session State ab."""
+    try:
+        import streamlit as st
+
+        if hasattr(st, "session_state"):
+            # Zeitstempel für dieses Berechnungsergebnis
+            timestamp = datetime.now().isoformat()
+
+            # Speichere Hauptergebnisse
+            st.session_state.calculation_results = results.copy()
+
+            # Update enhanced pricing if components are available
+            if update_enhanced_pricing:
+                _update_enhanced_pricing_in_calculation_results(results)
+
+            # Erstelle Backup-Kopie mit Zeitstempel
+            backup_data = {
+                "results": results.copy(),
+                "timestamp": timestamp,
+                "project_data_summary": {
+                    "anlage_kwp": results.get("anlage_kwp", 0),
+                    "total_investment_brutto": results.get(
+                        "total_investment_brutto", 0
+                    ),
+                    "annual_pv_production_kwh": results.get(
+                        "annual_pv_production_kwh", 0
+                    ),
+                },
+            }
+            st.session_state.calculation_results_backup = backup_data
+
+            # Speichere zusätzlich einen Timestamp für Debugging
+            st.session_state.calculation_timestamp = timestamp
+
+            if app_debug_mode_is_enabled:
+                print(
+                    f"CALC: Berechnungsergebnisse in Session State gespeichert (Zeitstempel: {timestamp})")
+    except ImportError:
+        # Streamlit nicht verfügbar (z.B. bei direkter Ausführung)
+        pass
+    except Exception as e:
+        if app_debug_mode_is_enabled:
+            print(f"CALC: Fehler beim Speichern in Session State: {e}")
+
+
+def _calculation_memo_key(
+    project_data: dict[str, Any],
+    texts: dict[str, str],
+    simulation_duration_user: int | None,
+    electricity_price_increase_user: float | None,
+) -> str | None:
+    """Fingerprint aller Eingaben von perform_calculations, None = nicht cachen.
+
+    Neben den Projektdaten fließen die Zustände ein, die die Berechnung
+    außerhalb ihrer Argumente liest: Admin-Einstellungen, Produktkatalog,
+    aktive Preis-Matrix und die Preismodifikationen aus dem Session State.
+    """
+    admin_settings_version = None
+    if _DATABASE_AVAILABLE and get_admin_settings_version is not None:
+        admin_settings_version = get_admin_settings_version()
+        if admin_settings_version is None:
+            # Einstellungen nicht lesbar -> Änderungen wären nicht erkennbar
+            return None
+    try:
+        from price_matrix_store import (
+            get_cached_active_matrix_id,
+            get_matrix_generation,
+        )
+
+        active_matrix_id = get_cached_active_matrix_id()
+        # Bearbeitete Zellen/Importe ändern die Generation, nicht die ID
+        matrix_generation = get_matrix_generation()
+    except Exception:
+        active_matrix_id = matrix_generation = None
+    memo = get_calculation_memo()
+    return make_fingerprint({
+        "customer_data": project_data.get("customer_data", {}),
+        "project_details": project_data.get("project_details", {}),
+        "economic_data": project_data.get("economic_data", {}),
+        "simulation_duration_user": simulation_duration_user,
+        "electricity_price_increase_user": electricity_price_increase_user,
+        "admin_settings_version": admin_settings_version,
+        "product_catalog_version": (
+            get_product_catalog_version() if get_product_catalog_version else None),
+        "active_matrix_id": active_matrix_id,
+        "matrix_generation": matrix_generation,
+        "pricing_modifications": _collect_pricing_modifications_from_session(),
+        "texts": memo.texts_fingerprint(texts),
+    })
+
+
 def perform_calculations(
     project_data: dict[str, Any],
     texts: dict[str, str],
     errors_list: list[str],
     simulation_duration_user: int | None = None,
     electricity_price_increase_user: float | None = None,
+    use_cache: bool = True,
+) -> dict[str, Any]:
+    """Berechnet alle Kennzahlen; identische Eingaben kommen aus dem Memo-Cache.
+
+    Ergebnisse sind Kopien und dürfen verändert werden. Meldungen der
+    ursprünglichen Berechnung werden bei einem Treffer an ``errors_list``
+    angehängt. ``use_cache=False`` (oder ``CALCULATION_MEMO_DISABLED=1``)
+    rechnet immer neu, z.B. zum Debuggen.
+    """
+    memo = get_calculation_memo()
+    key = None
+    if use_cache and not calculation_memo_disabled():
+        try:
+            key = _calculation_memo_key(
+                project_data, texts, simulation_duration_user,
+                electricity_price_increase_user)
+        except Exception as e:
+            print(f"CALC: Memo-Schlüssel nicht berechenbar: {e}")
+    if key is None:
+        memo.record_bypass()
+        return _perform_calculations_uncached(
+            project_data, texts, errors_list,
+            simulation_duration_user, electricity_price_increase_user)
+
+    cached = memo.get(key)
+    if cached is not None:
+        results, messages = cached
+        errors_list.extend(messages)
+        results["calculation_errors"] = errors_list
+        _store_calculation_results_in_session(
+            results, update_enhanced_pricing=False)
+        return results
+
+    errors_before = len(errors_list)
+    results = _perform_calculations_uncached(
+        project_data, texts, errors_list,
+        simulation_duration_user, electricity_price_increase_user)
+    memo.put(key, (
+        {k: v for k, v in results.items() if k != "calculation_errors"},
+        errors_list[errors_before:],
+    ))
+    return results
+
+
+def _perform_calculations_uncached(
+    project_data: dict[str, Any],
+    texts: dict[str, str],
+    errors_list: list[str],
+    simulation_duration_user: int | None = None,
+    electricity_price_increase_user: float | None = None,
 ) -> dict[str, Any]:
     results: dict[str, Any] = {"calculation_errors": errors_list}
     customer_data = project_data.get("customer_data", {})
@@ -2842,6 +2981,22 @@ def perform_calculations(
         "app_debug_mode_enabled", False)
     if not isinstance(app_debug_mode_is_enabled, bool):
         app_debug_mode_is_enabled = False
+
+    # Eigenverbrauchsmodell: "monthly" (Heuristik je Monat) oder "hourly"
+    # (8760-h-Simulation mit Standardlastprofil). Projektwert hat Vorrang.
+    self_consumption_simulation_mode = str(
+        project_details.get("self_consumption_simulation_mode")
+        or global_constants.get("self_consumption_simulation_mode", "monthly")
+        or "monthly"
+    ).lower()
+    hourly_mode = self_consumption_simulation_mode == "hourly"
+    load_profile_type = str(
+        project_details.get("load_profile_type")
+        or global_constants.get("load_profile_type", "H0")
+        or "H0"
+    )
+    results["self_consumption_simulation_mode"] = (
+        "hourly" if hourly_mode else "monthly")
     # --- Preis-Matrix vollständig entfernt ---
     # Ergebnisse kennzeichnen, damit aufrufende Komponenten wissen, dass das
     # alte Feature nicht mehr existiert.
@@ -2906,8 +3061,6 @@ def perform_calculations(
     annual_module_degradation_percent = float(
         global_constants.get("annual_module_degradation_percent", 0.5) or 0.5
     )
-    annual_degredation_factor = 1.0 - \
-        (annual_module_degradation_percent / 100.0)
     specific_yields_by_orientation_tilt = global_constants.get(
         "specific_yields_by_orientation_tilt", {}
     )
@@ -3049,6 +3202,7 @@ def perform_calculations(
                     texts,
                     errors_list,
                     debug_mode_enabled=app_debug_mode_is_enabled,
+                    include_hourly=hourly_mode,
                 )
         except (ValueError, TypeError) as e_coords:
             errors_list.append(
@@ -3068,6 +3222,7 @@ def perform_calculations(
 
     annual_pv_production_kwh_base, monthly_pv_production_kwh_base = 0.0, [
         0.0] * 12
+    hourly_pv_production_kwh_base = None  # Nur im Stundenmodus mit PVGIS
     results["pvgis_data_used"] = False  # Standardmäßig auf False setzen
 
     if pvgis_results_data and isinstance(pvgis_results_data, dict):
@@ -3087,6 +3242,8 @@ def perform_calculations(
             else:
                 annual_pv_production_kwh_base = annual_prod_pvgis
                 monthly_pv_production_kwh_base = monthly_prod_pvgis
+                hourly_pv_production_kwh_base = pvgis_results_data.get(
+                    "hourly_production_kwh")
                 results["specific_annual_yield_kwh_per_kwp"] = pvgis_results_data.get(
                     "specific_yield_kwh_kwp_pa", 0.0)
                 results["pvgis_source"] = pvgis_results_data.get(
@@ -3267,114 +3424,156 @@ def perform_calculations(
     monthly_feed_in_kwh = [0.0] * 12
     monthly_grid_bezug_kwh = [0.0] * 12
 
-    for i in range(12):
-        prod_month = monthly_pv_production_kwh[i]
-        cons_month = monthly_total_consumption_kwh[i]
+    hourly_simulation_summary: dict[str, Any] | None = None
+    if hourly_mode:
+        # Stündliche Simulation (8760 h): PV-Stundenreihe x Standardlastprofil,
+        # Speicher-SOC vektorisiert; Monatswerte werden daraus aggregiert.
+        from hourly_simulation import run_hourly_self_consumption
 
-        # 1. Direkter Eigenverbrauch – Grundlogik (Begrenzung durch
-        # gleichzeitige Verfügbarkeit)
-        direct_sc_base = min(prod_month, cons_month)
-        # Dynamischer Faktor (Standard 35 %, konfigurierbar über
-        # global_constants)
-        direct_fraction = float(
-            global_constants.get(
-                "direct_sc_fraction_cap",
-                0.35) or 0.35)
-        if direct_fraction < 0.05:
-            direct_fraction = 0.05
-        if direct_fraction > 0.85:
-            direct_fraction = 0.85
-        direct_sc = min(direct_sc_base, prod_month * direct_fraction)
-        monthly_direct_self_consumption_kwh[i] = direct_sc
-
-        # 2. Überschuss & Restverbrauch nach Direktverbrauch
-        pv_ueberschuss = max(0.0, prod_month - direct_sc)
-        rest_verbrauch = max(0.0, cons_month - direct_sc)
-
-        # 3. Speicher-Ladung nur aus PV-Überschuss
-        speicher_ladung_brutto = (
-            min(pv_ueberschuss, selected_storage_capacity_kwh)
-            if include_storage and selected_storage_capacity_kwh > 0
-            else 0.0
+        storage_max_c_rate = float(
+            global_constants.get("storage_max_c_rate", 0.5) or 0.5)
+        try:
+            latitude_for_profile = float(project_details.get("latitude"))
+        except (TypeError, ValueError):
+            latitude_for_profile = None
+        hourly_result = run_hourly_self_consumption(
+            annual_consumption_kwh=annual_consumption_kwh_yr,
+            monthly_pv_production_kwh=monthly_pv_production_kwh,
+            hourly_pv_production_kwh=hourly_pv_production_kwh_base,
+            storage_capacity_kwh=(
+                selected_storage_capacity_kwh if include_storage else 0.0),
+            storage_efficiency=storage_efficiency,
+            storage_max_power_kw=selected_storage_capacity_kwh * storage_max_c_rate,
+            load_profile_type=load_profile_type,
+            latitude=latitude_for_profile,
         )
-        speicher_ladung_netto = speicher_ladung_brutto * storage_efficiency
-        monthly_storage_charge_kwh[i] = speicher_ladung_netto
-
-        # 4. Speicher-Nutzung: realistisch wird ein Teil der geladenen Energie zeitversetzt verbraucht
-        # Falls rest_verbrauch == 0 (z.B. sehr niedriger Verbrauch oder hohe direkte Deckung), erlauben wir
-        # trotzdem eine Nutzung eines Anteils (abendliche Verlagerung). Annahme: bis zu 50 % des Verbrauchs
-        # darf über zeitversetzte Speicherung laufen, begrenzt durch Ladung.
-        evening_fraction = float(
-            global_constants.get(
-                "evening_shift_fraction",
-                0.5) or 0.5)
-        if evening_fraction < 0.1:
-            evening_fraction = 0.1
-        if evening_fraction > 0.9:
-            evening_fraction = 0.9
-
-        # Basispotenzial für Speicherentladung = Restverbrauch
-        discharge_potential = rest_verbrauch
-        if discharge_potential <= 0 and speicher_ladung_netto > 0 and cons_month > 0:
-            # Künstliche Abendverschiebung falls kompletter Verbrauch schon als
-            # direkt gezählt wurde
-            shifted_portion = cons_month * evening_fraction
-            # Verhindere Doppelzählung: reduziere den direkten Eigenverbrauch
-            # entsprechend (nur intern für Entladung)
-            effective_direct_for_storage_view = max(
-                0.0, direct_sc - shifted_portion)
-            # Neue nutzbare Speicher-Entladungsmenge durch Verschiebung
-            discharge_potential = min(shifted_portion, speicher_ladung_netto)
-        # Tatsächliche Speicherentladung begrenzt durch Ladung
-        speicher_nutzung = min(speicher_ladung_netto, discharge_potential)
-
-        # 4b. Mindest-Nutzungsanteil falls bislang 0 (Vermeidung
-        # unrealistischer 0-Entladung bei vorhandener Ladung)
-        if speicher_nutzung <= 0 and speicher_ladung_netto > 0 and cons_month > 0:
-            min_usage_share = float(
+        monthly_direct_self_consumption_kwh = hourly_result[
+            "monthly_direct_self_consumption_kwh"]
+        monthly_storage_charge_kwh = hourly_result["monthly_storage_charge_kwh"]
+        monthly_storage_discharge_for_sc_kwh = hourly_result[
+            "monthly_storage_discharge_for_sc_kwh"]
+        monthly_feed_in_kwh = hourly_result["monthly_feed_in_kwh"]
+        monthly_grid_bezug_kwh = hourly_result["monthly_grid_bezug_kwh"]
+        # Monatsverbrauch folgt dem Lastprofil statt der Pauschalverteilung
+        monthly_total_consumption_kwh = hourly_result["monthly_consumption_kwh"]
+        results["monthly_consumption_sim"] = monthly_total_consumption_kwh
+        hourly_simulation_summary = {
+            "load_profile_type": hourly_result["load_profile_type"],
+            "autarky_percent": hourly_result["autarky_percent"],
+            "self_consumption_percent": hourly_result["self_consumption_percent"],
+            "storage_full_cycles": hourly_result["storage_full_cycles"],
+            "pv_series_source": (
+                "PVGIS" if hourly_pv_production_kwh_base is not None else "synthetisch"),
+        }
+    else:
+        for i in range(12):
+            prod_month = monthly_pv_production_kwh[i]
+            cons_month = monthly_total_consumption_kwh[i]
+
+            # 1. Direkter Eigenverbrauch – Grundlogik (Begrenzung durch
+            # gleichzeitige Verfügbarkeit)
+            direct_sc_base = min(prod_month, cons_month)
+            # Dynamischer Faktor (Standard 35 %, konfigurierbar über
+            # global_constants)
+            direct_fraction = float(
                 global_constants.get(
-                    "storage_min_usage_share_of_charge",
-                    0.25) or 0.25)
-            if min_usage_share < 0.05:
-                min_usage_share = 0.05
-            if min_usage_share > 0.9:
-                min_usage_share = 0.9
-            min_usage_candidate = speicher_ladung_netto * min_usage_share
-            # Zusätzlich durch Gesamtverbrauch begrenzen
-            min_usage = min(
-                min_usage_candidate,
-                speicher_ladung_netto,
-                cons_month)
-            if min_usage > speicher_nutzung:
-                speicher_nutzung = min_usage
-
-        monthly_storage_discharge_for_sc_kwh[i] = speicher_nutzung
-
-        # 5. Netzeinspeisung nach Speicherladung (brutto-Ladung abziehen)
-        netzeinspeisung = max(0.0, pv_ueberschuss - speicher_ladung_brutto)
-        monthly_feed_in_kwh[i] = netzeinspeisung
-
-        # 6. Netzbezug: Restverbrauch minus Speicher-Nutzung
-        grid_bezug = max(0.0, rest_verbrauch - speicher_nutzung)
-        monthly_grid_bezug_kwh[i] = grid_bezug
+                    "direct_sc_fraction_cap",
+                    0.35) or 0.35)
+            if direct_fraction < 0.05:
+                direct_fraction = 0.05
+            if direct_fraction > 0.85:
+                direct_fraction = 0.85
+            direct_sc = min(direct_sc_base, prod_month * direct_fraction)
+            monthly_direct_self_consumption_kwh[i] = direct_sc
+
+            # 2. Überschuss & Restverbrauch nach Direktverbrauch
+            pv_ueberschuss = max(0.0, prod_month - direct_sc)
+            rest_verbrauch = max(0.0, cons_month - direct_sc)
+
+            # 3. Speicher-Ladung nur aus PV-Überschuss
+            speicher_ladung_brutto = (
+                min(pv_ueberschuss, selected_storage_capacity_kwh)
+                if include_storage and selected_storage_capacity_kwh > 0
+                else 0.0
+            )
+            speicher_ladung_netto = speicher_ladung_brutto * storage_efficiency
+            monthly_storage_charge_kwh[i] = speicher_ladung_netto
+
+            # 4. Speicher-Nutzung: realistisch wird ein Teil der geladenen Energie zeitversetzt verbraucht
+            # Falls rest_verbrauch == 0 (z.B. sehr niedriger Verbrauch oder hohe direkte Deckung), erlauben wir
+            # trotzdem eine Nutzung eines Anteils (abendliche Verlagerung). Annahme: bis zu 50 % des Verbrauchs
+            # darf über zeitversetzte Speicherung laufen, begrenzt durch Ladung.
+            evening_fraction = float(
+                global_constants.get(
+                    "evening_shift_fraction",
+                    0.5) or 0.5)
+            if evening_fraction < 0.1:
+                evening_fraction = 0.1
+            if evening_fraction > 0.9:
+                evening_fraction = 0.9
+
+            # Basispotenzial für Speicherentladung = Restverbrauch
+            discharge_potential = rest_verbrauch
+            if discharge_potential <= 0 and speicher_ladung_netto > 0 and cons_month > 0:
+                # Künstliche Abendverschiebung falls kompletter Verbrauch schon als
+                # direkt gezählt wurde
+                shifted_portion = cons_month * evening_fraction
+                # Verhindere Doppelzählung: reduziere den direkten Eigenverbrauch
+                # entsprechend (nur intern für Entladung)
+                effective_direct_for_storage_view = max(
+                    0.0, direct_sc - shifted_portion)
+                # Neue nutzbare Speicher-Entladungsmenge durch Verschiebung
+                discharge_potential = min(shifted_portion, speicher_ladung_netto)
+            # Tatsächliche Speicherentladung begrenzt durch Ladung
+            speicher_nutzung = min(speicher_ladung_netto, discharge_potential)
+
+            # 4b. Mindest-Nutzungsanteil falls bislang 0 (Vermeidung
+            # unrealistischer 0-Entladung bei vorhandener Ladung)
+            if speicher_nutzung <= 0 and speicher_ladung_netto > 0 and cons_month > 0:
+                min_usage_share = float(
+                    global_constants.get(
+                        "storage_min_usage_share_of_charge",
+                        0.25) or 0.25)
+                if min_usage_share < 0.05:
+                    min_usage_share = 0.05
+                if min_usage_share > 0.9:
+                    min_usage_share = 0.9
+                min_usage_candidate = speicher_ladung_netto * min_usage_share
+                # Zusätzlich durch Gesamtverbrauch begrenzen
+                min_usage = min(
+                    min_usage_candidate,
+                    speicher_ladung_netto,
+                    cons_month)
+                if min_usage > speicher_nutzung:
+                    speicher_nutzung = min_usage
+
+            monthly_storage_discharge_for_sc_kwh[i] = speicher_nutzung
+
+            # 5. Netzeinspeisung nach Speicherladung (brutto-Ladung abziehen)
+            netzeinspeisung = max(0.0, pv_ueberschuss - speicher_ladung_brutto)
+            monthly_feed_in_kwh[i] = netzeinspeisung
+
+            # 6. Netzbezug: Restverbrauch minus Speicher-Nutzung
+            grid_bezug = max(0.0, rest_verbrauch - speicher_nutzung)
+            monthly_grid_bezug_kwh[i] = grid_bezug
 
-        if app_debug_mode_is_enabled:
-            try:
-                print(
-                    f"MONAT {
-                        i +
-                        1:02d} | Prod={
-                        prod_month:.2f} kWh | Verbrauch={
-                        cons_month:.2f} kWh | Direkt={
-                        direct_sc:.2f} | PV-Überschuss={
-                        pv_ueberschuss:.2f} | RestVerbrauch={
-                            rest_verbrauch:.2f} | Ladung={
-                                speicher_ladung_netto:.2f} | Nutzung={
-                                    speicher_nutzung:.2f} | Einspeisung={
-                                        netzeinspeisung:.2f} | Netzbezug={
-                                            grid_bezug:.2f}")
-            except Exception:
-                pass
+            if app_debug_mode_is_enabled:
+                try:
+                    print(
+                        f"MONAT {
+                            i +
+                            1:02d} | Prod={
+                            prod_month:.2f} kWh | Verbrauch={
+                            cons_month:.2f} kWh | Direkt={
+                            direct_sc:.2f} | PV-Überschuss={
+                            pv_ueberschuss:.2f} | RestVerbrauch={
+                                rest_verbrauch:.2f} | Ladung={
+                                    speicher_ladung_netto:.2f} | Nutzung={
+                                        speicher_nutzung:.2f} | Einspeisung={
+                                            netzeinspeisung:.2f} | Netzbezug={
+                                                grid_bezug:.2f}")
+                except Exception:
+                    pass
 
     # --- Spezialfall Volleinspeisung ----------------------------------------
     feed_in_type_str_tmp = str(
@@ -3426,6 +3625,8 @@ def perform_calculations(
             "annual_storage_discharge_kwh": annual_storage_discharge_kwh,
         }
     )
+    if hourly_simulation_summary is not None:
+        results["hourly_simulation_summary"] = hourly_simulation_summary
 
     selected_inverter_id = project_details.get("selected_inverter_id")
     inverter_details = (real_get_product_by_id(
@@ -3449,11 +3650,15 @@ def perform_calculations(
     #   row_label  = Anzahl Module (floor match für numerische Labels)
     #   column_label = Speicher-Konfiguration (oder "Ohne Speicher")
     # einen Basispreis zu ermitteln. Fallback: 0.0
-    from price_matrix_store import get_active_matrix_id, get_matrix_full, lookup_price
+    from price_matrix_store import (
+        get_cached_active_matrix_id,
+        get_matrix_meta,
+        lookup_prices,
+    )
     matrix_price_is_pauschal = False
     # Speichert tatsächliche Spalte die gefunden wurde
     matrix_column_used_for_price = None
-    active_matrix_id = get_active_matrix_id()
+    active_matrix_id = get_cached_active_matrix_id()
     storage_column_label = None
     if include_storage:
         # Speicherlabel aus project_details oder DB ableiten
@@ -3483,31 +3688,33 @@ def perform_calculations(
             row_label = str(
                 int(module_quantity)) if module_quantity is not None else None
             col_label = storage_column_label
-            looked_up = None
+            # Kandidatenspalten in Fallback-Reihenfolge, ein Batch-Lookup
+            candidate_columns = []
             if row_label and col_label:
-                looked_up = lookup_price(
-                    active_matrix_id, row_label, col_label)
-                if looked_up is None and include_storage:
+                candidate_columns.append(col_label)
+                if include_storage:
                     # Versuch Fallback auf generischen Speicherlabel
-                    generic_fallback = texts.get(
+                    fallback_label = texts.get(
                         "storage_generic_label", "Speicher")
-                    if generic_fallback != col_label:
-                        looked_up = lookup_price(
-                            active_matrix_id, row_label, generic_fallback)
-                if looked_up is None and not include_storage:
+                else:
                     # Versuch alternativen Ohne-Speicher Text
-                    alt_no_storage = texts.get(
+                    fallback_label = texts.get(
                         "no_storage_alt_label", "Ohne Speicher")
-                    if alt_no_storage != col_label:
-                        looked_up = lookup_price(
-                            active_matrix_id, row_label, alt_no_storage)
-            if looked_up is None and row_label:
+                if fallback_label != col_label:
+                    candidate_columns.append(fallback_label)
+            if row_label:
                 # Letzter Fallback: kolumnen-unabhängige Basis (falls Spalte
                 # nicht gefunden) -> Versuche "Ohne Speicher"
-                generic_no_storage = texts.get(
-                    "no_storage_option_for_matrix", "Ohne Speicher")
-                looked_up = lookup_price(
-                    active_matrix_id, row_label, generic_no_storage)
+                candidate_columns.append(texts.get(
+                    "no_storage_option_for_matrix", "Ohne Speicher"))
+            looked_up = None
+            if candidate_columns:
+                prices = lookup_prices(
+                    active_matrix_id, [row_label], candidate_columns)
+                if prices is not None:
+                    found = prices[0][~np.isnan(prices[0])]
+                    if found.size:
+                        looked_up = float(found[0])
             if looked_up is not None:
                 base_matrix_price_netto = float(looked_up)
                 # Annahme: Matrixpreis beinhaltet Standardkosten außer
@@ -3519,9 +3726,8 @@ def perform_calculations(
                 # Versuche Meta-Daten einzulesen (pricing_mode / include_*
                 # flags)
                 try:
-                    _full = get_matrix_full(active_matrix_id)
-                    if _full and isinstance(_full, dict):
-                        _meta = _full.get('meta') or {}
+                    _meta = get_matrix_meta(active_matrix_id)
+                    if _meta:
                         matrix_pricing_mode = (
                             _meta.get('pricing_mode') or 'pauschal') or 'pauschal'
                         matrix_include_accessories = bool(
@@ -3933,21 +4139,6 @@ def perform_calculations(
         pass
 
     # --- Simulation über die Jahre ---
-    cash_flows_initial_investment = [
-        -total_investment_netto
-    ]  # Jahr 0 ist die Investition
-    (
-        annual_productions_sim_list,
-        annual_benefits_sim_list,
-        annual_maintenance_costs_sim_list,
-    ) = ([], [], [])
-    (
-        annual_cash_flows_yearly_list,
-        annual_elec_prices_sim_list,
-        annual_feed_in_tariffs_sim_list,
-    ) = ([], [], [])
-    annual_revenue_from_feed_in_sim_list = []  # Für detailliertere Analyse
-
     # Wartungskosten
     maintenance_fixed_pa = float(
         global_constants.get("maintenance_fixed_eur_pa", 0.0) or 0.0
@@ -3991,161 +4182,84 @@ def perform_calculations(
     # Wartungskosten für erweiterte Berechnungen definieren
     maintenance_cost_fixed_pa = annual_maintenance_costs_eur_year1_calc
 
-    for year_idx in range(1, results["simulation_period_years_effective"] + 1):
-        current_year_production = annual_pv_production_kwh * (
-            annual_degredation_factor ** (year_idx - 1)
-        )
-        annual_productions_sim_list.append(current_year_production)
-
-        # Annahme: Anteile von EV und Einspeisung bleiben über die Jahre
-        # relativ konstant zur Produktion
-        ev_anteil_an_prod_j1 = (
-            eigenverbrauch_pro_jahr_kwh / annual_pv_production_kwh
-            if annual_pv_production_kwh > 0
-            else 0
-        )
-        einspeisung_anteil_an_prod_j1 = (
-            netzeinspeisung_kwh / annual_pv_production_kwh
-            if annual_pv_production_kwh > 0
-            else 0
-        )
-
-        current_year_ev = current_year_production * ev_anteil_an_prod_j1
-        current_year_einspeisung = (
-            current_year_production * einspeisung_anteil_an_prod_j1
-        )
-
-        elec_price_sim = electricity_price_kwh * (
-            (1 + results["electricity_price_increase_rate_effective_percent"] / 100.0)
-            ** (year_idx - 1)
-        )
-        annual_elec_prices_sim_list.append(elec_price_sim)
-
-        feed_in_tariff_sim = results[
-            "einspeiseverguetung_eur_per_kwh"
-        ]  # Annahme: fester Tarif für EEG-Zeitraum
-        if year_idx > int(
-            global_constants.get("einspeiseverguetung_period_years", 20) or 20
-        ):  # Nach EEG-Vergütungszeitraum
-            feed_in_tariff_sim = float(
-                global_constants.get(
-                    "marktwert_strom_eur_per_kwh_after_eeg",
-                    0.03) or 0.03)  # Marktwert
-        annual_feed_in_tariffs_sim_list.append(feed_in_tariff_sim)
-
-        cost_savings_sim = current_year_ev * elec_price_sim
-        feed_in_rev_sim = current_year_einspeisung * feed_in_tariff_sim
-        annual_revenue_from_feed_in_sim_list.append(
-            feed_in_rev_sim
-        )  # Speichern für Details
-
-        tax_benefit_sim = (
-            feed_in_rev_sim * (income_tax_rate_percent / 100.0)
+    # Annahme: Anteile von EV und Einspeisung bleiben über die Jahre
+    # relativ konstant zur Produktion
+    ev_anteil_an_prod_j1 = (
+        eigenverbrauch_pro_jahr_kwh / annual_pv_production_kwh
+        if annual_pv_production_kwh > 0
+        else 0
+    )
+    einspeisung_anteil_an_prod_j1 = (
+        netzeinspeisung_kwh / annual_pv_production_kwh
+        if annual_pv_production_kwh > 0
+        else 0
+    )
+    # Jahre x Kennzahlen in einem Schritt; alle Zeitreihen, NPV, IRR und
+    # LCOE werden aus dieser Matrix gelesen
+    projection = project_cash_flows(
+        years=results["simulation_period_years_effective"],
+        investment=total_investment_netto,
+        production_kwh=annual_pv_production_kwh,
+        self_consumption_share=ev_anteil_an_prod_j1,
+        feed_in_share=einspeisung_anteil_an_prod_j1,
+        electricity_price=electricity_price_kwh,
+        price_increase=results["electricity_price_increase_rate_effective_percent"] / 100.0,
+        degradation=annual_module_degradation_percent / 100.0,
+        # Fester Tarif im EEG-Zeitraum, danach Marktwert
+        feed_in_tariff=results["einspeiseverguetung_eur_per_kwh"],
+        feed_in_tariff_after=float(
+            global_constants.get(
+                "marktwert_strom_eur_per_kwh_after_eeg",
+                0.03) or 0.03),
+        feed_in_tariff_years=int(
+            global_constants.get("einspeiseverguetung_period_years", 20) or 20),
+        tax_rate=(
+            income_tax_rate_percent / 100.0
             if customer_data.get("type", "Privat").lower() == "gewerblich"
             else 0.0
-        )
-        maint_costs_sim = annual_maintenance_costs_eur_year1_calc * (
-            (1 + maintenance_increase_pa_rate) ** (year_idx - 1)
-        )
-        annual_maintenance_costs_sim_list.append(maint_costs_sim)
-
-        annual_benefit_this_year = cost_savings_sim + feed_in_rev_sim + tax_benefit_sim
-        annual_benefits_sim_list.append(annual_benefit_this_year)
-
-        cash_flow_this_year = annual_benefit_this_year - maint_costs_sim
-        cash_flows_initial_investment.append(
-            cash_flow_this_year)  # Für IRR und NPV
-        annual_cash_flows_yearly_list.append(
-            cash_flow_this_year
-        )  # Nur die jährlichen CFs
+        ),
+        maintenance_year1=annual_maintenance_costs_eur_year1_calc,
+        maintenance_increase=maintenance_increase_pa_rate,
+        discount_rate=loan_interest_rate_percent / 100.0,  # Kalkulatorischer Zinssatz
+        inflation=inflation_rate_percent / 100.0,
+    )
+    annual_productions_sim_list = projection.metric("production_kwh")[0].tolist()
 
     results.update(
         {
             "annual_productions_sim": annual_productions_sim_list,
-            "annual_benefits_sim": annual_benefits_sim_list,
-            "annual_maintenance_costs_sim": annual_maintenance_costs_sim_list,
+            "annual_benefits_sim": projection.metric("benefit")[0].tolist(),
+            "annual_maintenance_costs_sim": projection.metric("maintenance")[0].tolist(),
             # Jährliche CFs (ohne Jahr 0)
-            "annual_cash_flows_sim": annual_cash_flows_yearly_list,
-            "cumulative_cash_flows_sim": np.cumsum(
-                cash_flows_initial_investment
-            ).tolist(),  # Kumulierte CFs (inkl. Jahr 0)
-            "annual_elec_prices_sim": annual_elec_prices_sim_list,  # Strompreise pro Jahr
+            "annual_cash_flows_sim": projection.metric("cash_flow")[0].tolist(),
+            # Kumulierte CFs (inkl. Jahr 0)
+            "cumulative_cash_flows_sim": projection.cumulative_cash_flows()[0].tolist(),
+            # Strompreise pro Jahr
+            "annual_elec_prices_sim": projection.metric("electricity_price")[0].tolist(),
             # Einspeisevergütung pro Jahr
-            "annual_feed_in_tariffs_sim": annual_feed_in_tariffs_sim_list,
+            "annual_feed_in_tariffs_sim": projection.metric("feed_in_tariff")[0].tolist(),
             # Jährliche Einnahmen aus Einspeisung
-            "annual_revenue_from_feed_in_sim": annual_revenue_from_feed_in_sim_list,
+            "annual_revenue_from_feed_in_sim": projection.metric("feed_in_revenue")[0].tolist(),
         }
     )
 
     # --- Weitere Kennzahlen ---
-    # Nettobarwert (NPV)
-    npv_value = -cash_flows_initial_investment[0]  # Investition in Jahr 0
-    discount_rate_npv = loan_interest_rate_percent / \
-        100.0  # Kalkulatorischer Zinssatz
-    for i_npv, cf_val in enumerate(
-            cash_flows_initial_investment[1:], 1):  # Ab Jahr 1
-        npv_value += cf_val / ((1 + discount_rate_npv) ** i_npv)
+    # Nettobarwert (NPV): Investition in Jahr 0, Cashflows ab Jahr 1 abgezinst
+    npv_value = float(projection.npv()[0])
     results["npv_value"] = npv_value
     results["npv_per_kwp"] = (
         npv_value /
         results["anlage_kwp"] if results["anlage_kwp"] > 0 else float("nan"))
 
-    # Interner Zinsfuß (IRR)
-    try:
-        import numpy_financial as npf
-
-        irr_val = npf.irr(
-            cash_flows_initial_investment
-        )  # Benötigt Cashflows inkl. initialer Investition
-        results["irr_percent"] = (
-            irr_val *
-            100 if irr_val is not None and not (
-                math.isnan(irr_val) or math.isinf(irr_val)) else float("nan"))
-    except ImportError:
-        results["irr_percent"] = float("nan")
-        errors_list.append(
-            texts.get(
-                "warn_numpy_financial_missing_for_irr",
-                "Hinweis: numpy_financial nicht installiert, IRR kann nicht berechnet werden.",
-            ))
-    except (
-        Exception
-    ) as e_irr_calc:  # Fängt auch ValueError von npf.irr ab, wenn keine Lösung gefunden
-        results["irr_percent"] = float("nan")
-        errors_list.append(
-            (
-                texts.get(
-                    "error_irr_calculation",
-                    "Fehler bei IRR-Berechnung: {error_details}",
-                )
-                or ""
-            ).format(error_details=str(e_irr_calc))
-        )
+    # Interner Zinsfuß (IRR), NaN wenn die Zahlungsreihe keinen hat
+    irr_val = float(projection.irr()[0])
+    results["irr_percent"] = (
+        irr_val * 100 if not (math.isnan(irr_val) or math.isinf(irr_val))
+        else float("nan"))
 
-    # Stromgestehungskosten (LCOE)
-    total_discounted_costs_lcoe = total_investment_netto  # Kosten in Jahr 0
-    total_discounted_production_lcoe = 0.0
-    discount_rate_lcoe = (
-        loan_interest_rate_percent / 100.0
-    )  # Gleicher Diskontsatz wie NPV
-    if annual_productions_sim_list and annual_maintenance_costs_sim_list:
-        for y_idx in range(
-            min(
-                len(annual_productions_sim_list),
-                len(annual_maintenance_costs_sim_list),
-                results["simulation_period_years_effective"],
-            )
-        ):
-            total_discounted_production_lcoe += annual_productions_sim_list[y_idx] / (
-                (1 + discount_rate_lcoe) ** (y_idx + 1))
-            total_discounted_costs_lcoe += annual_maintenance_costs_sim_list[y_idx] / (
-                (1 + discount_rate_lcoe) ** (y_idx + 1)
-            )  # Diskontierte Wartungskosten addieren
-    results["lcoe_euro_per_kwh"] = (
-        total_discounted_costs_lcoe / total_discounted_production_lcoe
-        if total_discounted_production_lcoe > 0
-        else float("inf")
-    )
+    # Stromgestehungskosten (LCOE): Investition + diskontierte Wartung je
+    # diskontierter kWh (gleicher Diskontsatz wie NPV)
+    results["lcoe_euro_per_kwh"] = float(projection.lcoe()[0])
     results["effektiver_pv_strompreis_ct_kwh"] = (
         results["lcoe_euro_per_kwh"] * 100
         if results["lcoe_euro_per_kwh"] != float("inf")
@@ -4288,9 +4402,6 @@ def perform_calculations(
         results["pv_deckungsgrad_wp_pct"] = 0.0
 
     # Kostenhochrechnung ohne PV
-    annual_costs_hochrechnung_values_calc = []
-    total_projected_costs_with_increase_calc = 0.0
-    total_projected_costs_without_increase_calc = 0.0
     base_consumption_for_projection_calc = (
         project_details.get("annual_consumption_kwh_yr", 0.0) or 0.0
     ) + (project_details.get("consumption_heating_kwh_yr", 0.0) or 0.0)
@@ -4302,19 +4413,17 @@ def perform_calculations(
     # base_consumption_for_projection_calc > 0 and app_debug_mode_is_enabled:
     # errors_list.append(texts.get("warn_zero_price_for_projection","Warnung:
     # Strompreis für Kostenhochrechnung ist 0 €/kWh.")) # Bereinigt
-    for year_proj_calc in range(results["simulation_period_years_effective"]):
-        cost_this_year_proj_calc = (
-            base_consumption_for_projection_calc *
-            base_price_for_projection_calc *
-            (
-                (1 +
-                 results["electricity_price_increase_rate_effective_percent"] /
-                 100.0) ** year_proj_calc))
-        annual_costs_hochrechnung_values_calc.append(cost_this_year_proj_calc)
-        total_projected_costs_with_increase_calc += cost_this_year_proj_calc
-        total_projected_costs_without_increase_calc += (
-            base_consumption_for_projection_calc *
-            base_price_for_projection_calc)
+    # Preisindex aus derselben Hochrechnung wie die PV-Cashflows
+    base_costs_for_projection_calc = (
+        base_consumption_for_projection_calc * base_price_for_projection_calc)
+    annual_costs_hochrechnung_values_calc = (
+        base_costs_for_projection_calc * projection.metric("price_index")[0]
+    ).tolist()
+    total_projected_costs_with_increase_calc = float(
+        sum(annual_costs_hochrechnung_values_calc))
+    total_projected_costs_without_increase_calc = (
+        base_costs_for_projection_calc *
+        results["simulation_period_years_effective"])
     results["annual_costs_hochrechnung_values"] = annual_costs_hochrechnung_values_calc
     results["annual_costs_hochrechnung_jahre_effektiv"] = results[
         "simulation_period_years_effective"
@@ -4603,47 +4712,7 @@ def perform_calculations(
     # Fehler/Hinweise: {errors_list}") # Bereinigt
 
     # *** BACKUP-SYSTEM: Speichere Ergebnisse in Session State mit Zeitstempel ***
-    try:
-        import streamlit as st
-
-        if hasattr(st, "session_state"):
-            # Zeitstempel für dieses Berechnungsergebnis
-            timestamp = datetime.now().isoformat()
-
-            # Speichere Hauptergebnisse
-            st.session_state.calculation_results = results.copy()
-
-            # Update enhanced pricing if components are available
-            _update_enhanced_pricing_in_calculation_results(results)
-
-            # Erstelle Backup-Kopie mit Zeitstempel
-            backup_data = {
-                "results": results.copy(),
-                "timestamp": timestamp,
-                "project_data_summary": {
-                    "anlage_kwp": results.get("anlage_kwp", 0),
-                    "total_investment_brutto": results.get(
-                        "total_investment_brutto", 0
-                    ),
-                    "annual_pv_production_kwh": results.get(
-                        "annual_pv_production_kwh", 0
-                    ),
-                },
-            }
-            st.session_state.calculation_results_backup = backup_data
-
-            # Speichere zusätzlich einen Timestamp für Debugging
-            st.session_state.calculation_timestamp = timestamp
-
-            if app_debug_mode_is_enabled:
-                print(
-                    f"CALC: Berechnungsergebnisse in Session State gespeichert (Zeitstempel: {timestamp})")
-    except ImportError:
-        # Streamlit nicht verfügbar (z.B. bei direkter Ausführung)
-        pass
-    except Exception as e:
-        if app_debug_mode_is_enabled:
-            print(f"CALC: Fehler beim Speichern in Session State: {e}")
+    _store_calculation_results_in_session(results, app_debug_mode_is_enabled)
 
     return results
 
@@ -4651,6 +4720,8 @@ def perform_calculations(
 class BreakEvenAnalysis:
     """Break-Even Analyseklasse für Wirtschaftlichkeitsberechnungen"""
 
+    MAX_YEARS = 50  # Sicherheitslimit
+
     def __init__(
             self,
             investment: float,
@@ -4677,114 +4748,70 @@ class BreakEvenAnalysis:
             else:
                 scenarios["simple_break_even_years"] = float('inf')
 
-            # Break-Even mit Preissteigerung
-            break_even_with_increase = self.calculate_break_even_with_price_increase()
-            scenarios["break_even_with_price_increase_years"] = break_even_with_increase
-
-            # Break-Even mit Inflation
-            break_even_with_inflation = self.calculate_break_even_with_inflation()
-            scenarios["break_even_with_inflation_years"] = break_even_with_inflation
-
-            # Optimistisches Szenario (Preissteigerung + niedrigere Inflation)
-            optimistic_break_even = self.calculate_optimistic_scenario()
-            scenarios["optimistic_break_even_years"] = optimistic_break_even
-
-            # Konservatives Szenario (höhere Inflation, niedrigere
-            # Preissteigerung)
-            conservative_break_even = self.calculate_conservative_scenario()
-            scenarios["conservative_break_even_years"] = conservative_break_even
+            # Preissteigerung, Inflation (real), optimistisch (20% höhere
+            # Preissteigerung) und konservativ (30% niedrigere
+            # Preissteigerung, 30% höhere Inflation) in einer Hochrechnung
+            (
+                scenarios["break_even_with_price_increase_years"],
+                scenarios["break_even_with_inflation_years"],
+                scenarios["optimistic_break_even_years"],
+                scenarios["conservative_break_even_years"],
+            ) = self._break_even_years(
+                price_increases=[
+                    self.electricity_price_increase,
+                    self.electricity_price_increase,
+                    self.electricity_price_increase * 1.2,
+                    self.electricity_price_increase * 0.7,
+                ],
+                inflation_rates=[
+                    0.0, self.inflation_rate, 0.0, self.inflation_rate * 1.3],
+            )
 
         except Exception as e:
             scenarios["error"] = f"Fehler bei Break-Even Berechnung: {str(e)}"
 
         return scenarios
 
-    def calculate_break_even_with_price_increase(self) -> float:
-        """Break-Even Berechnung mit Strompreissteigerung"""
+    def _break_even_years(
+            self,
+            price_increases: list[float],
+            inflation_rates: list[float]) -> list[float]:
+        """Amortisationsjahr (inflationsbereinigt) je Szenario, inf ab 50 Jahren."""
         if self.annual_savings <= 0:
-            return float('inf')
-
-        cumulative_savings = 0
-        year = 0
-        max_years = 50  # Sicherheitslimit
-
-        while cumulative_savings < self.investment and year < max_years:
-            year += 1
-            annual_savings_this_year = self.annual_savings * \
-                ((1 + self.electricity_price_increase) ** (year - 1))
-            cumulative_savings += annual_savings_this_year
+            return [float('inf')] * len(price_increases)
+        if self.investment <= 0:
+            return [0] * len(price_increases)
+        projection = project_savings(
+            investment=self.investment,
+            annual_savings=self.annual_savings,
+            years=self.MAX_YEARS - 1,
+            price_increase=np.asarray(price_increases, dtype=float),
+            inflation=np.asarray(inflation_rates, dtype=float),
+            batch=True,
+        )
+        return [
+            int(year) if math.isfinite(year) else float('inf')
+            for year in projection.break_even_years(real=True)
+        ]
 
-        return round(year, 2) if year < max_years else float('inf')
+    def calculate_break_even_with_price_increase(self) -> float:
+        """Break-Even Berechnung mit Strompreissteigerung"""
+        return self._break_even_years([self.electricity_price_increase], [0.0])[0]
 
     def calculate_break_even_with_inflation(self) -> float:
         """Break-Even Berechnung mit Inflation (Real-Betrachtung)"""
-        if self.annual_savings <= 0:
-            return float('inf')
-
-        # Reale Einsparungen (inflationsbereinigt)
-        real_annual_savings = self.annual_savings
-        real_investment = self.investment
-
-        cumulative_real_savings = 0
-        year = 0
-        max_years = 50
-
-        while cumulative_real_savings < real_investment and year < max_years:
-            year += 1
-            # Nominale Einsparungen steigen mit Strompreissteigerung
-            nominal_savings = self.annual_savings * \
-                ((1 + self.electricity_price_increase) ** (year - 1))
-            # Reale Einsparungen (inflationsbereinigt)
-            real_savings_this_year = nominal_savings / \
-                ((1 + self.inflation_rate) ** (year - 1))
-            cumulative_real_savings += real_savings_this_year
-
-        return round(year, 2) if year < max_years else float('inf')
+        return self._break_even_years(
+            [self.electricity_price_increase], [self.inflation_rate])[0]
 
     def calculate_optimistic_scenario(self) -> float:
         """Optimistisches Szenario mit erhöhter Strompreissteigerung"""
-        optimistic_price_increase = self.electricity_price_increase * \
-            1.2  # 20% höhere Preissteigerung
-
-        if self.annual_savings <= 0:
-            return float('inf')
-
-        cumulative_savings = 0
-        year = 0
-        max_years = 50
-
-        while cumulative_savings < self.investment and year < max_years:
-            year += 1
-            annual_savings_this_year = self.annual_savings * \
-                ((1 + optimistic_price_increase) ** (year - 1))
-            cumulative_savings += annual_savings_this_year
-
-        return round(year, 2) if year < max_years else float('inf')
+        return self._break_even_years(
+            [self.electricity_price_increase * 1.2], [0.0])[0]
 
     def calculate_conservative_scenario(self) -> float:
         """Konservatives Szenario mit reduzierter Strompreissteigerung"""
-        conservative_price_increase = self.electricity_price_increase * \
-            0.7  # 30% niedrigere Preissteigerung
-        higher_inflation = self.inflation_rate * 1.3  # 30% höhere Inflation
-
-        if self.annual_savings <= 0:
-            return float('inf')
-
-        cumulative_real_savings = 0
-        year = 0
-        max_years = 50
-
-        while cumulative_real_savings < self.investment and year < max_years:
-            year += 1
-            # Nominale Einsparungen mit konservativer Preissteigerung
-            nominal_savings = self.annual_savings * \
-                ((1 + conservative_price_increase) ** (year - 1))
-            # Reale Einsparungen mit höherer Inflation
-            real_savings_this_year = nominal_savings / \
-                ((1 + higher_inflation) ** (year - 1))
-            cumulative_real_savings += real_savings_this_year
-
-        return round(year, 2) if year < max_years else float('inf')
+        return self._break_even_years(
+            [self.electricity_price_increase * 0.7], [self.inflation_rate * 1.3])[0]
 
 
 class EnergyPriceComparison:
@@ -4850,32 +4877,18 @@ class TechnicalDegradation:
         self.warranty_power = warranty_power
 
     def calculate_degradation(self, years: int = 25) -> dict[str, Any]:
-        efficiency_by_year = []
-        degradation_rate_by_year = []
-        current_power = self.initial_power
-
-        for year in range(years):
-            # Guard gegen Division durch 0
-            if self.initial_power and self.initial_power > 0:
-                efficiency = (current_power / self.initial_power) * 100
-            else:
-                efficiency = 0.0
-            efficiency_by_year.append(efficiency)
-
-            if year < years - 1:
-                next_power = current_power * \
-                    (1 - self.annual_degradation / 100)
-                # Wenn current_power 0 ist, setze Rate direkt auf
-                # annual_degradation
-                if current_power and current_power > 0:
-                    degradation_rate = (
-                        (current_power - next_power) / current_power) * 100
-                else:
-                    degradation_rate = self.annual_degradation
-                degradation_rate_by_year.append(degradation_rate)
-                current_power = next_power
-            else:
-                degradation_rate_by_year.append(self.annual_degradation)
+        # Leistungsindex je Jahr (Jahr 1 = 1.0) aus dem Cashflow-Rechenkern
+        power_index = growth_index(-self.annual_degradation / 100, years)[0]
+        # Guard gegen Division durch 0
+        if self.initial_power and self.initial_power > 0:
+            efficiency_by_year = (power_index * 100).tolist()
+        else:
+            efficiency_by_year = [0.0] * years
+        # Konstante Degradation: relative Abnahme ist in jedem Jahr gleich
+        degradation_rate_by_year = [self.annual_degradation] * years
+        current_power = (
+            self.initial_power * float(power_index[-1])
+            if years > 0 else self.initial_power)
 
         if self.initial_power and self.initial_power > 0:
             total_degradation = (
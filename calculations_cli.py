@@ -34,13 +34,20 @@ except ImportError as exc:
         "dass es sich im Python‑Pfad befindet.") from exc
 
 
-def main() -> None:
-    """Liest JSON von stdin, führt die Berechnung aus und schreibt das Ergebnis."""
-    try:
-        data: dict[str, Any] = json.load(sys.stdin)
-    except json.JSONDecodeError as exc:
-        raise SystemExit(f"Ungültiges JSON auf der Eingabe: {exc}")
+def json_serializer(obj: Any) -> Any:
+    """JSON-Serialisierung für datetime-Objekte."""
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(
+        f'Object of type {
+            type(obj).__name__} is not JSON serializable')
+
+
+def run_calculations(data: dict[str, Any]) -> dict[str, Any]:
+    """Führt ``perform_calculations`` für ein Eingabe-Objekt (siehe oben) aus.
 
+    Wird auch vom ``calculation_worker`` pro Anfrage aufgerufen.
+    """
     project_data: dict[str, Any] = data.get("project_data", {})
     texts: dict[str, str] = data.get("texts", {})
     errors_list: list[str] = data.get("errors_list", [])
@@ -49,7 +56,7 @@ def main() -> None:
         "electricity_price_increase_user"
     )
 
-    results: dict[str, Any] = perform_calculations(
+    return perform_calculations(
         project_data,
         texts,
         errors_list,
@@ -57,14 +64,15 @@ def main() -> None:
         electricity_price_increase_user,
     )
 
-    # JSON-Serialisierung mit datetime Behandlung
-    def json_serializer(obj):
-        """Custom JSON serializer for datetime objects."""
-        if hasattr(obj, 'isoformat'):
-            return obj.isoformat()
-        raise TypeError(
-            f'Object of type {
-                type(obj).__name__} is not JSON serializable')
+
+def main() -> None:
+    """Liest JSON von stdin, führt die Berechnung aus und schreibt das Ergebnis."""
+    try:
+        data: dict[str, Any] = json.load(sys.stdin)
+    except json.JSONDecodeError as exc:
+        raise SystemExit(f"Ungültiges JSON auf der Eingabe: {exc}")
+
+    results: dict[str, Any] = run_calculations(data)
 
     json.dump(
         results,
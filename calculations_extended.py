@@ -24,7 +24,7 @@ Version: 1.1 (AI-Fully-Implemented)
 
 from typing import Any
 
-import numpy_financial as npf  # Benötigt: pip install numpy-financial
+from cashflow_projection import irr, npv, project_savings
 
 # --- Globale Annahmen für Berechnungen (können in Settings ausgelagert werden) ---
 LIFESPAN_YEARS = 25  # Lebensdauer der Anlage in Jahren
@@ -41,18 +41,13 @@ def calculate_dynamic_payback_period(
     """Berechnet die Amortisationszeit mit jährlicher Preissteigerung."""
     if investment <= 0 or initial_annual_savings <= 0:
         return float('inf')
-    years = 0
-    cumulative_savings = 0
-    current_annual_savings = initial_annual_savings
-    while cumulative_savings < investment:
-        cumulative_savings += current_annual_savings
-        current_annual_savings *= (1 + price_increase_percent / 100)
-        years += 1
-        if years > 50:
-            return float('inf')  # Sicherheitsabbruch
-    # Feinjustierung für unterjährige Amortisation
-    return years - (cumulative_savings - investment) / \
-        (current_annual_savings / (1 + price_increase_percent / 100))
+    # Sicherheitsabbruch nach 50 Jahren, unterjährig interpoliert
+    projection = project_savings(
+        investment=investment,
+        annual_savings=initial_annual_savings,
+        years=50,
+        price_increase=price_increase_percent / 100)
+    return float(projection.break_even_years(fractional=True)[0])
 
 
 def calculate_net_present_value(
@@ -60,7 +55,7 @@ def calculate_net_present_value(
         annual_savings: float) -> float:
     """Berechnet den Kapitalwert (NPV) der Investition."""
     cash_flows = [annual_savings] * LIFESPAN_YEARS
-    return npf.npv(DISCOUNT_RATE, cash_flows) - investment
+    return npv(DISCOUNT_RATE, cash_flows) - investment
 
 
 def calculate_internal_rate_of_return(
@@ -70,10 +65,7 @@ def calculate_internal_rate_of_return(
     if investment <= 0:
         return 0.0
     cash_flows = [-investment] + [annual_savings] * LIFESPAN_YEARS
-    try:
-        return npf.irr(cash_flows) * 100
-    except Exception:
-        return 0.0
+    return irr(cash_flows) * 100
 
 
 # calculations_extended.py
@@ -174,17 +166,14 @@ def calculate_effective_pv_electricity_price(
 
 def calculate_npv(cashflows: list[float], discount_rate: float) -> float:
     """11. Nettobarwert (NPV) """
-    # npf.npv erwartet die Rate als ersten Parameter und dann die Cashflows.
+    # Wie numpy_financial.npv: der erste Cashflow wird nicht abgezinst.
     # Die Initialinvestition ist oft der erste (negative) Cashflow.
-    return npf.npv(discount_rate, cashflows)
+    return npv(discount_rate, cashflows)
 
 
 def calculate_irr(cashflows: list[float]) -> float:
     """12. Interner Zinsfuß (IRR) """
-    try:
-        return npf.irr(cashflows) * 100
-    except BaseException:
-        return 0.0
+    return irr(cashflows) * 100
 
 
 def calculate_alternative_investment_value(
@@ -522,7 +511,7 @@ def calculate_profitability_index(
     """Berechnet den Rentabilitätsindex."""
     if investment <= 0:
         return 0.0
-    npv_of_future_cash_flows = npf.npv(
+    npv_of_future_cash_flows = npv(
         DISCOUNT_RATE, [annual_savings] * LIFESPAN_YEARS)
     return npv_of_future_cash_flows / investment
 
@@ -0,0 +1,376 @@
+"""
+Vektorisierte Cashflow-Hochrechnung über die Anlagenlaufzeit
+============================================================
+
+Gemeinsamer Rechenkern für ``perform_calculations``, ``BreakEvenAnalysis``,
+``TechnicalDegradation``, die Sensitivitätsanalysen im
+``AdvancedCalculationsIntegrator`` und ``calculations_extended``.
+
+Aus Degradations-, Preissteigerungs-, Wartungs- und Inflationsraten entsteht
+in einem Schritt eine Matrix (Szenarien x Jahre x Kennzahlen), siehe
+:data:`METRICS`. NPV, IRR, Break-Even und LCOE werden daraus abgeleitet.
+
+Raten sind Dezimalwerte (0.03 = 3 %) und dürfen sein:
+
+- Skalare (gleich für alle Szenarien und Jahre)
+- bei :func:`project_cash_flows` ein Vektor je Jahr
+- bei :func:`project_cash_flows_batch` ein Vektor je Szenario oder eine
+  Matrix (Szenarien x Jahre)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+METRICS = (
+    "production_kwh",
+    "self_consumption_kwh",
+    "feed_in_kwh",
+    "electricity_price",
+    "feed_in_tariff",
+    "savings",
+    "feed_in_revenue",
+    "tax_benefit",
+    "benefit",
+    "maintenance",
+    "cash_flow",
+    "cumulative_cash_flow",
+    "price_index",
+    "degradation_index",
+    "deflator",
+    "discount_factor",
+)
+METRIC_INDEX = {name: i for i, name in enumerate(METRICS)}
+
+# Suchintervall für den IRR (-99 % bis 1.000.000 %)
+IRR_LOW = -0.99
+IRR_HIGH = 10000.0
+# Stützstellen, zwischen denen Vorzeichenwechsel gesucht werden: bis 100 %
+# in 1-Prozentpunkt-Schritten, darüber logarithmisch
+IRR_GRID = np.concatenate(
+    [
+        np.linspace(IRR_LOW, 0.0, 100),
+        np.linspace(0.0, 1.0, 101)[1:],
+        np.geomspace(1.0, IRR_HIGH, 61)[1:],
+    ]
+)
+
+
+def growth_index(rates: Any, years: int) -> np.ndarray:
+    """Index ``prod_{k<y} (1 + rate_k)`` für y = 1..years (Jahr 1 = 1.0).
+
+    ``rates`` wird zu (Szenarien x Jahre) gebroadcastet; konstante Raten
+    werden exakt als ``(1 + r) ** (y - 1)`` gerechnet.
+    """
+    rates = np.asarray(rates, dtype=float)
+    if rates.ndim < 2:
+        rates = rates.reshape(1, -1) if rates.ndim == 1 else rates.reshape(1, 1)
+    if rates.shape[1] == 1:
+        return np.power(1.0 + rates, np.arange(years, dtype=float))
+    growth = 1.0 + rates[:, :years]
+    index = np.ones_like(growth)
+    np.cumprod(growth[:, :-1], axis=1, out=index[:, 1:])
+    return index
+
+
+def npv(rate: Any, cash_flows: Any) -> np.ndarray | float:
+    """Barwert wie ``numpy_financial.npv``: erster Wert undiskontiert (t = 0).
+
+    ``cash_flows`` darf 2D sein (Szenarien x Perioden), ``rate`` dann ein
+    Vektor je Szenario.
+    """
+    flows = np.asarray(cash_flows, dtype=float)
+    rate = np.asarray(rate, dtype=float)
+    if flows.ndim == 2 and rate.ndim == 1:
+        rate = rate[:, None]
+    factors = np.power(1.0 + rate, -np.arange(flows.shape[-1], dtype=float))
+    result = (flows * factors).sum(axis=-1)
+    return float(result) if np.ndim(result) == 0 else result
+
+
+def irr(cash_flows: Any, tol: float = 1e-10, max_iter: int = 200) -> np.ndarray | float:
+    """Interner Zinsfuß per Bisektion, für viele Zahlungsreihen gleichzeitig.
+
+    ``cash_flows[..., 0]`` ist die Periode 0 (typischerweise -Investition).
+    Das Startintervall ist der Vorzeichenwechsel auf :data:`IRR_GRID`, der
+    am nächsten an 0 % liegt; so werden auch Reihen mit mehreren Nullstellen
+    (z.B. negativer letzter Cashflow für Rückbau) und sehr hohe Zinsfüße
+    gefunden. Reihen ohne Vorzeichenwechsel zwischen -99 % und
+    :data:`IRR_HIGH` ergeben NaN.
+    """
+    flows = np.asarray(cash_flows, dtype=float)
+    single = flows.ndim == 1
+    flows = np.atleast_2d(flows)
+    exponents = np.arange(flows.shape[1], dtype=float)
+
+    def value(rate: np.ndarray) -> np.ndarray:
+        with np.errstate(over="ignore", invalid="ignore"):
+            return (flows * np.power(1.0 + rate[:, None], -exponents)).sum(axis=1)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        grid_values = flows @ np.power(1.0 + IRR_GRID[None, :], -exponents[:, None])
+    signs = np.sign(grid_values)
+    changes = (
+        np.isfinite(grid_values[:, :-1])
+        & np.isfinite(grid_values[:, 1:])
+        & (signs[:, :-1] != signs[:, 1:])
+    )
+    distance = np.minimum(np.abs(IRR_GRID[:-1]), np.abs(IRR_GRID[1:]))
+    bracket = np.argmin(np.where(changes, distance, np.inf), axis=1)
+    valid = changes.any(axis=1)
+
+    lo = IRR_GRID[bracket]
+    hi = IRR_GRID[bracket + 1]
+    f_lo = value(lo)
+    for _ in range(max_iter):
+        mid = 0.5 * (lo + hi)
+        f_mid = value(mid)
+        same_side = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(same_side, mid, lo)
+        f_lo = np.where(same_side, f_mid, f_lo)
+        hi = np.where(same_side, hi, mid)
+        if np.all(hi - lo < tol):
+            break
+    result = np.where(valid, 0.5 * (lo + hi), np.nan)
+    return float(result[0]) if single else result
+
+
+def break_even_years(
+    cumulative: np.ndarray, cash_flows: np.ndarray, fractional: bool = False
+) -> np.ndarray:
+    """Erstes Jahr (1-basiert), in dem die kumulierte Reihe >= 0 ist, sonst inf.
+
+    Mit ``fractional=True`` wird innerhalb dieses Jahres linear interpoliert.
+    """
+    reached = cumulative >= 0
+    any_reached = reached.any(axis=1)
+    first = np.argmax(reached, axis=1)
+    years = first.astype(float) + 1.0
+    if fractional:
+        rows = np.arange(cumulative.shape[0])
+        flow = cash_flows[rows, first]
+        overshoot = cumulative[rows, first]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            years = np.where(flow > 0, years - overshoot / flow, years)
+    return np.where(any_reached, years, np.inf)
+
+
+@dataclass
+class CashFlowProjection:
+    """Ergebnis der Hochrechnung: ``values[Szenario, Jahr, Kennzahl]``."""
+
+    values: np.ndarray
+    investment: np.ndarray
+
+    @property
+    def n_scenarios(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def years(self) -> int:
+        return self.values.shape[1]
+
+    def metric(self, name: str) -> np.ndarray:
+        """Kennzahl als (Szenarien x Jahre)."""
+        return self.values[:, :, METRIC_INDEX[name]]
+
+    def year_metric_matrix(self, scenario: int = 0) -> np.ndarray:
+        """(Jahre x Kennzahlen) eines Szenarios, Spalten wie :data:`METRICS`."""
+        return self.values[scenario]
+
+    def cash_flows(self) -> np.ndarray:
+        """Zahlungsreihe inkl. Jahr 0 (-Investition), (Szenarien x Jahre+1)."""
+        return np.concatenate(
+            [-self.investment[:, None], self.metric("cash_flow")], axis=1)
+
+    def cumulative_cash_flows(self) -> np.ndarray:
+        """Kumulierte Zahlungsreihe inkl. Jahr 0, (Szenarien x Jahre+1)."""
+        return np.concatenate(
+            [-self.investment[:, None], self.metric("cumulative_cash_flow")], axis=1)
+
+    def npv(self) -> np.ndarray:
+        """Kapitalwert je Szenario (Jahr y wird mit (1+r)^-y diskontiert)."""
+        discounted = self.metric("cash_flow") * self.metric("discount_factor")
+        return discounted.sum(axis=1) - self.investment
+
+    def irr(self) -> np.ndarray:
+        return irr(self.cash_flows())
+
+    def break_even_years(
+        self, real: bool = False, fractional: bool = False
+    ) -> np.ndarray:
+        """Amortisationsjahr je Szenario; ``real=True`` inflationsbereinigt."""
+        flows = self.metric("cash_flow")
+        if real:
+            flows = flows / self.metric("deflator")
+        cumulative = np.cumsum(flows, axis=1) - self.investment[:, None]
+        return break_even_years(cumulative, flows, fractional=fractional)
+
+    def lcoe(self) -> np.ndarray:
+        """Stromgestehungskosten (€/kWh): diskontierte Kosten / Produktion."""
+        discount = self.metric("discount_factor")
+        costs = self.investment + (self.metric("maintenance") * discount).sum(axis=1)
+        production = (self.metric("production_kwh") * discount).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(production > 0, costs / production, np.inf)
+
+
+def _as_matrix(value: Any, batch: bool) -> np.ndarray:
+    """Skalar -> (1,1); 1D je Jahr (einzeln) bzw. je Szenario (Batch); 2D bleibt."""
+    array = np.asarray(value, dtype=float)
+    if array.ndim == 0:
+        return array.reshape(1, 1)
+    if array.ndim == 1:
+        return array.reshape(-1, 1) if batch else array.reshape(1, -1)
+    return array
+
+
+def _project(
+    batch: bool,
+    years: int,
+    investment: Any,
+    production_kwh: Any,
+    electricity_price: Any,
+    self_consumption_share: Any = 1.0,
+    feed_in_share: Any = 0.0,
+    price_increase: Any = 0.0,
+    degradation: Any = 0.0,
+    feed_in_tariff: Any = 0.0,
+    feed_in_tariff_after: Any = None,
+    feed_in_tariff_years: int | None = None,
+    tax_rate: Any = 0.0,
+    maintenance_year1: Any = 0.0,
+    maintenance_increase: Any = 0.0,
+    discount_rate: Any = 0.0,
+    inflation: Any = 0.0,
+) -> CashFlowProjection:
+    years = max(0, int(years))
+    inputs = {
+        name: _as_matrix(value, batch)
+        for name, value in (
+            ("investment", investment),
+            ("production_kwh", production_kwh),
+            ("electricity_price", electricity_price),
+            ("self_consumption_share", self_consumption_share),
+            ("feed_in_share", feed_in_share),
+            ("price_increase", price_increase),
+            ("degradation", degradation),
+            ("feed_in_tariff", feed_in_tariff),
+            ("tax_rate", tax_rate),
+            ("maintenance_year1", maintenance_year1),
+            ("maintenance_increase", maintenance_increase),
+            ("discount_rate", discount_rate),
+            ("inflation", inflation),
+        )
+    }
+    n = max(m.shape[0] for m in inputs.values())
+    shape = (n, years)
+
+    price_index = np.broadcast_to(
+        growth_index(inputs["price_increase"], years), shape)
+    degradation_index = np.broadcast_to(
+        growth_index(-inputs["degradation"], years), shape)
+    maintenance_index = growth_index(inputs["maintenance_increase"], years)
+    deflator = np.broadcast_to(growth_index(inputs["inflation"], years), shape)
+    # Diskontfaktor (1+r)^-y: Jahr 1 wird bereits einmal abgezinst
+    discount_rate_m = inputs["discount_rate"]
+    if discount_rate_m.shape[1] == 1:
+        discount_factor = np.power(
+            1.0 + discount_rate_m, -np.arange(1, years + 1, dtype=float))
+    else:
+        discount_factor = 1.0 / (
+            growth_index(discount_rate_m, years)
+            * (1.0 + discount_rate_m[:, :years]))
+    discount_factor = np.broadcast_to(discount_factor, shape)
+
+    production = inputs["production_kwh"] * degradation_index
+    self_consumption = production * inputs["self_consumption_share"]
+    feed_in = production * inputs["feed_in_share"]
+    price = inputs["electricity_price"] * price_index
+    tariff = np.broadcast_to(inputs["feed_in_tariff"], shape)
+    if feed_in_tariff_after is not None and feed_in_tariff_years is not None:
+        after = np.arange(1, years + 1) > int(feed_in_tariff_years)
+        tariff = np.where(
+            after, _as_matrix(feed_in_tariff_after, batch), tariff)
+    savings = self_consumption * price
+    feed_in_revenue = feed_in * tariff
+    tax_benefit = feed_in_revenue * inputs["tax_rate"]
+    benefit = savings + feed_in_revenue + tax_benefit
+    maintenance = inputs["maintenance_year1"] * maintenance_index
+    cash_flow = benefit - maintenance
+    invest = np.broadcast_to(inputs["investment"][:, 0], (n,)).astype(float)
+    cumulative = np.cumsum(np.broadcast_to(cash_flow, shape), axis=1) - invest[:, None]
+
+    columns = {
+        "production_kwh": production,
+        "self_consumption_kwh": self_consumption,
+        "feed_in_kwh": feed_in,
+        "electricity_price": price,
+        "feed_in_tariff": tariff,
+        "savings": savings,
+        "feed_in_revenue": feed_in_revenue,
+        "tax_benefit": tax_benefit,
+        "benefit": benefit,
+        "maintenance": maintenance,
+        "cash_flow": cash_flow,
+        "cumulative_cash_flow": cumulative,
+        "price_index": price_index,
+        "degradation_index": degradation_index,
+        "deflator": deflator,
+        "discount_factor": discount_factor,
+    }
+    values = np.empty((n, years, len(METRICS)))
+    for name, column in columns.items():
+        values[:, :, METRIC_INDEX[name]] = np.broadcast_to(column, shape)
+    return CashFlowProjection(values=values, investment=invest.copy())
+
+
+def project_cash_flows(**kwargs: Any) -> CashFlowProjection:
+    """Hochrechnung für ein Szenario; 1D-Raten sind Werte je Jahr.
+
+    Args (alle als Keyword):
+        years: Betrachtungszeitraum
+        investment: Investition in Jahr 0 (netto)
+        production_kwh: PV-Ertrag im ersten Jahr
+        electricity_price: Strompreis im ersten Jahr (€/kWh)
+        self_consumption_share / feed_in_share: Anteile an der Produktion
+        price_increase, degradation, maintenance_increase, inflation,
+        discount_rate: Raten als Dezimalwert
+        feed_in_tariff: Vergütung (€/kWh), nach ``feed_in_tariff_years``
+            gilt ``feed_in_tariff_after``
+        tax_rate: Steuervorteil als Anteil der Einspeiseerlöse
+        maintenance_year1: Wartungskosten im ersten Jahr
+    """
+    return _project(False, **kwargs)
+
+
+def project_cash_flows_batch(**kwargs: Any) -> CashFlowProjection:
+    """Wie :func:`project_cash_flows` für viele Szenarien auf einmal.
+
+    1D-Eingaben sind Werte je Szenario, 2D-Eingaben (Szenarien x Jahre).
+    """
+    return _project(True, **kwargs)
+
+
+def project_savings(
+    investment: Any,
+    annual_savings: Any,
+    years: int,
+    price_increase: Any = 0.0,
+    inflation: Any = 0.0,
+    discount_rate: Any = 0.0,
+    batch: bool = False,
+) -> CashFlowProjection:
+    """Kurzform für einen Einsparungsstrom, der mit dem Strompreis wächst.
+
+    Die Einsparung des ersten Jahres wird als Produktion mit Preis 1
+    eingesetzt, so dass ``savings`` = Einsparung x Preisindex.
+    """
+    return _project(
+        batch, years=years, investment=investment,
+        production_kwh=annual_savings, electricity_price=1.0,
+        price_increase=price_increase, inflation=inflation,
+        discount_rate=discount_rate)
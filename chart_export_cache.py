@@ -0,0 +1,331 @@
+"""
+Gemeinsamer Cache für Plotly-Diagrammexporte
+============================================
+
+Kaleido-Renderings sind der teuerste Schritt beim Erstellen von PDFs mit
+Diagrammen, und identische Diagramme kommen in vielen Angeboten und Firmen
+wieder vor. Dieser Cache speichert exportierte Bilder unter einem Digest aus
+Figure-JSON, Format, Größe und Skalierung:
+
+- In-Memory-LRU (begrenzt nach Anzahl und Bytes) für den laufenden Prozess
+- inhaltsadressierter Dateispeicher (``data/chart_cache/ab/abcdef….png``)
+  für Prozess- und Sitzungsgrenzen hinweg; Schreiben erfolgt atomar über
+  ``os.replace``, damit parallele Streamlit-Sitzungen und Prozesse nie
+  halbe Dateien lesen
+- gleichzeitige Anfragen für denselben Schlüssel rendern nur einmal
+
+Konfiguration über ``CHART_CACHE_DIR`` (leer = nur Speicher) oder
+:func:`configure_chart_export_cache`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, "data", "chart_cache")
+DEFAULT_MAX_MEMORY_ENTRIES = 256
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024
+# Nach so vielen Schreibvorgängen wird die Größe des Dateispeichers geprüft
+_DISK_PRUNE_EVERY = 64
+
+
+def make_chart_key(
+    fig_json: str,
+    format: str = "png",
+    width: int | None = None,
+    height: int | None = None,
+    scale: float | None = None,
+) -> str:
+    """SHA-256 über Figure-JSON und Exportparameter."""
+    digest = hashlib.sha256(fig_json.encode("utf-8"))
+    digest.update(f"|{format}|{width}|{height}|{scale}".encode("ascii"))
+    return digest.hexdigest()
+
+
+class ChartExportCache:
+    """Zweistufiger Cache (LRU im Speicher, Dateien auf Platte) für Chart-Bilder."""
+
+    def __init__(
+        self,
+        cache_dir: str | None = DEFAULT_CACHE_DIR,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+        self.cache_dir = cache_dir or None
+        self.max_memory_entries = max_memory_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        # Schlüssel, die gerade gerendert werden -> Event für Wartende
+        self._inflight: dict[str, threading.Event] = {}
+        self._writes_since_prune = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "renders": 0,
+            "render_errors": 0,
+            "inflight_waits": 0,
+            "disk_errors": 0,
+        }
+
+    # --- Speicher ---------------------------------------------------------
+
+    def _memory_get(self, key: str) -> bytes | None:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+        return data
+
+    def _memory_put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory and (
+            len(self._memory) > self.max_memory_entries
+            or self._memory_bytes > self.max_memory_bytes
+        ):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # --- Platte -----------------------------------------------------------
+
+    def _path(self, key: str, format: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{format}")
+
+    def _disk_get(self, key: str, format: str) -> bytes | None:
+        if not self.cache_dir:
+            return None
+        path = self._path(key, format)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            with self._lock:
+                self._stats["disk_errors"] += 1
+            return None
+        # mtime dient als "zuletzt genutzt" für prune_disk (atime ist auf
+        # noatime-Mounts und NTFS unzuverlässig)
+        with contextlib.suppress(OSError):
+            os.utime(path, None)
+        return data
+
+    def _disk_put(self, key: str, format: str, data: bytes) -> None:
+        if not self.cache_dir:
+            return
+        path = self._path(key, format)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+                raise
+        except OSError:
+            with self._lock:
+                self._stats["disk_errors"] += 1
+            return
+
+        with self._lock:
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= _DISK_PRUNE_EVERY
+            if prune:
+                self._writes_since_prune = 0
+        if prune:
+            self.prune_disk()
+
+    def prune_disk(self) -> int:
+        """Löscht die am längsten nicht genutzten Dateien über ``max_disk_bytes``.
+
+        Reihenfolge nach mtime, das bei jedem Treffer aktualisiert wird.
+        """
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+        files = []
+        total = 0
+        for root, _dirs, names in os.walk(self.cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        removed = 0
+        files.sort()
+        for _mtime, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    # --- öffentliche API --------------------------------------------------
+
+    def lookup(self, key: str, format: str = "png") -> bytes | None:
+        """Bytes zu einem Schlüssel aus Speicher oder Platte, sonst None."""
+        with self._lock:
+            data = self._memory_get(key)
+            if data is not None:
+                self._stats["memory_hits"] += 1
+                return data
+        data = self._disk_get(key, format)
+        if data is not None:
+            with self._lock:
+                self._stats["disk_hits"] += 1
+                self._memory_put(key, data)
+        return data
+
+    def store(self, key: str, format: str, data: bytes) -> None:
+        """Legt extern gerenderte Bytes (z.B. aus einem Batch) im Cache ab."""
+        with self._lock:
+            self._stats["renders"] += 1
+            self._memory_put(key, data)
+        self._disk_put(key, format, data)
+
+    def get_or_render(
+        self,
+        fig: Any,
+        format: str = "png",
+        width: int | None = None,
+        height: int | None = None,
+        scale: float | None = None,
+        renderer: Callable[..., bytes] | None = None,
+    ) -> bytes:
+        """Liefert die Bildbytes der Figur, rendert nur bei einem Cache-Miss.
+
+        ``renderer`` wird wie ``fig.to_image`` aufgerufen (Standard). Fehler
+        beim Rendern (z.B. Kaleido fehlt) werden an den Aufrufer
+        weitergereicht und nicht gecacht.
+        """
+        key = make_chart_key(fig.to_json(), format, width, height, scale)
+        render = renderer or fig.to_image
+
+        while True:
+            with self._lock:
+                data = self._memory_get(key)
+                if data is not None:
+                    self._stats["memory_hits"] += 1
+                    return data
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    self._inflight[key] = threading.Event()
+                    break
+                self._stats["inflight_waits"] += 1
+            # Eine andere Sitzung rendert dieses Diagramm bereits
+            waiter.wait()
+
+        try:
+            data = self._disk_get(key, format)
+            if data is not None:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._memory_put(key, data)
+                return data
+
+            try:
+                data = render(
+                    format=format, width=width, height=height, scale=scale)
+            except Exception:
+                with self._lock:
+                    self._stats["render_errors"] += 1
+                raise
+            with self._lock:
+                self._stats["renders"] += 1
+                self._memory_put(key, data)
+            self._disk_put(key, format, data)
+            return data
+        finally:
+            with self._lock:
+                event = self._inflight.pop(key, None)
+            if event is not None:
+                event.set()
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["renders"]
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        )
+        return stats
+
+
+_chart_cache: ChartExportCache | None = None
+_chart_cache_lock = threading.Lock()
+
+
+def get_chart_export_cache() -> ChartExportCache:
+    """Prozessweite Instanz (Verzeichnis aus ``CHART_CACHE_DIR``)."""
+    global _chart_cache
+    if _chart_cache is None:
+        with _chart_cache_lock:
+            if _chart_cache is None:
+                _chart_cache = ChartExportCache(
+                    cache_dir=os.environ.get("CHART_CACHE_DIR", DEFAULT_CACHE_DIR),
+                )
+    return _chart_cache
+
+
+def configure_chart_export_cache(**kwargs: Any) -> ChartExportCache:
+    """Ersetzt die prozessweite Instanz (z.B. temporäres Verzeichnis in Tests)."""
+    global _chart_cache
+    with _chart_cache_lock:
+        _chart_cache = ChartExportCache(**kwargs)
+    return _chart_cache
+
+
+def export_figure_bytes(
+    fig: Any,
+    format: str = "png",
+    width: int | None = None,
+    height: int | None = None,
+    scale: float | None = None,
+) -> bytes:
+    """Exportiert eine Plotly-Figur über den gemeinsamen Cache.
+
+    Cache-Misses rendert der dauerhaft laufende Renderer aus
+    :mod:`chart_render_service`.
+    """
+    from chart_render_service import get_chart_render_service
+
+    return get_chart_render_service().render(
+        fig, format=format, width=width, height=height, scale=scale)
+
+
+def get_chart_export_cache_stats() -> dict[str, Any]:
+    return get_chart_export_cache().get_stats()
@@ -0,0 +1,530 @@
+"""
+Dauerhafter Kaleido-Renderer für Diagramm-Exporte
+=================================================
+
+Mit Kaleido 1.x startet ``fig.to_image`` für jedes Diagramm einen eigenen
+Chromium-Prozess. Ein Angebot mit Diagrammseiten zahlt diesen Start dutzende
+Male hintereinander. Dieser Dienst hält stattdessen eine Kaleido-Instanz mit
+mehreren Tabs in einem Hintergrund-Thread offen:
+
+- :meth:`ChartRenderService.render_batch` nimmt mehrere Figuren an und
+  rendert alle Cache-Misses gleichzeitig (ein Tab pro Figur)
+- :meth:`ChartRenderService.render` rendert einzelne Figuren über denselben
+  warmen Renderer (genutzt von :func:`chart_export_cache.export_figure_bytes`)
+- ist Kaleido 1.x oder Chrome nicht verfügbar, wird wie bisher
+  ``fig.to_image`` pro Figur verwendet
+- :class:`LazyChart` hält eine Figur, bis ihre Bytes tatsächlich gebraucht
+  werden (Analyse-Seite -> PDF)
+
+Alle Ergebnisse laufen über :mod:`chart_export_cache`. Mit
+:func:`track_pdf_timing` lässt sich messen, welchen Anteil das Rendern von
+Diagrammen an der gesamten PDF-Erstellung hat.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import functools
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from chart_export_cache import (
+    ChartExportCache,
+    get_chart_export_cache,
+    make_chart_key,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.environ.get("CHART_RENDER_WORKERS", "4"))
+DEFAULT_TIMEOUT_SECONDS = 90.0
+# Wartezeit nach einem fehlgeschlagenen Browser-Start (verdoppelt sich je Fehlschlag)
+WARM_RETRY_INITIAL_SECONDS = 30.0
+WARM_RETRY_MAX_SECONDS = 600.0
+
+
+@dataclass
+class ChartJob:
+    """Eine zu rendernde Figur mit Exportparametern."""
+
+    fig: Any
+    format: str = "png"
+    width: int | None = None
+    height: int | None = None
+    scale: float | None = None
+
+    def key(self) -> str:
+        return make_chart_key(
+            self.fig.to_json(), self.format, self.width, self.height, self.scale)
+
+    def options(self) -> dict[str, Any]:
+        opts = {"format": self.format, "width": self.width,
+                "height": self.height, "scale": self.scale}
+        return {k: v for k, v in opts.items() if v is not None}
+
+
+class LazyChart:
+    """Diagramm, das erst beim Bedarf exportiert wird.
+
+    Die Analyse-Switcher legen solche Handles statt fertiger PNG-Bytes unter
+    ``*_chart_bytes`` ab. :func:`materialize_chart_bytes` rendert die für ein
+    PDF ausgewählten Handles gemeinsam in einem Batch; :meth:`to_bytes` ist der
+    Weg für einzelne Nachzügler.
+    """
+
+    __slots__ = ("fig", "format", "width", "height", "scale")
+
+    def __init__(
+        self,
+        fig: Any,
+        format: str = "png",
+        width: int | None = 800,
+        height: int | None = 480,
+        scale: float | None = 1.5,
+    ):
+        self.fig = fig
+        self.format = format
+        self.width = width
+        self.height = height
+        self.scale = scale
+
+    def job(self) -> ChartJob:
+        return ChartJob(self.fig, self.format, self.width, self.height, self.scale)
+
+    def to_bytes(self) -> bytes | None:
+        """Bildbytes über Cache und warmen Renderer, None bei Renderfehlern."""
+        try:
+            return get_chart_render_service().render(
+                self.fig, format=self.format, width=self.width,
+                height=self.height, scale=self.scale)
+        except Exception as e:
+            logger.warning("Diagramm konnte nicht gerendert werden: %s", e)
+            return None
+
+    def __repr__(self) -> str:
+        return (f"LazyChart({self.format}, {self.width}x{self.height}, "
+                f"scale={self.scale})")
+
+
+# --- Zeitmessung -------------------------------------------------------------
+
+_timing_local = threading.local()
+_last_pdf_timing: dict[str, Any] | None = None
+
+
+def _add_render_time(seconds: float, charts: int) -> None:
+    for frame in getattr(_timing_local, "stack", ()):
+        frame["chart_render_s"] += seconds
+        frame["charts"] += charts
+
+
+def track_pdf_timing(label: str) -> Callable:
+    """Decorator: misst Gesamtzeit und Diagramm-Renderzeit einer PDF-Funktion.
+
+    Verschachtelte Aufrufe (z.B. ``generate_offer_pdf`` innerhalb von
+    ``generate_offer_pdf_with_main_templates``) werden dem äußersten Aufruf
+    zugerechnet; nur dieser wird geloggt.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            global _last_pdf_timing
+            stack = getattr(_timing_local, "stack", None)
+            if stack is None:
+                stack = _timing_local.stack = []
+            frame = {"label": label, "chart_render_s": 0.0, "charts": 0}
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                frame["total_s"] = time.perf_counter() - start
+                stack.pop()
+                if not stack:
+                    frame["chart_share"] = (
+                        frame["chart_render_s"] / frame["total_s"]
+                        if frame["total_s"] > 0 else 0.0)
+                    _last_pdf_timing = frame
+                    logger.info(
+                        "%s: %.2f s gesamt, davon %.2f s Diagramme "
+                        "(%d Stück, %.0f %%)",
+                        label, frame["total_s"], frame["chart_render_s"],
+                        frame["charts"], frame["chart_share"] * 100)
+        return wrapper
+    return decorator
+
+
+def get_last_pdf_timing() -> dict[str, Any] | None:
+    """Messwerte der zuletzt abgeschlossenen PDF-Erstellung."""
+    return dict(_last_pdf_timing) if _last_pdf_timing else None
+
+
+# --- Renderer ------------------------------------------------------------------
+
+class ChartRenderService:
+    """Warmer Kaleido-Renderer mit Batch-Export und Cache-Anbindung."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        cache: ChartExportCache | None = None,
+        kaleido_factory: Callable[..., Any] | None = None,
+    ):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._cache = cache
+        # Erzeugt die Kaleido-Instanz (Standard: kaleido.Kaleido)
+        self._kaleido_factory = kaleido_factory
+        self._kaleido: Any = None
+        self._open_lock: asyncio.Lock | None = None
+        self._unavailable_reason: str | None = None
+        # Browser-Start fehlgeschlagen: bis _retry_at wird to_image genutzt
+        self._open_failures = 0
+        self._retry_at = 0.0
+        self._last_open_error: str | None = None
+        # Laufende Batches je Instanz; ausgemusterte Instanzen werden erst
+        # geschlossen, wenn ihr letzter Batch fertig ist
+        self._in_flight: dict[int, int] = {}
+        self._retired: dict[int, Any] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "batches": 0,
+            "batch_charts": 0,
+            "cache_hits": 0,
+            "renders": 0,
+            "fallback_renders": 0,
+            "render_errors": 0,
+            "render_seconds": 0.0,
+            "browser_starts": 0,
+        }
+
+    @property
+    def cache(self) -> ChartExportCache:
+        return self._cache or get_chart_export_cache()
+
+    # --- Event-Loop und Browser ----------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="chart-render-service",
+                    daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _get_kaleido(self) -> Any:
+        # Läuft ausschließlich im Loop-Thread; der asyncio-Lock verhindert,
+        # dass parallele Batches zwei Browser starten
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        async with self._open_lock:
+            if self._kaleido is None:
+                factory = self._kaleido_factory
+                if factory is None:
+                    import kaleido
+                    factory = kaleido.Kaleido
+                kaleido_instance = factory(n=self.workers, timeout=self.timeout)
+                await kaleido_instance.open()
+                self._kaleido = kaleido_instance
+                with self._lock:
+                    self._stats["browser_starts"] += 1
+        return self._kaleido
+
+    async def _render_async(
+            self, jobs: list[ChartJob]) -> list[bytes | BaseException]:
+        kaleido_instance = await self._get_kaleido()
+        key = id(kaleido_instance)
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        try:
+            results = await asyncio.gather(
+                *(kaleido_instance.calc_fig(job.fig, opts=job.options())
+                  for job in jobs),
+                return_exceptions=True)
+        finally:
+            self._in_flight[key] -= 1
+        if (results and self._kaleido is kaleido_instance
+                and all(isinstance(r, BaseException) for r in results)):
+            # Vermutlich ist der Browser abgestürzt: neue Batches bekommen
+            # einen neuen Browser, laufende Batches rendern zu Ende
+            self._kaleido = None
+            self._retired[key] = kaleido_instance
+        if key in self._retired and self._in_flight[key] == 0:
+            del self._in_flight[key]
+            await self._close_instance(self._retired.pop(key))
+        return results
+
+    async def _close_kaleido(self) -> None:
+        kaleido_instance, self._kaleido = self._kaleido, None
+        retired = list(self._retired.values())
+        self._retired.clear()
+        self._in_flight.clear()
+        for instance in [kaleido_instance, *retired]:
+            if instance is not None:
+                await self._close_instance(instance)
+
+    @staticmethod
+    async def _close_instance(kaleido_instance: Any) -> None:
+        try:
+            await kaleido_instance.close()
+        except Exception as e:
+            logger.debug("Kaleido ließ sich nicht sauber schließen: %s", e)
+
+    def _warm_available(self) -> bool:
+        if self._unavailable_reason is not None:
+            return False
+        if time.monotonic() < self._retry_at:
+            return False
+        if self._kaleido_factory is not None:
+            return True
+        try:
+            import kaleido
+        except ImportError:
+            self._unavailable_reason = "kaleido nicht installiert"
+            return False
+        if not hasattr(kaleido, "Kaleido"):
+            # Kaleido 0.x: kein Browser-Modell, to_image ist bereits der Weg
+            self._unavailable_reason = "kaleido < 1.0"
+            return False
+        return True
+
+    def _render_jobs(
+            self, jobs: list[ChartJob]) -> list[bytes | BaseException]:
+        """Rendert Jobs gleichzeitig im warmen Browser oder einzeln per to_image."""
+        if self._warm_available():
+            future = asyncio.run_coroutine_threadsafe(
+                self._render_async(jobs), self._ensure_loop())
+            try:
+                results = future.result()
+            except Exception as e:
+                # Browser ließ sich nicht starten (z.B. Chrome fehlt):
+                # später erneut versuchen, bis dahin to_image
+                with self._lock:
+                    self._open_failures += 1
+                    delay = min(
+                        WARM_RETRY_MAX_SECONDS,
+                        WARM_RETRY_INITIAL_SECONDS * 2 ** (self._open_failures - 1))
+                    self._retry_at = time.monotonic() + delay
+                    self._last_open_error = f"{type(e).__name__}: {e}"
+                logger.warning(
+                    "Warmer Kaleido-Renderer nicht verfügbar, nutze to_image "
+                    "(neuer Versuch in %.0f s): %s", delay, e)
+            else:
+                with self._lock:
+                    self._open_failures = 0
+                    self._retry_at = 0.0
+                    self._last_open_error = None
+                return results
+
+        results: list[bytes | BaseException] = []
+        for job in jobs:
+            try:
+                results.append(job.fig.to_image(**job.options()))
+            except Exception as e:
+                results.append(e)
+        with self._lock:
+            self._stats["fallback_renders"] += len(jobs)
+        return results
+
+    # --- öffentliche API -------------------------------------------------------
+
+    def render(
+        self,
+        fig: Any,
+        format: str = "png",
+        width: int | None = None,
+        height: int | None = None,
+        scale: float | None = None,
+    ) -> bytes:
+        """Einzelne Figur über Cache und warmen Renderer; Fehler werden geworfen."""
+        def renderer(**options: Any) -> bytes:
+            result = self._render_jobs([ChartJob(fig, **options)])[0]
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        start = time.perf_counter()
+        try:
+            return self.cache.get_or_render(
+                fig, format=format, width=width, height=height, scale=scale,
+                renderer=renderer)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stats["render_seconds"] += elapsed
+            _add_render_time(elapsed, 1)
+
+    def render_batch(
+        self,
+        jobs: Mapping[str, ChartJob],
+        errors: dict[str, BaseException] | None = None,
+    ) -> dict[str, bytes]:
+        """Rendert mehrere Figuren in einem Durchgang.
+
+        Args:
+            jobs: Chart-ID -> :class:`ChartJob`
+            errors: optionales Dict, in das fehlgeschlagene IDs eingetragen werden
+
+        Returns:
+            Chart-ID -> Bildbytes (nur erfolgreich gerenderte Diagramme)
+        """
+        start = time.perf_counter()
+        cache = self.cache
+        results: dict[str, bytes] = {}
+        # Gleiche Figuren im selben Batch nur einmal rendern
+        misses: dict[str, tuple[ChartJob, list[str]]] = {}
+        hits = 0
+
+        for chart_id, job in jobs.items():
+            try:
+                key = job.key()
+            except Exception as e:
+                if errors is not None:
+                    errors[chart_id] = e
+                continue
+            data = cache.lookup(key, job.format)
+            if data is not None:
+                results[chart_id] = data
+                hits += 1
+            elif key in misses:
+                misses[key][1].append(chart_id)
+            else:
+                misses[key] = (job, [chart_id])
+
+        failed = 0
+        if misses:
+            keys = list(misses)
+            rendered = self._render_jobs([misses[k][0] for k in keys])
+            for key, result in zip(keys, rendered, strict=True):
+                job, chart_ids = misses[key]
+                if isinstance(result, BaseException):
+                    failed += len(chart_ids)
+                    logger.warning(
+                        "Diagramm %s konnte nicht gerendert werden: %s",
+                        ", ".join(chart_ids), result)
+                    if errors is not None:
+                        for chart_id in chart_ids:
+                            errors[chart_id] = result
+                    continue
+                cache.store(key, job.format, result)
+                for chart_id in chart_ids:
+                    results[chart_id] = result
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["batch_charts"] += len(jobs)
+            self._stats["cache_hits"] += hits
+            self._stats["renders"] += len(misses)
+            self._stats["render_errors"] += failed
+            self._stats["render_seconds"] += elapsed
+        _add_render_time(elapsed, len(jobs))
+        logger.info(
+            "Diagramm-Batch: %d Diagramme, %d aus Cache, %d gerendert in %.2f s",
+            len(jobs), hits, len(misses), elapsed)
+        return results
+
+    def close(self) -> None:
+        """Beendet Browser und Loop-Thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._close_kaleido(), loop).result(timeout=10)
+        except Exception as e:
+            logger.debug("Kaleido-Shutdown fehlgeschlagen: %s", e)
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["unavailable_reason"] = (
+                self._unavailable_reason or self._last_open_error)
+        stats["warm_renderer"] = self._kaleido is not None
+        return stats
+
+
+def materialize_chart_bytes(
+    analysis_results: dict[str, Any],
+    chart_keys: Iterable[str],
+    format: str = "png",
+    width: int | None = 800,
+    height: int | None = 480,
+    scale: float | None = 1.5,
+) -> dict[str, Any]:
+    """Ersetzt Figuren und :class:`LazyChart`-Handles unter ``chart_keys`` in
+    einem Batch durch Bildbytes.
+
+    Handles werden mit ihren eigenen Exportparametern gerendert, rohe Figuren
+    mit den hier übergebenen. Einträge, die bereits Bytes sind, bleiben
+    unverändert; nicht renderbare Diagramme werden entfernt, damit die
+    PDF-Seiten sie wie fehlende Diagramme überspringen. Das Dict wird
+    in-place geändert und zurückgegeben.
+    """
+    jobs: dict[str, ChartJob] = {}
+    for chart_key in dict.fromkeys(chart_keys):
+        value = analysis_results.get(chart_key)
+        if isinstance(value, LazyChart):
+            jobs[chart_key] = value.job()
+        elif hasattr(value, "to_json") and hasattr(value, "to_image"):
+            jobs[chart_key] = ChartJob(value, format, width, height, scale)
+    if not jobs:
+        return analysis_results
+
+    rendered = get_chart_render_service().render_batch(jobs)
+    for chart_key in jobs:
+        if chart_key in rendered:
+            analysis_results[chart_key] = rendered[chart_key]
+        else:
+            analysis_results.pop(chart_key, None)
+    return analysis_results
+
+
+_render_service: ChartRenderService | None = None
+_render_service_lock = threading.Lock()
+
+
+def get_chart_render_service() -> ChartRenderService:
+    """Prozessweiter Renderer (Browser startet beim ersten Cache-Miss)."""
+    global _render_service
+    if _render_service is None:
+        with _render_service_lock:
+            if _render_service is None:
+                _render_service = ChartRenderService()
+    return _render_service
+
+
+def render_chart_batch(
+    jobs: Mapping[str, ChartJob],
+    errors: dict[str, BaseException] | None = None,
+) -> dict[str, bytes]:
+    """Kurzform für ``get_chart_render_service().render_batch(...)``."""
+    return get_chart_render_service().render_batch(jobs, errors)
+
+
+def shutdown_chart_render_service() -> None:
+    global _render_service
+    with _render_service_lock:
+        service, _render_service = _render_service, None
+    if service is not None:
+        service.close()
+
+
+atexit.register(shutdown_chart_render_service)
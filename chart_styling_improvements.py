@@ -464,14 +464,14 @@ def save_plotly_chart_to_bytes(
     Returns:
         PNG-Bytes
     """
-    import plotly.io as pio
+    from chart_export_cache import export_figure_bytes
 
     # Hohe Auflösung (Task 4.3)
     # Berechne Pixel-Größe: cm -> inch -> pixel
     width_px = int(FIGURE_WIDTH_CM * CM_TO_INCH * DPI)
     height_px = int(FIGURE_HEIGHT_CM * CM_TO_INCH * DPI)
 
-    chart_bytes = pio.to_image(
+    chart_bytes = export_figure_bytes(
         fig,
         format='png',
         width=width_px,
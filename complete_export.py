@@ -413,6 +413,14 @@ def export_all_results(
     except BaseException:
         pass
 
+    # Diagramme der Analyse-Seite liegen noch als Handle vor -> ein Batch
+    try:
+        from chart_render_service import materialize_chart_bytes
+        materialize_chart_bytes(
+            complete_export['charts'], list(complete_export['charts']))
+    except BaseException:
+        pass
+
     # 2. Financial Tools
     try:
         financial = collect_all_financial_calculations(
@@ -88,6 +88,7 @@ from .job_repository import (
 from .jobs import (
     ErrorType,
     Job,
+    JobCancelledError,
     JobManager,
     JobPriority,
     JobQueue,
@@ -131,6 +132,12 @@ from .navigation_history import (
     render_breadcrumbs,
 )
 
+# Persistence Scheduler
+from .persistence_scheduler import (
+    PersistenceScheduler,
+    get_persistence_scheduler,
+)
+
 # Navigation System
 from .router import (
     AuthenticationMiddleware,
@@ -311,6 +318,9 @@ __all__ = [
     "get_migration_manager",
     "migrate",
     "rollback",
+    # Persistence Scheduler
+    "PersistenceScheduler",
+    "get_persistence_scheduler",
     # Session Management
     "NavigationEntry",
     "SessionPersistence",
@@ -445,6 +455,7 @@ __all__ = [
     "Job",
     "JobManager",
     "JobPriority",
+    "JobCancelledError",
     "JobQueue",
     "JobResult",
     "JobStatus",
@@ -0,0 +1,143 @@
+"""Throughput benchmark for the background job system
+
+Queues a mix of PDF and calculation jobs and measures throughput (jobs/s)
+and dispatch latency (time from enqueue until a worker starts the job):
+
+    python -m core.benchmark_jobs --jobs 10000 --workers 4
+"""
+
+import argparse
+import hashlib
+import logging
+import threading
+import time
+
+from .jobs import Job, JobManager, JobPriority, JobQueue
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _pdf_job(enqueued_at: float, record, progress_callback=None) -> int:
+    """Stand-in for a PDF export: hash a few pages worth of bytes"""
+    record(time.perf_counter() - enqueued_at)
+    page = b"%PDF-1.7 Angebot " * 256
+    digest = hashlib.blake2b(digest_size=16)
+    for _ in range(8):
+        digest.update(page)
+    if progress_callback:
+        progress_callback(1.0, "PDF erstellt")
+    return len(digest.hexdigest())
+
+
+def _calculation_job(enqueued_at: float, record, progress_callback=None) -> float:
+    """Stand-in for a calculation: short numeric loop"""
+    record(time.perf_counter() - enqueued_at)
+    total = 0.0
+    for year in range(1, 21):
+        total += 1000.0 * 0.995 ** year
+    if progress_callback:
+        progress_callback(1.0, "Berechnung fertig")
+    return total
+
+
+def benchmark_queue(jobs: int = 10000) -> dict[str, float]:
+    """Raw JobQueue enqueue/dequeue rate (single thread)"""
+    queue = JobQueue()
+    priorities = list(JobPriority)
+    batch = [
+        Job(name=f"job-{i}", priority=priorities[i % len(priorities)])
+        for i in range(jobs)
+    ]
+
+    start = time.perf_counter()
+    for job in batch:
+        queue.enqueue(job)
+    enqueue_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while queue.dequeue() is not None:
+        pass
+    dequeue_s = time.perf_counter() - start
+
+    return {
+        "enqueue_per_s": jobs / enqueue_s,
+        "dequeue_per_s": jobs / dequeue_s,
+    }
+
+
+def benchmark_dispatch(jobs: int = 10000, workers: int = 4) -> dict[str, float]:
+    """End-to-end throughput and dispatch latency of JobManager"""
+    manager = JobManager(
+        max_workers=workers, auto_recover=False, persist_results=False)
+    latencies: list[float] = []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def record(latency: float) -> None:
+        with lock:
+            latencies.append(latency)
+            if len(latencies) == jobs:
+                done.set()
+
+    manager.start()
+    try:
+        start = time.perf_counter()
+        for i in range(jobs):
+            if i % 2:
+                job = Job(name="pdf", function=_pdf_job,
+                          priority=JobPriority.HIGH)
+            else:
+                job = Job(name="calculation", function=_calculation_job)
+            job.args = (time.perf_counter(), record)
+            manager.enqueue(job)
+        enqueued_s = time.perf_counter() - start
+
+        done.wait(timeout=300)
+        # Wait for the last jobs to finish their bookkeeping
+        while manager.get_running_jobs():
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+    finally:
+        manager.stop()
+
+    return {
+        "jobs": float(len(latencies)),
+        "enqueue_s": enqueued_s,
+        "jobs_per_s": len(latencies) / elapsed,
+        "p50_dispatch_ms": _percentile(latencies, 50) * 1000,
+        "p99_dispatch_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    # Per-job log lines would dominate the measurement
+    try:
+        import structlog
+        structlog.configure(
+            wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    except ImportError:
+        logging.getLogger("core.jobs").setLevel(logging.WARNING)
+
+    queue_result = benchmark_queue(args.jobs)
+    print(f"JobQueue enqueue:  {queue_result['enqueue_per_s']:10.0f} jobs/s")
+    print(f"JobQueue dequeue:  {queue_result['dequeue_per_s']:10.0f} jobs/s")
+
+    result = benchmark_dispatch(args.jobs, args.workers)
+    print(f"JobManager:        {result['jobs_per_s']:10.0f} jobs/s "
+          f"({int(result['jobs'])} jobs, {args.workers} workers)")
+    print(f"Dispatch p50:      {result['p50_dispatch_ms']:10.2f} ms")
+    print(f"Dispatch p99:      {result['p99_dispatch_ms']:10.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
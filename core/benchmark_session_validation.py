@@ -0,0 +1,94 @@
+"""Throughput benchmark for SessionManager.validate_session
+
+Creates users with open sessions in a temporary SQLite database and
+validates random tokens, once with the token cache disabled (one joined
+query per call) and once with it enabled:
+
+    python -m core.benchmark_session_validation --sessions 200 --validations 20000
+"""
+
+import argparse
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .database import Base, DatabaseManager
+from .security import SessionManager, User
+
+
+def _make_db_manager(path: Path) -> DatabaseManager:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    manager = DatabaseManager(use_enhanced_connection_manager=False)
+    manager.engine = engine
+    manager.SessionLocal = sessionmaker(bind=engine)
+    return manager
+
+
+def benchmark_validation(
+    sessions: int = 200,
+    validations: int = 20000,
+    cache_ttl: float = 30.0
+) -> dict[str, float]:
+    """Validations per second for one cache setting"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = _make_db_manager(Path(tmp) / "bench.db")
+        manager = SessionManager(
+            db_manager, cache_ttl=cache_ttl, activity_flush_interval=1.0)
+
+        with db_manager.session_scope() as db_session:
+            for i in range(sessions):
+                db_session.add(User(
+                    id=f"user-{i}", email=f"user-{i}@example.com",
+                    password_hash="x"))
+        tokens = [manager.create_session(User(id=f"user-{i}"))
+                  for i in range(sessions)]
+
+        rng = random.Random(42)
+        picks = [rng.choice(tokens) for _ in range(validations)]
+
+        start = time.perf_counter()
+        for token in picks:
+            if manager.validate_session(token) is None:
+                raise RuntimeError("validation failed")
+        elapsed = time.perf_counter() - start
+        manager.flush_activity()
+
+        stats = manager.get_cache_stats()
+        db_manager.engine.dispose()
+
+    return {
+        "validations_per_s": validations / elapsed,
+        "avg_us": elapsed / validations * 1e6,
+        "hit_rate": stats["hit_rate"],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--validations", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    # Per-call log lines would dominate the measurement
+    try:
+        import structlog
+        structlog.configure(
+            wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    except ImportError:
+        logging.getLogger("core.security").setLevel(logging.WARNING)
+
+    for label, ttl in (("uncached (join)", 0.0), ("token cache", 30.0)):
+        result = benchmark_validation(args.sessions, args.validations, ttl)
+        print(f"{label:16s} {result['validations_per_s']:10.0f} validations/s "
+              f"({result['avg_us']:.1f} us, hit rate {result['hit_rate']:.2%})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
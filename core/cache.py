@@ -1,7 +1,9 @@
 """Intelligent Caching System with Multi-Layer Support"""
 
 import hashlib
+import itertools
 import json
+import sys
 import threading
 import time
 from collections import OrderedDict
@@ -29,6 +31,79 @@ import builtins
 
 from .config import get_config
 
+# Size estimation for cache entries
+SIZER_SAMPLE_ITEMS = 32  # Containers larger than this are sampled
+SIZER_MAX_DEPTH = 6
+_SCALAR_SIZE = 32  # Rough per-object overhead of small Python scalars
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Cheap estimate of the memory footprint of a cached value in bytes
+
+    Fast paths for bytes/str, NumPy arrays and pandas objects; containers
+    are walked recursively, but only a sample of their items is measured
+    and extrapolated to the full length.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return _SCALAR_SIZE
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value)
+
+    # NumPy arrays (duck-typed to avoid importing numpy here)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int) and hasattr(value, "dtype"):
+        return nbytes
+
+    # pandas DataFrame / Series (object columns counted shallowly)
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage) and hasattr(value, "dtypes"):
+        try:
+            usage = memory_usage(index=True, deep=False)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        except Exception:
+            pass
+
+    if _depth >= SIZER_MAX_DEPTH:
+        return sys.getsizeof(value, _SCALAR_SIZE)
+
+    if isinstance(value, dict):
+        items = value.items()
+        count = len(value)
+        if count > SIZER_SAMPLE_ITEMS:
+            items = itertools.islice(items, SIZER_SAMPLE_ITEMS)
+        sampled = sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in items
+        )
+        return sys.getsizeof(value) + _extrapolate(sampled, count)
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        count = len(value)
+        if count > SIZER_SAMPLE_ITEMS and isinstance(value, (list, tuple)):
+            step = count // SIZER_SAMPLE_ITEMS
+            items = value[::step][:SIZER_SAMPLE_ITEMS]
+        else:
+            items = itertools.islice(value, SIZER_SAMPLE_ITEMS)
+        sampled = sum(estimate_size(item, _depth + 1) for item in items)
+        return sys.getsizeof(value) + _extrapolate(sampled, count)
+
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_size(vars(value), _depth + 1)
+
+    return sys.getsizeof(value, _SCALAR_SIZE)
+
+
+def _extrapolate(sampled: int, count: int) -> int:
+    """Scale the size of the sampled items up to ``count`` items"""
+    if count <= SIZER_SAMPLE_ITEMS:
+        return sampled
+    return sampled * count // SIZER_SAMPLE_ITEMS
+
 
 @dataclass
 class CacheEntry:
@@ -119,20 +194,52 @@ class CacheKeys:
 
 
 class InMemoryCache:
-    """In-memory cache with LRU eviction and TTL support"""
+    """
+    In-memory cache with LRU eviction and TTL support
 
-    def __init__(self, max_entries: int = 1000, default_ttl: int = 3600):
+    Eviction is size-aware: least recently used entries are dropped until
+    both ``max_entries`` and ``max_bytes`` (if set) are satisfied. Entry
+    sizes come from ``sizer`` (default :func:`estimate_size`). A tag -> keys
+    index keeps ``invalidate_by_tags`` proportional to the matching keys.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        default_ttl: int = 3600,
+        max_bytes: int | None = None,
+        sizer: Callable[[Any], int] | None = None
+    ):
         self.max_entries = max_entries
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes or None  # 0/None = no byte budget
+        self.sizer = sizer or estimate_size
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tag_index: dict[str, builtins.set[str]] = {}
+        self._current_bytes = 0
         self._lock = threading.RLock()
         self._stats = {
             "hits": 0,
             "misses": 0,
             "evictions": 0,
-            "expirations": 0
+            "expirations": 0,
+            "rejected_too_large": 0
         }
 
+    def _remove(self, key: str) -> CacheEntry | None:
+        """Remove entry and its index/size bookkeeping (lock held)"""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return None
+        self._current_bytes -= entry.size_bytes
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+        return entry
+
     def get(self, key: str) -> Any | None:
         """Get value from cache"""
         with self._lock:
@@ -144,7 +251,7 @@ class InMemoryCache:
                 return None
 
             if entry.is_expired():
-                self._cache.pop(key)
+                self._remove(key)
                 self._stats["expirations"] += 1
                 self._stats["misses"] += 1
                 logger.debug("Cache expired", key=key, layer="memory")
@@ -165,6 +272,12 @@ class InMemoryCache:
         tags: set[str] = None
     ) -> None:
         """Set value in cache"""
+        # Estimate size outside the lock
+        try:
+            size_bytes = int(self.sizer(value))
+        except Exception:
+            size_bytes = 0
+
         with self._lock:
             # Calculate expiration
             ttl_seconds = ttl if ttl is not None else self.default_ttl
@@ -172,11 +285,17 @@ class InMemoryCache:
             if ttl_seconds > 0:
                 expires_at = datetime.now() + timedelta(seconds=ttl_seconds)
 
-            # Estimate size
-            try:
-                size_bytes = len(json.dumps(value, default=str).encode())
-            except Exception:
-                size_bytes = 0
+            self._remove(key)
+
+            if self.max_bytes is not None and size_bytes > self.max_bytes:
+                self._stats["rejected_too_large"] += 1
+                logger.debug(
+                    "Cache set rejected (too large)",
+                    key=key,
+                    size_bytes=size_bytes,
+                    layer="memory"
+                )
+                return
 
             # Create entry
             entry = CacheEntry(
@@ -184,17 +303,23 @@ class InMemoryCache:
                 value=value,
                 created_at=datetime.now(),
                 expires_at=expires_at,
-                tags=tags or set(),
+                tags=set(tags) if tags else set(),
                 size_bytes=size_bytes
             )
 
             # Add to cache
             self._cache[key] = entry
-            self._cache.move_to_end(key)
-
-            # Evict if over capacity
-            while len(self._cache) > self.max_entries:
-                evicted_key, _ = self._cache.popitem(last=False)
+            self._current_bytes += size_bytes
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+
+            # Evict least recently used entries if over capacity
+            while len(self._cache) > self.max_entries or (
+                self.max_bytes is not None
+                and self._current_bytes > self.max_bytes
+            ):
+                evicted_key = next(iter(self._cache))
+                self._remove(evicted_key)
                 self._stats["evictions"] += 1
                 logger.debug("Cache eviction", key=evicted_key, layer="memory")
 
@@ -203,8 +328,7 @@ class InMemoryCache:
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
         with self._lock:
-            if key in self._cache:
-                del self._cache[key]
+            if self._remove(key) is not None:
                 logger.debug("Cache delete", key=key, layer="memory")
                 return True
             return False
@@ -213,18 +337,19 @@ class InMemoryCache:
         """Clear all cache entries"""
         with self._lock:
             self._cache.clear()
+            self._tag_index.clear()
+            self._current_bytes = 0
             logger.info("Cache cleared", layer="memory")
 
     def invalidate_by_tags(self, tags: builtins.set[str]) -> int:
         """Invalidate all entries with matching tags"""
         with self._lock:
-            keys_to_delete = []
-            for key, entry in self._cache.items():
-                if entry.tags & tags:  # Intersection
-                    keys_to_delete.append(key)
+            keys_to_delete: builtins.set[str] = set()
+            for tag in tags:
+                keys_to_delete |= self._tag_index.get(tag, set())
 
             for key in keys_to_delete:
-                del self._cache[key]
+                self._remove(key)
 
             logger.info(
                 "Cache invalidated by tags",
@@ -244,10 +369,6 @@ class InMemoryCache:
                 else 0.0
             )
 
-            total_size = sum(
-                entry.size_bytes for entry in self._cache.values()
-            )
-
             return {
                 "layer": "memory",
                 "entries": len(self._cache),
@@ -257,7 +378,10 @@ class InMemoryCache:
                 "hit_rate": hit_rate,
                 "evictions": self._stats["evictions"],
                 "expirations": self._stats["expirations"],
-                "total_size_bytes": total_size
+                "rejected_too_large": self._stats["rejected_too_large"],
+                "total_size_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "tags": len(self._tag_index)
             }
 
     def get_all_keys(self) -> list[str]:
@@ -531,7 +655,8 @@ class MultiLayerCache:
         config = get_config()
         self.memory_cache = InMemoryCache(
             max_entries=config.cache.max_entries,
-            default_ttl=config.cache.default_ttl
+            default_ttl=config.cache.default_ttl,
+            max_bytes=config.cache.max_bytes
         )
         self.streamlit_cache = StreamlitCacheWrapper()
         self.database_cache = DatabaseCache()
@@ -26,6 +26,24 @@ except ImportError:
 from .cache import get_cache
 
 
+def _size_utilization(layer_stats: dict[str, Any]) -> tuple[float, float, float]:
+    """Entry, byte and effective (the higher of both) utilization of a layer"""
+    max_entries = layer_stats.get("max_entries", 1)
+    entries = layer_stats.get("entries", 0)
+    entry_utilization = entries / max_entries if max_entries > 0 else 0
+
+    max_bytes = layer_stats.get("max_bytes")
+    byte_utilization = (
+        layer_stats.get("total_size_bytes", 0) / max_bytes
+        if max_bytes else 0.0
+    )
+    return (
+        entry_utilization,
+        byte_utilization,
+        max(entry_utilization, byte_utilization)
+    )
+
+
 @dataclass
 class CacheMetric:
     """Single cache metric data point"""
@@ -248,8 +266,11 @@ class CachePerformanceAnalyzer:
 
         entries = layer_stats.get("entries", 0)
         max_entries = layer_stats.get("max_entries", 1)
-        utilization = entries / max_entries if max_entries > 0 else 0
         total_size = layer_stats.get("total_size_bytes", 0)
+        max_bytes = layer_stats.get("max_bytes")
+        entry_utilization, byte_utilization, utilization = (
+            _size_utilization(layer_stats)
+        )
 
         # Record metric
         self.metrics_collector.record_metric(
@@ -258,6 +279,12 @@ class CachePerformanceAnalyzer:
             value=utilization,
             metadata={"entries": entries, "size_bytes": total_size}
         )
+        self.metrics_collector.record_metric(
+            layer=layer,
+            metric_type="bytes_in_use",
+            value=total_size,
+            metadata={"max_bytes": max_bytes}
+        )
 
         # Check for alert
         if utilization > self._alert_thresholds["size_high"]:
@@ -274,8 +301,11 @@ class CachePerformanceAnalyzer:
             "entries": entries,
             "max_entries": max_entries,
             "utilization": utilization,
+            "entry_utilization": entry_utilization,
+            "byte_utilization": byte_utilization,
             "total_size_bytes": total_size,
             "total_size_mb": total_size / (1024 * 1024),
+            "max_bytes": max_bytes,
             "status": self._get_status(utilization, "utilization")
         }
 
@@ -486,10 +516,7 @@ class CachePerformanceAnalyzer:
         stats = cache.get_stats()
         memory_stats = stats.get("memory", {})
 
-        utilization = (
-            memory_stats.get("entries", 0) /
-            memory_stats.get("max_entries", 1)
-        )
+        _, _, utilization = _size_utilization(memory_stats)
 
         # Trigger cleanup if utilization > 90%
         if utilization > 0.9:
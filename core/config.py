@@ -124,6 +124,10 @@ def _get_cache_max_entries():
     return int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
 
 
+def _get_cache_max_bytes():
+    return int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
 @dataclass
 class CacheConfig:
     """Cache configuration"""
@@ -131,6 +135,7 @@ class CacheConfig:
     redis_url: str | None = field(default_factory=_get_redis_url)
     default_ttl: int = field(default_factory=_get_cache_ttl)
     max_entries: int = field(default_factory=_get_cache_max_entries)
+    max_bytes: int = field(default_factory=_get_cache_max_bytes)  # 0 = unlimited
 
     def validate(self) -> None:
         """Validate cache configuration"""
@@ -138,6 +143,8 @@ class CacheConfig:
             raise ValueError("CACHE_TTL must be non-negative")
         if self.max_entries < 1:
             raise ValueError("CACHE_MAX_ENTRIES must be at least 1")
+        if self.max_bytes < 0:
+            raise ValueError("CACHE_MAX_BYTES must be non-negative")
 
 
 def _get_job_backend():
@@ -607,6 +614,7 @@ class AppConfig:
             "cache": {
                 "default_ttl": self.cache.default_ttl,
                 "max_entries": self.cache.max_entries,
+                "max_bytes": self.cache.max_bytes,
             },
             "jobs": {
                 "backend": self.jobs.backend,
@@ -1,11 +1,14 @@
 """Background Job Processing System"""
 
+import heapq
 import json
 import random
 import threading
 import time
 import uuid
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -236,18 +239,39 @@ class JobResult:
             self.progress_details.update(details)
 
 
+class JobCancelledError(Exception):
+    """Raised inside a job when cancellation was requested"""
+
+
 class ProgressCallback:
-    """Progress callback for job functions"""
+    """Progress callback for job functions
+
+    Also serves as the cooperative cancellation point: once the job was
+    cancelled (or exceeded its timeout), the next ``update`` raises
+    :class:`JobCancelledError`. Long-running functions without progress
+    reporting can check ``cancelled`` themselves.
+    """
 
     def __init__(
             self,
             job_result: JobResult,
-            update_fn: Callable | None = None):
+            update_fn: Callable | None = None,
+            cancel_event: threading.Event | None = None):
         self.job_result = job_result
         self.update_fn = update_fn
+        self.cancel_event = cancel_event
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancellation was requested"""
+        return self.cancel_event is not None and self.cancel_event.is_set()
 
     def update(self, progress: float, message: str = "", **details) -> None:
         """Update progress"""
+        if self.cancelled:
+            raise JobCancelledError(
+                f"Job {self.job_result.job_id} was cancelled")
+
         self.job_result.update_progress(progress, message, **details)
         if self.update_fn:
             self.update_fn(self.job_result)
@@ -265,68 +289,159 @@ class ProgressCallback:
 
 
 class JobQueue:
-    """Priority queue for jobs"""
+    """Priority queue for jobs
+
+    Jobs whose ``scheduled_at`` lies in the future wait in a timer heap keyed
+    on (ready_time, -priority, seq). Once due they move to the ready heap,
+    which is ordered by (-priority, ready_time, seq), i.e. higher priority
+    first, then FIFO. Removal is lazy: removed entries stay in the heaps and
+    are skipped when they surface.
+
+    ``dequeue(block=True)`` waits on a condition variable until a job is
+    ready (or the next timer is due) instead of polling.
+    """
 
     def __init__(self):
-        self._queue: list[tuple[int, datetime, Job]] = []
+        self._ready: list[tuple[int, float, int, Job]] = []
+        self._delayed: list[tuple[float, int, int, Job]] = []
+        self._entries: dict[str, int] = {}  # job id -> seq of live entry
+        self._seq = 0
+        self._wakeups = 0
         self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+
+    @staticmethod
+    def _ready_time(job: Job) -> float:
+        if job.scheduled_at is None:
+            return time.time()
+        return job.scheduled_at.timestamp()
+
+    def _is_live(self, job: Job, seq: int) -> bool:
+        return self._entries.get(job.id) == seq
+
+    def _promote_due(self, now: float) -> None:
+        """Move due delayed jobs to the ready heap (lock held)"""
+        delayed = self._delayed
+        while delayed and delayed[0][0] <= now:
+            ready_time, neg_priority, seq, job = heapq.heappop(delayed)
+            if self._is_live(job, seq):
+                heapq.heappush(self._ready, (neg_priority, ready_time, seq, job))
+
+    def _pop_ready(self) -> Job | None:
+        ready = self._ready
+        while ready:
+            _, _, seq, job = heapq.heappop(ready)
+            if self._is_live(job, seq):
+                del self._entries[job.id]
+                return job
+        return None
+
+    def _next_timer(self) -> float | None:
+        delayed = self._delayed
+        while delayed and not self._is_live(delayed[0][3], delayed[0][2]):
+            heapq.heappop(delayed)
+        return delayed[0][0] if delayed else None
 
     def enqueue(self, job: Job) -> None:
         """Add job to queue with priority"""
         with self._lock:
-            # Priority queue: higher priority first, then FIFO
-            priority = -job.priority  # Negative for max-heap behavior
-            timestamp = job.scheduled_at or datetime.now()
-            self._queue.append((priority, timestamp, job))
-            self._queue.sort(key=lambda x: (x[0], x[1]))
-
-    def dequeue(self) -> Job | None:
-        """Get next job from queue"""
+            self._seq += 1
+            seq = self._seq
+            self._entries[job.id] = seq
+            ready_time = self._ready_time(job)
+            if ready_time <= time.time():
+                heapq.heappush(
+                    self._ready, (-job.priority, ready_time, seq, job))
+                self._not_empty.notify()
+            else:
+                heapq.heappush(
+                    self._delayed, (ready_time, -job.priority, seq, job))
+                # A waiting worker may have to shorten its timer
+                self._not_empty.notify()
+
+    def dequeue(
+            self,
+            block: bool = False,
+            timeout: float | None = None) -> Job | None:
+        """Get next ready job from queue
+
+        With ``block=True`` waits up to ``timeout`` seconds (forever if None)
+        for a job to become ready. Returns None on timeout or after
+        :meth:`wake_all`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
         with self._lock:
-            if not self._queue:
-                return None
-
-            # Check for jobs ready to run
-            now = datetime.now()
-            for i, (priority, timestamp, job) in enumerate(self._queue):
-                if timestamp <= now:
-                    self._queue.pop(i)
+            wakeups = self._wakeups
+            while True:
+                now = time.time()
+                self._promote_due(now)
+                job = self._pop_ready()
+                if job is not None:
+                    if self._ready:
+                        # More work is ready: hand it to another waiting worker
+                        self._not_empty.notify()
                     return job
-
-            return None
+                if not block or self._wakeups != wakeups:
+                    return None
+
+                wait = None
+                next_timer = self._next_timer()
+                if next_timer is not None:
+                    wait = max(0.0, next_timer - now)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._not_empty.wait(wait)
+
+    def wake_all(self) -> None:
+        """Wake up all blocked ``dequeue`` calls (used on shutdown)"""
+        with self._lock:
+            self._wakeups += 1
+            self._not_empty.notify_all()
 
     def peek(self) -> Job | None:
         """Peek at next job without removing"""
         with self._lock:
-            if not self._queue:
-                return None
-            return self._queue[0][2]
+            self._promote_due(time.time())
+            while self._ready:
+                _, _, seq, job = self._ready[0]
+                if self._is_live(job, seq):
+                    return job
+                heapq.heappop(self._ready)
+            if self._next_timer() is not None:
+                return self._delayed[0][3]
+            return None
 
     def remove(self, job_id: str) -> bool:
         """Remove job from queue"""
         with self._lock:
-            for i, (_, _, job) in enumerate(self._queue):
-                if job.id == job_id:
-                    self._queue.pop(i)
-                    return True
-            return False
+            return self._entries.pop(job_id, None) is not None
 
     def size(self) -> int:
         """Get queue size"""
         with self._lock:
-            return len(self._queue)
+            return len(self._entries)
 
     def clear(self) -> None:
         """Clear all jobs from queue"""
         with self._lock:
-            self._queue.clear()
+            self._ready.clear()
+            self._delayed.clear()
+            self._entries.clear()
 
 
 class JobManager:
     """Enhanced job manager with priority queues and scheduling"""
 
-    def __init__(self, max_workers: int = 4, auto_recover: bool = True):
+    def __init__(
+            self,
+            max_workers: int = 4,
+            auto_recover: bool = True,
+            persist_results: bool = True):
         self.max_workers = max_workers
+        self.persist_results = persist_results
         self.queue = JobQueue()
         self.running_jobs: dict[str, Job] = {}
         self.job_results: dict[str, JobResult] = {}
@@ -341,6 +456,20 @@ class JobManager:
         # Dead letter queue for failed jobs
         self.dead_letter_queue: list[tuple[Job, JobResult]] = []
 
+        # Jobs waiting for their dependencies (released on job completion)
+        self.blocked_jobs: dict[str, Job] = {}
+
+        # Cancellation flags of running jobs (cooperative cancellation)
+        self._cancel_events: dict[str, threading.Event] = {}
+
+        # Shared executor for jobs with timeout (created on start). Timed-out
+        # jobs that ignore cancellation keep their pool thread, so busy
+        # slots are counted and a saturated pool falls back to a dedicated
+        # thread per job
+        self._timeout_executor: ThreadPoolExecutor | None = None
+        self._timeout_pool_size = max_workers * 2
+        self._timeout_slots_busy = 0
+
         # Auto-recover pending jobs on startup
         if auto_recover:
             self._recover_pending_jobs()
@@ -357,6 +486,10 @@ class JobManager:
             return
 
         self.running = True
+        self._timeout_executor = ThreadPoolExecutor(
+            max_workers=self._timeout_pool_size,
+            thread_name_prefix="JobTimeoutWorker"
+        )
 
         for i in range(self.max_workers):
             worker = threading.Thread(
@@ -377,11 +510,18 @@ class JobManager:
         logger.info("Stopping job manager", graceful=graceful)
         self.running = False
 
+        self.queue.wake_all()
+
         if graceful:
             # Wait for running jobs to complete
             start_time = time.time()
             while self.running_jobs and (time.time() - start_time) < timeout:
                 time.sleep(0.1)
+        else:
+            # Ask running jobs to stop at their next progress update
+            with self.lock:
+                for event in self._cancel_events.values():
+                    event.set()
 
         # Wait for workers to finish
         for worker in self.workers:
@@ -389,23 +529,33 @@ class JobManager:
                 worker.join(timeout=1)
 
         self.workers.clear()
+
+        if self._timeout_executor is not None:
+            self._timeout_executor.shutdown(wait=False, cancel_futures=True)
+            self._timeout_executor = None
         logger.info("Job manager stopped")
 
     def _worker_loop(self) -> None:
         """Worker thread main loop"""
         while self.running:
             try:
-                job = self.queue.dequeue()
+                # Blocks until a job is ready; the timeout only bounds the
+                # reaction time to stop() requests that race with the wait
+                job = self.queue.dequeue(block=True, timeout=1.0)
 
                 if job is None:
-                    time.sleep(0.1)
                     continue
 
                 # Check dependencies
-                if not self._check_dependencies(job):
-                    # Re-queue if dependencies not met
-                    self.queue.enqueue(job)
-                    time.sleep(0.5)
+                with self.lock:
+                    failed_dep = self._failed_dependency(job)
+                    if failed_dep is None and not self._check_dependencies(job):
+                        # Park until a dependency completes
+                        self.blocked_jobs[job.id] = job
+                        continue
+
+                if failed_dep is not None:
+                    self._fail_dependent_job(job, failed_dep)
                     continue
 
                 # Execute job
@@ -427,6 +577,61 @@ class JobManager:
 
         return True
 
+    def _failed_dependency(self, job: Job) -> str | None:
+        """Return the id of a dependency that failed or was cancelled"""
+        for dep_id in job.depends_on:
+            result = self.job_results.get(dep_id)
+            if result and result.status in (
+                    JobStatus.FAILED, JobStatus.CANCELLED):
+                return dep_id
+        return None
+
+    def _fail_dependent_job(self, job: Job, dep_id: str) -> None:
+        """Fail a job whose dependency can no longer complete"""
+        now = datetime.now()
+        job_result = JobResult(
+            job_id=job.id,
+            status=JobStatus.FAILED,
+            error=f"Dependency {dep_id} did not complete",
+            error_type=ErrorType.PERMANENT,
+            completed_at=now,
+            worker_id=self.worker_id
+        )
+        with self.lock:
+            self.job_results[job.id] = job_result
+
+        logger.warning(
+            "Job failed due to dependency", job_id=job.id, dependency=dep_id)
+        self._persist_job_result(job_result)
+
+    def _release_blocked_jobs(self) -> None:
+        """Re-queue blocked jobs whose dependencies are now satisfied and
+        fail those whose dependencies failed (transitively)"""
+        released: list[Job] = []
+        while True:
+            with self.lock:
+                failed = [
+                    (job, dep_id) for job in self.blocked_jobs.values()
+                    if (dep_id := self._failed_dependency(job)) is not None
+                ]
+                for job, _ in failed:
+                    del self.blocked_jobs[job.id]
+                ready = [
+                    job for job in self.blocked_jobs.values()
+                    if self._check_dependencies(job)
+                ]
+                for job in ready:
+                    del self.blocked_jobs[job.id]
+            released.extend(ready)
+            if not failed:
+                break
+            # Failing a job may fail blocked jobs that depend on it
+            for job, dep_id in failed:
+                self._fail_dependent_job(job, dep_id)
+
+        for job in released:
+            self.queue.enqueue(job)
+
     def _execute_job(self, job: Job) -> None:
         """Execute a job"""
         job_result = JobResult(
@@ -435,10 +640,12 @@ class JobManager:
             started_at=datetime.now(),
             worker_id=self.worker_id
         )
+        cancel_event = threading.Event()
 
         with self.lock:
             self.running_jobs[job.id] = job
             self.job_results[job.id] = job_result
+            self._cancel_events[job.id] = cancel_event
 
         logger.info("Job started", job_id=job.id, name=job.name)
 
@@ -455,7 +662,8 @@ class JobManager:
             def update_progress(result: JobResult):
                 self._persist_job_result(result)
 
-            progress_callback = ProgressCallback(job_result, update_progress)
+            progress_callback = ProgressCallback(
+                job_result, update_progress, cancel_event)
 
             # Execute with timeout
             if job.timeout:
@@ -485,11 +693,19 @@ class JobManager:
                 duration=job_result.duration_seconds
             )
 
+        except JobCancelledError:
+            job_result.status = JobStatus.CANCELLED
+            job_result.completed_at = datetime.now()
+            job_result.duration_seconds = (
+                job_result.completed_at - job_result.started_at
+            ).total_seconds()
+
+            logger.info("Job cancelled (running)", job_id=job.id)
+
         except Exception as e:
             # Job failed
             import traceback
 
-            job_result.status = JobStatus.FAILED
             job_result.error = str(e)
             job_result.traceback = traceback.format_exc()
             job_result.completed_at = datetime.now()
@@ -507,7 +723,8 @@ class JobManager:
                 error_type=job_result.error_type
             )
 
-            # Handle retry
+            # Handle retry; FAILED is only set once no retry follows, so
+            # dependents never see a failure that is about to be retried
             if self._should_retry(job, job_result):
                 self._retry_job(job)
                 # Notify about retry
@@ -519,6 +736,7 @@ class JobManager:
                         "Failed to send retry notification",
                         error=str(e))
             else:
+                job_result.status = JobStatus.FAILED
                 # Move to dead letter queue
                 self.dead_letter_queue.append((job, job_result))
                 # Notify about failure
@@ -533,10 +751,14 @@ class JobManager:
         finally:
             with self.lock:
                 self.running_jobs.pop(job.id, None)
+                self._cancel_events.pop(job.id, None)
 
             # Persist result
             self._persist_job_result(job_result)
 
+            if self.blocked_jobs:
+                self._release_blocked_jobs()
+
     def _execute_with_timeout(
         self,
         func: Callable,
@@ -545,30 +767,66 @@ class JobManager:
         timeout: int,
         progress_callback: ProgressCallback
     ) -> Any:
-        """Execute function with timeout"""
-        result = [None]
-        exception = [None]
+        """Execute function with timeout
 
-        def target():
-            try:
-                kwargs_with_progress = kwargs.copy()
-                if 'progress_callback' not in kwargs_with_progress:
-                    kwargs_with_progress['progress_callback'] = progress_callback
-                result[0] = func(*args, **kwargs_with_progress)
-            except Exception as e:
-                exception[0] = e
+        Runs on the shared timeout executor, or on a dedicated thread while
+        all pool threads are busy (e.g. held by timed-out jobs). Python
+        threads cannot be killed, so on timeout the job's cancel flag is set
+        and the function stops at its next progress update.
+        """
+        kwargs_with_progress = kwargs.copy()
+        if 'progress_callback' not in kwargs_with_progress:
+            kwargs_with_progress['progress_callback'] = progress_callback
 
-        thread = threading.Thread(target=target)
-        thread.start()
-        thread.join(timeout=timeout)
+        executor = self._timeout_executor
+        if executor is None:
+            # Manager not started (direct call): run in the calling thread
+            return func(*args, **kwargs_with_progress)
 
-        if thread.is_alive():
-            raise TimeoutError(f"Job execution exceeded timeout of {timeout}s")
+        with self.lock:
+            pooled = self._timeout_slots_busy < self._timeout_pool_size
+            if pooled:
+                self._timeout_slots_busy += 1
+
+        if pooled:
+            future = executor.submit(func, *args, **kwargs_with_progress)
+            future.add_done_callback(self._release_timeout_slot)
+        else:
+            logger.warning("Timeout pool saturated, using dedicated thread")
+            future = self._run_in_dedicated_thread(
+                func, args, kwargs_with_progress)
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            if progress_callback.cancel_event is not None:
+                progress_callback.cancel_event.set()
+            raise TimeoutError(
+                f"Job execution exceeded timeout of {timeout}s") from None
+
+    def _release_timeout_slot(self, future: Future) -> None:
+        """Done callback: free a timeout pool slot"""
+        with self.lock:
+            self._timeout_slots_busy -= 1
 
-        if exception[0]:
-            raise exception[0]
+    @staticmethod
+    def _run_in_dedicated_thread(
+            func: Callable, args: tuple, kwargs: dict) -> Future:
+        """Run func on its own daemon thread and return its future"""
+        future: Future = Future()
 
-        return result[0]
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(
+            target=run, name="JobTimeoutWorker-dedicated", daemon=True).start()
+        return future
 
     def _categorize_error(self, error: Exception) -> ErrorType:
         """Categorize error as transient or permanent"""
@@ -636,6 +894,8 @@ class JobManager:
 
     def _persist_job_result(self, result: JobResult) -> None:
         """Persist job result to database"""
+        if not self.persist_results:
+            return
         try:
             from .job_repository import JobRepository
             repo = JobRepository()
@@ -662,6 +922,9 @@ class JobManager:
         self.queue.enqueue(job)
 
         # Persist job
+        if not self.persist_results:
+            logger.info("Job enqueued", job_id=job.id, name=job.name)
+            return job.id
         try:
             from .job_repository import JobRepository
             repo = JobRepository()
@@ -702,11 +965,31 @@ class JobManager:
                 self._persist_job_result(self.job_results[job_id])
 
             logger.info("Job cancelled (queued)", job_id=job_id)
+            # Dependents can no longer run
+            self._release_blocked_jobs()
+            return True
+
+        # Remove from jobs waiting for dependencies
+        with self.lock:
+            blocked = self.blocked_jobs.pop(job_id, None)
+        if blocked is not None:
+            if job_id in self.job_results:
+                self.job_results[job_id].status = JobStatus.CANCELLED
+                self.job_results[job_id].completed_at = datetime.now()
+                self._persist_job_result(self.job_results[job_id])
+
+            logger.info("Job cancelled (blocked)", job_id=job_id)
+            # Dependents can no longer run
+            self._release_blocked_jobs()
             return True
 
         # Check if running
         if job_id in self.running_jobs:
-            # Mark as cancelled (worker will check)
+            # Signal the job; it stops at its next progress update
+            with self.lock:
+                event = self._cancel_events.get(job_id)
+            if event is not None:
+                event.set()
             if job_id in self.job_results:
                 self.job_results[job_id].status = JobStatus.CANCELLED
                 self._persist_job_result(self.job_results[job_id])
@@ -718,8 +1001,8 @@ class JobManager:
         return False
 
     def get_queue_size(self) -> int:
-        """Get current queue size"""
-        return self.queue.size()
+        """Get current queue size (including jobs waiting for dependencies)"""
+        return self.queue.size() + len(self.blocked_jobs)
 
     def get_running_jobs(self) -> list[Job]:
         """Get currently running jobs"""
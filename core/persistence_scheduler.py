@@ -0,0 +1,271 @@
+"""Shared Debounce Scheduler for Persistence Engines
+
+One worker thread serves every debounced save in the process instead of a
+``threading.Timer`` thread per call. Pending saves live in a dict keyed by a
+caller-chosen key (e.g. a session id) with their deadlines in a heap; a new
+schedule for a pending key replaces its payload (coalescing) and, by
+default, pushes the deadline back. Stale heap entries are skipped lazily.
+Deadlines are rounded up to ``tick_seconds`` (like a timer wheel), so saves
+that fall into the same tick fire together and never early.
+
+When deadlines come due, all due entries that share a callback are handed
+to that callback as one list, so an engine can write them in a single
+database transaction.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+try:
+    import structlog
+    logger = structlog.get_logger(__name__)
+except ImportError:
+    import logging
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+
+BatchCallback = Callable[[list[Any]], None]
+
+
+@dataclass
+class _PendingSave:
+    """A scheduled save waiting for its deadline"""
+    deadline: float
+    seq: int
+    callback: BatchCallback
+    payload: Any
+
+
+class PersistenceScheduler:
+    """Single-thread scheduler with coalesced per-key deadlines"""
+
+    def __init__(
+        self,
+        name: str = "persistence-scheduler",
+        tick_seconds: float = 0.05
+    ):
+        self.name = name
+        self.tick_seconds = tick_seconds
+        self._pending: dict[Hashable, _PendingSave] = {}
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._worker: threading.Thread | None = None
+        self._shutdown = False
+
+        # Metrics
+        self._scheduled = 0
+        self._coalesced = 0
+        self._flushes = 0
+        self._flushed_items = 0
+        self._flush_errors = 0
+        self._total_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._last_flush_ms = 0.0
+
+    def schedule(
+        self,
+        key: Hashable,
+        delay_seconds: float,
+        callback: BatchCallback,
+        payload: Any = None,
+        reset: bool = True
+    ) -> None:
+        """
+        Schedule (or coalesce) a save
+
+        Args:
+            key: Identity of the pending save (one pending save per key)
+            delay_seconds: Debounce delay
+            callback: Called with the list of due payloads of this callback
+            payload: Value passed to the callback; replaces a pending one
+            reset: If False, keep the deadline of an already pending save
+        """
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError(f"{self.name} is shut down")
+
+            self._scheduled += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._coalesced += 1
+                pending.payload = payload
+                pending.callback = callback
+                if not reset:
+                    return
+
+            deadline = time.monotonic() + delay_seconds
+            if self.tick_seconds > 0:
+                deadline = math.ceil(
+                    deadline / self.tick_seconds) * self.tick_seconds
+            seq = next(self._seq)
+            self._pending[key] = _PendingSave(deadline, seq, callback, payload)
+            heapq.heappush(self._heap, (deadline, seq, key))
+
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+            elif self._heap[0][1] == seq:
+                # New earliest deadline
+                self._cond.notify()
+
+    def cancel(self, key: Hashable) -> Any:
+        """
+        Drop a pending save
+
+        Returns:
+            Payload of the cancelled save or None
+        """
+        with self._cond:
+            pending = self._pending.pop(key, None)
+            return pending.payload if pending else None
+
+    def is_pending(self, key: Hashable) -> bool:
+        """Check whether a save is pending for key"""
+        with self._cond:
+            return key in self._pending
+
+    def pending_keys(
+            self,
+            predicate: Callable[[Hashable], bool] | None = None
+    ) -> list[Hashable]:
+        """Keys with pending saves, optionally filtered"""
+        with self._cond:
+            if predicate is None:
+                return list(self._pending)
+            return [key for key in self._pending if predicate(key)]
+
+    def flush(
+            self,
+            keys: list[Hashable] | None = None
+    ) -> int:
+        """
+        Run pending saves now in the calling thread
+
+        Args:
+            keys: Keys to flush (all pending saves if None)
+
+        Returns:
+            Number of saves executed
+        """
+        with self._cond:
+            if keys is None:
+                keys = list(self._pending)
+            due = [(key, self._pending.pop(key))
+                   for key in keys if key in self._pending]
+
+        self._run_due(due)
+        return len(due)
+
+    def shutdown(self, flush: bool = True, timeout: float = 5.0) -> None:
+        """Stop the worker thread, running pending saves first"""
+        if flush:
+            self.flush()
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout=timeout)
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get scheduler metrics"""
+        with self._cond:
+            scheduled = self._scheduled
+            return {
+                "pending_saves": len(self._pending),
+                "scheduled": scheduled,
+                "coalesced": self._coalesced,
+                "coalescing_ratio": (
+                    self._coalesced / scheduled if scheduled else 0.0),
+                "flushes": self._flushes,
+                "flushed_items": self._flushed_items,
+                "flush_errors": self._flush_errors,
+                "avg_flush_latency_ms": (
+                    self._total_flush_ms / self._flushes
+                    if self._flushes else 0.0),
+                "max_flush_latency_ms": self._max_flush_ms,
+                "last_flush_latency_ms": self._last_flush_ms,
+                "avg_batch_size": (
+                    self._flushed_items / self._flushes
+                    if self._flushes else 0.0),
+            }
+
+    def _run(self) -> None:
+        """Worker loop: sleep until the earliest deadline, run due saves"""
+        while True:
+            with self._cond:
+                while True:
+                    if self._shutdown:
+                        return
+                    due = self._pop_due(time.monotonic())
+                    if due:
+                        break
+                    timeout = (self._heap[0][0] - time.monotonic()
+                               if self._heap else None)
+                    self._cond.wait(timeout)
+
+            self._run_due(due)
+
+    def _pop_due(self, now: float) -> list[tuple[Hashable, _PendingSave]]:
+        """Pop all due entries, skipping stale heap entries"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, seq, key = heapq.heappop(self._heap)
+            pending = self._pending.get(key)
+            if pending is None or pending.seq != seq:
+                continue
+            del self._pending[key]
+            due.append((key, pending))
+        return due
+
+    def _run_due(self, due: list[tuple[Hashable, _PendingSave]]) -> None:
+        """Invoke callbacks, one call per callback with all its payloads"""
+        groups: dict[BatchCallback, list[Any]] = {}
+        for _, pending in due:
+            groups.setdefault(pending.callback, []).append(pending.payload)
+
+        for callback, payloads in groups.items():
+            start = time.perf_counter()
+            failed = False
+            try:
+                callback(payloads)
+            except Exception as e:
+                failed = True
+                logger.error(
+                    "Scheduled save failed",
+                    count=len(payloads),
+                    error=str(e))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._cond:
+                self._flushes += 1
+                self._flushed_items += len(payloads)
+                self._flush_errors += int(failed)
+                self._total_flush_ms += elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+                self._last_flush_ms = elapsed_ms
+
+
+# Global scheduler
+_scheduler: PersistenceScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_persistence_scheduler() -> PersistenceScheduler:
+    """Get global persistence scheduler"""
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PersistenceScheduler()
+
+    return _scheduler
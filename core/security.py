@@ -5,7 +5,9 @@ import hmac
 import json
 import re
 import secrets
+import threading
 import time
+import weakref
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -21,11 +23,14 @@ from sqlalchemy import (
     String,
     Table,
     Text,
+    bindparam,
+    update,
 )
 from sqlalchemy.orm import relationship
 
 from .config import get_config
 from .database import Base, DatabaseManager, get_db_manager
+from .persistence_scheduler import get_persistence_scheduler
 
 try:
     import bcrypt
@@ -333,13 +338,57 @@ class MFAManager:
             return False
 
 
+# Every SessionManager in the process, so revocations reach all token caches
+_session_managers: weakref.WeakSet = weakref.WeakSet()
+_session_managers_lock = threading.Lock()
+
+
+def _live_session_managers() -> list['SessionManager']:
+    with _session_managers_lock:
+        return list(_session_managers)
+
+
 class SessionManager:
-    """User session management with configurable timeouts"""
+    """User session management with configurable timeouts
 
-    def __init__(self, db_manager: DatabaseManager = None):
+    validate_session() keeps a short-lived in-process cache of
+    token -> (user snapshot, session expiry), so repeated validations of the
+    same token skip the database. revoke_session() and
+    revoke_all_user_sessions() drop the affected entries from every
+    SessionManager in the process; revocations made by other processes
+    become visible after at most ``cache_ttl`` seconds.
+
+    last_activity updates are buffered per session and written in one bulk
+    UPDATE every ``activity_flush_interval`` seconds on the shared
+    persistence scheduler.
+    """
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager = None,
+        cache_ttl: float = 30.0,
+        activity_flush_interval: float = 30.0
+    ):
         self.db_manager = db_manager or get_db_manager()
         self.config = get_config()
         self.session_timeout = self.config.security.session_timeout
+        self.cache_ttl = cache_ttl
+        self.activity_flush_interval = activity_flush_interval
+
+        # token -> (session_id, user snapshot, expires_at, cached_until)
+        self._token_cache: dict[str, tuple[str,
+                                           dict[str, Any], datetime, float]] = {}
+        # session_id -> last_activity not yet written
+        self._pending_activity: dict[str, datetime] = {}
+        self._cache_lock = threading.Lock()
+        # Bumped by every revoke; validations that overlap one don't cache
+        self._revocation_epoch = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._activity_flushes = 0
+
+        with _session_managers_lock:
+            _session_managers.add(self)
 
     def create_session(
         self,
@@ -370,46 +419,175 @@ class SessionManager:
         return session_token
 
     def validate_session(self, session_token: str) -> User | None:
-        """Validate session token and return user"""
+        """Validate session token and return user
+
+        Returns:
+            Detached snapshot of the user (column attributes only) or None
+        """
+        now = datetime.utcnow()
+
+        if self.cache_ttl > 0:
+            with self._cache_lock:
+                entry = self._token_cache.get(session_token)
+                if entry is not None:
+                    session_id, snapshot, expires_at, cached_until = entry
+                    if cached_until > time.monotonic() and expires_at >= now:
+                        self._cache_hits += 1
+                        self._record_activity(session_id, now)
+                        return User(**snapshot)
+                    del self._token_cache[session_token]
+                self._cache_misses += 1
+                epoch = self._revocation_epoch
+
         with self.db_manager.session_scope() as db_session:
-            session = db_session.query(AuthenticationSession).filter(
+            # Session and user in one round-trip
+            row = db_session.query(AuthenticationSession, User).join(
+                User, User.id == AuthenticationSession.user_id
+            ).filter(
                 AuthenticationSession.session_token == session_token
             ).first()
 
-            if not session:
+            if not row:
                 return None
 
+            session, user = row
+
             # Check expiration
-            if session.expires_at < datetime.utcnow():
+            if session.expires_at < now:
                 logger.info("Session expired", session_id=session.id)
                 db_session.delete(session)
                 return None
 
-            # Update last activity
-            session.last_activity = datetime.utcnow()
+            snapshot = {
+                column.key: getattr(user, column.key)
+                for column in User.__table__.columns
+            }
+            session_id = session.id
+            expires_at = session.expires_at
+
+        with self._cache_lock:
+            if self.cache_ttl > 0 and epoch == self._revocation_epoch:
+                self._token_cache[session_token] = (
+                    session_id, snapshot, expires_at,
+                    time.monotonic() + self.cache_ttl)
+            self._record_activity(session_id, now)
+
+        return User(**snapshot)
+
+    def _record_activity(self, session_id: str, timestamp: datetime) -> None:
+        """Buffer a last_activity update (caller holds _cache_lock)"""
+        first = not self._pending_activity
+        self._pending_activity[session_id] = timestamp
+        if first:
+            get_persistence_scheduler().schedule(
+                (self, "activity"),
+                self.activity_flush_interval,
+                self._flush_activity_due,
+                reset=False
+            )
+
+    def _flush_activity_due(self, _items: list) -> None:
+        """Scheduler callback"""
+        self.flush_activity()
+
+    def flush_activity(self) -> int:
+        """Write buffered last_activity timestamps in one bulk UPDATE
+
+        Returns:
+            Number of sessions updated
+        """
+        with self._cache_lock:
+            pending = self._pending_activity
+            self._pending_activity = {}
+        if not pending:
+            return 0
+
+        table = AuthenticationSession.__table__
+        statement = update(table).where(
+            table.c.id == bindparam('b_session_id')
+        ).values(last_activity=bindparam('b_last_activity'))
+
+        try:
+            with self.db_manager.session_scope() as db_session:
+                db_session.execute(statement, [
+                    {'b_session_id': session_id, 'b_last_activity': timestamp}
+                    for session_id, timestamp in pending.items()
+                ])
+        except Exception as e:
+            logger.error(
+                "Session activity flush failed",
+                count=len(pending),
+                error=str(e))
+            # Keep the timestamps for the next flush unless newer ones arrived
+            with self._cache_lock:
+                for session_id, timestamp in pending.items():
+                    self._pending_activity.setdefault(session_id, timestamp)
+            return 0
+
+        self._activity_flushes += 1
+        logger.debug("Session activity flushed", count=len(pending))
+        return len(pending)
 
-            # Get user
-            user = db_session.query(User).filter(
-                User.id == session.user_id).first()
+    def get_cache_stats(self) -> dict[str, Any]:
+        """Get token cache and activity buffer statistics"""
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "cached_tokens": len(self._token_cache),
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_rate": self._cache_hits / lookups if lookups else 0.0,
+                "pending_activity_updates": len(self._pending_activity),
+                "activity_flushes": self._activity_flushes,
+            }
 
-            return user
+    def _evict_token(self, session_token: str) -> None:
+        for manager in _live_session_managers():
+            manager._evict_cached_token(session_token)
+
+    def _evict_user(self, user_id: str) -> None:
+        for manager in _live_session_managers():
+            manager._evict_cached_user(user_id)
+
+    def _evict_cached_token(self, session_token: str) -> None:
+        with self._cache_lock:
+            self._revocation_epoch += 1
+            entry = self._token_cache.pop(session_token, None)
+            if entry is not None:
+                self._pending_activity.pop(entry[0], None)
+
+    def _evict_cached_user(self, user_id: str) -> None:
+        with self._cache_lock:
+            self._revocation_epoch += 1
+            for token, entry in list(self._token_cache.items()):
+                if entry[1].get('id') == user_id:
+                    del self._token_cache[token]
+                    self._pending_activity.pop(entry[0], None)
 
     def revoke_session(self, session_token: str) -> bool:
         """Revoke session"""
+        self._evict_token(session_token)
+
         with self.db_manager.session_scope() as db_session:
             session = db_session.query(AuthenticationSession).filter(
                 AuthenticationSession.session_token == session_token
             ).first()
 
             if session:
+                with self._cache_lock:
+                    self._pending_activity.pop(session.id, None)
                 db_session.delete(session)
                 logger.info("Session revoked", session_id=session.id)
-                return True
 
-            return False
+        # Again after the commit: a validation that read the row before the
+        # delete must not cache it
+        self._evict_token(session_token)
+        return session is not None
 
     def revoke_all_user_sessions(self, user_id: str) -> int:
         """Revoke all sessions for user"""
+        self._evict_user(user_id)
+
         with self.db_manager.session_scope() as db_session:
             count = db_session.query(AuthenticationSession).filter(
                 AuthenticationSession.user_id == user_id
@@ -419,7 +597,9 @@ class SessionManager:
                 "All user sessions revoked",
                 user_id=user_id,
                 count=count)
-            return count
+
+        self._evict_user(user_id)
+        return count
 
     def cleanup_expired_sessions(self) -> int:
         """Clean up expired sessions"""
@@ -439,7 +619,10 @@ class AuthenticationManager:
         self.db_manager = db_manager or get_db_manager()
         self.password_hasher = PasswordHasher()
         self.mfa_manager = MFAManager()
-        self.session_manager = SessionManager(db_manager)
+        # Default database: share the process-wide token cache
+        self.session_manager = (
+            SessionManager(db_manager) if db_manager is not None
+            else get_session_manager())
         self.config = get_config()
 
         # Account lockout settings
@@ -824,9 +1007,19 @@ def get_authentication_manager() -> AuthenticationManager:
     return AuthenticationManager()
 
 
+_session_manager: SessionManager | None = None
+_session_manager_lock = threading.Lock()
+
+
 def get_session_manager() -> SessionManager:
-    """Get session manager instance"""
-    return SessionManager()
+    """Get shared session manager instance (shares the token cache)"""
+    global _session_manager
+
+    with _session_manager_lock:
+        if _session_manager is None:
+            _session_manager = SessionManager()
+
+    return _session_manager
 
 
 def get_mfa_manager() -> MFAManager:
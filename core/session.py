@@ -1,12 +1,14 @@
 """Enhanced Session Management & State Persistence"""
 
 import json
-import threading
 import uuid
+from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any
 
+from .persistence_scheduler import PersistenceScheduler, get_persistence_scheduler
+
 try:
     import streamlit as st
     STREAMLIT_AVAILABLE = True
@@ -351,70 +353,100 @@ class UserSession:
 
 # Session persistence with debouncing
 class SessionPersistence:
-    """Debounced session state persistence engine"""
+    """Debounced session state persistence engine
+
+    Saves are scheduled on the shared PersistenceScheduler (one worker
+    thread for all sessions). Repeated saves of a session within the
+    debounce window coalesce into one; sessions that come due together and
+    have no per-call save_fn are written through batch_save_fn in one call.
+    """
 
-    def __init__(self, debounce_ms: int = 500):
+    def __init__(
+        self,
+        debounce_ms: int = 500,
+        batch_save_fn: Callable[[list['UserSession']], None] | None = None,
+        scheduler: PersistenceScheduler | None = None
+    ):
         self.debounce_ms = debounce_ms
-        self._pending_saves: dict[str, threading.Timer] = {}
-        self._lock = threading.Lock()
+        self.batch_save_fn = batch_save_fn
+        self._scheduler = scheduler or get_persistence_scheduler()
 
     def schedule_save(
         self,
         session_id: str,
         session: UserSession,
-        save_fn: callable
+        save_fn: Callable[[UserSession], None] | None = None
     ) -> None:
-        """Schedule debounced save"""
-        with self._lock:
-            # Cancel existing timer if any
-            if session_id in self._pending_saves:
-                self._pending_saves[session_id].cancel()
-
-            # Schedule new save
-            timer = threading.Timer(
-                self.debounce_ms / 1000.0,
-                lambda: self._execute_save(session_id, session, save_fn)
-            )
-            self._pending_saves[session_id] = timer
-            timer.start()
-
-    def _execute_save(
+        """Schedule debounced save (via batch_save_fn if save_fn is None)"""
+        if save_fn is None and self.batch_save_fn is None:
+            raise ValueError("save_fn is required without batch_save_fn")
+
+        self._scheduler.schedule(
+            (self, session_id),
+            self.debounce_ms / 1000.0,
+            self._execute_saves,
+            (session_id, session, save_fn)
+        )
+
+    def _execute_saves(
         self,
-        session_id: str,
-        session: UserSession,
-        save_fn: callable
+        items: list[tuple[str, UserSession, Callable | None]]
     ) -> None:
-        """Execute the actual save"""
-        try:
-            save_fn(session)
-            logger.debug("Session saved", session_id=session_id)
-        except Exception as e:
-            logger.error(
-                "Session save failed",
-                session_id=session_id,
-                error=str(e))
-        finally:
-            with self._lock:
-                self._pending_saves.pop(session_id, None)
+        """Execute due saves; sessions without save_fn in one batch"""
+        batch = []
+        for session_id, session, save_fn in items:
+            if save_fn is None:
+                batch.append(session)
+                continue
+            try:
+                save_fn(session)
+                logger.debug("Session saved", session_id=session_id)
+            except Exception as e:
+                logger.error(
+                    "Session save failed",
+                    session_id=session_id,
+                    error=str(e))
+
+        if batch:
+            try:
+                self.batch_save_fn(batch)
+                logger.debug("Session batch saved", count=len(batch))
+            except Exception as e:
+                logger.error(
+                    "Session batch save failed",
+                    count=len(batch),
+                    error=str(e))
 
     def flush(self, session_id: str = None) -> None:
         """Immediately execute pending saves"""
-        with self._lock:
-            if session_id:
-                timer = self._pending_saves.get(session_id)
-                if timer:
-                    timer.cancel()
-                    timer.function()
-            else:
-                # Flush all pending saves
-                for timer in self._pending_saves.values():
-                    timer.cancel()
-                    timer.function()
-                self._pending_saves.clear()
+        if session_id:
+            keys = [(self, session_id)]
+        else:
+            keys = self._scheduler.pending_keys(
+                lambda key: isinstance(key, tuple) and key[0] is self)
+        self._scheduler.flush(keys)
+
+    def pending_count(self) -> int:
+        """Number of sessions with a pending save"""
+        return len(self._scheduler.pending_keys(
+            lambda key: isinstance(key, tuple) and key[0] is self))
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Get persistence metrics (scheduler-wide plus own pending saves)"""
+        return {
+            "pending_sessions": self.pending_count(),
+            "scheduler": self._scheduler.get_metrics()
+        }
+
+
+def _save_sessions(sessions: list[UserSession]) -> None:
+    """Write sessions in one transaction"""
+    from .session_repository import SessionRepository
+    SessionRepository().save_sessions(sessions)
 
 
 # Global session persistence engine
-_session_persistence = SessionPersistence()
+_session_persistence = SessionPersistence(batch_save_fn=_save_sessions)
 
 
 def get_session_persistence() -> SessionPersistence:
@@ -514,14 +546,8 @@ def persist_input(key: str, val: Any) -> None:
 
     # Schedule debounced database write
     try:
-        from .session_repository import SessionRepository
-        repo = SessionRepository()
-
-        def save_fn(sess: UserSession):
-            repo.save_session(sess)
-
         persistence = get_session_persistence()
-        persistence.schedule_save(session.session_id, session, save_fn)
+        persistence.schedule_save(session.session_id, session)
 
         logger.debug("Input persisted", key=key)
     except Exception as e:
@@ -537,20 +563,15 @@ def save_session(session: UserSession, immediate: bool = False) -> None:
         immediate: If True, save immediately without debouncing
     """
     try:
-        from .session_repository import SessionRepository
-        repo = SessionRepository()
-
         if immediate:
-            repo.save_session(session)
+            from .session_repository import SessionRepository
+            SessionRepository().save_session(session)
             logger.info(
                 "Session saved immediately",
                 session_id=session.session_id)
         else:
-            def save_fn(sess: UserSession):
-                repo.save_session(sess)
-
             persistence = get_session_persistence()
-            persistence.schedule_save(session.session_id, session, save_fn)
+            persistence.schedule_save(session.session_id, session)
             logger.debug(
                 "Session save scheduled",
                 session_id=session.session_id)
@@ -2,12 +2,15 @@
 
 import json
 from datetime import datetime, timedelta
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import Column, DateTime, Integer, String, Text
 
 from .database import Base, DatabaseManager, get_db_manager
 
+if TYPE_CHECKING:
+    from .session import UserSession
+
 try:
     import structlog
     logger = structlog.get_logger(__name__)
@@ -53,38 +56,60 @@ class SessionRepository:
         Args:
             session: UserSession instance to save
         """
+        self.save_sessions([session])
 
-        with self.db_manager.session_scope() as db_session:
-            # Check if session exists
-            existing = db_session.query(SessionModel).filter(
-                SessionModel.session_id == session.session_id
-            ).first()
+    def save_sessions(self, sessions: list['UserSession']) -> None:
+        """
+        Save or update several sessions in one transaction
 
-            session_data_json = session.to_json()
-
-            if existing:
-                # Update existing session
-                existing.session_data = session_data_json
-                existing.updated_at = datetime.utcnow()
-                existing.last_activity = session.last_activity
-                existing.version = session.version
-                existing.user_id = session.user_id
-
-                logger.debug("Session updated", session_id=session.session_id)
-            else:
-                # Create new session
-                new_session = SessionModel(
-                    session_id=session.session_id,
-                    user_id=session.user_id,
-                    session_data=session_data_json,
-                    created_at=session.created_at,
-                    updated_at=session.updated_at,
-                    last_activity=session.last_activity,
-                    version=session.version
+        Args:
+            sessions: UserSession instances to save
+        """
+        if not sessions:
+            return
+
+        with self.db_manager.session_scope() as db_session:
+            # Load existing rows with one query
+            existing_rows = {
+                row.session_id: row
+                for row in db_session.query(SessionModel).filter(
+                    SessionModel.session_id.in_(
+                        [session.session_id for session in sessions])
                 )
-                db_session.add(new_session)
+            }
+
+            for session in sessions:
+                existing = existing_rows.get(session.session_id)
+                session_data_json = session.to_json()
+
+                if existing:
+                    # Update existing session
+                    existing.session_data = session_data_json
+                    existing.updated_at = datetime.utcnow()
+                    existing.last_activity = session.last_activity
+                    existing.version = session.version
+                    existing.user_id = session.user_id
+
+                    logger.debug(
+                        "Session updated",
+                        session_id=session.session_id)
+                else:
+                    # Create new session
+                    new_session = SessionModel(
+                        session_id=session.session_id,
+                        user_id=session.user_id,
+                        session_data=session_data_json,
+                        created_at=session.created_at,
+                        updated_at=session.updated_at,
+                        last_activity=session.last_activity,
+                        version=session.version
+                    )
+                    db_session.add(new_session)
+                    existing_rows[session.session_id] = new_session
 
-                logger.debug("Session created", session_id=session.session_id)
+                    logger.debug(
+                        "Session created",
+                        session_id=session.session_id)
 
     def get_session(self, session_id: str) -> dict[str, Any] | None:
         """
@@ -8,6 +8,7 @@ from .cache import (
     CacheKeys,
     InMemoryCache,
     MultiLayerCache,
+    estimate_size,
     get_cache,
     get_or_compute,
     invalidate_cache,
@@ -122,6 +123,42 @@ class TestInMemoryCache:
         assert cache.get("key1") is None
         assert cache.get("key2") is None
 
+    def test_byte_budget_eviction(self):
+        cache = InMemoryCache(max_bytes=2500)
+
+        cache.set("pdf1", b"a" * 1000)
+        cache.set("pdf2", b"b" * 1000)
+        cache.get("pdf1")
+        cache.set("pdf3", b"c" * 1000)  # Evicts pdf2 (least recently used)
+
+        assert cache.get("pdf2") is None
+        assert cache.get("pdf1") is not None
+        assert cache.get_stats()["total_size_bytes"] == 2000
+
+        cache.set("huge", b"x" * 5000)  # Larger than the budget
+        assert cache.get("huge") is None
+        assert cache.get_stats()["rejected_too_large"] == 1
+
+    def test_tag_index_follows_evictions(self):
+        cache = InMemoryCache(max_entries=2)
+        cache.set("key1", "value1", tags={"user"})
+        cache.set("key2", "value2", tags={"user"})
+        cache.set("key3", "value3", tags={"product"})  # Evicts key1
+        cache.set("key2", "value2b", tags={"offer"})  # Re-tagged
+
+        assert cache.invalidate_by_tags({"user"}) == 0
+        assert cache.invalidate_by_tags({"offer", "product"}) == 2
+        assert cache.get_stats()["tags"] == 0
+
+    def test_estimate_size(self):
+        np = pytest.importorskip("numpy")
+
+        assert estimate_size(b"x" * 100) == 100
+        assert estimate_size(np.zeros(1000)) == 8000
+        large = [{"year": i, "value": float(i)} for i in range(10000)]
+        small = large[:100]
+        assert 50 < estimate_size(large) / estimate_size(small) < 200
+
 
 class TestMultiLayerCache:
     """Test multi-layer cache coordination"""
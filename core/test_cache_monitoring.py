@@ -217,6 +217,22 @@ class TestCachePerformanceAnalyzer:
         assert "max_entries" in report
         assert "total_size_bytes" in report
 
+    def test_analyze_cache_size_reports_bytes(self):
+        collector = CacheMetricsCollector()
+        analyzer = CachePerformanceAnalyzer(collector)
+        cache = get_cache()
+        cache.memory_cache.set("monitoring_blob", b"x" * 4096)
+
+        try:
+            report = analyzer.analyze_cache_size("memory")
+            assert report["total_size_bytes"] >= 4096
+            assert report["max_bytes"] == cache.memory_cache.max_bytes
+            assert report["utilization"] >= report["byte_utilization"]
+            assert collector.get_latest_metric(
+                "memory", "bytes_in_use").value == report["total_size_bytes"]
+        finally:
+            cache.memory_cache.delete("monitoring_blob")
+
     def test_analyze_evictions(self):
         collector = CacheMetricsCollector()
         analyzer = CachePerformanceAnalyzer(collector)
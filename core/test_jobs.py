@@ -8,6 +8,7 @@ import pytest
 from core.jobs import (
     ErrorType,
     Job,
+    JobCancelledError,
     JobManager,
     JobPriority,
     JobQueue,
@@ -180,6 +181,214 @@ def test_job_queue_scheduled():
     assert result.name == "Future"
 
 
+def test_job_queue_delayed_jobs_keep_priority_order():
+    """Test that due delayed jobs are ordered by priority, then FIFO"""
+    queue = JobQueue()
+    soon = datetime.now() + timedelta(seconds=0.2)
+
+    queue.enqueue(Job(name="Low", priority=JobPriority.LOW, scheduled_at=soon))
+    queue.enqueue(Job(name="High", priority=JobPriority.HIGH, scheduled_at=soon))
+    queue.enqueue(Job(name="Normal", priority=JobPriority.NORMAL))
+
+    assert queue.dequeue().name == "Normal"
+    assert queue.dequeue() is None
+
+    time.sleep(0.25)
+    assert [queue.dequeue().name, queue.dequeue().name] == ["High", "Low"]
+    assert queue.size() == 0
+
+
+def test_job_queue_remove_and_blocking_dequeue():
+    """Test lazy removal and waiting for delayed jobs without polling"""
+    queue = JobQueue()
+    removed = Job(name="Removed")
+    delayed = Job(
+        name="Delayed",
+        scheduled_at=datetime.now() + timedelta(seconds=0.2))
+
+    queue.enqueue(removed)
+    queue.enqueue(delayed)
+    assert queue.remove(removed.id)
+    assert not queue.remove(removed.id)
+    assert queue.size() == 1
+
+    start = time.monotonic()
+    assert queue.dequeue(block=True, timeout=2).name == "Delayed"
+    assert 0.15 <= time.monotonic() - start < 1.0
+    assert queue.dequeue(block=True, timeout=0.05) is None
+
+
+def test_progress_callback_raises_when_cancelled():
+    """Test cooperative cancellation through the progress callback"""
+    import threading
+
+    event = threading.Event()
+    callback = ProgressCallback(JobResult(job_id="job"), cancel_event=event)
+    callback(0.5, "Half")
+    event.set()
+
+    assert callback.cancelled
+    with pytest.raises(JobCancelledError):
+        callback(0.6, "More")
+
+
+def test_job_manager_cancel_stops_running_job():
+    """Test that a cancelled running job stops and stays cancelled"""
+    manager = JobManager(max_workers=1, auto_recover=False, persist_results=False)
+    manager.start()
+
+    try:
+        job_id = manager.enqueue(Job(name="Slow", function=slow_task, args=(2.0,)))
+        time.sleep(0.3)
+        assert manager.cancel(job_id)
+
+        start_time = time.time()
+        while manager.get_running_jobs() and time.time() - start_time < 2:
+            time.sleep(0.05)
+
+        assert not manager.get_running_jobs()
+        assert manager.poll(job_id).status == JobStatus.CANCELLED
+
+    finally:
+        manager.stop()
+
+
+def test_job_manager_timeout_uses_shared_executor():
+    """Test timeout handling on the reusable executor"""
+    manager = JobManager(max_workers=1, auto_recover=False, persist_results=False)
+    manager.start()
+
+    try:
+        job_id = manager.enqueue(Job(
+            name="Timeout", function=slow_task, args=(2.0,),
+            timeout=0.3, max_retries=0))
+
+        start_time = time.time()
+        while time.time() - start_time < 3:
+            result = manager.poll(job_id)
+            if result and result.status == JobStatus.FAILED:
+                break
+            time.sleep(0.05)
+
+        assert result.status == JobStatus.FAILED
+        assert "timeout" in result.error
+        assert manager._timeout_executor is not None
+
+    finally:
+        manager.stop()
+
+
+def stubborn_task(duration: float, progress_callback=None) -> str:
+    """Task that ignores cancellation (no progress updates)"""
+    time.sleep(duration)
+    return "completed"
+
+
+def _wait_for_status(manager, job_id, statuses, max_wait=5):
+    start_time = time.time()
+    while time.time() - start_time < max_wait:
+        result = manager.poll(job_id)
+        if result and result.status in statuses:
+            return result
+        time.sleep(0.05)
+    return manager.poll(job_id)
+
+
+def test_job_manager_timeout_pool_saturated_by_stuck_jobs():
+    """Test that stuck timed-out jobs do not starve later timed jobs"""
+    manager = JobManager(max_workers=1, auto_recover=False, persist_results=False)
+    manager.start()
+
+    try:
+        # Pool size is 2; both threads stay busy after their jobs time out
+        stuck_ids = [
+            manager.enqueue(Job(
+                name=f"Stuck {i}", function=stubborn_task, args=(1.5,),
+                timeout=0.2, max_retries=0))
+            for i in range(2)
+        ]
+        job_id = manager.enqueue(Job(
+            name="Quick", function=simple_task, args=(1, 2),
+            timeout=1.0, max_retries=0))
+
+        result = _wait_for_status(
+            manager, job_id, (JobStatus.COMPLETED, JobStatus.FAILED))
+        assert result.status == JobStatus.COMPLETED
+        assert result.result == 3
+        for stuck_id in stuck_ids:
+            assert manager.poll(stuck_id).status == JobStatus.FAILED
+
+    finally:
+        manager.stop()
+
+
+def test_job_manager_fails_jobs_with_failed_dependency():
+    """Test that dependents of a failed job fail instead of blocking"""
+    manager = JobManager(max_workers=2, auto_recover=False, persist_results=False)
+    manager.start()
+
+    try:
+        job1_id = manager.enqueue(Job(
+            name="Job1", function=failing_task, max_retries=0))
+        job2_id = manager.enqueue(Job(
+            name="Job2", function=simple_task, args=(1, 2),
+            depends_on=[job1_id]))
+        job3_id = manager.enqueue(Job(
+            name="Job3", function=simple_task, args=(3, 4),
+            depends_on=[job2_id]))
+
+        for job_id in (job2_id, job3_id):
+            result = _wait_for_status(manager, job_id, (JobStatus.FAILED,))
+            assert result.status == JobStatus.FAILED
+            assert "Dependency" in result.error
+        assert not manager.blocked_jobs
+
+        # Jobs enqueued after the failure fail as soon as they are dequeued
+        job4_id = manager.enqueue(Job(
+            name="Job4", function=simple_task, args=(5, 6),
+            depends_on=[job1_id]))
+        assert _wait_for_status(
+            manager, job4_id, (JobStatus.FAILED,)).status == JobStatus.FAILED
+
+    finally:
+        manager.stop()
+
+
+def test_job_manager_cancel_fails_dependents():
+    """Test that cancelling a blocked dependency fails the jobs waiting for it"""
+    manager = JobManager(max_workers=2, auto_recover=False, persist_results=False)
+    manager.start()
+
+    try:
+        blocker_id = manager.enqueue(Job(
+            name="Blocker", function=slow_task, args=(3.0,)))
+        job1_id = manager.enqueue(Job(
+            name="Job1", function=simple_task, args=(1, 2),
+            depends_on=[blocker_id]))
+        job2_id = manager.enqueue(Job(
+            name="Job2", function=simple_task, args=(3, 4),
+            depends_on=[job1_id]))
+
+        # Job1 and Job2 park while the blocker runs
+        start_time = time.time()
+        while len(manager.blocked_jobs) < 2 and time.time() - start_time < 2:
+            time.sleep(0.05)
+        assert set(manager.blocked_jobs) == {job1_id, job2_id}
+
+        assert manager.cancel(job1_id)
+
+        # Released right away, not when the blocker finishes
+        result = _wait_for_status(manager, job2_id, (JobStatus.FAILED,), max_wait=1)
+        assert result.status == JobStatus.FAILED
+        assert "Dependency" in result.error
+        assert not manager.blocked_jobs
+        assert manager.get_queue_size() == 0
+        assert manager.poll(job1_id).status == JobStatus.CANCELLED
+
+    finally:
+        manager.stop(graceful=False)
+
+
 def test_job_manager_basic():
     """Test basic JobManager functionality"""
     manager = JobManager(max_workers=2)
@@ -0,0 +1,212 @@
+"""Tests for the shared persistence scheduler"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from .database import Base, DatabaseManager
+from .persistence_scheduler import PersistenceScheduler
+from .session import SessionPersistence, UserSession
+from .session_repository import SessionModel, SessionRepository
+from .widget_persistence import WidgetPersistenceEngine, WidgetStateModel
+
+
+@pytest.fixture
+def scheduler():
+    """Create a private scheduler"""
+    sched = PersistenceScheduler(name="test-scheduler")
+    yield sched
+    sched.shutdown(flush=False)
+
+
+@pytest.fixture
+def test_db():
+    """Create test database"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+
+    db_manager = DatabaseManager(use_enhanced_connection_manager=False)
+    db_manager.engine = engine
+    db_manager.SessionLocal = sessionmaker(bind=engine)
+
+    yield db_manager
+
+    Base.metadata.drop_all(engine)
+
+
+class TestPersistenceScheduler:
+    """Test PersistenceScheduler"""
+
+    def test_due_saves_are_batched_per_callback(self, scheduler):
+        """Test that saves due together reach the callback as one list"""
+        calls = []
+        done = threading.Event()
+
+        def callback(payloads):
+            calls.append(sorted(payloads))
+            done.set()
+
+        for i in range(5):
+            scheduler.schedule(f"key_{i}", 0.05, callback, i)
+
+        assert done.wait(2)
+        time.sleep(0.05)
+        assert calls == [[0, 1, 2, 3, 4]]
+
+    def test_rescheduling_coalesces(self, scheduler):
+        """Test that a pending key keeps only the latest payload"""
+        calls = []
+
+        for i in range(10):
+            scheduler.schedule("session", 10, calls.extend, i)
+
+        metrics = scheduler.get_metrics()
+        assert metrics["pending_saves"] == 1
+        assert metrics["coalesced"] == 9
+        assert metrics["coalescing_ratio"] == pytest.approx(0.9)
+
+        assert scheduler.flush() == 1
+        assert calls == [9]
+
+    def test_reset_false_keeps_deadline(self, scheduler):
+        """Test that reset=False does not postpone a pending save"""
+        fired = threading.Event()
+
+        scheduler.schedule("batch", 0.1, lambda _: fired.set())
+        time.sleep(0.06)
+        scheduler.schedule("batch", 0.1, lambda _: fired.set(), reset=False)
+
+        # Fires at the original deadline (plus at most one tick)
+        assert fired.wait(0.15)
+
+    def test_earlier_deadline_wakes_worker(self, scheduler):
+        """Test that a new earliest deadline is not delayed by later ones"""
+        fired = threading.Event()
+
+        scheduler.schedule("late", 30, lambda _: None)
+        scheduler.schedule("early", 0.02, lambda _: fired.set())
+
+        assert fired.wait(1)
+        assert scheduler.is_pending("late")
+
+    def test_cancel(self, scheduler):
+        """Test cancelling a pending save"""
+        scheduler.schedule("key", 10, lambda _: None, "payload")
+
+        assert scheduler.cancel("key") == "payload"
+        assert scheduler.flush() == 0
+
+    def test_callback_errors_are_counted(self, scheduler):
+        """Test that failing callbacks do not stop the scheduler"""
+        def failing(_payloads):
+            raise RuntimeError("boom")
+
+        scheduler.schedule("key", 10, failing)
+        scheduler.flush()
+
+        metrics = scheduler.get_metrics()
+        assert metrics["flushes"] == 1
+        assert metrics["flush_errors"] == 1
+
+    def test_single_worker_thread(self, scheduler):
+        """Test that many scheduled saves share one thread"""
+        before = threading.active_count()
+
+        for i in range(200):
+            scheduler.schedule(i, 10, lambda _: None)
+
+        assert threading.active_count() - before <= 1
+
+
+class TestSessionPersistenceBatching:
+    """Test batched session saves"""
+
+    def test_sessions_saved_in_one_batch(self, scheduler):
+        """Test that due sessions go to batch_save_fn together"""
+        batches = []
+        persistence = SessionPersistence(
+            debounce_ms=10000,
+            batch_save_fn=batches.append,
+            scheduler=scheduler)
+        sessions = [UserSession() for _ in range(3)]
+
+        for session in sessions:
+            persistence.schedule_save(session.session_id, session)
+        assert persistence.pending_count() == 3
+
+        persistence.flush()
+
+        assert len(batches) == 1
+        assert {s.session_id for s in batches[0]} == {
+            s.session_id for s in sessions}
+        assert persistence.pending_count() == 0
+
+    def test_save_fn_required_without_batch_save_fn(self, scheduler):
+        """Test that a save target is required"""
+        persistence = SessionPersistence(scheduler=scheduler)
+
+        with pytest.raises(ValueError):
+            persistence.schedule_save("sid", UserSession())
+
+    def test_repository_save_sessions(self, test_db):
+        """Test writing several sessions in one transaction"""
+        repo = SessionRepository(db_manager=test_db)
+        sessions = [UserSession(user_id=f"user_{i}") for i in range(3)]
+
+        repo.save_sessions(sessions)
+        sessions[0].version = 5
+        repo.save_sessions(sessions[:1])
+
+        with test_db.session_scope() as db_session:
+            assert db_session.query(SessionModel).count() == 3
+            row = db_session.query(SessionModel).filter(
+                SessionModel.session_id == sessions[0].session_id).one()
+            assert row.version == 5
+
+
+class TestWidgetPersistenceBatching:
+    """Test widget persistence on the shared scheduler"""
+
+    def test_flush_writes_all_sessions(self, test_db, scheduler):
+        """Test that pending widget states are written on flush"""
+        engine = WidgetPersistenceEngine(
+            db_manager=test_db, debounce_ms=10000, scheduler=scheduler)
+
+        for value in range(5):
+            engine.schedule_save("s1", "kwp", value)
+        engine.schedule_save("s1", "name", "Max")
+        engine.schedule_save("s2", "kwp", 12)
+
+        metrics = engine.get_metrics()
+        assert metrics["pending_widget_saves"] == 3
+        assert metrics["scheduler"]["coalesced"] == 4
+
+        engine.flush()
+
+        assert engine.get_widget_count() == 3
+        assert engine.recover_widget_states("s1")["kwp"]["value"] == 4
+        assert engine.get_metrics()["pending_widget_saves"] == 0
+
+    def test_batch_timeout_flushes(self, test_db, scheduler):
+        """Test that queued widget states are written after the timeout"""
+        engine = WidgetPersistenceEngine(
+            db_manager=test_db, debounce_ms=10, batch_timeout_ms=50,
+            scheduler=scheduler)
+
+        engine.schedule_save("s1", "kwp", 10)
+
+        deadline = time.time() + 2
+        while engine.get_widget_count("s1") == 0 and time.time() < deadline:
+            time.sleep(0.02)
+
+        with test_db.session_scope() as db_session:
+            state = db_session.query(WidgetStateModel).one()
+            assert state.widget_key == "kwp"
@@ -1,6 +1,7 @@
 """Tests for Security & Access Control System"""
 
 import time
+from contextlib import contextmanager
 
 import pytest
 
@@ -212,6 +213,177 @@ def test_password_change(auth_manager):
     assert result.status.value == "success"
 
 
+@pytest.fixture
+def memory_db():
+    """In-memory database with security tables"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from .database import Base, DatabaseManager
+
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+
+    manager = DatabaseManager(use_enhanced_connection_manager=False)
+    manager.engine = engine
+    manager.SessionLocal = sessionmaker(bind=engine)
+    yield manager
+    Base.metadata.drop_all(engine)
+
+
+def _create_user_and_session(memory_db, session_manager, user_id="u1"):
+    """Insert a user and open a session for it"""
+    from .security import User
+
+    with memory_db.session_scope() as db_session:
+        db_session.add(User(
+            id=user_id, email=f"{user_id}@example.com", password_hash="x"))
+    return session_manager.create_session(User(id=user_id))
+
+
+def test_session_validation_cache(memory_db):
+    """Test token cache hits and invalidation on revoke"""
+    from .security import SessionManager
+
+    session_manager = SessionManager(memory_db, cache_ttl=60)
+    token = _create_user_and_session(memory_db, session_manager)
+
+    first = session_manager.validate_session(token)
+    second = session_manager.validate_session(token)
+
+    assert first.id == second.id == "u1"
+    assert first is not second
+    stats = session_manager.get_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+    assert session_manager.revoke_session(token)
+    assert session_manager.validate_session(token) is None
+
+
+def test_session_cache_revoke_all_user_sessions(memory_db):
+    """Test that revoking a user's sessions drops cached tokens"""
+    from .security import SessionManager
+
+    session_manager = SessionManager(memory_db, cache_ttl=60)
+    token = _create_user_and_session(memory_db, session_manager)
+    assert session_manager.validate_session(token) is not None
+
+    assert session_manager.revoke_all_user_sessions("u1") == 1
+
+    assert session_manager.get_cache_stats()["cached_tokens"] == 0
+    assert session_manager.validate_session(token) is None
+
+
+def test_session_revoked_during_validation_is_not_cached(memory_db, monkeypatch):
+    """Test that a revoke between DB read and cache write wins"""
+    from .security import SessionManager
+
+    session_manager = SessionManager(memory_db, cache_ttl=60)
+    token = _create_user_and_session(memory_db, session_manager)
+    original_scope = memory_db.session_scope
+
+    @contextmanager
+    def scope_then_revoke():
+        with original_scope() as db_session:
+            yield db_session
+        # Validation has read the row but not cached it yet
+        monkeypatch.setattr(memory_db, "session_scope", original_scope)
+        session_manager.revoke_session(token)
+
+    monkeypatch.setattr(memory_db, "session_scope", scope_then_revoke)
+    assert session_manager.validate_session(token) is not None
+
+    assert session_manager.get_cache_stats()["cached_tokens"] == 0
+    assert session_manager.validate_session(token) is None
+
+
+def test_logout_evicts_shared_session_cache(memory_db, monkeypatch):
+    """Test that logout through a new AuthenticationManager reaches the
+    shared session manager's token cache"""
+    from . import security
+
+    monkeypatch.setattr(security, "get_db_manager", lambda: memory_db)
+    monkeypatch.setattr(security, "_session_manager", None)
+    shared = security.get_session_manager()
+    token = _create_user_and_session(memory_db, shared)
+    assert shared.validate_session(token) is not None
+
+    assert security.get_authentication_manager().logout(token)
+
+    assert shared.get_cache_stats()["cached_tokens"] == 0
+    assert shared.validate_session(token) is None
+
+
+def test_revoke_reaches_other_session_managers(memory_db):
+    """Test that revoking in one SessionManager drops other caches"""
+    from .security import SessionManager
+
+    first = SessionManager(memory_db, cache_ttl=60)
+    second = SessionManager(memory_db, cache_ttl=60)
+    token = _create_user_and_session(memory_db, first)
+    assert second.validate_session(token) is not None
+
+    assert first.revoke_all_user_sessions("u1") == 1
+
+    assert second.validate_session(token) is None
+
+
+def test_session_activity_is_buffered(memory_db):
+    """Test bulk flush of last_activity updates"""
+    from .security import AuthenticationSession, SessionManager
+
+    session_manager = SessionManager(
+        memory_db, cache_ttl=60, activity_flush_interval=3600)
+    tokens = [
+        _create_user_and_session(memory_db, session_manager, f"u{i}")
+        for i in range(3)
+    ]
+    with memory_db.session_scope() as db_session:
+        before = {
+            s.id: s.last_activity
+            for s in db_session.query(AuthenticationSession)}
+
+    time.sleep(0.01)
+    for token in tokens * 2:
+        session_manager.validate_session(token)
+
+    assert session_manager.get_cache_stats()["pending_activity_updates"] == 3
+    assert session_manager.flush_activity() == 3
+
+    with memory_db.session_scope() as db_session:
+        for s in db_session.query(AuthenticationSession):
+            assert s.last_activity > before[s.id]
+
+
+def test_failed_activity_flush_is_retried(memory_db, monkeypatch):
+    """Test that timestamps survive a failed bulk UPDATE"""
+    from .security import SessionManager
+
+    session_manager = SessionManager(
+        memory_db, cache_ttl=60, activity_flush_interval=3600)
+    token = _create_user_and_session(memory_db, session_manager)
+    session_manager.validate_session(token)
+    original_scope = memory_db.session_scope
+
+    @contextmanager
+    def failing_scope():
+        raise RuntimeError("database is locked")
+        yield
+
+    monkeypatch.setattr(memory_db, "session_scope", failing_scope)
+    assert session_manager.flush_activity() == 0
+    assert session_manager.get_cache_stats()["pending_activity_updates"] == 1
+
+    monkeypatch.setattr(memory_db, "session_scope", original_scope)
+    assert session_manager.flush_activity() == 1
+
+
 # ============================================================================
 # Task 9.2: Authorization & RBAC Tests
 # ============================================================================
@@ -559,3 +731,4 @@ def test_input_validation(security_monitor):
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
@@ -19,6 +19,7 @@ from typing import Any
 from sqlalchemy import Column, DateTime, Integer, String, Text
 
 from .database import Base, DatabaseManager, get_db_manager
+from .persistence_scheduler import PersistenceScheduler, get_persistence_scheduler
 
 try:
     import structlog
@@ -57,34 +58,43 @@ class WidgetStateModel(Base):
 
 
 class WidgetPersistenceEngine:
-    """Debounced persistence engine for widget states"""
+    """Debounced persistence engine for widget states
+
+    Per-widget debounce deadlines and the batch timeout are scheduled on the
+    shared PersistenceScheduler, so no thread is created per widget change.
+    Due widget states are queued per session and written for all sessions
+    in one transaction once a session reaches batch_size or the batch
+    timeout expires.
+    """
 
     def __init__(
         self,
         db_manager: DatabaseManager = None,
         debounce_ms: int = 500,
         batch_size: int = 10,
-        batch_timeout_ms: int = 1000
+        batch_timeout_ms: int = 1000,
+        scheduler: PersistenceScheduler | None = None
     ):
         self.db_manager = db_manager or get_db_manager()
         self.debounce_ms = debounce_ms
         self.batch_size = batch_size
         self.batch_timeout_ms = batch_timeout_ms
+        self._scheduler = scheduler or get_persistence_scheduler()
 
-        # Pending saves: {session_id: {widget_key: (value, timer)}}
-        self._pending_saves: dict[str, dict[str,
-                                            tuple[Any, threading.Timer]]] = defaultdict(dict)
-
-        # Batch queue: {session_id: [(widget_key, value, timestamp)]}
-        self._batch_queue: dict[str, list[tuple[str,
-                                                Any, datetime]]] = defaultdict(list)
+        # Batch queue: {session_id: {widget_key: (save_data, timestamp)}}
+        self._batch_queue: dict[str, dict[str,
+                                          tuple[dict, datetime]]] = defaultdict(dict)
 
         # Locks
-        self._save_lock = threading.Lock()
         self._batch_lock = threading.Lock()
 
-        # Batch timer
-        self._batch_timer: threading.Timer | None = None
+    def _widget_key(self, session_id: str, widget_key: str) -> tuple:
+        """Scheduler key of a widget's pending save"""
+        return (self, "widget", session_id, widget_key)
+
+    def _is_own_widget_key(self, key: Any) -> bool:
+        return (isinstance(key, tuple) and len(key) == 4
+                and key[0] is self and key[1] == "widget")
 
     def schedule_save(
         self,
@@ -108,156 +118,155 @@ class WidgetPersistenceEngine:
             errors: Validation errors
             warnings: Validation warnings
         """
-        with self._save_lock:
-            # Cancel existing timer if any
-            if widget_key in self._pending_saves[session_id]:
-                _, timer = self._pending_saves[session_id][widget_key]
-                timer.cancel()
-
-            # Create save data
-            save_data = {
-                'session_id': session_id,
-                'widget_key': widget_key,
-                'widget_value': widget_value,
-                'widget_type': widget_type,
-                'is_valid': is_valid,
-                'errors': errors or [],
-                'warnings': warnings or []
-            }
-
-            # Schedule new save
-            timer = threading.Timer(
-                self.debounce_ms / 1000.0,
-                lambda: self._execute_save(session_id, widget_key, save_data)
-            )
-            self._pending_saves[session_id][widget_key] = (save_data, timer)
-            timer.start()
-
-            logger.debug(
-                "Widget save scheduled",
-                session_id=session_id,
-                widget_key=widget_key,
-                debounce_ms=self.debounce_ms
+        # Create save data
+        save_data = {
+            'session_id': session_id,
+            'widget_key': widget_key,
+            'widget_value': widget_value,
+            'widget_type': widget_type,
+            'is_valid': is_valid,
+            'errors': errors or [],
+            'warnings': warnings or []
+        }
+
+        # Replaces a pending save of the same widget
+        self._scheduler.schedule(
+            self._widget_key(session_id, widget_key),
+            self.debounce_ms / 1000.0,
+            self._execute_saves,
+            save_data
+        )
+
+        logger.debug(
+            "Widget save scheduled",
+            session_id=session_id,
+            widget_key=widget_key,
+            debounce_ms=self.debounce_ms
+        )
+
+    def _execute_saves(self, items: list[dict]) -> None:
+        """Move due widget saves into the batch queue"""
+        with self._batch_lock:
+            now = datetime.now()
+            for save_data in items:
+                session_id = save_data['session_id']
+                self._batch_queue[session_id][save_data['widget_key']] = (
+                    save_data, now)
+
+            # Check if a batch is ready
+            batch_ready = any(
+                len(batch) >= self.batch_size
+                for batch in self._batch_queue.values())
+
+        if batch_ready:
+            self._flush_all_batches()
+        else:
+            # Schedule batch flush if not already scheduled
+            self._scheduler.schedule(
+                (self, "batch"),
+                self.batch_timeout_ms / 1000.0,
+                self._flush_batch_timeout,
+                reset=False
             )
 
-    def _execute_save(
-            self,
-            session_id: str,
-            widget_key: str,
-            save_data: dict) -> None:
-        """Execute the actual save"""
-        try:
-            # Add to batch queue
-            with self._batch_lock:
-                self._batch_queue[session_id].append((
-                    widget_key,
-                    save_data,
-                    datetime.now()
-                ))
-
-                # Check if batch is ready
-                if len(self._batch_queue[session_id]) >= self.batch_size:
-                    self._flush_batch(session_id)
-                else:
-                    # Schedule batch flush if not already scheduled
-                    if self._batch_timer is None or not self._batch_timer.is_alive():
-                        self._batch_timer = threading.Timer(
-                            self.batch_timeout_ms / 1000.0,
-                            lambda: self._flush_all_batches()
-                        )
-                        self._batch_timer.start()
+        logger.debug("Widgets added to batch", count=len(items))
 
-            logger.debug(
-                "Widget added to batch",
-                session_id=session_id,
-                widget_key=widget_key)
-        except Exception as e:
-            logger.error(
-                "Widget save failed",
-                session_id=session_id,
-                widget_key=widget_key,
-                error=str(e))
-        finally:
-            with self._save_lock:
-                self._pending_saves[session_id].pop(widget_key, None)
+    def _flush_batch_timeout(self, _items: list) -> None:
+        """Batch timeout callback"""
+        self._flush_all_batches()
 
     def _flush_batch(self, session_id: str) -> None:
         """Flush batch for specific session"""
         with self._batch_lock:
-            batch = self._batch_queue.pop(session_id, [])
+            batch = self._batch_queue.pop(session_id, None)
 
-            if not batch:
-                return
-
-            try:
-                self._save_batch(session_id, batch)
-                logger.info(
-                    "Widget batch saved",
-                    session_id=session_id,
-                    count=len(batch)
-                )
-            except Exception as e:
-                logger.error(
-                    "Widget batch save failed",
-                    session_id=session_id,
-                    count=len(batch),
-                    error=str(e)
-                )
+        if batch:
+            self._write_batches({session_id: batch})
 
     def _flush_all_batches(self) -> None:
-        """Flush all pending batches"""
+        """Flush all pending batches in one transaction"""
+        self._scheduler.cancel((self, "batch"))
         with self._batch_lock:
-            session_ids = list(self._batch_queue.keys())
+            batches = {sid: batch for sid, batch in self._batch_queue.items()
+                       if batch}
+            self._batch_queue.clear()
 
-        for session_id in session_ids:
-            self._flush_batch(session_id)
+        if batches:
+            self._write_batches(batches)
 
-    def _save_batch(self, session_id: str,
-                    batch: list[tuple[str, dict, datetime]]) -> None:
-        """Save batch of widget states to database"""
-        with self.db_manager.session_scope() as db_session:
-            for widget_key, save_data, timestamp in batch:
-                # Check if widget state exists
-                existing = db_session.query(WidgetStateModel).filter(
-                    WidgetStateModel.session_id == session_id,
-                    WidgetStateModel.widget_key == widget_key
-                ).first()
+    def _write_batches(
+            self,
+            batches: dict[str, dict[str, tuple[dict, datetime]]]) -> None:
+        """Write batches and log the outcome"""
+        count = sum(len(batch) for batch in batches.values())
+        try:
+            self._save_batches(batches)
+            logger.info(
+                "Widget batch saved",
+                sessions=len(batches),
+                count=count
+            )
+        except Exception as e:
+            logger.error(
+                "Widget batch save failed",
+                sessions=len(batches),
+                count=count,
+                error=str(e)
+            )
 
-                # Serialize value
-                try:
-                    value_json = json.dumps(
-                        save_data['widget_value'], default=str)
-                except (TypeError, ValueError):
-                    value_json = str(save_data['widget_value'])
-
-                # Serialize errors and warnings
-                errors_json = json.dumps(save_data['errors'])
-                warnings_json = json.dumps(save_data['warnings'])
-
-                if existing:
-                    # Update existing
-                    existing.widget_value = value_json
-                    existing.widget_type = save_data.get('widget_type')
-                    existing.is_valid = 1 if save_data['is_valid'] else 0
-                    existing.errors = errors_json
-                    existing.warnings = warnings_json
-                    existing.updated_at = datetime.utcnow()
-                    existing.version += 1
-                else:
-                    # Create new
-                    new_state = WidgetStateModel(
-                        session_id=session_id,
-                        widget_key=widget_key,
-                        widget_value=value_json,
-                        widget_type=save_data.get('widget_type'),
-                        is_valid=1 if save_data['is_valid'] else 0,
-                        errors=errors_json,
-                        warnings=warnings_json,
-                        created_at=datetime.utcnow(),
-                        updated_at=datetime.utcnow(),
-                        version=1
+    def _save_batches(
+            self,
+            batches: dict[str, dict[str, tuple[dict, datetime]]]) -> None:
+        """Save widget states of several sessions in one transaction"""
+        with self.db_manager.session_scope() as db_session:
+            for session_id, batch in batches.items():
+                # Load existing widget states of the session with one query
+                existing_states = {
+                    state.widget_key: state
+                    for state in db_session.query(WidgetStateModel).filter(
+                        WidgetStateModel.session_id == session_id,
+                        WidgetStateModel.widget_key.in_(list(batch))
                     )
-                    db_session.add(new_state)
+                }
+
+                for widget_key, (save_data, timestamp) in batch.items():
+                    existing = existing_states.get(widget_key)
+
+                    # Serialize value
+                    try:
+                        value_json = json.dumps(
+                            save_data['widget_value'], default=str)
+                    except (TypeError, ValueError):
+                        value_json = str(save_data['widget_value'])
+
+                    # Serialize errors and warnings
+                    errors_json = json.dumps(save_data['errors'])
+                    warnings_json = json.dumps(save_data['warnings'])
+
+                    if existing:
+                        # Update existing
+                        existing.widget_value = value_json
+                        existing.widget_type = save_data.get('widget_type')
+                        existing.is_valid = 1 if save_data['is_valid'] else 0
+                        existing.errors = errors_json
+                        existing.warnings = warnings_json
+                        existing.updated_at = datetime.utcnow()
+                        existing.version += 1
+                    else:
+                        # Create new
+                        new_state = WidgetStateModel(
+                            session_id=session_id,
+                            widget_key=widget_key,
+                            widget_value=value_json,
+                            widget_type=save_data.get('widget_type'),
+                            is_valid=1 if save_data['is_valid'] else 0,
+                            errors=errors_json,
+                            warnings=warnings_json,
+                            created_at=datetime.utcnow(),
+                            updated_at=datetime.utcnow(),
+                            version=1
+                        )
+                        db_session.add(new_state)
 
     def flush(self, session_id: str = None, widget_key: str = None) -> None:
         """
@@ -268,33 +277,35 @@ class WidgetPersistenceEngine:
             widget_key: Optional widget key to flush (all if None)
         """
         if session_id and widget_key:
-            # Flush specific widget
-            with self._save_lock:
-                if widget_key in self._pending_saves.get(session_id, {}):
-                    save_data, timer = self._pending_saves[session_id][widget_key]
-                    timer.cancel()
-                    self._execute_save(session_id, widget_key, save_data)
+            # Move specific widget into the batch queue
+            self._scheduler.flush([self._widget_key(session_id, widget_key)])
         elif session_id:
             # Flush all widgets for session
-            with self._save_lock:
-                widgets = list(self._pending_saves.get(session_id, {}).keys())
-
-            for widget_key in widgets:
-                self.flush(session_id, widget_key)
+            self._scheduler.flush(self._scheduler.pending_keys(
+                lambda key: self._is_own_widget_key(key)
+                and key[2] == session_id))
 
             # Flush batch
             self._flush_batch(session_id)
         else:
             # Flush all
-            with self._save_lock:
-                session_ids = list(self._pending_saves.keys())
-
-            for sid in session_ids:
-                self.flush(sid)
+            self._scheduler.flush(
+                self._scheduler.pending_keys(self._is_own_widget_key))
 
             # Flush all batches
             self._flush_all_batches()
 
+    def get_metrics(self) -> dict[str, Any]:
+        """Get persistence metrics (scheduler-wide plus own queues)"""
+        with self._batch_lock:
+            batched = sum(len(batch) for batch in self._batch_queue.values())
+        return {
+            "pending_widget_saves": len(
+                self._scheduler.pending_keys(self._is_own_widget_key)),
+            "batched_widget_states": batched,
+            "scheduler": self._scheduler.get_metrics()
+        }
+
     def recover_widget_states(
         self,
         session_id: str,
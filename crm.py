@@ -10,6 +10,8 @@ from typing import Any
 import pandas as pd
 import streamlit as st
 
+from db_pool import run_schema_init_once
+
 try:
     from database import get_db_connection as real_get_db_connection
     if not callable(real_get_db_connection):
@@ -334,8 +336,9 @@ def render_crm(
                 "Datenbankverbindung nicht verfügbar. CRM-Funktionen eingeschränkt."))
         return
 
-    # Erstellt die Tabellen (inkl. neuer Spalten) oder fügt Spalten hinzu
-    create_tables_crm(conn)
+    # Erstellt die Tabellen (inkl. neuer Spalten) oder fügt Spalten hinzu;
+    # pro Datenbankdatei nur beim ersten Rendern
+    run_schema_init_once(conn, "crm", create_tables_crm)
 
     view_mode = st.session_state.get('crm_view_mode', 'customer_list')
     selected_customer_id = st.session_state.get('selected_customer_id', None)
@@ -2,10 +2,14 @@
 import json
 import os
 import sqlite3
+import threading
 import traceback
 from datetime import datetime
 from typing import Any
 
+from db_pool import get_connection as get_pooled_connection
+from db_pool import reset_connection_pool, run_schema_init_once
+
 DB_SCHEMA_VERSION = 14
 # print(
 #     f"DATABASE.PY TOP LEVEL: DB_SCHEMA_VERSION ist auf {DB_SCHEMA_VERSION} gesetzt.")
@@ -41,12 +45,8 @@ def get_db_connection() -> sqlite3.Connection | None:
     Ständen fehlen. Hiermit wird die Produkt-CRUD wieder funktionsfähig.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        try:
-            conn.row_factory = sqlite3.Row  # komfortabler Zugriff per Spaltenname
-        except Exception:
-            pass
-        return conn
+        # Verbindung aus dem Thread-Pool; conn.close() gibt sie zurück
+        return get_pooled_connection(DB_PATH, row_factory=sqlite3.Row)
     except Exception as e:
         print(f"DB: get_db_connection fehlgeschlagen: {e}")
         return None
@@ -346,9 +346,9 @@ def get_db_connection() -> sqlite3.Connection | None:
     try:
         if not os.path.exists(DATA_DIR):
             os.makedirs(DATA_DIR)
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
+        # Verbindung aus dem Thread-Pool (WAL, getunte PRAGMAs); conn.close()
+        # gibt sie an den Pool zurück
+        return get_pooled_connection(DB_PATH, row_factory=sqlite3.Row)
     except sqlite3.Error as e:
         print(f"FATAL DB Error: {e}")
         traceback.print_exc()
@@ -376,11 +376,27 @@ def get_pdf_template_by_name(
             conn.close()
 
 
+def _read_settings_version(conn: sqlite3.Connection) -> int:
+    try:
+        row = conn.execute(
+            "SELECT version FROM admin_settings_version WHERE id = 1").fetchone()
+        return int(row[0]) if row else 0
+    except sqlite3.Error:
+        return 0
+
+
 def backup_database(backup_path: str) -> bool:
+    # Im WAL-Modus liegen committete Seiten ggf. noch in der -wal-Datei, daher
+    # Online-Backup-API statt Dateikopie
     try:
-        import shutil
         if os.path.exists(DB_PATH):
-            shutil.copy2(DB_PATH, backup_path)
+            src = get_db_connection()
+            dst = sqlite3.connect(backup_path)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+                src.close()
             print(f"DB: Backup erfolgreich erstellt: {backup_path}")
             return True
         print(f"DB: Quelldatei {DB_PATH} existiert nicht für Backup.")
@@ -392,9 +408,23 @@ def backup_database(backup_path: str) -> bool:
 
 def restore_database(backup_path: str) -> bool:
     try:
-        import shutil
         if os.path.exists(backup_path):
-            shutil.copy2(backup_path, DB_PATH)
+            invalidate_admin_settings_cache(close=True)
+            dst = get_db_connection()
+            src = sqlite3.connect(backup_path)
+            try:
+                old_version = _read_settings_version(dst)
+                src.backup(dst)
+                # Versionszähler weiterzählen, damit andere Prozesse neu laden
+                _ensure_settings_version(dst)
+                dst.execute(
+                    "UPDATE admin_settings_version SET version = ? WHERE id = 1",
+                    (max(old_version, _read_settings_version(dst)) + 1,))
+                dst.commit()
+            finally:
+                src.close()
+                dst.close()
+            reset_connection_pool()
             print(f"DB: Wiederherstellung erfolgreich von: {backup_path}")
             return True
         print(f"DB: Backup-Datei {backup_path} existiert nicht.")
@@ -849,7 +879,12 @@ def reset_database() -> bool:
     try:
         # Datenbankdatei löschen
         if os.path.exists(DB_PATH):
+            invalidate_admin_settings_cache(close=True)
+            reset_connection_pool()
             os.remove(DB_PATH)
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(DB_PATH + suffix):
+                    os.remove(DB_PATH + suffix)
             print(f"DB: Datenbankdatei {DB_PATH} gelöscht")
 
         # Company Documents Verzeichnis löschen
@@ -1257,44 +1292,209 @@ def init_db():
             conn.close()
 
 
+# --- Admin-Settings-Snapshot ---
+# Alle Einstellungen werden mit einer Abfrage geladen und dekodiert im Speicher
+# gehalten. Trigger auf admin_settings erhöhen bei jeder Änderung (auch aus
+# anderen Prozessen oder Skripten mit direktem SQL) den Zähler in
+# admin_settings_version; pro Zugriff wird nur dieser Zähler gelesen.
+
+_MISSING = object()
+
+
+def _ensure_settings_version(conn: sqlite3.Connection) -> None:
+    """Legt Versionszeile und Trigger für admin_settings an (idempotent)."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS admin_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            last_modified TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS admin_settings_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        );
+    """)
+    cursor.execute(
+        "INSERT OR IGNORE INTO admin_settings_version (id, version) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_admin_settings_version_{event.lower()}
+            AFTER {event} ON admin_settings
+            BEGIN
+                UPDATE admin_settings_version SET version = version + 1 WHERE id = 1;
+            END;
+        """)
+    conn.commit()
+
+
+def _decode_admin_setting(key: str, value_str: Any) -> Any:
+    """Dekodiert einen gespeicherten Wert; _MISSING bedeutet 'Default verwenden'."""
+    if value_str is None:
+        return None if key == 'active_company_id' else _MISSING
+    if isinstance(value_str, str) and value_str.strip().startswith(
+            ('[', '{')) and value_str.strip().endswith((']', '}')):
+        try:
+            return json.loads(value_str)
+        except json.JSONDecodeError:
+            pass
+    if key in INITIAL_ADMIN_SETTINGS and isinstance(
+            INITIAL_ADMIN_SETTINGS.get(key), bool):
+        try:
+            return bool(int(value_str))
+        except BaseException:
+            pass
+    if key == 'active_company_id':
+        try:
+            return int(value_str)
+        except BaseException:
+            return _MISSING
+    return value_str
+
+
+def _copy_json(value: Any) -> Any:
+    """Schnelle Tiefenkopie JSON-dekodierter Werte (nur dict/list sind veränderbar)."""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+class AdminSettingsSnapshot:
+    """Prozessweiter Snapshot der Tabelle admin_settings.
+
+    Hält eine eigene, thread-übergreifend genutzte Verbindung zu ``DB_PATH``
+    (wird bei geändertem Pfad oder ersetzter Datei neu geöffnet) und lädt alle
+    Einstellungen neu, sobald sich der Versionszähler geändert hat.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._conn_key: tuple | None = None
+        self._version: int | None = None
+        self._raw: dict[str, Any] = {}
+        self._decoded: dict[str, Any] = {}
+        self._stats = {"hits": 0, "reloads": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        try:
+            st = os.stat(DB_PATH)
+            conn_key = (DB_PATH, st.st_dev, st.st_ino)
+        except OSError:
+            conn_key = (DB_PATH, None, None)
+        if self._conn is None or self._conn_key != conn_key:
+            self._close()
+            os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+            conn = sqlite3.connect(
+                DB_PATH, check_same_thread=False, isolation_level=None)
+            try:
+                _ensure_settings_version(conn)
+            except Exception:
+                conn.close()
+                raise
+            self._conn, self._conn_key = conn, conn_key
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+        self._conn_key = None
+        self._version = None
+
+    def _refresh(self) -> None:
+        conn = self._connection()
+        version = conn.execute(
+            "SELECT version FROM admin_settings_version WHERE id = 1").fetchone()[0]
+        if version == self._version:
+            return
+        # Lesetransaktion, damit Version und Werte zusammenpassen
+        conn.execute("BEGIN")
+        try:
+            version = conn.execute(
+                "SELECT version FROM admin_settings_version WHERE id = 1").fetchone()[0]
+            rows = conn.execute("SELECT key, value FROM admin_settings").fetchall()
+        finally:
+            conn.execute("COMMIT")
+        self._raw = dict(rows)
+        self._decoded = {}
+        self._version = version
+        self._stats["reloads"] += 1
+
+    def get(self, key: str) -> Any:
+        """Dekodierter Wert oder _MISSING (Schlüssel fehlt / Default verwenden)."""
+        with self._lock:
+            try:
+                self._refresh()
+            except sqlite3.Error as e:
+                print(f"DB Fehler load_admin_setting '{key}': {e}")
+                self._close()
+                return _MISSING
+            if key in self._decoded:
+                self._stats["hits"] += 1
+                value = self._decoded[key]
+            elif key in self._raw:
+                value = _decode_admin_setting(key, self._raw[key])
+                self._decoded[key] = value
+            else:
+                return _MISSING
+        # Aufrufer dürfen das Ergebnis verändern, ohne den Snapshot zu berühren
+        return _copy_json(value)
+
+    def version(self) -> int | None:
+        """Aktueller Versionszähler (lädt bei Änderung neu), None bei DB-Fehlern."""
+        with self._lock:
+            try:
+                self._refresh()
+            except sqlite3.Error as e:
+                print(f"DB Fehler admin_settings_version: {e}")
+                self._close()
+                return None
+            return self._version
+
+    def invalidate(self, close: bool = False) -> None:
+        with self._lock:
+            self._version = None
+            self._raw = {}
+            self._decoded = {}
+            if close:
+                self._close()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["version"] = self._version
+            stats["entries"] = len(self._raw)
+        return stats
+
+
+_admin_settings_snapshot = AdminSettingsSnapshot()
+
+
+def invalidate_admin_settings_cache(close: bool = False) -> None:
+    """Verwirft den Snapshot; ``close=True`` schließt auch dessen Verbindung."""
+    _admin_settings_snapshot.invalidate(close=close)
+
+
+def get_admin_settings_cache_stats() -> dict[str, Any]:
+    return _admin_settings_snapshot.get_stats()
+
+
+def get_admin_settings_version() -> int | None:
+    """Ändert sich bei jedem Schreibzugriff auf admin_settings (auch extern)."""
+    return _admin_settings_snapshot.version()
+
+
 def load_admin_setting(key: str, default: Any = None) -> Any:
-    conn = get_db_connection()
-    if conn is None:
-        return default
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT value FROM admin_settings WHERE key = ?", (key,))
-        row = cursor.fetchone()
-        if row and row['value'] is not None:
-            value_str = row['value']
-            if isinstance(value_str, str) and value_str.strip().startswith(
-                    ('[', '{')) and value_str.strip().endswith((']', '}')):
-                try:
-                    return json.loads(value_str)
-                except json.JSONDecodeError:
-                    pass
-            if key in INITIAL_ADMIN_SETTINGS and isinstance(
-                    INITIAL_ADMIN_SETTINGS.get(key), bool):
-                try:
-                    return bool(int(value_str))
-                except BaseException:
-                    pass
-            if key == 'active_company_id':
-                try:
-                    return int(value_str) if value_str is not None else None
-                except BaseException:
-                    return default
-            return value_str
-        if key == 'active_company_id' and row and row['value'] is None:
-            return None
-        return default
-    except Exception as e:
-        print(f"DB Fehler load_admin_setting '{key}': {e}")
-        return default
-    finally:
-        if conn:
-            conn.close()
+    value = _admin_settings_snapshot.get(key)
+    return default if value is _MISSING else value
 
 
 def save_admin_setting(key: str, value: Any) -> bool:
@@ -1335,6 +1535,7 @@ def save_admin_setting(key: str, value: Any) -> bool:
                 params_for_sql[1] is None}")
         cursor.execute(sql_query, params_for_sql)
         conn.commit()
+        invalidate_admin_settings_cache()
         print(
             f"DB ERFOLG: save_admin_setting - Einstellung '{key}' erfolgreich gespeichert.")
         return True
@@ -2279,29 +2480,34 @@ def get_company_documents(company_id: int, doc_type: str |
     return list_company_documents(company_id, doc_type)
 
 
+def _create_crm_customers_table(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS crm_customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT,
+            last_name TEXT,
+            email TEXT,
+            phone TEXT,
+            address TEXT,
+            status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            notes TEXT,
+            project_data TEXT
+        )
+    ''')
+    conn.commit()
+
+
 def get_all_active_customers() -> list[dict[str, Any]]:
     """Gibt alle aktiven Kunden aus der CRM-Datenbank zurück"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_db_connection()
+        if not conn:
+            return []
+        run_schema_init_once(conn, "crm_customers", _create_crm_customers_table)
         cursor = conn.cursor()
 
-        # Versuche zuerst die Tabelle zu erstellen falls sie nicht existiert
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crm_customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT,
-                last_name TEXT,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                project_data TEXT
-            )
-        ''')
-
         cursor.execute('''
             SELECT id, first_name, last_name, email, phone, address, status,
                    created_at, updated_at, notes, project_data
@@ -2340,26 +2546,12 @@ def get_all_active_customers() -> list[dict[str, Any]]:
 def create_customer(customer_data: dict[str, Any]) -> bool:
     """Erstellt einen neuen Kunden in der CRM-Datenbank"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_db_connection()
+        if not conn:
+            return False
+        run_schema_init_once(conn, "crm_customers", _create_crm_customers_table)
         cursor = conn.cursor()
 
-        # Tabelle erstellen falls sie nicht existiert
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crm_customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT,
-                last_name TEXT,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                project_data TEXT
-            )
-        ''')
-
         cursor.execute('''
             INSERT INTO crm_customers (first_name, last_name, email, phone, address, notes, project_data)
             VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -2438,26 +2630,12 @@ def update_customer(customer_id: int, customer_data: dict[str, Any]) -> bool:
 def get_customer_by_id(customer_id: int) -> dict[str, Any] | None:
     """Gibt einen spezifischen Kunden basierend auf der ID zurück"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = get_db_connection()
+        if not conn:
+            return None
+        run_schema_init_once(conn, "crm_customers", _create_crm_customers_table)
         cursor = conn.cursor()
 
-        # Versuche zuerst die Tabelle zu erstellen falls sie nicht existiert
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS crm_customers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name TEXT,
-                last_name TEXT,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                notes TEXT,
-                project_data TEXT
-            )
-        ''')
-
         cursor.execute('''
             SELECT id, first_name, last_name, email, phone, address, status,
                    created_at, updated_at, notes, project_data
@@ -0,0 +1,218 @@
+# db_pool.py
+# Gemeinsamer SQLite-Verbindungspool für database.py, product_db.py, crm.py
+# und brand_logo_db.py
+"""
+Thread-lokaler Pool für SQLite-Verbindungen.
+
+Die Module öffnen pro Funktionsaufruf eine Verbindung und schließen sie am
+Ende wieder (``conn = get_db_connection() ... conn.close()``). Dieses Muster
+bleibt erhalten: :func:`get_connection` liefert eine :class:`PooledConnection`,
+deren ``close()`` die Verbindung nicht schließt, sondern offene Transaktionen
+zurückrollt und sie in den Leerlauf-Pool des aufrufenden Threads zurücklegt.
+
+Neue Verbindungen laufen im WAL-Modus mit ``synchronous=NORMAL``, größerem
+Page-Cache und Memory-Mapping. Schema-Initialisierungen (``CREATE TABLE IF NOT
+EXISTS`` + Spalten-Migrationen) werden über :func:`run_schema_init_once` nur
+einmal pro Datenbankdatei und Prozess ausgeführt.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import sqlite3
+import threading
+from collections.abc import Callable
+from typing import Any
+
+MAX_IDLE_PER_THREAD = 4
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 16 * 1024
+MMAP_SIZE_BYTES = 128 * 1024 * 1024
+
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA cache_size=-{CACHE_SIZE_KIB}",
+    f"PRAGMA mmap_size={MMAP_SIZE_BYTES}",
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3-Verbindung, deren ``close()`` sie an den Pool zurückgibt."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._pool: SQLiteConnectionPool | None = None
+        self._pool_key: tuple | None = None
+        self._idle = False
+
+    def close(self) -> None:
+        pool = self._pool
+        if pool is None:
+            super().close()
+        else:
+            pool._release(self)
+
+    def discard(self) -> None:
+        """Schließt die Verbindung endgültig (ohne Rückgabe an den Pool)."""
+        self._pool = None
+        with contextlib.suppress(sqlite3.Error):
+            super().close()
+
+
+def _file_identity(db_path: str) -> tuple:
+    try:
+        st = os.stat(db_path)
+        return (st.st_dev, st.st_ino)
+    except OSError:
+        return (None, None)
+
+
+class SQLiteConnectionPool:
+    """Leerlauf-Verbindungen je Thread und Datenbankpfad.
+
+    Verbindungen werden nicht zwischen Threads geteilt (``check_same_thread``
+    bleibt aktiv). Ersetzte oder gelöschte Datenbankdateien sowie
+    :meth:`reset` führen dazu, dass Leerlauf-Verbindungen verworfen werden.
+    """
+
+    def __init__(self, max_idle_per_thread: int = MAX_IDLE_PER_THREAD):
+        self.max_idle_per_thread = max_idle_per_thread
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._schema_done: set[tuple] = set()
+        self._stats = {"created": 0, "reused": 0, "discarded": 0}
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _idle_list(self, db_path: str) -> list[PooledConnection]:
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = self._local.idle = {}
+        return idle.setdefault(db_path, [])
+
+    def _open(self, db_path: str, pool_key: tuple) -> PooledConnection:
+        conn = sqlite3.connect(db_path, factory=PooledConnection)
+        for pragma in _CONNECTION_PRAGMAS:
+            # z.B. WAL auf Netzlaufwerken nicht verfügbar
+            with contextlib.suppress(sqlite3.Error):
+                conn.execute(pragma)
+        # Identität erst nach dem Öffnen (die Datei kann neu angelegt worden sein)
+        conn._pool_key = (db_path, _file_identity(db_path), pool_key[2])
+        conn._pool = self
+        self._count("created")
+        return conn
+
+    def connect(
+        self, db_path: str, row_factory: Any = sqlite3.Row
+    ) -> sqlite3.Connection:
+        """Leerlauf-Verbindung des Threads oder eine neue Verbindung."""
+        if db_path == ":memory:":
+            conn = sqlite3.connect(db_path)
+            conn.row_factory = row_factory
+            return conn
+
+        pool_key = (db_path, _file_identity(db_path), self._generation)
+        idle = self._idle_list(db_path)
+        conn = None
+        while idle:
+            candidate = idle.pop()
+            if candidate._pool_key == pool_key:
+                conn = candidate
+                self._count("reused")
+                break
+            candidate.discard()
+            self._count("discarded")
+        if conn is None:
+            conn = self._open(db_path, pool_key)
+        conn._idle = False
+        conn.row_factory = row_factory
+        return conn
+
+    def _release(self, conn: PooledConnection) -> None:
+        if conn._idle:
+            return  # doppeltes close()
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+            conn.text_factory = str
+            conn.isolation_level = ""
+        except sqlite3.Error:
+            conn.discard()
+            self._count("discarded")
+            return
+        db_path = conn._pool_key[0]
+        idle = self._idle_list(db_path)
+        if conn._pool_key[2] != self._generation or len(idle) >= self.max_idle_per_thread:
+            conn.discard()
+            self._count("discarded")
+            return
+        conn._idle = True
+        idle.append(conn)
+
+    def run_schema_init_once(
+        self, conn: sqlite3.Connection, name: str,
+        init: Callable[[sqlite3.Connection], Any],
+    ) -> None:
+        """Führt ``init(conn)`` einmal pro Datenbankdatei und ``name`` aus.
+
+        Für Verbindungen, die nicht aus dem Pool stammen, wird ``init`` bei
+        jedem Aufruf ausgeführt (bisheriges Verhalten).
+        """
+        pool_key = getattr(conn, "_pool_key", None)
+        if pool_key is None:
+            init(conn)
+            return
+        token = (pool_key, name)
+        with self._lock:
+            if token in self._schema_done:
+                return
+        init(conn)
+        with self._lock:
+            self._schema_done.add(token)
+
+    def reset(self) -> None:
+        """Verwirft alle Leerlauf-Verbindungen (auch anderer Threads, beim
+        nächsten Zugriff) und den Status der Schema-Initialisierung."""
+        with self._lock:
+            self._generation += 1
+            self._schema_done.clear()
+        for conns in getattr(self._local, "idle", {}).values():
+            while conns:
+                conns.pop().discard()
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["generation"] = self._generation
+        stats["idle_in_thread"] = sum(
+            len(c) for c in getattr(self._local, "idle", {}).values())
+        return stats
+
+
+_pool = SQLiteConnectionPool()
+
+
+def get_connection(db_path: str, row_factory: Any = sqlite3.Row) -> sqlite3.Connection:
+    return _pool.connect(db_path, row_factory=row_factory)
+
+
+def run_schema_init_once(
+    conn: sqlite3.Connection, name: str, init: Callable[[sqlite3.Connection], Any]
+) -> None:
+    _pool.run_schema_init_once(conn, name, init)
+
+
+def reset_connection_pool() -> None:
+    _pool.reset()
+
+
+def get_connection_pool_stats() -> dict[str, int]:
+    return _pool.get_stats()
@@ -2595,7 +2595,12 @@ def main():
                                             modifier_pct=base_modifier,
                                             progression_pct=progression,
                                             pdf_options=pdf_options,
-                                            additional_pdf=None
+                                            additional_pdf=None,
+                                            parallel=bool(
+                                                database_module is not None
+                                                and database_module.load_admin_setting(
+                                                    'multi_offer_parallel_generation', False)
+                                            )
                                         )
                                         
                                         if not results:
@@ -0,0 +1,340 @@
+"""
+Stündliche Eigenverbrauchs- und Speichersimulation (8760 h)
+==========================================================
+
+Vektorisierte Jahressimulation für ``perform_calculations``:
+- Standardlastprofile (H0 Haushalt, G0 Gewerbe) als stündliche Näherung
+  der BDEW-Profile inkl. H0-Dynamisierung
+- Stündliche PV-Erzeugung aus PVGIS-Zeitreihen oder synthetisch aus
+  Monatssummen (Sonnenstandsgeometrie)
+- Speicher-Ladezustand (SOC) ohne Python-Schleife über eine parallele
+  Präfix-Verknüpfung geklemmter Additionen (log2(8760) NumPy-Schritte)
+
+Alle Monatswerte werden aus den Stundenwerten aggregiert, sodass die
+bestehenden Ergebnis-Keys unverändert befüllt werden können.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import numpy as np
+
+HOURS_PER_YEAR = 8760
+DAYS_PER_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Stundenindex -> Monat (0..11) und Tag im Jahr (0..364), einmalig berechnet
+HOUR_TO_MONTH = np.repeat(
+    np.arange(12), np.asarray(DAYS_PER_MONTH) * 24
+)
+HOUR_TO_DAY = np.repeat(np.arange(365), 24)
+HOUR_OF_DAY = np.tile(np.arange(24), 365)
+
+# Stündliche Tagesgänge (relative Leistung) je Profil, Tagtyp und Saison.
+# Vereinfachte Näherung der BDEW-Viertelstundenprofile (Mittel je Stunde).
+_PROFILE_SHAPES: dict[str, dict[str, tuple[float, ...]]] = {
+    "H0": {
+        "werktag": (
+            0.55, 0.45, 0.40, 0.38, 0.38, 0.42, 0.60, 0.85, 0.95, 0.90, 0.88, 0.92,
+            1.05, 1.05, 0.95, 0.88, 0.90, 1.05, 1.30, 1.45, 1.40, 1.25, 1.05, 0.78,
+        ),
+        "samstag": (
+            0.62, 0.50, 0.44, 0.40, 0.40, 0.42, 0.50, 0.68, 0.90, 1.05, 1.12, 1.18,
+            1.25, 1.20, 1.05, 0.98, 1.00, 1.12, 1.30, 1.40, 1.35, 1.22, 1.05, 0.82,
+        ),
+        "sonntag": (
+            0.65, 0.52, 0.45, 0.40, 0.39, 0.40, 0.44, 0.55, 0.78, 1.00, 1.15, 1.30,
+            1.42, 1.30, 1.10, 1.00, 1.00, 1.10, 1.28, 1.38, 1.32, 1.18, 1.00, 0.80,
+        ),
+    },
+    "G0": {
+        "werktag": (
+            0.35, 0.33, 0.32, 0.32, 0.33, 0.40, 0.70, 1.15, 1.50, 1.65, 1.70, 1.70,
+            1.55, 1.55, 1.60, 1.55, 1.40, 1.15, 0.85, 0.65, 0.52, 0.45, 0.40, 0.37,
+        ),
+        "samstag": (
+            0.35, 0.33, 0.32, 0.32, 0.32, 0.35, 0.45, 0.65, 0.90, 1.05, 1.10, 1.10,
+            1.00, 0.85, 0.70, 0.60, 0.55, 0.50, 0.47, 0.44, 0.42, 0.40, 0.38, 0.36,
+        ),
+        "sonntag": (
+            0.33, 0.32, 0.31, 0.31, 0.31, 0.32, 0.33, 0.35, 0.37, 0.38, 0.39, 0.40,
+            0.40, 0.39, 0.38, 0.38, 0.38, 0.39, 0.40, 0.40, 0.39, 0.37, 0.35, 0.34,
+        ),
+    },
+}
+
+# Saisonfaktoren je Monat (Winter höher, Sommer niedriger)
+_SEASON_FACTORS: dict[str, tuple[float, ...]] = {
+    "H0": (1.18, 1.12, 1.04, 0.96, 0.90, 0.86, 0.86, 0.88, 0.93, 1.01, 1.10, 1.18),
+    "G0": (1.10, 1.07, 1.02, 0.98, 0.95, 0.92, 0.92, 0.93, 0.96, 1.00, 1.06, 1.10),
+}
+
+SUPPORTED_LOAD_PROFILES = tuple(_PROFILE_SHAPES.keys())
+
+
+def _h0_dynamization_factors() -> np.ndarray:
+    """BDEW-Dynamisierungsfunktion für H0 (Tag 1..365)."""
+    d = np.arange(1, 366, dtype=float)
+    return (
+        -3.92e-10 * d**4 + 3.2e-7 * d**3 - 7.02e-5 * d**2 + 2.1e-3 * d + 1.24
+    )
+
+
+def build_load_profile(
+    annual_consumption_kwh: float,
+    profile_type: str = "H0",
+    first_weekday: int = 0,
+) -> np.ndarray:
+    """
+    Erzeugt ein stündliches Lastprofil (8760 Werte in kWh), normiert auf den
+    Jahresverbrauch.
+
+    Args:
+        annual_consumption_kwh: Jahresverbrauch in kWh
+        profile_type: ``"H0"`` (Haushalt) oder ``"G0"`` (Gewerbe)
+        first_weekday: Wochentag des 1. Januar (0 = Montag)
+    """
+    profile_key = str(profile_type or "H0").upper()
+    if profile_key not in _PROFILE_SHAPES:
+        profile_key = "H0"
+    if annual_consumption_kwh <= 0:
+        return np.zeros(HOURS_PER_YEAR)
+
+    shapes = _PROFILE_SHAPES[profile_key]
+    weekday_of_day = (np.arange(365) + int(first_weekday)) % 7
+    # 0 = Werktag, 1 = Samstag, 2 = Sonntag
+    day_type = np.where(weekday_of_day == 6, 2, np.where(weekday_of_day == 5, 1, 0))
+    shape_matrix = np.array(
+        [shapes["werktag"], shapes["samstag"], shapes["sonntag"]], dtype=float
+    )
+
+    hourly = shape_matrix[day_type[HOUR_TO_DAY], HOUR_OF_DAY]
+    hourly = hourly * np.asarray(_SEASON_FACTORS[profile_key])[HOUR_TO_MONTH]
+    if profile_key == "H0":
+        hourly = hourly * _h0_dynamization_factors()[HOUR_TO_DAY]
+
+    return hourly * (annual_consumption_kwh / hourly.sum())
+
+
+def synthesize_hourly_pv(
+    monthly_production_kwh: list[float] | np.ndarray,
+    latitude: float = 51.0,
+) -> np.ndarray:
+    """
+    Verteilt Monatserträge über einen Sonnenstands-Tagesgang auf 8760 Stunden.
+
+    Wird verwendet, wenn keine PVGIS-Stundenreihe vorliegt (manuelle
+    Ertragsberechnung). Die Monatssummen bleiben exakt erhalten.
+    """
+    monthly = np.asarray(monthly_production_kwh, dtype=float)
+    if monthly.shape != (12,):
+        raise ValueError("monthly_production_kwh muss 12 Werte enthalten")
+
+    lat_rad = math.radians(latitude)
+    day_of_year = HOUR_TO_DAY + 1
+    declination = np.radians(23.45) * np.sin(2 * np.pi * (284 + day_of_year) / 365)
+    hour_angle = np.radians(15.0 * (HOUR_OF_DAY + 0.5 - 12.0))
+    sin_elevation = (
+        math.sin(lat_rad) * np.sin(declination)
+        + math.cos(lat_rad) * np.cos(declination) * np.cos(hour_angle)
+    )
+    shape = np.clip(sin_elevation, 0.0, None) ** 1.2
+
+    month_sums = np.bincount(HOUR_TO_MONTH, weights=shape, minlength=12)
+    scale = np.divide(
+        monthly, month_sums, out=np.zeros(12), where=month_sums > 0
+    )
+    return shape * scale[HOUR_TO_MONTH]
+
+
+def fold_hourly_series(values: list[float] | np.ndarray) -> np.ndarray:
+    """
+    Bringt eine Stundenreihe auf genau 8760 Werte (Schaltjahr: 29. Februar
+    wird entfernt, kürzere Reihen werden mit 0 aufgefüllt).
+    """
+    arr = np.asarray(values, dtype=float)
+    if arr.size == 8784:
+        feb29_start = (31 + 28) * 24
+        arr = np.concatenate([arr[:feb29_start], arr[feb29_start + 24:]])
+    if arr.size >= HOURS_PER_YEAR:
+        return arr[:HOURS_PER_YEAR]
+    return np.pad(arr, (0, HOURS_PER_YEAR - arr.size))
+
+
+def clamped_cumsum(
+    delta: np.ndarray,
+    lower: float,
+    upper: float,
+    initial: float = 0.0,
+) -> np.ndarray:
+    """
+    Berechnet ``x[t] = min(upper, max(lower, x[t-1] + delta[t]))`` ohne
+    Python-Schleife.
+
+    Jeder Schritt ist eine Funktion ``f(x) = min(hi, max(lo, x + a))``; die
+    Verkettung zweier solcher Funktionen hat wieder diese Form. Damit lässt
+    sich die Rekursion als inklusiver Präfix-Scan (Hillis-Steele) in
+    ``ceil(log2(n))`` vektorisierten Schritten auswerten.
+    """
+    a = np.asarray(delta, dtype=float).copy()
+    n = a.size
+    if n == 0:
+        return a
+    lo = np.full(n, float(lower))
+    hi = np.full(n, float(upper))
+
+    step = 1
+    while step < n:
+        # Komposition: (a,lo,hi)[t] nach (a,lo,hi)[t-step]
+        a_prev, lo_prev, hi_prev = a[:-step], lo[:-step], hi[:-step]
+        a_cur, lo_cur, hi_cur = a[step:], lo[step:], hi[step:]
+        new_lo = np.clip(lo_prev + a_cur, lo_cur, hi_cur)
+        new_hi = np.clip(hi_prev + a_cur, lo_cur, hi_cur)
+        new_a = a_prev + a_cur
+        a = np.concatenate([a[:step], new_a])
+        lo = np.concatenate([lo[:step], new_lo])
+        hi = np.concatenate([hi[:step], new_hi])
+        step *= 2
+
+    return np.minimum(hi, np.maximum(lo, initial + a))
+
+
+def simulate_battery_dispatch(
+    pv_kwh: np.ndarray,
+    load_kwh: np.ndarray,
+    capacity_kwh: float,
+    round_trip_efficiency: float = 0.9,
+    max_power_kw: float | None = None,
+    initial_soc_kwh: float | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Eigenverbrauchsoptimierter Speicherbetrieb (Überschuss laden, Defizit
+    entladen) für beliebig lange Stundenreihen.
+
+    Returns:
+        Dict mit Stundenreihen ``direct``, ``charge`` (netto eingespeichert),
+        ``discharge`` (an Verbraucher abgegeben), ``feed_in``, ``grid`` und
+        ``soc``.
+    """
+    pv = np.asarray(pv_kwh, dtype=float)
+    load = np.asarray(load_kwh, dtype=float)
+    if pv.shape != load.shape:
+        raise ValueError("PV- und Lastreihe müssen gleich lang sein")
+
+    direct = np.minimum(pv, load)
+    surplus = pv - direct
+    deficit = load - direct
+
+    if capacity_kwh <= 0:
+        zeros = np.zeros_like(pv)
+        return {
+            "direct": direct,
+            "charge": zeros,
+            "discharge": zeros,
+            "feed_in": surplus,
+            "grid": deficit,
+            "soc": zeros,
+        }
+
+    eta = math.sqrt(min(max(round_trip_efficiency, 0.01), 1.0))
+    if max_power_kw is not None and max_power_kw > 0:
+        surplus_usable = np.minimum(surplus, max_power_kw)
+        deficit_usable = np.minimum(deficit, max_power_kw)
+    else:
+        surplus_usable, deficit_usable = surplus, deficit
+
+    delta = surplus_usable * eta - deficit_usable / eta
+
+    if initial_soc_kwh is None:
+        # Eingeschwungener Zustand: Start-SOC = SOC am Jahresende
+        start = float(clamped_cumsum(delta, 0.0, capacity_kwh, 0.0)[-1])
+    else:
+        start = min(max(float(initial_soc_kwh), 0.0), capacity_kwh)
+    soc = clamped_cumsum(delta, 0.0, capacity_kwh, start)
+
+    soc_change = np.diff(soc, prepend=start)
+    charge = np.clip(soc_change, 0.0, None)
+    discharge = np.clip(-soc_change, 0.0, None) * eta
+
+    return {
+        "direct": direct,
+        "charge": charge,
+        "discharge": discharge,
+        "feed_in": np.clip(surplus - charge / eta, 0.0, None),
+        "grid": np.clip(deficit - discharge, 0.0, None),
+        "soc": soc,
+    }
+
+
+def aggregate_monthly(hourly: np.ndarray) -> list[float]:
+    """Summiert eine 8760er-Stundenreihe zu 12 Monatswerten."""
+    return np.bincount(
+        HOUR_TO_MONTH, weights=np.asarray(hourly, dtype=float), minlength=12
+    ).tolist()
+
+
+def run_hourly_self_consumption(
+    annual_consumption_kwh: float,
+    monthly_pv_production_kwh: list[float] | None = None,
+    hourly_pv_production_kwh: list[float] | np.ndarray | None = None,
+    storage_capacity_kwh: float = 0.0,
+    storage_efficiency: float = 0.9,
+    storage_max_power_kw: float | None = None,
+    load_profile_type: str = "H0",
+    latitude: float | None = None,
+) -> dict[str, Any]:
+    """
+    Komplette Stundensimulation eines Jahres mit Monatsaggregation.
+
+    Die zurückgegebenen ``monthly_*``-Listen entsprechen den Keys, die
+    ``perform_calculations`` bisher aus der Monatsschleife erzeugt hat.
+    """
+    if hourly_pv_production_kwh is not None:
+        pv = fold_hourly_series(hourly_pv_production_kwh)
+        if monthly_pv_production_kwh is not None:
+            # Auf die (ggf. angepassten) Monatssummen skalieren
+            target = np.asarray(monthly_pv_production_kwh, dtype=float)
+            current = np.bincount(HOUR_TO_MONTH, weights=pv, minlength=12)
+            scale = np.divide(target, current, out=np.zeros(12), where=current > 0)
+            pv = pv * scale[HOUR_TO_MONTH]
+    elif monthly_pv_production_kwh is not None:
+        pv = synthesize_hourly_pv(
+            monthly_pv_production_kwh, latitude if latitude is not None else 51.0
+        )
+    else:
+        pv = np.zeros(HOURS_PER_YEAR)
+
+    load = build_load_profile(annual_consumption_kwh, load_profile_type)
+    flows = simulate_battery_dispatch(
+        pv,
+        load,
+        storage_capacity_kwh,
+        round_trip_efficiency=storage_efficiency,
+        max_power_kw=storage_max_power_kw,
+    )
+
+    total_load = float(load.sum())
+    total_pv = float(pv.sum())
+    self_consumed = float(flows["direct"].sum() + flows["discharge"].sum())
+
+    return {
+        "monthly_direct_self_consumption_kwh": aggregate_monthly(flows["direct"]),
+        "monthly_storage_charge_kwh": aggregate_monthly(flows["charge"]),
+        "monthly_storage_discharge_for_sc_kwh": aggregate_monthly(flows["discharge"]),
+        "monthly_feed_in_kwh": aggregate_monthly(flows["feed_in"]),
+        "monthly_grid_bezug_kwh": aggregate_monthly(flows["grid"]),
+        "monthly_consumption_kwh": aggregate_monthly(load),
+        "monthly_production_kwh": aggregate_monthly(pv),
+        "autarky_percent": (self_consumed / total_load * 100.0) if total_load > 0 else 0.0,
+        "self_consumption_percent": (self_consumed / total_pv * 100.0) if total_pv > 0 else 0.0,
+        "storage_full_cycles": (
+            float(flows["discharge"].sum()) / storage_capacity_kwh
+            if storage_capacity_kwh > 0
+            else 0.0
+        ),
+        "load_profile_type": str(load_profile_type or "H0").upper(),
+        "hourly_flows": flows,
+        "hourly_load_kwh": load,
+        "hourly_pv_kwh": pv,
+    }
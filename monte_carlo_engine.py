@@ -0,0 +1,204 @@
+"""
+Vektorisierte Monte-Carlo-Risikoanalyse
+=======================================
+
+Gemeinsame Engine für ``AdvancedCalculationsIntegrator`` (calculations.py)
+und ``PVCalculationsAdvanced`` (pv_calculations_core.py).
+
+Alle Stichproben werden in einem Schritt über einen lokalen
+``numpy.random.Generator`` gezogen (kein globaler Seed). Korrelationen
+zwischen den Parametern werden über eine Cholesky-Zerlegung abgebildet,
+der NPV ergibt sich aus einer (Simulationen x Jahre) Faktor-Matrix.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+# Reihenfolge der stochastischen Parameter (Index in Korrelationsmatrix)
+PARAMETERS = (
+    "investment",
+    "yield",
+    "price_increase",
+    "degradation",
+    "discount_rate",
+)
+
+DEFAULT_PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+
+
+@dataclass
+class MonteCarloConfig:
+    """Verteilungsannahmen (Normalverteilung; relative Streuung für
+    Investition und Ertrag, absolute Streuung für Raten)."""
+
+    investment_rel_std: float = 0.10
+    yield_rel_std: float = 0.15
+    price_increase_mean: float = 0.0
+    price_increase_std: float = 0.01
+    degradation_mean: float = 0.005
+    degradation_std: float = 0.001
+    discount_rate_mean: float = 0.04
+    discount_rate_std: float = 0.01
+    lifetime_years: int = 25
+    # Paarweise Korrelationen, z.B. {("price_increase", "discount_rate"): 0.3}
+    correlations: dict[tuple[str, str], float] = field(default_factory=dict)
+    histogram_bins: int = 50
+    seed: int | None = 42
+
+    def correlation_matrix(self) -> np.ndarray:
+        matrix = np.eye(len(PARAMETERS))
+        for (name_a, name_b), rho in self.correlations.items():
+            i, j = PARAMETERS.index(name_a), PARAMETERS.index(name_b)
+            matrix[i, j] = matrix[j, i] = float(rho)
+        return matrix
+
+
+def draw_correlated_normals(
+    rng: np.random.Generator, n_simulations: int, correlation: np.ndarray
+) -> np.ndarray:
+    """Zieht (n_simulations x n_parameter) korrelierte Standardnormalwerte."""
+    try:
+        cholesky = np.linalg.cholesky(correlation)
+    except np.linalg.LinAlgError as e:
+        raise ValueError(
+            "Korrelationsmatrix ist nicht positiv definit") from e
+    standard = rng.standard_normal((n_simulations, correlation.shape[0]))
+    return standard @ cholesky.T
+
+
+def simulate_npv(
+    base_investment: float,
+    base_annual_benefit: float,
+    n_simulations: int = 1000,
+    config: MonteCarloConfig | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Zieht alle Parameter und berechnet die NPV-Verteilung.
+
+    Returns:
+        Dict mit ``npv`` sowie den gezogenen Parameterreihen.
+    """
+    cfg = config or MonteCarloConfig()
+    rng = np.random.default_rng(cfg.seed)
+    z = draw_correlated_normals(rng, int(n_simulations), cfg.correlation_matrix())
+
+    investment = np.maximum(
+        0.0, base_investment * (1.0 + cfg.investment_rel_std * z[:, 0]))
+    benefit = np.maximum(
+        0.0, base_annual_benefit * (1.0 + cfg.yield_rel_std * z[:, 1]))
+    price_increase = cfg.price_increase_mean + cfg.price_increase_std * z[:, 2]
+    degradation = np.clip(
+        cfg.degradation_mean + cfg.degradation_std * z[:, 3], 0.0, 0.99)
+    discount_rate = np.maximum(
+        -0.99, cfg.discount_rate_mean + cfg.discount_rate_std * z[:, 4])
+
+    years = np.arange(1, cfg.lifetime_years + 1, dtype=float)
+    # benefit_y = B * ((1+p)(1-d))^(y-1) / (1+r)^y, in Log-Form als Matrix
+    log_growth = np.log1p(np.maximum(price_increase, -0.99)) + np.log1p(-degradation)
+    log_discount = np.log1p(discount_rate)
+    factor_matrix = np.exp(
+        np.outer(log_growth, years - 1.0) - np.outer(log_discount, years)
+    )
+    npv = benefit * factor_matrix.sum(axis=1) - investment
+
+    return {
+        "npv": npv,
+        "investment": investment,
+        "annual_benefit": benefit,
+        "price_increase": price_increase,
+        "degradation": degradation,
+        "discount_rate": discount_rate,
+    }
+
+
+def summarize_distribution(
+    npv: np.ndarray,
+    confidence_level: float = 95,
+    histogram_bins: int = 50,
+    percentiles: tuple[int, ...] = DEFAULT_PERCENTILES,
+) -> dict[str, Any]:
+    """Kennzahlen, Perzentile, VaR/CVaR und Histogramm einer NPV-Verteilung."""
+    alpha = (100 - confidence_level) / 2
+    percentile_values = np.percentile(
+        npv, [alpha, 100 - alpha, 5, *percentiles])
+    lower, upper, var_5 = percentile_values[:3]
+    tail = npv[npv <= var_5]
+    counts, edges = np.histogram(npv, bins=histogram_bins)
+
+    return {
+        "npv_mean": float(np.mean(npv)),
+        "npv_std": float(np.std(npv)),
+        "npv_lower_bound": float(lower),
+        "npv_upper_bound": float(upper),
+        "var_5": float(var_5),
+        "cvar_5": float(tail.mean()) if tail.size else float(var_5),
+        "success_probability": float((npv > 0).mean() * 100),
+        "percentiles": {
+            int(p): float(v) for p, v in zip(percentiles, percentile_values[3:], strict=True)
+        },
+        "histogram": {
+            "counts": counts.tolist(),
+            "bin_edges": edges.tolist(),
+        },
+    }
+
+
+def parameter_sensitivity(samples: dict[str, np.ndarray]) -> list[dict[str, Any]]:
+    """Rangkorrelation (Spearman) jedes Parameters mit dem NPV."""
+    labels = {
+        "investment": "Investitionskosten",
+        "annual_benefit": "Jährlicher Nutzen",
+        "discount_rate": "Diskontierungsrate",
+        "price_increase": "Strompreissteigerung",
+        "degradation": "Moduldegradation",
+    }
+    npv_ranks = np.argsort(np.argsort(samples["npv"]))
+    sensitivity = []
+    for key, label in labels.items():
+        values = samples[key]
+        if np.ptp(values) == 0:
+            impact = 0.0
+        else:
+            ranks = np.argsort(np.argsort(values))
+            impact = float(np.corrcoef(ranks, npv_ranks)[0, 1])
+        sensitivity.append({"parameter": label, "impact": round(impact, 3)})
+    return sensitivity
+
+
+def run_monte_carlo(
+    calc_results: dict[str, Any],
+    n_simulations: int = 1000,
+    confidence_level: float = 95,
+    config: MonteCarloConfig | None = None,
+    include_distribution: bool = True,
+) -> dict[str, Any]:
+    """
+    Komplette Risikoanalyse auf Basis der ``perform_calculations``-Ergebnisse.
+
+    Übernimmt Strompreissteigerung aus
+    ``electricity_price_increase_rate_effective_percent``, falls vorhanden.
+    """
+    cfg = config or MonteCarloConfig()
+    price_increase_pct = calc_results.get(
+        "electricity_price_increase_rate_effective_percent")
+    if config is None and isinstance(price_increase_pct, (int, float)):
+        cfg.price_increase_mean = float(price_increase_pct) / 100.0
+
+    samples = simulate_npv(
+        float(calc_results.get("total_investment_netto", 20000) or 0.0),
+        float(calc_results.get("annual_financial_benefit_year1", 1500) or 0.0),
+        n_simulations,
+        cfg,
+    )
+    summary = summarize_distribution(
+        samples["npv"], confidence_level, cfg.histogram_bins)
+    summary["sensitivity_analysis"] = parameter_sensitivity(samples)
+    summary["simulations_count"] = int(n_simulations)
+    summary["confidence_level"] = confidence_level
+    if include_distribution:
+        summary["npv_distribution"] = samples["npv"]
+    return summary
@@ -27,6 +27,117 @@ def progress_callback(current, total, message="Processing"):
     print(f"PROGRESS:{json.dumps(progress_data)}", file=sys.stderr, flush=True)
 
 
+def generate_multi_offers(config, output_dir=None, progress=progress_callback,
+                          debug=False):
+    """
+    Erzeugt je Firma aus ``config['companies']`` ein Angebots-PDF.
+
+    Wird von main() und vom calculation_worker (mit eigenem progress) genutzt.
+
+    Returns:
+        Ergebnis-Dict wie es die CLI als JSON ausgibt
+    """
+    # Import multi-offer generator
+    from multi_offer_generator import generate_multi_offer_pdf
+
+    # Extract configuration
+    companies = config.get('companies', [])
+    project_template = config.get('project_template', {})
+    analysis_template = config.get('analysis_template', {})
+    pdf_options = config.get('pdf_options', {})
+
+    # Set default output directory
+    if not output_dir:
+        output_dir = config.get('output_directory', 'multi_output')
+    os.makedirs(output_dir, exist_ok=True)
+
+    if debug:
+        print(
+            f"🎯 Generating Multi-PDFs for {len(companies)} companies", file=sys.stderr)
+        print(f"   Output Directory: {output_dir}", file=sys.stderr)
+
+    # Initialize progress
+    progress(0, len(companies), "Starting multi-PDF generation")
+
+    generated_files = []
+    failed_companies = []
+
+    for i, company in enumerate(companies):
+        try:
+            progress(
+                i, len(companies), f"Processing {
+                    company.get(
+                        'name', 'Unknown Company')}")
+
+            # Create company-specific project data
+            project_data = project_template.copy()
+            project_data.update({
+                'company_information': company,
+                'customer_name': f"Angebot für {company.get('name', 'Kunde')}"
+            })
+
+            # Generate output filename
+            company_name = company.get(
+                'name',
+                'unknown').replace(
+                ' ',
+                '_').replace(
+                '/',
+                '_')
+            output_filename = f"angebot_{company_name}_{i + 1:03d}.pdf"
+            output_path = os.path.join(output_dir, output_filename)
+
+            # Generate PDF for this company
+            result_path = generate_multi_offer_pdf(
+                project_data=project_data,
+                analysis_results=analysis_template,
+                company_info=company,
+                output_path=output_path,
+                **pdf_options
+            )
+
+            generated_files.append({
+                "company": company.get('name', 'Unknown'),
+                "file_path": result_path,
+                "file_size": os.path.getsize(result_path) if os.path.exists(result_path) else 0,
+                "success": True
+            })
+
+        except Exception as e:
+            if debug:
+                print(
+                    f"❌ Error processing {
+                        company.get(
+                            'name',
+                            'Unknown')}: {e}",
+                    file=sys.stderr)
+
+            failed_companies.append({
+                "company": company.get('name', 'Unknown'),
+                "error": str(e),
+                "success": False
+            })
+
+    # Final progress update
+    progress(
+        len(companies),
+        len(companies),
+        "Multi-PDF generation completed")
+
+    # Return comprehensive result as JSON
+    return {
+        "success": True,
+        "message": f"Multi-PDF generation completed: {
+            len(generated_files)} successful, {
+            len(failed_companies)} failed",
+        "output_directory": output_dir,
+        "generated_files": generated_files,
+        "failed_companies": failed_companies,
+        "total_companies": len(companies),
+        "successful_count": len(generated_files),
+        "failed_count": len(failed_companies)}
+
+
 def main():
     """Main entry point for CLI Multi-PDF generation"""
     parser = argparse.ArgumentParser(
@@ -54,105 +165,8 @@ def main():
             print(
                 f"🔧 Loaded multi-PDF config: {json.dumps(config, indent=2)}", file=sys.stderr)
 
-        # Import multi-offer generator
-        from multi_offer_generator import generate_multi_offer_pdf
-
-        # Extract configuration
-        companies = config.get('companies', [])
-        project_template = config.get('project_template', {})
-        analysis_template = config.get('analysis_template', {})
-        pdf_options = config.get('pdf_options', {})
-
-        # Set default output directory
-        if not args.output_dir:
-            args.output_dir = config.get('output_directory', 'multi_output')
-        os.makedirs(args.output_dir, exist_ok=True)
-
-        if args.debug:
-            print(
-                f"🎯 Generating Multi-PDFs for {len(companies)} companies", file=sys.stderr)
-            print(f"   Output Directory: {args.output_dir}", file=sys.stderr)
-
-        # Initialize progress
-        progress_callback(0, len(companies), "Starting multi-PDF generation")
-
-        generated_files = []
-        failed_companies = []
-
-        for i, company in enumerate(companies):
-            try:
-                progress_callback(
-                    i, len(companies), f"Processing {
-                        company.get(
-                            'name', 'Unknown Company')}")
-
-                # Create company-specific project data
-                project_data = project_template.copy()
-                project_data.update({
-                    'company_information': company,
-                    'customer_name': f"Angebot für {company.get('name', 'Kunde')}"
-                })
-
-                # Generate output filename
-                company_name = company.get(
-                    'name',
-                    'unknown').replace(
-                    ' ',
-                    '_').replace(
-                    '/',
-                    '_')
-                output_filename = f"angebot_{company_name}_{i + 1:03d}.pdf"
-                output_path = os.path.join(args.output_dir, output_filename)
-
-                # Generate PDF for this company
-                result_path = generate_multi_offer_pdf(
-                    project_data=project_data,
-                    analysis_results=analysis_template,
-                    company_info=company,
-                    output_path=output_path,
-                    **pdf_options
-                )
-
-                generated_files.append({
-                    "company": company.get('name', 'Unknown'),
-                    "file_path": result_path,
-                    "file_size": os.path.getsize(result_path) if os.path.exists(result_path) else 0,
-                    "success": True
-                })
-
-            except Exception as e:
-                if args.debug:
-                    print(
-                        f"❌ Error processing {
-                            company.get(
-                                'name',
-                                'Unknown')}: {e}",
-                        file=sys.stderr)
-
-                failed_companies.append({
-                    "company": company.get('name', 'Unknown'),
-                    "error": str(e),
-                    "success": False
-                })
-
-        # Final progress update
-        progress_callback(
-            len(companies),
-            len(companies),
-            "Multi-PDF generation completed")
-
-        # Return comprehensive result as JSON
-        result = {
-            "success": True,
-            "message": f"Multi-PDF generation completed: {
-                len(generated_files)} successful, {
-                len(failed_companies)} failed",
-            "output_directory": args.output_dir,
-            "generated_files": generated_files,
-            "failed_companies": failed_companies,
-            "total_companies": len(companies),
-            "successful_count": len(generated_files),
-            "failed_count": len(failed_companies)}
+        result = generate_multi_offers(
+            config, args.output_dir, debug=args.debug)
 
         print(json.dumps(result))
 
@@ -20,6 +20,7 @@ from pathlib import Path
 from typing import Any
 
 from calculations_extended import run_all_extended_analyses
+from chart_render_service import LazyChart, materialize_chart_bytes, track_pdf_timing
 from theming.pdf_styles import get_theme
 
 # Optional PDF Templates import
@@ -1812,6 +1813,7 @@ def generate_main_template_pdf_bytes(
         return None
 
 
+@track_pdf_timing("generate_offer_pdf_with_main_templates")
 def generate_offer_pdf_with_main_templates(
     project_data: dict[str, Any],
     analysis_results: dict[str, Any] | None,
@@ -2340,9 +2342,13 @@ def generate_offer_pdf_with_main_templates(
             except:
                 theme = None
 
+            # Ausgewählte Diagramme gemeinsam in einem Batch rendern
+            chart_results = materialize_chart_bytes(
+                dict(analysis_results), selected_charts_for_pdf_opt)
+
             # Generate chart pages
             chart_generator = ChartPageGenerator(
-                analysis_results=analysis_results,
+                analysis_results=chart_results,
                 layout=chart_layout_opt,
                 theme=theme,
                 logger=logger
@@ -3085,7 +3091,7 @@ def _update_styles_with_dynamic_colors(design_settings: dict[str, str]):
         ])
 
 
-def _get_image_flowable(image_data_input: str | bytes | None,
+def _get_image_flowable(image_data_input: str | bytes | LazyChart | None,
                         desired_width: float,
                         texts: dict[str,
                                     str],
@@ -3112,6 +3118,9 @@ def _get_image_flowable(image_data_input: str | bytes | None,
             img_data_bytes = None
     elif isinstance(image_data_input, bytes):
         img_data_bytes = image_data_input
+    elif isinstance(image_data_input, LazyChart):
+        # Nicht im Batch materialisiertes Diagramm einzeln rendern
+        img_data_bytes = image_data_input.to_bytes()
 
     if img_data_bytes:
         try:
@@ -4217,6 +4226,7 @@ def _merge_two_pdfs(pdf1_bytes: bytes, pdf2_bytes: bytes) -> bytes:
         return pdf1_bytes
 
 
+@track_pdf_timing("generate_offer_pdf")
 def generate_offer_pdf(
     project_data: dict[str, Any],
     analysis_results: dict[str, Any] | None,
@@ -4286,6 +4296,12 @@ def generate_offer_pdf(
         # Projekt-/Analyse-Dicts lokal kopieren, um Seiteneffekte zu vermeiden
         project_data = dict(project_data or {})
         analysis_results = dict(analysis_results or {})
+        # Ausgewählte Diagramme, die noch als Figur vorliegen, gemeinsam in
+        # einem Batch rendern statt einzeln beim Aufbau der Seiten
+        materialize_chart_bytes(
+            analysis_results,
+            list((inclusion_options or {}).get("selected_charts_for_pdf", []))
+            + ["co2_savings_chart_bytes"])
 
         # 1) Firmendaten in project_data.company_information injizieren, falls
         # nicht vorhanden
@@ -6376,6 +6392,9 @@ def _append_datasheets_and_documents(
         try:
             from extended_pdf_generator import ChartPageGenerator, ExtendedPDFLogger
 
+            # Alle ausgewählten Diagramme in einem Batch rendern
+            analysis_results = materialize_chart_bytes(
+                dict(analysis_results), selected_charts_for_pdf)
             chart_logger = ExtendedPDFLogger()
 
             # Get theme
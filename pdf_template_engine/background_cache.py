@@ -0,0 +1,126 @@
+"""
+pdf_template_engine/background_cache.py
+
+Prozessweiter Cache für geparste Hintergrundseiten (nt_nt_0X.pdf, haus.pdf,
+multi_nt_XX_fY.pdf, ...).
+
+Statt für jede Seite jedes Angebots erneut ``PdfReader`` zu öffnen, wird die
+fertig vorbereitete Hintergrundseite (inkl. Bereinigung/Haus-Overlay) einmal
+aufgebaut und gehalten. Schlüssel sind die beteiligten Dateipfade samt
+mtime/Größe, Änderungen an den Templates werden also automatisch erkannt.
+
+Gecachte Seiten werden nie direkt verändert: :func:`add_background_page`
+klont sie über ``PdfWriter.add_page`` in den jeweiligen Writer, das Overlay
+wird anschließend auf die Kopie gemergt.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+from pypdf import PdfReader, PdfWriter
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class CachedBackgroundPage:
+    """Vorbereitete Hintergrundseite; ``lock`` schützt das Klonen, da pypdf
+    Objekte lazy aus dem Reader-Stream nachlädt."""
+
+    __slots__ = ("page", "lock")
+
+    def __init__(self, page: Any):
+        self.page = page
+        self.lock = threading.Lock()
+
+
+class BackgroundPageCache:
+    """Cache vorbereiteter Hintergrundseiten, Schlüssel: (Name, Pfade, mtimes)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages: dict[tuple, tuple[tuple, CachedBackgroundPage | None]] = {}
+        self._stats = {"hits": 0, "builds": 0}
+
+    def get(
+        self,
+        name: str,
+        paths: Sequence[Path],
+        build: Callable[[], Any | None],
+    ) -> CachedBackgroundPage | None:
+        """Liefert die gecachte Seite oder baut sie mit ``build()`` neu auf.
+
+        Args:
+            name: Art der Vorbereitung (z.B. "standard:3"), Teil des Schlüssels
+            paths: Alle Dateien, aus denen ``build`` die Seite zusammensetzt
+            build: Erzeugt die Seite (oder None, wenn nichts vorhanden ist)
+        """
+        key = (name, tuple(str(p) for p in paths))
+        signature = tuple(_file_signature(Path(p)) for p in paths)
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached[0] == signature:
+                self._stats["hits"] += 1
+                return cached[1]
+
+        page = build()
+        entry = CachedBackgroundPage(page) if page is not None else None
+        with self._lock:
+            self._pages[key] = (signature, entry)
+            self._stats["builds"] += 1
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+            for stat in self._stats:
+                self._stats[stat] = 0
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._pages)
+        return stats
+
+
+def load_pdf_page(path: Path, page_index: int = 0) -> Any | None:
+    """Öffnet eine PDF-Datei und gibt eine Seite zurück (None bei Fehler)."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        return PdfReader(str(path)).pages[page_index]
+    except Exception:
+        return None
+
+
+def add_background_page(writer: PdfWriter, entry: CachedBackgroundPage) -> Any:
+    """Klont die gecachte Seite in ``writer`` und gibt die Writer-Seite zurück."""
+    with entry.lock:
+        return writer.add_page(entry.page)
+
+
+_background_cache = BackgroundPageCache()
+
+
+def get_background_page(
+    name: str, paths: Sequence[Path], build: Callable[[], Any | None]
+) -> CachedBackgroundPage | None:
+    return _background_cache.get(name, paths, build)
+
+
+def clear_background_cache() -> None:
+    _background_cache.clear()
+
+
+def get_background_cache_stats() -> dict[str, int]:
+    return _background_cache.get_stats()
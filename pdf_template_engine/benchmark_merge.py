@@ -0,0 +1,74 @@
+"""
+pdf_template_engine/benchmark_merge.py
+
+Misst die Merge-Zeit pro Angebot (8 Seiten Overlay + Hintergründe) ohne und
+mit Background-Cache:
+
+    python -m pdf_template_engine.benchmark_merge --runs 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import statistics
+import time
+from pathlib import Path
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from .background_cache import clear_background_cache, get_background_cache_stats
+from .dynamic_overlay import merge_with_background
+
+DEFAULT_BG_DIR = Path(__file__).resolve().parent.parent / "pdf_templates_static" / "notext"
+
+
+def make_overlay(pages: int = 8) -> bytes:
+    """Einfaches Text-Overlay mit ``pages`` Seiten."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    for page in range(1, pages + 1):
+        c.setFont("Helvetica", 12)
+        for row in range(40):
+            c.drawString(40, 800 - row * 18, f"Seite {page} Zeile {row}: 12.345,67 €")
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def benchmark_merge(bg_dir: Path = DEFAULT_BG_DIR, runs: int = 20) -> dict[str, float]:
+    """Median-Merge-Zeit pro Angebot in ms (ohne/mit Cache)."""
+    overlay = make_overlay()
+    results: dict[str, float] = {}
+    for label, use_cache in (("uncached_ms", False), ("cached_ms", True)):
+        clear_background_cache()
+        if use_cache:
+            merge_with_background(overlay, bg_dir)  # Aufwärmen
+        durations = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            merge_with_background(overlay, bg_dir, use_cache=use_cache)
+            durations.append((time.perf_counter() - start) * 1000)
+        results[label] = statistics.median(durations)
+    results["speedup"] = results["uncached_ms"] / results["cached_ms"]
+    results.update(
+        {f"cache_{k}": v for k, v in get_background_cache_stats().items()}
+    )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--bg-dir", type=Path, default=DEFAULT_BG_DIR)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+    result = benchmark_merge(args.bg_dir, args.runs)
+    print(f"ohne Cache: {result['uncached_ms']:8.1f} ms/Angebot")
+    print(f"mit Cache:  {result['cached_ms']:8.1f} ms/Angebot")
+    print(f"Faktor:     {result['speedup']:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,309 @@
+"""
+pdf_template_engine/coords_cache.py
+
+Kompilierte Koordinaten-Layouts für die Overlay-Erzeugung.
+
+Die Dateien coords/seiteN.yml, coords_multi/seiteN_fM.yml und
+coords_wp/wp_seiteN.yml werden einmal geparst und als kompakte,
+unveränderliche Tupel-Records im Prozess gehalten (Schlüssel: Pfad,
+mtime und Dateigröße). Optional kann pro Verzeichnis ein JSON-Bundle
+(z. B. ``coords.compiled.json`` neben ``coords/``) vorab erzeugt werden,
+sodass auch ein frischer Prozess nichts mehr parsen muss:
+
+    python -m pdf_template_engine.precompile_layouts
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, NamedTuple
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_LAYOUT_DIRS = ("coords", "coords_multi", "coords_wp")
+BUNDLE_SUFFIX = ".compiled.json"
+BUNDLE_VERSION = 1
+LAYOUT_PATTERNS = ("*.yml", "*.yaml")
+
+_NUMBER_RE = re.compile(r"[-+]?[0-9]*[\.,]?[0-9]+")
+
+
+class CoordElement(NamedTuple):
+    """Ein Eintrag einer seiteX.yml; ``None`` = Feld nicht gesetzt."""
+
+    text: str | None = None
+    position: tuple[float, float, float, float] | None = None
+    font: str | None = None
+    font_size: float | None = None
+    color: int | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Frisches, veränderbares Dict im Format von ``parse_coords_file``."""
+        return {k: v for k, v in zip(self._fields, self, strict=True) if v is not None}
+
+
+def _parse_coords_lines(lines) -> tuple[CoordElement, ...]:
+    """Parst die Zeilen einer Koordinaten-Datei in kompakte Records.
+
+    Einträge sind durch eine Zeile beginnend mit '-' oder '---' getrennt.
+    Unterstützte Felder: Text, Position(x0,y0,x1,y1), Schriftart, Schriftgröße, Farbe
+    """
+    elements: list[CoordElement] = []
+    current: dict[str, Any] = {}
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        # Einträge sind durch Linien aus '-' getrennt (z.B.
+        # "----------------------------------------")
+        if (
+            line.startswith("---") or (set(line) == {"-"} and len(line) >= 3)
+        ) and current:
+            elements.append(CoordElement(**current))
+            current = {}
+            continue
+        if line.startswith("Text:"):
+            current["text"] = line.split(":", 1)[1].strip()
+        elif line.startswith("Position:"):
+            # Zahlen extrahieren (auch mit Komma als Dezimaltrenner)
+            nums = [n.replace(",", ".") for n in _NUMBER_RE.findall(line)]
+            if len(nums) >= 4:
+                current["position"] = tuple(float(n) for n in nums[:4])
+        elif line.startswith("Schriftart:"):
+            current["font"] = line.split(":", 1)[1].strip()
+        elif line.lower().startswith("schriftgröße:") or line.lower().startswith(
+            "schriftgroesse:"
+        ):
+            try:
+                val = line.split(":", 1)[1].strip().replace(",", ".")
+                current["font_size"] = float(val)
+            except Exception:
+                current["font_size"] = 10.0
+        elif line.startswith("Farbe:"):
+            try:
+                val = line.split(":", 1)[1].strip()
+                if val.lower().startswith("0x"):
+                    current["color"] = int(val, 16)
+                else:
+                    current["color"] = int(val)
+            except Exception:
+                current["color"] = 0
+    if current:
+        elements.append(CoordElement(**current))
+    return tuple(elements)
+
+
+def compile_coords_file(path: Path) -> tuple[CoordElement, ...]:
+    """Parst eine Koordinaten-Datei ohne Cache (leeres Tupel, wenn sie fehlt)."""
+    path = Path(path)
+    if not path.exists():
+        return ()
+    with path.open(encoding="utf-8", errors="ignore") as f:
+        return _parse_coords_lines(f)
+
+
+def _file_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def bundle_path_for(layout_dir: Path) -> Path:
+    """coords/ -> coords.compiled.json (Geschwisterdatei des Verzeichnisses)."""
+    layout_dir = Path(layout_dir)
+    return layout_dir.with_name(layout_dir.name + BUNDLE_SUFFIX)
+
+
+class LayoutCache:
+    """Prozessweiter Cache kompilierter Layouts mit optionalem JSON-Bundle."""
+
+    def __init__(self, use_bundles: bool = True):
+        self.use_bundles = use_bundles
+        self._lock = threading.Lock()
+        # Pfad -> (Signatur, Elemente)
+        self._layouts: dict[str, tuple[tuple[int, int], tuple[CoordElement, ...]]] = {}
+        # Verzeichnis -> {Dateiname: (Signatur, Elemente)} aus dem Bundle
+        self._bundles: dict[str, dict[str, tuple[tuple[int, int], tuple[CoordElement, ...]]]] = {}
+        self._stats = {"hits": 0, "bundle_hits": 0, "compiled": 0}
+
+    def _bundle_entries(self, layout_dir: Path) -> dict:
+        key = str(layout_dir)
+        entries = self._bundles.get(key)
+        if entries is None:
+            entries = _read_bundle(bundle_path_for(layout_dir))
+            self._bundles[key] = entries
+        return entries
+
+    def get(self, path: Path) -> tuple[CoordElement, ...]:
+        """Kompiliertes Layout für ``path``; parst nur bei neuer/geänderter Datei."""
+        path = Path(path)
+        signature = _file_signature(path)
+        if signature is None:
+            return ()
+        key = str(path)
+        with self._lock:
+            cached = self._layouts.get(key)
+            if cached is not None and cached[0] == signature:
+                self._stats["hits"] += 1
+                return cached[1]
+            if self.use_bundles:
+                entry = self._bundle_entries(path.parent).get(path.name)
+                if entry is not None and entry[0] == signature:
+                    self._layouts[key] = entry
+                    self._stats["bundle_hits"] += 1
+                    return entry[1]
+
+        elements = compile_coords_file(path)
+        with self._lock:
+            self._layouts[key] = (signature, elements)
+            self._stats["compiled"] += 1
+        return elements
+
+    def get_yaml(self, path: Path) -> tuple[dict[str, Any], ...]:
+        """Wie :meth:`get`, aber für Layouts im YAML-Listenformat
+        (``placeholder``/``x``/``y``/...); Einträge sind schreibgeschützt."""
+        path = Path(path)
+        signature = _file_signature(path)
+        if signature is None:
+            return ()
+        key = f"yaml:{path}"
+        with self._lock:
+            cached = self._layouts.get(key)
+            if cached is not None and cached[0] == signature:
+                self._stats["hits"] += 1
+                return cached[1]
+
+        import yaml
+
+        with path.open(encoding="utf-8") as f:
+            items = tuple(yaml.safe_load(f) or ())
+        with self._lock:
+            self._layouts[key] = (signature, items)
+            self._stats["compiled"] += 1
+        return items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._layouts.clear()
+            self._bundles.clear()
+            for stat in self._stats:
+                self._stats[stat] = 0
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._layouts)
+        return stats
+
+
+def _read_bundle(bundle_path: Path) -> dict:
+    if not bundle_path.exists():
+        return {}
+    try:
+        with bundle_path.open(encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != BUNDLE_VERSION:
+            return {}
+        entries = {}
+        for name, entry in data.get("files", {}).items():
+            elements = tuple(
+                CoordElement(
+                    text,
+                    tuple(position) if position is not None else None,
+                    font,
+                    font_size,
+                    color,
+                )
+                for text, position, font, font_size, color in entry["elements"]
+            )
+            entries[name] = ((entry["mtime_ns"], entry["size"]), elements)
+        return entries
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Layout-Cache: Bundle '{bundle_path}' nicht lesbar: {e}")
+        return {}
+
+
+def precompile_directory(layout_dir: Path) -> int:
+    """Kompiliert alle Layouts eines Verzeichnisses in dessen JSON-Bundle.
+
+    Returns:
+        Anzahl der kompilierten Dateien.
+    """
+    layout_dir = Path(layout_dir)
+    files: dict[str, Any] = {}
+    for pattern in LAYOUT_PATTERNS:
+        for path in sorted(layout_dir.glob(pattern)):
+            signature = _file_signature(path)
+            if signature is None:
+                continue
+            files[path.name] = {
+                "mtime_ns": signature[0],
+                "size": signature[1],
+                "elements": [list(el) for el in compile_coords_file(path)],
+            }
+    bundle_path = bundle_path_for(layout_dir)
+    tmp_path = bundle_path.with_name(bundle_path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump({"version": BUNDLE_VERSION, "files": files}, f, ensure_ascii=False)
+    os.replace(tmp_path, bundle_path)
+    return len(files)
+
+
+def precompile_layouts(layout_dirs=None) -> dict[str, int]:
+    """Erzeugt die Bundles für alle (existierenden) Layout-Sets."""
+    dirs = layout_dirs or [BASE_DIR / name for name in DEFAULT_LAYOUT_DIRS]
+    result: dict[str, int] = {}
+    for layout_dir in dirs:
+        layout_dir = Path(layout_dir)
+        if not layout_dir.is_absolute() and not layout_dir.exists():
+            layout_dir = BASE_DIR / layout_dir
+        if not layout_dir.is_dir():
+            print(f"Layout-Cache: Verzeichnis '{layout_dir}' nicht gefunden, übersprungen")
+            continue
+        result[str(layout_dir)] = precompile_directory(layout_dir)
+    # Neue Bundles beim nächsten Zugriff neu einlesen
+    _layout_cache.clear()
+    return result
+
+
+_layout_cache = LayoutCache(
+    use_bundles=os.environ.get("COORDS_LAYOUT_BUNDLES", "1").lower() not in {"0", "false", "off"}
+)
+
+
+def get_layout(path: Path) -> tuple[CoordElement, ...]:
+    return _layout_cache.get(path)
+
+
+def get_yaml_layout(path: Path) -> tuple[dict[str, Any], ...]:
+    return _layout_cache.get_yaml(path)
+
+
+def clear_layout_cache() -> None:
+    _layout_cache.clear()
+
+
+def get_layout_cache_stats() -> dict[str, int]:
+    return _layout_cache.get_stats()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Kompiliert Koordinaten-Layouts (coords/, coords_multi/, coords_wp/) vorab."
+    )
+    parser.add_argument(
+        "dirs",
+        nargs="*",
+        help=f"Layout-Verzeichnisse (Standard: {', '.join(DEFAULT_LAYOUT_DIRS)})",
+    )
+    args = parser.parse_args(argv)
+    result = precompile_layouts(args.dirs or None)
+    for layout_dir, count in result.items():
+        print(f"{count:4d} Layouts -> {bundle_path_for(Path(layout_dir))}")
+    return 0 if result else 1
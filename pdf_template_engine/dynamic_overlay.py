@@ -8,9 +8,9 @@ pdf_templates_static/notext/nt_nt_01.pdf … nt_nt_08.pdf.
 
 from __future__ import annotations
 
-import base64
 import io
 import re
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
@@ -18,7 +18,6 @@ from pypdf import PdfReader, PdfWriter, Transformation
 from reportlab.lib import colors  # für add_page3_elements (colors.black)
 from reportlab.lib.colors import Color
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 
 try:
@@ -28,6 +27,14 @@ try:
 except Exception:  # pragma: no cover
     PageObject = None  # type: ignore
 
+from .background_cache import (
+    CachedBackgroundPage,
+    add_background_page,
+    get_background_page,
+    load_pdf_page,
+)
+from .coords_cache import get_layout, get_yaml_layout
+from .image_cache import get_image_reader
 from .placeholders import PLACEHOLDER_MAPPING
 
 # Optional: Admin-Settings laden, um Overlay-Verhalten dynamisch zu steuern
@@ -52,41 +59,14 @@ def _to_bool(val: Any, default: bool = False) -> bool:
     return default
 
 
-def _as_image_reader(val: Any) -> Any:
+def _as_image_reader(val: Any, max_size_pt: tuple[float, float] | None = None) -> Any:
     """Erzeugt einen ImageReader aus Base64, Data-URL oder lokalem Dateipfad.
-    Gibt None zurück, wenn nicht lesbar."""
-    try:
-        if not val:
-            return None
-        s = str(val).strip()
-
-        # Data-URL -> Base64 extrahieren
-        if ";base64," in s:
-            s = s.split(";base64,", 1)[1]
-
-        # Versuche Base64-Decode
-        try:
-            raw = base64.b64decode(s)
+    Gibt None zurück, wenn nicht lesbar.
 
-            # Prüfe Bildformat - nur PNG/JPEG unterstützt
-            if raw.startswith(b"<?xml") or raw.startswith(b"<svg"):
-                return None  # SVG nicht unterstützt
-
-            return ImageReader(io.BytesIO(raw))
-        except Exception:
-            pass
-
-        # Falls Dateipfad existiert, Datei laden
-        try:
-            p = Path(s)
-            if p.exists() and p.is_file():
-                with p.open("rb") as f:
-                    data = f.read()
-                return ImageReader(io.BytesIO(data))
-        except Exception:
-            pass
-
-        return None
+    Ergebnisse kommen aus dem Bild-Cache (image_cache); mit ``max_size_pt``
+    (größte Zeichenfläche in Punkten) wird auf Druckauflösung verkleinert."""
+    try:
+        return get_image_reader(val, max_size_pt)
     except Exception:
         return None
 
@@ -139,54 +119,11 @@ def parse_coords_file(path: Path) -> list[dict[str, Any]]:
 
     Einträge sind durch eine Zeile beginnend mit '-' oder '---' getrennt.
     Unterstützte Felder: Text, Position(x0,y0,x1,y1), Schriftart, Schriftgröße, Farbe
+
+    Die Datei wird nur geparst, wenn sie neu ist oder sich geändert hat
+    (siehe coords_cache); jeder Aufruf erhält eigene, veränderbare Dicts.
     """
-    elements: list[dict[str, Any]] = []
-    current: dict[str, Any] = {}
-    if not path.exists():
-        return elements
-    with path.open(encoding="utf-8", errors="ignore") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            # Einträge sind durch Linien aus '-' getrennt (z.B.
-            # "----------------------------------------")
-            if (
-                line.startswith("---") or (set(line) == {"-"} and len(line) >= 3)
-            ) and current:
-                elements.append(current)
-                current = {}
-                continue
-            if line.startswith("Text:"):
-                current["text"] = line.split(":", 1)[1].strip()
-            elif line.startswith("Position:"):
-                # Zahlen extrahieren (auch mit Komma als Dezimaltrenner)
-                nums = re.findall(r"[-+]?[0-9]*[\.,]?[0-9]+", line)
-                nums = [n.replace(",", ".") for n in nums]
-                if len(nums) >= 4:
-                    current["position"] = tuple(float(n) for n in nums[:4])
-            elif line.startswith("Schriftart:"):
-                current["font"] = line.split(":", 1)[1].strip()
-            elif line.lower().startswith("schriftgröße:") or line.lower().startswith(
-                "schriftgroesse:"
-            ):
-                try:
-                    val = line.split(":", 1)[1].strip().replace(",", ".")
-                    current["font_size"] = float(val)
-                except Exception:
-                    current["font_size"] = 10.0
-            elif line.startswith("Farbe:"):
-                try:
-                    val = line.split(":", 1)[1].strip()
-                    if val.lower().startswith("0x"):
-                        current["color"] = int(val, 16)
-                    else:
-                        current["color"] = int(val)
-                except Exception:
-                    current["color"] = 0
-        if current:
-            elements.append(current)
-    return elements
+    return [el.to_dict() for el in get_layout(path)]
 
 
 def int_to_color(value: int) -> Color:
@@ -197,6 +134,9 @@ def int_to_color(value: int) -> Color:
     return Color(r, g, b)
 
 
+COMPANY_LOGO_MAX_SIZE_PT = (200.0, 85.0)
+
+
 def _draw_company_logo(
     c: canvas.Canvas,
     dynamic_data: dict[str, str],
@@ -209,8 +149,11 @@ def _draw_company_logo(
     if not b64:
         return
     try:
-        img_bytes = base64.b64decode(b64)
-        img = ImageReader(io.BytesIO(img_bytes))
+        # Ein Reader für alle Seiten (größte Fläche), damit das Logo nur
+        # einmal eingebettet wird
+        img = _as_image_reader(b64, COMPANY_LOGO_MAX_SIZE_PT)
+        if img is None:
+            return
         # Zielfläche: max Breite/Höhe
         is_first_page = page_index == 1
         max_w, max_h = (200, 85) if is_first_page else (120, 50)  # Punkte
@@ -2378,11 +2321,11 @@ def _draw_page5_component_images(
             ),
         ]
         for img_b64, pos in images:
-            img = _as_image_reader(img_b64)
-            if img is None:
-                continue
             max_w = float(pos.get("max_w", 140.0))
             max_h = float(pos.get("max_h", 90.0))
+            img = _as_image_reader(img_b64, (max_w, max_h))
+            if img is None:
+                continue
             x = float(pos.get("x", 50.0))
             y_top = float(pos.get("y_top", page_height - 250.0))
             try:
@@ -2626,14 +2569,14 @@ def _draw_page5_brand_logos(
             b64 = dynamic_data.get(key)
             if not b64:
                 continue
-            img = _as_image_reader(b64)
-            if img is None:
-                continue
             pos = positions.get(category, {})
             x = float(pos.get("x", default_positions[category]["x"]))
             y_bottom = float(pos.get("y", default_positions[category]["y"]))
             box_w = float(pos.get("width", default_positions[category]["width"]))
             box_h = float(pos.get("height", default_positions[category]["height"]))
+            img = _as_image_reader(b64, (box_w, box_h))
+            if img is None:
+                continue
 
             # Optional: 2cm vom rechten Rand erzwingen falls Admin-x sehr weit links (< rechte Rand - 2cm)
             # 2 cm ≈ 56.7 pt. Rechter Rand (A4 width ~595). Ziel-x = 595 - 56.7
@@ -2744,120 +2687,120 @@ def _remove_text_from_page(page, texts_to_remove: list[str]):
         pass  # Bei Fehlern einfach ignorieren
 
 
-def merge_with_background(overlay_bytes: bytes, bg_dir: Path) -> bytes:
-    """Verschmilzt das Overlay mit nt_nt_01.pdf … nt_nt_08.pdf aus bg_dir."""
+def _build_background_page(bg_dir: Path, page_num: int) -> Any | None:
+    """Setzt die Hintergrundseite für ``page_num`` aus bg_dir zusammen.
+
+    Reihenfolge: Basis (nt_nt_0X.pdf bzw. nt_0X.pdf) -> haus.pdf (nur Seite 1).
+    Auf Seite 3 werden problematische Legendentexte entfernt.
+    """
+    # Unterstütze beide Muster: nt_nt_XX.pdf und nt_XX.pdf
+    bg_page = None
+    for cand in _background_candidates(bg_dir, page_num):
+        bg_page = load_pdf_page(cand)
+        if bg_page is not None:
+            break
+
+    # Optional: Auf Seite 1 zusätzlich eine weitere statische PDF (haus.pdf) mergen
+    extra_bg_page = load_pdf_page(bg_dir / "haus.pdf") if page_num == 1 else None
+
+    # Falls kein Standard-Hintergrund vorhanden ist, aber haus.pdf
+    # existiert, nutze diese als Basis
+    base_page = bg_page
+    if base_page is None and extra_bg_page is not None:
+        base_page = extra_bg_page
+        extra_bg_page = None  # bereits als Basis gesetzt
+
+    if base_page is not None:
+        # Seite 3: Problematische Legendentexte aus dem Hintergrund
+        # entfernen
+        if page_num == 3:
+            texts_to_remove = ["", "", "", "", ""]
+            _remove_text_from_page(base_page, texts_to_remove)
+
+        # Falls eine zusätzliche Haus-Seite vorhanden ist, zuerst darüber
+        # legen (skaliert 30% und zentriert)
+        if extra_bg_page is not None:
+            try:
+                bw = float(base_page.mediabox.width)
+                bh = float(base_page.mediabox.height)
+                hw = float(extra_bg_page.mediabox.width)
+                hh = float(extra_bg_page.mediabox.height)
+                scale = 0.3  # 70% kleiner
+                tx = (bw - hw * scale) / 2.0
+                ty = (bh - hh * scale) / 2.0
+                t = Transformation().scale(scale, scale).translate(tx, ty)
+                base_page.merge_transformed_page(extra_bg_page, t)
+            except Exception:
+                # Fallback: unskaliert mergen
+                try:
+                    base_page.merge_page(extra_bg_page)
+                except Exception:
+                    pass
+        return base_page
+
+    # Kein Standard-Hintergrund: nur haus.pdf (falls vorhanden) als
+    # Basis auf leerer A4-Seite, skaliert
+    if extra_bg_page is not None and PageObject is not None:
+        try:
+            bw, bh = A4
+            base = PageObject.create_blank_page(width=bw, height=bh)  # type: ignore
+            hw = float(extra_bg_page.mediabox.width)
+            hh = float(extra_bg_page.mediabox.height)
+            scale = 0.3
+            tx = (bw - hw * scale) / 2.0
+            ty = (bh - hh * scale) / 2.0
+            t = Transformation().scale(scale, scale).translate(tx, ty)
+            base.merge_transformed_page(extra_bg_page, t)
+            return base
+        except Exception:
+            pass
+    return None
+
+
+def _background_candidates(bg_dir: Path, page_num: int) -> list[Path]:
+    return [bg_dir / f"nt_nt_{page_num:02d}.pdf", bg_dir / f"nt_{page_num:02d}.pdf"]
+
+
+def _background_entry(
+    bg_dir: Path, page_num: int, use_cache: bool = True
+) -> CachedBackgroundPage | None:
+    """Vorbereitete Hintergrundseite, bei ``use_cache`` prozessweit wiederverwendet."""
+    def build():
+        return _build_background_page(bg_dir, page_num)
+
+    if not use_cache:
+        page = build()
+        return CachedBackgroundPage(page) if page is not None else None
+    paths = _background_candidates(bg_dir, page_num)
+    if page_num == 1:
+        paths.append(bg_dir / "haus.pdf")
+    return get_background_page(f"standard:{page_num}", paths, build)
+
+
+def merge_with_background(
+    overlay_bytes: bytes, bg_dir: Path, use_cache: bool = True
+) -> bytes:
+    """Verschmilzt das Overlay mit nt_nt_01.pdf … nt_nt_08.pdf aus bg_dir.
+
+    Die Hintergründe kommen aus dem Background-Cache (siehe background_cache);
+    ``use_cache=False`` baut sie wie früher bei jedem Aufruf neu auf.
+    """
     overlay_reader = PdfReader(io.BytesIO(overlay_bytes))
     writer = PdfWriter()
     for page_num in range(
         1, 9
     ):  # MIGRATION: Changed from range(1, 8) to range(1, 9) for 8 pages
-        # Unterstütze beide Muster: nt_nt_XX.pdf und nt_XX.pdf
-        candidates = [
-            bg_dir
-            / f"nt_nt_{
-                page_num:02d}.pdf",
-            bg_dir
-            / f"nt_{
-                page_num:02d}.pdf",
-        ]
-        bg_page = None
-        for cand in candidates:
-            if cand.exists():
-                try:
-                    bg_reader = PdfReader(str(cand))
-                    bg_page = bg_reader.pages[0]
-                    break
-                except Exception:
-                    continue
-        # Fallback: Wenn kein Hintergrund vorhanden/lesbar ist, füge nur
-        # Overlay-Seite ein
         ov_page = overlay_reader.pages[page_num - 1]
-
-        # Optional: Auf Seite 1 zusätzlich eine weitere statische PDF (haus.pdf) mergen
-        # Reihenfolge: Basis (nt_nt_01.pdf) -> haus.pdf -> Overlay
-        extra_bg_page = None
-        if page_num == 1:
-            haus_path = bg_dir / "haus.pdf"
-            if haus_path.exists():
-                try:
-                    haus_reader = PdfReader(str(haus_path))
-                    extra_bg_page = haus_reader.pages[0]
-                except Exception:
-                    extra_bg_page = None
-
-        # Falls kein Standard-Hintergrund vorhanden ist, aber haus.pdf
-        # existiert, nutze diese als Basis
-        base_page = bg_page
-        if base_page is None and extra_bg_page is not None:
-            base_page = extra_bg_page
-            extra_bg_page = None  # bereits als Basis gesetzt
-
-        if base_page is not None:
-            # Seite 3: Problematische Legendentexte aus dem Hintergrund
-            # entfernen
-            if page_num == 3:
-                texts_to_remove = ["", "", "", "", ""]
-                _remove_text_from_page(base_page, texts_to_remove)
-
-            # Falls eine zusätzliche Haus-Seite vorhanden ist, zuerst darüber
-            # legen (skaliert 30% und zentriert)
-            if extra_bg_page is not None:
-                try:
-                    bw = float(base_page.mediabox.width)
-                    bh = float(base_page.mediabox.height)
-                    hw = float(extra_bg_page.mediabox.width)
-                    hh = float(extra_bg_page.mediabox.height)
-                    scale = 0.3  # 70% kleiner
-                    tx = (bw - hw * scale) / 2.0
-                    ty = (bh - hh * scale) / 2.0
-                    t = Transformation().scale(scale, scale).translate(tx, ty)
-                    base_page.merge_transformed_page(extra_bg_page, t)
-                except Exception:
-                    # Fallback: unskaliert mergen
-                    try:
-                        base_page.merge_page(extra_bg_page)
-                    except Exception:
-                        pass
-            # WICHTIG: Erstelle eine Kopie der base_page vor dem Merge
-            from copy import deepcopy
-
-            merged_page = deepcopy(base_page)
-
-            # Overlay über den zusammengesetzten Hintergrund legen
-            merged_page.merge_page(ov_page)
-            writer.add_page(merged_page)
-        else:
-            # Kein Standard-Hintergrund: nur haus.pdf (falls vorhanden) als
-            # Basis, skaliert, dann Overlay
-            if extra_bg_page is not None and PageObject is not None:
-                try:
-                    # Erzeuge leere Basis-Seite in A4 (oder Größe des Overlay)
-                    try:
-                        bw = float(ov_page.mediabox.width)
-                        bh = float(ov_page.mediabox.height)
-                    except Exception:
-                        bw, bh = A4
-                    base = PageObject.create_blank_page(
-                        width=bw, height=bh
-                    )  # type: ignore
-                    hw = float(extra_bg_page.mediabox.width)
-                    hh = float(extra_bg_page.mediabox.height)
-                    scale = 0.3
-                    tx = (bw - hw * scale) / 2.0
-                    ty = (bh - hh * scale) / 2.0
-                    t = Transformation().scale(scale, scale).translate(tx, ty)
-                    base.merge_transformed_page(extra_bg_page, t)
-                    # WICHTIG: Erstelle Kopie vor Overlay-Merge
-                    from copy import deepcopy
-
-                    merged_base = deepcopy(base)
-                    merged_base.merge_page(ov_page)
-                    writer.add_page(merged_base)
-                    continue
-                except Exception:
-                    pass
-            # Fallback: nur Overlay
+        entry = _background_entry(bg_dir, page_num, use_cache)
+        if entry is None:
+            # Fallback: Wenn kein Hintergrund vorhanden/lesbar ist, füge nur
+            # Overlay-Seite ein
             writer.add_page(ov_page)
+            continue
+        # Hintergrund in den Writer klonen (gecachte Seite bleibt unverändert)
+        # und Overlay über den zusammengesetzten Hintergrund legen
+        merged_page = add_background_page(writer, entry)
+        merged_page.merge_page(ov_page)
     out = io.BytesIO()
     writer.write(out)
     return out.getvalue()
@@ -2963,6 +2906,599 @@ def generate_custom_offer_pdf(
         return None
 
 
+@dataclass
+class FirmWorkUnit:
+    """Picklebare Arbeitseinheit für die PDF einer Firma.
+
+    Produkt-Rotation und Preis-Kaskadierung hängen von der Reihenfolge der
+    Firmen ab und werden deshalb vorab sequentiell ermittelt; die eigentliche
+    PDF-Erzeugung braucht danach keinen geteilten Zustand mehr.
+    """
+
+    firm_index: int
+    firm_name: str
+    firm: dict
+    rotated_products: dict
+    price_result: dict
+
+
+def _firm_display_name(firm: dict, firm_index: int) -> str:
+    return firm.get('name') or firm.get('Name') or f"Firma_{firm_index + 1}"
+
+
+def _prepare_firm_work_unit(
+    firm_index: int,
+    firm: dict,
+    standard_products: dict,
+    used_brands: set,
+    used_models: dict,
+    project_data: dict,
+    analysis_results: dict,
+    profit_margin: float,
+    modifier_pct: float,
+    progression_pct: float,
+) -> FirmWorkUnit:
+    """Schritte 1-2: Produkt-Rotation und kaskadierte Preisberechnung."""
+    from price_modification_engine import calculate_price_with_products
+    from product_rotation_engine import rotate_products
+
+    firm_name = _firm_display_name(firm, firm_index)
+
+    # 1. Rotiere Produkte für diese Firma
+    print(f"\n[1/4] Produkt-Rotation...")
+    rotated_products = rotate_products(
+        standard_products=standard_products,
+        used_brands=used_brands,
+        firm_index=firm_index,
+        used_models=used_models
+    )
+
+    if not rotated_products or len(rotated_products) == 0:
+        print(f"⚠️ Produkt-Rotation fehlgeschlagen - nutze STANDARD-PRODUKTE als Fallback")
+        rotated_products = standard_products.copy()
+
+    print(f"✓ {len(rotated_products)} Produkte für Firma {firm_index + 1}")
+
+    # Debug: Zeige rotierte Produkte
+    if rotated_products.get('pv_modules'):
+        pv_name = rotated_products['pv_modules'].get('model_name', rotated_products['pv_modules'].get('name', 'N/A'))
+        print(f"   → PV-Modul: {pv_name}")
+    if rotated_products.get('inverters'):
+        inv_name = rotated_products['inverters'].get('model_name', rotated_products['inverters'].get('name', 'N/A'))
+        print(f"   → Wechselrichter: {inv_name}")
+    if rotated_products.get('battery_storage'):
+        bat_name = rotated_products['battery_storage'].get('model_name', rotated_products['battery_storage'].get('name', 'N/A'))
+        print(f"   → Speicher: {bat_name}")
+
+    # 2. Berechne Preis mit Modifikation
+    print(f"\n[2/4] Preisberechnung...")
+
+    # ✅ Basis-Preis aus project_data holen (nicht neu berechnen!)
+    base_price_from_project = project_data.get('project_details', {}).get('final_offer_price_net', 0)
+
+    if base_price_from_project == 0:
+        print(f"⚠️ WARNUNG: Basis-Preis ist 0! Prüfe project_data!")
+        print(f"   Verfügbare Keys: {list(project_data.get('project_details', {}).keys())}")
+
+    price_result = calculate_price_with_products(
+        products=rotated_products,
+        analysis_results=analysis_results,
+        profit_margin=profit_margin,
+        modifier_pct=modifier_pct,
+        firm_index=firm_index,
+        progression_pct=progression_pct,
+        base_price_override=base_price_from_project  # ← NEU: Override!
+    )
+
+    modified_price = price_result['modified_price']
+    base_price = price_result['base_price']
+
+    # KASKADIERUNGS-BEWEIS ausgeben
+    print(f"\n{'='*60}")
+    print(f"KASKADIERUNGS-BERECHNUNG FÜR {firm_name.upper()}")
+    print(f"{'='*60}")
+    print(f"Basis-Preis (Haupt-PDF): {base_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", "."))
+    print(f"Firma-Index: {firm_index}")
+    print(f"Modifier (Firma 1): {modifier_pct}%")
+    print(f"Progression (weitere): {progression_pct}%")
+    print(f"")
+
+    # Zeige Kaskadierungs-Schritte
+    temp_price = base_price
+    for i in range(firm_index + 1):
+        pct = modifier_pct if i == 0 else progression_pct
+        old_price = temp_price
+        temp_price = temp_price * (1 + pct / 100)
+        formatted_old = f"{old_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+        formatted_new = f"{temp_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+        print(f"  Schritt {i+1}: {formatted_old} + {pct}% = {formatted_new}")
+
+    print(f"")
+    print(f"FINALER PREIS: {modified_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", "."))
+    print(f"Gesamt-Erhöhung: +{price_result['modifier_applied']:.2f}%")
+    print(f"{'='*60}\n")
+
+    return FirmWorkUnit(
+        firm_index=firm_index,
+        firm_name=firm_name,
+        firm=firm,
+        rotated_products=rotated_products,
+        price_result=price_result,
+    )
+
+
+def _rotation_state(used_brands: set, used_models: dict) -> tuple:
+    """Vergleichbarer Schnappschuss der bisher verwendeten Marken/Modelle."""
+    return (
+        frozenset(used_brands),
+        frozenset(
+            (category, frozenset(models))
+            for category, models in used_models.items()
+            if models
+        ),
+    )
+
+
+def _register_used_products(rotated_products: dict, used_brands: set, used_models: dict) -> None:
+    """Merkt verwendete Marken/Modelle für die Rotation der nächsten Firma."""
+    from product_rotation_engine import track_used_brands, track_used_models
+
+    used_brands.update(track_used_brands(rotated_products))
+
+    for category, models in track_used_models(rotated_products).items():
+        if category not in used_models:
+            used_models[category] = set()
+        used_models[category].update(models)
+
+
+def _render_firm_offer(
+    unit: FirmWorkUnit,
+    project_data: dict,
+    analysis_results: dict,
+    additional_pdf: bytes | None = None,
+) -> bytes | None:
+    """Schritte 3-4: Dynamic Data aufbauen und PDF erzeugen.
+
+    Arbeitet ausschließlich auf den übergebenen Daten und kann daher auch in
+    einem Worker-Prozess laufen.
+    """
+    firm = unit.firm
+    firm_name = unit.firm_name
+    rotated_products = unit.rotated_products
+    modified_price = unit.price_result['modified_price']
+
+    # 3. Baue Dynamic Data mit rotierten Produkten
+    print(f"\n[3/4] Dynamic Data erstellen...")
+
+    # ═══════════════════════════════════════════════════════════════════════
+    # WICHTIG: Überschreibe Produkte IN project_data VOR build_dynamic_data()!
+    # ═══════════════════════════════════════════════════════════════════════
+
+    # Erstelle modifizierte Kopie von project_data mit rotierten Produkten
+    modified_project_data = project_data.copy() if project_data else {}
+    if 'project_details' not in modified_project_data:
+        modified_project_data['project_details'] = {}
+
+    # PV-Modul überschreiben
+    pv_module = rotated_products.get('pv_modules', {})
+    if pv_module:
+        module_name = pv_module.get('model_name', pv_module.get('name', ''))
+        module_brand = pv_module.get('brand', pv_module.get('manufacturer', ''))
+        if module_name:
+            modified_project_data['project_details']['selected_module_name'] = module_name
+            modified_project_data['project_details']['module_model'] = module_name
+            print(f"   → PV-Modul in project_data: {module_name}")
+        if module_brand:
+            modified_project_data['project_details']['module_manufacturer'] = module_brand
+
+    # Wechselrichter überschreiben
+    inverter = rotated_products.get('inverters', {})
+    if inverter:
+        inverter_name = inverter.get('model_name', inverter.get('name', ''))
+        inverter_brand = inverter.get('brand', inverter.get('manufacturer', ''))
+        if inverter_name:
+            modified_project_data['project_details']['selected_inverter_name'] = inverter_name
+            modified_project_data['project_details']['inverter_model'] = inverter_name
+            print(f"   → Wechselrichter in project_data: {inverter_name}")
+        if inverter_brand:
+            modified_project_data['project_details']['inverter_manufacturer'] = inverter_brand
+
+    # Batteriespeicher überschreiben
+    battery = rotated_products.get('battery_storage', {})
+    if battery:
+        battery_name = battery.get('model_name', battery.get('name', ''))
+        battery_brand = battery.get('brand', battery.get('manufacturer', ''))
+        if battery_name:
+            modified_project_data['project_details']['selected_storage_name'] = battery_name
+            modified_project_data['project_details']['battery_model'] = battery_name
+            modified_project_data['project_details']['storage_model'] = battery_name
+            print(f"   → Speicher in project_data: {battery_name}")
+        if battery_brand:
+            modified_project_data['project_details']['battery_manufacturer'] = battery_brand
+            modified_project_data['project_details']['storage_manufacturer'] = battery_brand
+
+    # Erstelle modifizierte analysis_results mit neuem Preis
+    modified_analysis = analysis_results.copy() if analysis_results else {}
+
+    # WICHTIG: Setze alle möglichen Preis-Keys mit modifiziertem Preis
+    modified_analysis['total_price'] = modified_price
+    modified_analysis['FINAL_END_PREIS'] = modified_price
+    modified_analysis['final_end_preis'] = modified_price
+    modified_analysis['endpreis'] = modified_price
+    modified_analysis['gesamtpreis'] = modified_price
+    modified_analysis['total_cost'] = modified_price
+
+    # Formatierter Preis (z.B. "19.550,00 €")
+    formatted_price = f"{modified_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+    modified_analysis['FINAL_END_PREIS_FORMATTED'] = formatted_price
+    modified_analysis['final_end_preis_formatted'] = formatted_price
+
+    # Rotierte Produkte speichern
+    modified_analysis['rotated_products'] = rotated_products
+
+    # Firmen-Info kopieren und erweitern
+    multi_company_info = firm.copy()
+
+    print(f"✓ Modifizierter Preis in analysis_results: {modified_price:.2f}€")
+    print(f"✓ Formatierter Preis: {formatted_price}")
+
+    # Baue Dynamic Data mit modifizierten Daten
+    try:
+        from pdf_template_engine.placeholders import build_dynamic_data
+
+        multi_dynamic_data = build_dynamic_data(
+            project_data=modified_project_data,  # ← MIT ROTIERTEN PRODUKTEN!
+            analysis_results=modified_analysis,  # Mit modifiziertem Preis!
+            company_info=multi_company_info
+        )
+
+        print(f"✓ Dynamic Data: {len(multi_dynamic_data)} Einträge")
+
+        # ═══════════════════════════════════════════════════════════════════════
+        # KRITISCH: Überschreibe ALLE ABHÄNGIGEN WERTE nach Preis-Änderung!
+        # ═══════════════════════════════════════════════════════════════════════
+
+        # 1. NETTO-PREIS (Brutto / 1.19)
+        netto_price = modified_price / 1.19
+        formatted_netto = f"{netto_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+
+        # 2. MEHRWERTSTEUER (19% vom Netto)
+        mwst_betrag = modified_price - netto_price
+        formatted_mwst = f"{mwst_betrag:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+
+        # 3. AMORTISATIONSZEIT (Investment / Jahresersparnis)
+        # ⚠️ WICHTIG: yearly_savings wird weiter unten neu berechnet!
+        # Nutze erstmal den Wert aus analysis_results als Fallback
+        yearly_savings_fallback = analysis_results.get('yearly_savings', 0) or analysis_results.get('savings_year_1', 0)
+
+        if yearly_savings_fallback > 0:
+            amortisation_years = modified_price / yearly_savings_fallback
+            formatted_amortisation = f"{amortisation_years:.1f}".replace(".", ",")
+        else:
+            amortisation_years = 0
+            formatted_amortisation = "0,0"
+
+        # 4. ÜBERSCHREIBE ALLE PREIS-KEYS
+        multi_dynamic_data['FINAL_END_PREIS'] = f"{modified_price:.2f}"
+        multi_dynamic_data['FINAL_END_PREIS_FORMATTED'] = formatted_price
+        multi_dynamic_data['final_end_preis'] = f"{modified_price:.2f}"
+        multi_dynamic_data['final_end_preis_formatted'] = formatted_price
+
+        # 5. ÜBERSCHREIBE NETTO-PREIS
+        multi_dynamic_data['FINAL_END_PREIS_NETTO'] = f"{netto_price:.2f}"
+        multi_dynamic_data['final_end_preis_netto'] = formatted_netto
+        multi_dynamic_data['simple_endergebnis_netto'] = f"{netto_price:.2f}"
+        multi_dynamic_data['simple_endergebnis_netto_formatted'] = formatted_netto
+
+        # 6. ÜBERSCHREIBE BRUTTO-PREIS (= modified_price)
+        multi_dynamic_data['SIMPLE_ENDERGEBNIS_BRUTTO'] = f"{modified_price:.2f}"
+        multi_dynamic_data['simple_endergebnis_brutto'] = f"{modified_price:.2f}"
+        multi_dynamic_data['simple_endergebnis_brutto_formatted'] = formatted_price
+
+        # 7. ÜBERSCHREIBE MEHRWERTSTEUER
+        multi_dynamic_data['SIMPLE_MWST'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['SIMPLE_MWST_FORMATTED'] = formatted_mwst
+        multi_dynamic_data['simple_mwst_formatted'] = formatted_mwst
+        multi_dynamic_data['MWST_IN_ZWISCHENSUMME'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['MWST_IN_ZWISCHENSUMME_FORMATTED'] = formatted_mwst
+        multi_dynamic_data['mwst_in_zwischensumme'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['mwst_in_zwischensumme_formatted'] = formatted_mwst
+        multi_dynamic_data['FINAL_MWST_IN_ZWISCHENSUMME'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['FINAL_MWST_IN_ZWISCHENSUMME_FORMATTED'] = formatted_mwst
+        multi_dynamic_data['final_mwst_in_zwischensumme'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['final_mwst_in_zwischensumme_formatted'] = formatted_mwst
+
+        # SEITE 8 Keys (Preistabelle)
+        multi_dynamic_data['preis_mit_mwst'] = f"{modified_price:.2f}"
+        multi_dynamic_data['preis_mit_mwst_formatted'] = formatted_price
+        multi_dynamic_data['minus_mwst'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['minus_mwst_formatted'] = formatted_mwst
+
+        # SEITE 2 Keys (ersparte Mehrwertsteuer)
+        multi_dynamic_data['ersparte_mehrwertsteuer'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['ersparte_mehrwertsteuer_formatted'] = formatted_mwst
+        multi_dynamic_data['ERSPARTE_MEHRWERTSTEUER'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['ERSPARTE_MEHRWERTSTEUER_FORMATTED'] = formatted_mwst
+        multi_dynamic_data['vat_savings'] = f"{mwst_betrag:.2f}"
+        multi_dynamic_data['vat_savings_formatted'] = formatted_mwst
+        multi_dynamic_data['vat_amount_eur'] = formatted_mwst
+
+        # 8. ÜBERSCHREIBE AMORTISATIONSZEIT
+        multi_dynamic_data['amortisation_time'] = formatted_amortisation
+        multi_dynamic_data['AMORTISATION_TIME'] = formatted_amortisation
+        multi_dynamic_data['payback_period'] = formatted_amortisation
+
+        # ═══════════════════════════════════════════════════════════════════════
+        # 9. ÜBERSCHREIBE ERTRÄGE/EINSPARUNGEN (basierend auf neuem Preis)
+        # ═══════════════════════════════════════════════════════════════════════
+
+        # Hole jährliche Stromproduktion und andere Basis-Werte aus analysis_results
+        jahresproduktion_kwh = analysis_results.get('yearly_production_kwh', 0) or analysis_results.get('jahresproduktion_kwh', 0)
+        eigenverbrauch_pct = analysis_results.get('self_consumption_percent', 0) or analysis_results.get('eigenverbrauch_quote_%', 0)
+
+        # Versuche eigenverbrauch als float zu parsen (falls String mit %)
+        if isinstance(eigenverbrauch_pct, str):
+            eigenverbrauch_pct = float(eigenverbrauch_pct.replace('%', '').replace(',', '.').strip()) if eigenverbrauch_pct else 0
+
+        # Einspeisetarif (€/kWh)
+        einspeisetarif = analysis_results.get('feed_in_tariff_eur_per_kwh', 0.082)  # Default 8,2 Cent
+
+        # Strompreis (€/kWh)
+        strompreis = analysis_results.get('electricity_cost_eur_per_kwh', 0.30)  # Default 30 Cent
+
+        if jahresproduktion_kwh > 0:
+            # Eigenverbrauch in kWh
+            eigenverbrauch_kwh = jahresproduktion_kwh * (eigenverbrauch_pct / 100)
+
+            # Einspeisung in kWh
+            einspeisung_kwh = jahresproduktion_kwh - eigenverbrauch_kwh
+
+            # Einsparung durch Direktverbrauch (€)
+            einsparung_direkt = eigenverbrauch_kwh * strompreis
+            formatted_einsparung_direkt = f"{einsparung_direkt:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+
+            # Einnahmen aus Einspeisevergütung (€)
+            einnahmen_einspeisung = einspeisung_kwh * einspeisetarif
+            formatted_einnahmen = f"{einnahmen_einspeisung:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+
+            # Vorteile durch steuerfreie Einspeisung (19% MwSt auf Eigenverbrauch)
+            # Dies ist die ersparte MwSt auf selbst verbrauchten Strom
+            steuerfreie_vorteile = einsparung_direkt * 0.19
+            formatted_steuerfreie = f"{steuerfreie_vorteile:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+
+            # Gesamt Erträge pro Jahr
+            gesamt_ertrag = einsparung_direkt + einnahmen_einspeisung + steuerfreie_vorteile
+            formatted_gesamt = f"{gesamt_ertrag:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
+
+            # Überschreibe Keys
+            multi_dynamic_data['einsparung_direktverbrauch'] = f"{einsparung_direkt:.2f}"
+            multi_dynamic_data['einsparung_direktverbrauch_formatted'] = formatted_einsparung_direkt
+            multi_dynamic_data['savings_self_consumption'] = f"{einsparung_direkt:.2f}"
+            multi_dynamic_data['savings_self_consumption_formatted'] = formatted_einsparung_direkt
+
+            multi_dynamic_data['einnahmen_einspeisung'] = f"{einnahmen_einspeisung:.2f}"
+            multi_dynamic_data['einnahmen_einspeisung_formatted'] = formatted_einnahmen
+            multi_dynamic_data['feed_in_revenue'] = f"{einnahmen_einspeisung:.2f}"
+            multi_dynamic_data['feed_in_revenue_formatted'] = formatted_einnahmen
+            multi_dynamic_data['annual_feed_in_revenue_eur'] = formatted_einnahmen
+
+            multi_dynamic_data['steuerfreie_vorteile'] = f"{steuerfreie_vorteile:.2f}"
+            multi_dynamic_data['steuerfreie_vorteile_formatted'] = formatted_steuerfreie
+            multi_dynamic_data['tax_free_benefits'] = f"{steuerfreie_vorteile:.2f}"
+            multi_dynamic_data['tax_free_benefits_formatted'] = formatted_steuerfreie
+
+            multi_dynamic_data['gesamt_ertrag_jahr'] = f"{gesamt_ertrag:.2f}"
+            multi_dynamic_data['gesamt_ertrag_jahr_formatted'] = formatted_gesamt
+            multi_dynamic_data['total_annual_revenue'] = f"{gesamt_ertrag:.2f}"
+            multi_dynamic_data['total_annual_revenue_formatted'] = formatted_gesamt
+            multi_dynamic_data['yearly_savings'] = f"{gesamt_ertrag:.2f}"
+
+            print(f"   → Eigenverbrauch: {eigenverbrauch_kwh:.0f} kWh, Einspeisung: {einspeisung_kwh:.0f} kWh")
+            print(f"   → Einsparung Direkt: {formatted_einsparung_direkt}")
+            print(f"   → Einnahmen Einspeisung: {formatted_einnahmen}")
+            print(f"   → Steuerfreie Vorteile: {formatted_steuerfreie}")
+            print(f"   → Gesamt Ertrag/Jahr: {formatted_gesamt}")
+
+            # ═══════════════════════════════════════════════════════════════════════
+            # AMORTISATIONSZEIT NEU BERECHNEN (mit neuem Gesamt-Ertrag)
+            # ═══════════════════════════════════════════════════════════════════════
+            if gesamt_ertrag > 0:
+                amortisation_years_neu = modified_price / gesamt_ertrag
+                formatted_amortisation_neu = f"{amortisation_years_neu:.1f}".replace(".", ",")
+
+                # Überschreibe Amortisations-Keys mit neuem Wert
+                multi_dynamic_data['amortisation_jahre'] = f"{amortisation_years_neu:.1f}"
+                multi_dynamic_data['amortisation_jahre_formatted'] = formatted_amortisation_neu
+                multi_dynamic_data['AMORTISATION_JAHRE_FORMATTED'] = formatted_amortisation_neu
+                multi_dynamic_data['amortisation_years'] = f"{amortisation_years_neu:.1f}"
+                multi_dynamic_data['payback_period_years'] = f"{amortisation_years_neu:.1f}"
+
+                print(f"   → Amortisation NEU: {formatted_amortisation_neu} Jahre (basierend auf Gesamt-Ertrag)")
+
+
+        # ═══════════════════════════════════════════════════════════════════════
+        # 9. ÜBERSCHREIBE PRODUKT-NAMEN (aus rotierten Produkten)
+        # ═══════════════════════════════════════════════════════════════════════
+
+        # PV-Modul
+        pv_module = rotated_products.get('pv_modules', {})
+        if pv_module:
+            module_name = pv_module.get('model_name', pv_module.get('name', ''))
+            module_brand = pv_module.get('brand', pv_module.get('manufacturer', ''))
+            module_capacity = pv_module.get('capacity_w', pv_module.get('power_wp', 0))
+
+            if module_name:
+                multi_dynamic_data['module_model'] = module_name
+                multi_dynamic_data['MODULE_MODEL'] = module_name
+                multi_dynamic_data['pv_module_name'] = module_name
+
+            if module_brand:
+                multi_dynamic_data['module_manufacturer'] = module_brand
+                multi_dynamic_data['MODULE_MANUFACTURER'] = module_brand
+
+            if module_capacity:
+                multi_dynamic_data['module_capacity_w'] = str(module_capacity)
+                multi_dynamic_data['MODULE_CAPACITY_W'] = str(module_capacity)
+
+        # Wechselrichter
+        inverter = rotated_products.get('inverters', {})
+        if inverter:
+            inverter_name = inverter.get('model_name', inverter.get('name', ''))
+            inverter_brand = inverter.get('brand', inverter.get('manufacturer', ''))
+
+            if inverter_name:
+                multi_dynamic_data['inverter_model'] = inverter_name
+                multi_dynamic_data['INVERTER_MODEL'] = inverter_name
+                multi_dynamic_data['inverter_name'] = inverter_name
+
+            if inverter_brand:
+                multi_dynamic_data['inverter_manufacturer'] = inverter_brand
+                multi_dynamic_data['INVERTER_MANUFACTURER'] = inverter_brand
+
+        # Batteriespeicher
+        battery = rotated_products.get('battery_storage', {})
+        if battery:
+            battery_name = battery.get('model_name', battery.get('name', ''))
+            battery_brand = battery.get('brand', battery.get('manufacturer', ''))
+            battery_capacity = battery.get('capacity_kwh', 0)
+
+            if battery_name:
+                multi_dynamic_data['battery_model'] = battery_name
+                multi_dynamic_data['BATTERY_MODEL'] = battery_name
+                multi_dynamic_data['storage_name'] = battery_name
+
+            if battery_brand:
+                multi_dynamic_data['battery_manufacturer'] = battery_brand
+                multi_dynamic_data['BATTERY_MANUFACTURER'] = battery_brand
+
+            if battery_capacity:
+                multi_dynamic_data['battery_capacity_kwh'] = str(battery_capacity)
+                multi_dynamic_data['BATTERY_CAPACITY_KWH'] = str(battery_capacity)
+
+        # Debug-Ausgabe
+        print(f"")
+        print(f"{'='*70}")
+        print(f"ÜBERSCHRIEBENE WERTE FÜR {firm_name.upper()}:")
+        print(f"{'='*70}")
+        print(f"✓ Brutto-Preis:    {formatted_price}")
+        print(f"✓ Netto-Preis:     {formatted_netto}")
+        print(f"✓ Mehrwertsteuer:  {formatted_mwst}")
+        print(f"✓ Amortisation:    {formatted_amortisation} Jahre")
+        if pv_module:
+            print(f"✓ PV-Modul:        {pv_module.get('model_name', pv_module.get('name', ''))}")
+        if inverter:
+            print(f"✓ Wechselrichter:  {inverter.get('model_name', inverter.get('name', ''))}")
+        if battery:
+            print(f"✓ Speicher:        {battery.get('model_name', battery.get('name', ''))}")
+        print(f"{'='*70}")
+        print(f"")
+
+    except Exception as e:
+        print(f"ERROR: build_dynamic_data() fehlgeschlagen: {e}")
+        import traceback
+        traceback.print_exc()
+
+        # Fallback: Minimal Dynamic Data mit Preis
+        multi_dynamic_data = {
+            'firma_name': firm_name,
+            'FINAL_END_PREIS': f"{modified_price:.2f}",
+            'FINAL_END_PREIS_FORMATTED': formatted_price,
+            'final_end_preis': f"{modified_price:.2f}",
+            'final_end_preis_formatted': formatted_price,
+        }
+
+    # 4. Generiere PDF mit Standard-Templates aber modifizierten Daten
+    print(f"\n[4/4] PDF-Generierung...")
+
+    # VERWENDE STANDARD generate_custom_offer_pdf() mit modifizierten Daten!
+    # Keine firma-spezifischen Templates nötig - Dynamic Data enthält alle Unterschiede
+
+    try:
+        # Berechne Pfade relativ zum Projekt-Root (ein Level über pdf_template_engine/)
+        base_dir = Path(__file__).parent.parent
+        coords_dir = base_dir / "coords"
+        bg_dir = base_dir / "pdf_templates_static" / "notext"
+
+        pdf_bytes = generate_custom_offer_pdf(
+            coords_dir=coords_dir,
+            bg_dir=bg_dir,
+            dynamic_data=multi_dynamic_data,
+            additional_pdf=additional_pdf
+        )
+
+        if not pdf_bytes:
+            print(f"ERROR: PDF-Generierung fehlgeschlagen für {firm_name}")
+            return None
+
+        print(f"✓ PDF generiert: {len(pdf_bytes)} bytes")
+
+        # ZEIGE FINALEN PREIS DER IN PDF IST
+        final_price_in_pdf = multi_dynamic_data.get('FINAL_END_PREIS_FORMATTED')
+        print(f"")
+        print(f"{'*'*60}")
+        print(f"✅ PREIS IN PDF VON {firm_name.upper()}: {final_price_in_pdf}")
+        print(f"{'*'*60}")
+        print(f"")
+
+    except Exception as pdf_error:
+        print(f"ERROR: PDF-Generierung fehlgeschlagen: {pdf_error}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+    return pdf_bytes
+
+
+# Prozess-lokale Daten der Worker (einmal pro Worker statt pro Firma gepickelt)
+_MULTI_OFFER_WORKER_STATE: dict[str, Any] = {}
+
+
+def _init_multi_offer_worker(
+    project_data: dict,
+    analysis_results: dict,
+    additional_pdf: bytes | None,
+    session_snapshot: dict | None = None,
+) -> None:
+    _MULTI_OFFER_WORKER_STATE.update(
+        project_data=project_data,
+        analysis_results=analysis_results,
+        additional_pdf=additional_pdf,
+    )
+    if session_snapshot is not None:
+        # Worker (spawn) sehen keinen Streamlit-Session-State des Hauptprozesses
+        from pdf_template_engine.placeholders import use_session_snapshot
+
+        use_session_snapshot(session_snapshot)
+
+
+def _render_firm_offer_in_worker(unit: FirmWorkUnit) -> bytes | None:
+    try:
+        return _render_firm_offer(
+            unit,
+            _MULTI_OFFER_WORKER_STATE["project_data"],
+            _MULTI_OFFER_WORKER_STATE["analysis_results"],
+            _MULTI_OFFER_WORKER_STATE["additional_pdf"],
+        )
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def _create_multi_offer_progress(total: int) -> Any:
+    """Ladebalken aus components.progress_manager (No-Op ohne Streamlit)."""
+    try:
+        from components.progress_manager import ProgressBarNoOp, create_progress_bar, _is_session_alive
+
+        if not _is_session_alive():
+            return ProgressBarNoOp("multi_offer", "Multi-PDF")
+        bar = create_progress_bar(f"Multi-PDF: 0/{total} Firmen")
+        bar.set_max(max(total, 1))
+        return bar
+    except Exception:
+        return None
+
+
 def generate_multi_offer_pdfs(
     selected_firms: list,
     standard_products: dict,
@@ -2974,10 +3510,13 @@ def generate_multi_offer_pdfs(
     progression_pct: float = 5.0,
     pdf_options: dict | None = None,
     additional_pdf: bytes | None = None,
+    parallel: bool = False,
+    max_workers: int | None = None,
+    mp_context: Any = None,
 ) -> list[tuple[str, bytes]]:
     """
     Generiere Multiple PDFs für verschiedene Firmen mit rotierenden Produkten
-    
+
     Args:
         selected_firms: Liste von Firmen-Dicts aus Firmendatenbank
         standard_products: {category: product_dict} vom Standard-Angebot
@@ -2989,522 +3528,218 @@ def generate_multi_offer_pdfs(
         progression_pct: Progressive Aufschlag-Steigerung pro Firma
         pdf_options: Optional - PDF-Inhaltsoptionen aus UI
         additional_pdf: Optional zusätzliche PDF-Seiten
-    
+        parallel: PDF-Erzeugung auf einen ProcessPoolExecutor verteilen.
+            Rotation und Preis-Kaskadierung werden vorab in Firmen-Reihenfolge
+            berechnet, die Ergebnisliste behält die Reihenfolge bei.
+        max_workers: Anzahl Worker-Prozesse (Standard: min(Firmen, CPUs))
+        mp_context: Optional multiprocessing-Kontext der Worker
+            (z.B. ``multiprocessing.get_context("spawn")``)
+
     Returns:
         Liste von (firmenname, pdf_bytes) Tupeln
     """
-    from product_rotation_engine import rotate_products, track_used_brands, track_used_models
-    from price_modification_engine import calculate_price_with_products
-    
+    from product_rotation_engine import track_used_brands, track_used_models
+
     print(f"\n{'='*80}")
-    print(f"MULTI-PDF GENERIERUNG: {len(selected_firms)} Firmen")
+    print(f"MULTI-PDF GENERIERUNG: {len(selected_firms)} Firmen"
+          f"{' (parallel)' if parallel else ''}")
     print(f"{'='*80}\n")
-    
+
     results = []
     used_brands = track_used_brands(standard_products)
     used_models = track_used_models(standard_products)
-    
+
     print(f"Standard-Angebot verwendet Marken: {used_brands}")
     print(f"Standard-Angebot verwendet Modelle: {used_models}")
-    
-    for firm_index, firm in enumerate(selected_firms):
-        firm_name = firm.get('name') or firm.get('Name') or f"Firma_{firm_index + 1}"
-        
-        print(f"\n{'-'*80}")
-        print(f"Firma {firm_index + 1}/{len(selected_firms)}: {firm_name}")
-        print(f"{'-'*80}")
-        
-        try:
-            # 1. Rotiere Produkte für diese Firma
-            print(f"\n[1/4] Produkt-Rotation...")
-            rotated_products = rotate_products(
-                standard_products=standard_products,
-                used_brands=used_brands,
-                firm_index=firm_index,
-                used_models=used_models
-            )
-            
-            if not rotated_products or len(rotated_products) == 0:
-                print(f"⚠️ Produkt-Rotation fehlgeschlagen - nutze STANDARD-PRODUKTE als Fallback")
-                rotated_products = standard_products.copy()
-            
-            print(f"✓ {len(rotated_products)} Produkte für Firma {firm_index + 1}")
-            
-            # Debug: Zeige rotierte Produkte
-            if rotated_products.get('pv_modules'):
-                pv_name = rotated_products['pv_modules'].get('model_name', rotated_products['pv_modules'].get('name', 'N/A'))
-                print(f"   → PV-Modul: {pv_name}")
-            if rotated_products.get('inverters'):
-                inv_name = rotated_products['inverters'].get('model_name', rotated_products['inverters'].get('name', 'N/A'))
-                print(f"   → Wechselrichter: {inv_name}")
-            if rotated_products.get('battery_storage'):
-                bat_name = rotated_products['battery_storage'].get('model_name', rotated_products['battery_storage'].get('name', 'N/A'))
-                print(f"   → Speicher: {bat_name}")
-            
-            # 2. Berechne Preis mit Modifikation
-            print(f"\n[2/4] Preisberechnung...")
-            
-            # ✅ Basis-Preis aus project_data holen (nicht neu berechnen!)
-            base_price_from_project = project_data.get('project_details', {}).get('final_offer_price_net', 0)
-            
-            if base_price_from_project == 0:
-                print(f"⚠️ WARNUNG: Basis-Preis ist 0! Prüfe project_data!")
-                print(f"   Verfügbare Keys: {list(project_data.get('project_details', {}).keys())}")
-            
-            price_result = calculate_price_with_products(
-                products=rotated_products,
-                analysis_results=analysis_results,
-                profit_margin=profit_margin,
-                modifier_pct=modifier_pct,
-                firm_index=firm_index,
-                progression_pct=progression_pct,
-                base_price_override=base_price_from_project  # ← NEU: Override!
-            )
-            
-            modified_price = price_result['modified_price']
-            base_price = price_result['base_price']
-            
-            # KASKADIERUNGS-BEWEIS ausgeben
-            print(f"\n{'='*60}")
-            print(f"KASKADIERUNGS-BERECHNUNG FÜR {firm_name.upper()}")
-            print(f"{'='*60}")
-            print(f"Basis-Preis (Haupt-PDF): {base_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", "."))
-            print(f"Firma-Index: {firm_index}")
-            print(f"Modifier (Firma 1): {modifier_pct}%")
-            print(f"Progression (weitere): {progression_pct}%")
-            print(f"")
-            
-            # Zeige Kaskadierungs-Schritte
-            temp_price = base_price
-            for i in range(firm_index + 1):
-                pct = modifier_pct if i == 0 else progression_pct
-                old_price = temp_price
-                temp_price = temp_price * (1 + pct / 100)
-                formatted_old = f"{old_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-                formatted_new = f"{temp_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-                print(f"  Schritt {i+1}: {formatted_old} + {pct}% = {formatted_new}")
-            
-            print(f"")
-            print(f"FINALER PREIS: {modified_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", "."))
-            print(f"Gesamt-Erhöhung: +{price_result['modifier_applied']:.2f}%")
-            print(f"{'='*60}\n")
-            
-            # 3. Baue Dynamic Data mit rotierten Produkten
-            print(f"\n[3/4] Dynamic Data erstellen...")
-            
-            # ═══════════════════════════════════════════════════════════════════════
-            # WICHTIG: Überschreibe Produkte IN project_data VOR build_dynamic_data()!
-            # ═══════════════════════════════════════════════════════════════════════
-            
-            # Erstelle modifizierte Kopie von project_data mit rotierten Produkten
-            modified_project_data = project_data.copy() if project_data else {}
-            if 'project_details' not in modified_project_data:
-                modified_project_data['project_details'] = {}
-            
-            # PV-Modul überschreiben
-            pv_module = rotated_products.get('pv_modules', {})
-            if pv_module:
-                module_name = pv_module.get('model_name', pv_module.get('name', ''))
-                module_brand = pv_module.get('brand', pv_module.get('manufacturer', ''))
-                if module_name:
-                    modified_project_data['project_details']['selected_module_name'] = module_name
-                    modified_project_data['project_details']['module_model'] = module_name
-                    print(f"   → PV-Modul in project_data: {module_name}")
-                if module_brand:
-                    modified_project_data['project_details']['module_manufacturer'] = module_brand
-            
-            # Wechselrichter überschreiben
-            inverter = rotated_products.get('inverters', {})
-            if inverter:
-                inverter_name = inverter.get('model_name', inverter.get('name', ''))
-                inverter_brand = inverter.get('brand', inverter.get('manufacturer', ''))
-                if inverter_name:
-                    modified_project_data['project_details']['selected_inverter_name'] = inverter_name
-                    modified_project_data['project_details']['inverter_model'] = inverter_name
-                    print(f"   → Wechselrichter in project_data: {inverter_name}")
-                if inverter_brand:
-                    modified_project_data['project_details']['inverter_manufacturer'] = inverter_brand
-            
-            # Batteriespeicher überschreiben
-            battery = rotated_products.get('battery_storage', {})
-            if battery:
-                battery_name = battery.get('model_name', battery.get('name', ''))
-                battery_brand = battery.get('brand', battery.get('manufacturer', ''))
-                if battery_name:
-                    modified_project_data['project_details']['selected_storage_name'] = battery_name
-                    modified_project_data['project_details']['battery_model'] = battery_name
-                    modified_project_data['project_details']['storage_model'] = battery_name
-                    print(f"   → Speicher in project_data: {battery_name}")
-                if battery_brand:
-                    modified_project_data['project_details']['battery_manufacturer'] = battery_brand
-                    modified_project_data['project_details']['storage_manufacturer'] = battery_brand
-            
-            # Erstelle modifizierte analysis_results mit neuem Preis
-            modified_analysis = analysis_results.copy() if analysis_results else {}
-            
-            # WICHTIG: Setze alle möglichen Preis-Keys mit modifiziertem Preis
-            modified_analysis['total_price'] = modified_price
-            modified_analysis['FINAL_END_PREIS'] = modified_price
-            modified_analysis['final_end_preis'] = modified_price
-            modified_analysis['endpreis'] = modified_price
-            modified_analysis['gesamtpreis'] = modified_price
-            modified_analysis['total_cost'] = modified_price
-            
-            # Formatierter Preis (z.B. "19.550,00 €")
-            formatted_price = f"{modified_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-            modified_analysis['FINAL_END_PREIS_FORMATTED'] = formatted_price
-            modified_analysis['final_end_preis_formatted'] = formatted_price
-            
-            # Rotierte Produkte speichern
-            modified_analysis['rotated_products'] = rotated_products
-            
-            # Firmen-Info kopieren und erweitern
-            multi_company_info = firm.copy()
-            
-            print(f"✓ Modifizierter Preis in analysis_results: {modified_price:.2f}€")
-            print(f"✓ Formatierter Preis: {formatted_price}")
-            
-            # Baue Dynamic Data mit modifizierten Daten
+
+    progress_bar = _create_multi_offer_progress(len(selected_firms))
+    completed_firms = 0
+
+    def _report_progress(firm_name: str) -> None:
+        nonlocal completed_firms
+        completed_firms += 1
+        if progress_bar is not None:
             try:
-                from pdf_template_engine.placeholders import build_dynamic_data
-                
-                multi_dynamic_data = build_dynamic_data(
-                    project_data=modified_project_data,  # ← MIT ROTIERTEN PRODUKTEN!
-                    analysis_results=modified_analysis,  # Mit modifiziertem Preis!
-                    company_info=multi_company_info
+                progress_bar.update(
+                    completed_firms,
+                    f"Multi-PDF: {completed_firms}/{len(selected_firms)} Firmen ({firm_name})",
                 )
-                
-                print(f"✓ Dynamic Data: {len(multi_dynamic_data)} Einträge")
-                
-                # ═══════════════════════════════════════════════════════════════════════
-                # KRITISCH: Überschreibe ALLE ABHÄNGIGEN WERTE nach Preis-Änderung!
-                # ═══════════════════════════════════════════════════════════════════════
-                
-                # 1. NETTO-PREIS (Brutto / 1.19)
-                netto_price = modified_price / 1.19
-                formatted_netto = f"{netto_price:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-                
-                # 2. MEHRWERTSTEUER (19% vom Netto)
-                mwst_betrag = modified_price - netto_price
-                formatted_mwst = f"{mwst_betrag:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-                
-                # 3. AMORTISATIONSZEIT (Investment / Jahresersparnis)
-                # ⚠️ WICHTIG: yearly_savings wird weiter unten neu berechnet!
-                # Nutze erstmal den Wert aus analysis_results als Fallback
-                yearly_savings_fallback = analysis_results.get('yearly_savings', 0) or analysis_results.get('savings_year_1', 0)
-                
-                if yearly_savings_fallback > 0:
-                    amortisation_years = modified_price / yearly_savings_fallback
-                    formatted_amortisation = f"{amortisation_years:.1f}".replace(".", ",")
+            except Exception:
+                pass
+
+    def _report_firm_error(firm_name: str, e: Exception) -> None:
+        print(f"\n{'!'*80}")
+        print(f"❌ FEHLER BEI FIRMA {firm_name.upper()}")
+        print(f"{'!'*80}")
+        print(f"Fehler-Typ: {type(e).__name__}")
+        print(f"Fehler-Nachricht: {str(e)}")
+        print(f"\nSTACKTRACE:")
+        import traceback
+        traceback.print_exc()
+        print(f"{'!'*80}\n")
+
+    if parallel and len(selected_firms) > 1:
+        import os
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        from pdf_template_engine.placeholders import snapshot_session_inputs
+
+        workers = max_workers or min(len(selected_firms), os.cpu_count() or 1)
+        with ProcessPoolExecutor(
+            max_workers=max(workers, 1),
+            mp_context=mp_context,
+            initializer=_init_multi_offer_worker,
+            initargs=(project_data, analysis_results, additional_pdf,
+                      snapshot_session_inputs()),
+        ) as executor:
+            # 1. Reihenfolgeabhängige Schritte vorab (Rotation, Kaskadierung),
+            #    vorläufig unter der Annahme, dass alle PDFs gelingen. Gemerkt
+            #    wird je Firma der Rotationszustand, mit dem sie vorbereitet wurde.
+            tentative_brands = set(used_brands)
+            tentative_models = {
+                category: set(models) for category, models in used_models.items()}
+            prepared: list[tuple[tuple, FirmWorkUnit | None]] = []
+            for firm_index, firm in enumerate(selected_firms):
+                firm_name = _firm_display_name(firm, firm_index)
+                print(f"\n{'-'*80}")
+                print(f"Firma {firm_index + 1}/{len(selected_firms)}: {firm_name} (Vorbereitung)")
+                print(f"{'-'*80}")
+                state = _rotation_state(tentative_brands, tentative_models)
+                try:
+                    unit = _prepare_firm_work_unit(
+                        firm_index, firm, standard_products, tentative_brands,
+                        tentative_models, project_data, analysis_results,
+                        profit_margin, modifier_pct, progression_pct,
+                    )
+                except Exception as e:
+                    _report_firm_error(firm_name, e)
+                    unit = None
                 else:
-                    amortisation_years = 0
-                    formatted_amortisation = "0,0"
-                
-                # 4. ÜBERSCHREIBE ALLE PREIS-KEYS
-                multi_dynamic_data['FINAL_END_PREIS'] = f"{modified_price:.2f}"
-                multi_dynamic_data['FINAL_END_PREIS_FORMATTED'] = formatted_price
-                multi_dynamic_data['final_end_preis'] = f"{modified_price:.2f}"
-                multi_dynamic_data['final_end_preis_formatted'] = formatted_price
-                
-                # 5. ÜBERSCHREIBE NETTO-PREIS
-                multi_dynamic_data['FINAL_END_PREIS_NETTO'] = f"{netto_price:.2f}"
-                multi_dynamic_data['final_end_preis_netto'] = formatted_netto
-                multi_dynamic_data['simple_endergebnis_netto'] = f"{netto_price:.2f}"
-                multi_dynamic_data['simple_endergebnis_netto_formatted'] = formatted_netto
-                
-                # 6. ÜBERSCHREIBE BRUTTO-PREIS (= modified_price)
-                multi_dynamic_data['SIMPLE_ENDERGEBNIS_BRUTTO'] = f"{modified_price:.2f}"
-                multi_dynamic_data['simple_endergebnis_brutto'] = f"{modified_price:.2f}"
-                multi_dynamic_data['simple_endergebnis_brutto_formatted'] = formatted_price
-                
-                # 7. ÜBERSCHREIBE MEHRWERTSTEUER
-                multi_dynamic_data['SIMPLE_MWST'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['SIMPLE_MWST_FORMATTED'] = formatted_mwst
-                multi_dynamic_data['simple_mwst_formatted'] = formatted_mwst
-                multi_dynamic_data['MWST_IN_ZWISCHENSUMME'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['MWST_IN_ZWISCHENSUMME_FORMATTED'] = formatted_mwst
-                multi_dynamic_data['mwst_in_zwischensumme'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['mwst_in_zwischensumme_formatted'] = formatted_mwst
-                multi_dynamic_data['FINAL_MWST_IN_ZWISCHENSUMME'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['FINAL_MWST_IN_ZWISCHENSUMME_FORMATTED'] = formatted_mwst
-                multi_dynamic_data['final_mwst_in_zwischensumme'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['final_mwst_in_zwischensumme_formatted'] = formatted_mwst
-                
-                # SEITE 8 Keys (Preistabelle)
-                multi_dynamic_data['preis_mit_mwst'] = f"{modified_price:.2f}"
-                multi_dynamic_data['preis_mit_mwst_formatted'] = formatted_price
-                multi_dynamic_data['minus_mwst'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['minus_mwst_formatted'] = formatted_mwst
-                
-                # SEITE 2 Keys (ersparte Mehrwertsteuer)
-                multi_dynamic_data['ersparte_mehrwertsteuer'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['ersparte_mehrwertsteuer_formatted'] = formatted_mwst
-                multi_dynamic_data['ERSPARTE_MEHRWERTSTEUER'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['ERSPARTE_MEHRWERTSTEUER_FORMATTED'] = formatted_mwst
-                multi_dynamic_data['vat_savings'] = f"{mwst_betrag:.2f}"
-                multi_dynamic_data['vat_savings_formatted'] = formatted_mwst
-                multi_dynamic_data['vat_amount_eur'] = formatted_mwst
-                
-                # 8. ÜBERSCHREIBE AMORTISATIONSZEIT
-                multi_dynamic_data['amortisation_time'] = formatted_amortisation
-                multi_dynamic_data['AMORTISATION_TIME'] = formatted_amortisation
-                multi_dynamic_data['payback_period'] = formatted_amortisation
-                
-                # ═══════════════════════════════════════════════════════════════════════
-                # 9. ÜBERSCHREIBE ERTRÄGE/EINSPARUNGEN (basierend auf neuem Preis)
-                # ═══════════════════════════════════════════════════════════════════════
-                
-                # Hole jährliche Stromproduktion und andere Basis-Werte aus analysis_results
-                jahresproduktion_kwh = analysis_results.get('yearly_production_kwh', 0) or analysis_results.get('jahresproduktion_kwh', 0)
-                eigenverbrauch_pct = analysis_results.get('self_consumption_percent', 0) or analysis_results.get('eigenverbrauch_quote_%', 0)
-                
-                # Versuche eigenverbrauch als float zu parsen (falls String mit %)
-                if isinstance(eigenverbrauch_pct, str):
-                    eigenverbrauch_pct = float(eigenverbrauch_pct.replace('%', '').replace(',', '.').strip()) if eigenverbrauch_pct else 0
-                
-                # Einspeisetarif (€/kWh)
-                einspeisetarif = analysis_results.get('feed_in_tariff_eur_per_kwh', 0.082)  # Default 8,2 Cent
-                
-                # Strompreis (€/kWh)
-                strompreis = analysis_results.get('electricity_cost_eur_per_kwh', 0.30)  # Default 30 Cent
-                
-                if jahresproduktion_kwh > 0:
-                    # Eigenverbrauch in kWh
-                    eigenverbrauch_kwh = jahresproduktion_kwh * (eigenverbrauch_pct / 100)
-                    
-                    # Einspeisung in kWh
-                    einspeisung_kwh = jahresproduktion_kwh - eigenverbrauch_kwh
-                    
-                    # Einsparung durch Direktverbrauch (€)
-                    einsparung_direkt = eigenverbrauch_kwh * strompreis
-                    formatted_einsparung_direkt = f"{einsparung_direkt:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-                    
-                    # Einnahmen aus Einspeisevergütung (€)
-                    einnahmen_einspeisung = einspeisung_kwh * einspeisetarif
-                    formatted_einnahmen = f"{einnahmen_einspeisung:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-                    
-                    # Vorteile durch steuerfreie Einspeisung (19% MwSt auf Eigenverbrauch)
-                    # Dies ist die ersparte MwSt auf selbst verbrauchten Strom
-                    steuerfreie_vorteile = einsparung_direkt * 0.19
-                    formatted_steuerfreie = f"{steuerfreie_vorteile:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-                    
-                    # Gesamt Erträge pro Jahr
-                    gesamt_ertrag = einsparung_direkt + einnahmen_einspeisung + steuerfreie_vorteile
-                    formatted_gesamt = f"{gesamt_ertrag:,.2f} €".replace(",", "X").replace(".", ",").replace("X", ".")
-                    
-                    # Überschreibe Keys
-                    multi_dynamic_data['einsparung_direktverbrauch'] = f"{einsparung_direkt:.2f}"
-                    multi_dynamic_data['einsparung_direktverbrauch_formatted'] = formatted_einsparung_direkt
-                    multi_dynamic_data['savings_self_consumption'] = f"{einsparung_direkt:.2f}"
-                    multi_dynamic_data['savings_self_consumption_formatted'] = formatted_einsparung_direkt
-                    
-                    multi_dynamic_data['einnahmen_einspeisung'] = f"{einnahmen_einspeisung:.2f}"
-                    multi_dynamic_data['einnahmen_einspeisung_formatted'] = formatted_einnahmen
-                    multi_dynamic_data['feed_in_revenue'] = f"{einnahmen_einspeisung:.2f}"
-                    multi_dynamic_data['feed_in_revenue_formatted'] = formatted_einnahmen
-                    multi_dynamic_data['annual_feed_in_revenue_eur'] = formatted_einnahmen
-                    
-                    multi_dynamic_data['steuerfreie_vorteile'] = f"{steuerfreie_vorteile:.2f}"
-                    multi_dynamic_data['steuerfreie_vorteile_formatted'] = formatted_steuerfreie
-                    multi_dynamic_data['tax_free_benefits'] = f"{steuerfreie_vorteile:.2f}"
-                    multi_dynamic_data['tax_free_benefits_formatted'] = formatted_steuerfreie
-                    
-                    multi_dynamic_data['gesamt_ertrag_jahr'] = f"{gesamt_ertrag:.2f}"
-                    multi_dynamic_data['gesamt_ertrag_jahr_formatted'] = formatted_gesamt
-                    multi_dynamic_data['total_annual_revenue'] = f"{gesamt_ertrag:.2f}"
-                    multi_dynamic_data['total_annual_revenue_formatted'] = formatted_gesamt
-                    multi_dynamic_data['yearly_savings'] = f"{gesamt_ertrag:.2f}"
-                    
-                    print(f"   → Eigenverbrauch: {eigenverbrauch_kwh:.0f} kWh, Einspeisung: {einspeisung_kwh:.0f} kWh")
-                    print(f"   → Einsparung Direkt: {formatted_einsparung_direkt}")
-                    print(f"   → Einnahmen Einspeisung: {formatted_einnahmen}")
-                    print(f"   → Steuerfreie Vorteile: {formatted_steuerfreie}")
-                    print(f"   → Gesamt Ertrag/Jahr: {formatted_gesamt}")
-                    
-                    # ═══════════════════════════════════════════════════════════════════════
-                    # AMORTISATIONSZEIT NEU BERECHNEN (mit neuem Gesamt-Ertrag)
-                    # ═══════════════════════════════════════════════════════════════════════
-                    if gesamt_ertrag > 0:
-                        amortisation_years_neu = modified_price / gesamt_ertrag
-                        formatted_amortisation_neu = f"{amortisation_years_neu:.1f}".replace(".", ",")
-                        
-                        # Überschreibe Amortisations-Keys mit neuem Wert
-                        multi_dynamic_data['amortisation_jahre'] = f"{amortisation_years_neu:.1f}"
-                        multi_dynamic_data['amortisation_jahre_formatted'] = formatted_amortisation_neu
-                        multi_dynamic_data['AMORTISATION_JAHRE_FORMATTED'] = formatted_amortisation_neu
-                        multi_dynamic_data['amortisation_years'] = f"{amortisation_years_neu:.1f}"
-                        multi_dynamic_data['payback_period_years'] = f"{amortisation_years_neu:.1f}"
-                        
-                        print(f"   → Amortisation NEU: {formatted_amortisation_neu} Jahre (basierend auf Gesamt-Ertrag)")
+                    _register_used_products(
+                        unit.rotated_products, tentative_brands, tentative_models)
+                prepared.append((state, unit))
+
+            # 2. PDF-Erzeugung parallel
+            pdf_by_index: dict[int, bytes | None] = {}
+
+            def _render(unit: FirmWorkUnit) -> bytes | None:
+                try:
+                    return executor.submit(_render_firm_offer_in_worker, unit).result()
+                except Exception as e:
+                    _report_firm_error(unit.firm_name, e)
+                    return None
+
+            futures = {}
+            for _, unit in prepared:
+                if unit is None:
+                    continue
+                try:
+                    futures[executor.submit(_render_firm_offer_in_worker, unit)] = unit
+                except Exception as e:
+                    _report_firm_error(unit.firm_name, e)
+                    pdf_by_index[unit.firm_index] = None
+
+            # 3. Ergebnisse in Firmen-Reihenfolge übernehmen, sobald sie
+            #    vorliegen. Wie im sequentiellen Fall zählen nur erfolgreiche
+            #    Firmen für die Rotation; hat ein Fehlschlag davor den
+            #    Rotationszustand einer Firma verändert, wird sie neu vorbereitet
+            #    und nur dann neu erzeugt, wenn sich Produkte oder Preis ändern.
+            def _accept_finished_firms(position: int) -> int:
+                while position < len(prepared):
+                    firm = selected_firms[position]
+                    firm_name = _firm_display_name(firm, position)
+                    state, unit = prepared[position]
+                    actual_state = _rotation_state(used_brands, used_models)
+                    if state != actual_state:
+                        try:
+                            new_unit = _prepare_firm_work_unit(
+                                position, firm, standard_products, used_brands,
+                                used_models, project_data, analysis_results,
+                                profit_margin, modifier_pct, progression_pct,
+                            )
+                        except Exception as e:
+                            _report_firm_error(firm_name, e)
+                            new_unit = None
+                        if new_unit != unit:
+                            unit = new_unit
+                            pdf_by_index[position] = _render(unit) if unit else None
+                        prepared[position] = (actual_state, unit)
+                    if unit is not None and position not in pdf_by_index:
+                        break  # PDF noch in Arbeit
+
+                    pdf_bytes = pdf_by_index.get(position) if unit is not None else None
+                    if pdf_bytes:
+                        results.append((unit.firm_name, pdf_bytes))
+                        _register_used_products(unit.rotated_products, used_brands, used_models)
+                    elif unit is not None:
+                        print(f"ERROR: PDF-Generierung fehlgeschlagen für {unit.firm_name}")
+                    _report_progress(firm_name)
+                    position += 1
+                return position
+
+            accepted = _accept_finished_firms(0)
+            for future in as_completed(futures):
+                unit = futures[future]
+                try:
+                    pdf_bytes = future.result()
+                except Exception as e:
+                    _report_firm_error(unit.firm_name, e)
+                    pdf_bytes = None
+                # Ergebnisse verworfener Vorbereitungen nicht übernehmen
+                if prepared[unit.firm_index][1] is unit:
+                    pdf_by_index[unit.firm_index] = pdf_bytes
+                accepted = _accept_finished_firms(accepted)
+    else:
+        for firm_index, firm in enumerate(selected_firms):
+            firm_name = _firm_display_name(firm, firm_index)
+
+            print(f"\n{'-'*80}")
+            print(f"Firma {firm_index + 1}/{len(selected_firms)}: {firm_name}")
+            print(f"{'-'*80}")
 
-                
-                # ═══════════════════════════════════════════════════════════════════════
-                # 9. ÜBERSCHREIBE PRODUKT-NAMEN (aus rotierten Produkten)
-                # ═══════════════════════════════════════════════════════════════════════
-                
-                # PV-Modul
-                pv_module = rotated_products.get('pv_modules', {})
-                if pv_module:
-                    module_name = pv_module.get('model_name', pv_module.get('name', ''))
-                    module_brand = pv_module.get('brand', pv_module.get('manufacturer', ''))
-                    module_capacity = pv_module.get('capacity_w', pv_module.get('power_wp', 0))
-                    
-                    if module_name:
-                        multi_dynamic_data['module_model'] = module_name
-                        multi_dynamic_data['MODULE_MODEL'] = module_name
-                        multi_dynamic_data['pv_module_name'] = module_name
-                    
-                    if module_brand:
-                        multi_dynamic_data['module_manufacturer'] = module_brand
-                        multi_dynamic_data['MODULE_MANUFACTURER'] = module_brand
-                    
-                    if module_capacity:
-                        multi_dynamic_data['module_capacity_w'] = str(module_capacity)
-                        multi_dynamic_data['MODULE_CAPACITY_W'] = str(module_capacity)
-                
-                # Wechselrichter
-                inverter = rotated_products.get('inverters', {})
-                if inverter:
-                    inverter_name = inverter.get('model_name', inverter.get('name', ''))
-                    inverter_brand = inverter.get('brand', inverter.get('manufacturer', ''))
-                    
-                    if inverter_name:
-                        multi_dynamic_data['inverter_model'] = inverter_name
-                        multi_dynamic_data['INVERTER_MODEL'] = inverter_name
-                        multi_dynamic_data['inverter_name'] = inverter_name
-                    
-                    if inverter_brand:
-                        multi_dynamic_data['inverter_manufacturer'] = inverter_brand
-                        multi_dynamic_data['INVERTER_MANUFACTURER'] = inverter_brand
-                
-                # Batteriespeicher
-                battery = rotated_products.get('battery_storage', {})
-                if battery:
-                    battery_name = battery.get('model_name', battery.get('name', ''))
-                    battery_brand = battery.get('brand', battery.get('manufacturer', ''))
-                    battery_capacity = battery.get('capacity_kwh', 0)
-                    
-                    if battery_name:
-                        multi_dynamic_data['battery_model'] = battery_name
-                        multi_dynamic_data['BATTERY_MODEL'] = battery_name
-                        multi_dynamic_data['storage_name'] = battery_name
-                    
-                    if battery_brand:
-                        multi_dynamic_data['battery_manufacturer'] = battery_brand
-                        multi_dynamic_data['BATTERY_MANUFACTURER'] = battery_brand
-                    
-                    if battery_capacity:
-                        multi_dynamic_data['battery_capacity_kwh'] = str(battery_capacity)
-                        multi_dynamic_data['BATTERY_CAPACITY_KWH'] = str(battery_capacity)
-                
-                # Debug-Ausgabe
-                print(f"")
-                print(f"{'='*70}")
-                print(f"ÜBERSCHRIEBENE WERTE FÜR {firm_name.upper()}:")
-                print(f"{'='*70}")
-                print(f"✓ Brutto-Preis:    {formatted_price}")
-                print(f"✓ Netto-Preis:     {formatted_netto}")
-                print(f"✓ Mehrwertsteuer:  {formatted_mwst}")
-                print(f"✓ Amortisation:    {formatted_amortisation} Jahre")
-                if pv_module:
-                    print(f"✓ PV-Modul:        {pv_module.get('model_name', pv_module.get('name', ''))}")
-                if inverter:
-                    print(f"✓ Wechselrichter:  {inverter.get('model_name', inverter.get('name', ''))}")
-                if battery:
-                    print(f"✓ Speicher:        {battery.get('model_name', battery.get('name', ''))}")
-                print(f"{'='*70}")
-                print(f"")
-                
-            except Exception as e:
-                print(f"ERROR: build_dynamic_data() fehlgeschlagen: {e}")
-                import traceback
-                traceback.print_exc()
-                
-                # Fallback: Minimal Dynamic Data mit Preis
-                multi_dynamic_data = {
-                    'firma_name': firm_name,
-                    'FINAL_END_PREIS': f"{modified_price:.2f}",
-                    'FINAL_END_PREIS_FORMATTED': formatted_price,
-                    'final_end_preis': f"{modified_price:.2f}",
-                    'final_end_preis_formatted': formatted_price,
-                }
-            
-            # 4. Generiere PDF mit Standard-Templates aber modifizierten Daten
-            print(f"\n[4/4] PDF-Generierung...")
-            
-            # VERWENDE STANDARD generate_custom_offer_pdf() mit modifizierten Daten!
-            # Keine firma-spezifischen Templates nötig - Dynamic Data enthält alle Unterschiede
-            
             try:
-                # Berechne Pfade relativ zum Projekt-Root (ein Level über pdf_template_engine/)
-                base_dir = Path(__file__).parent.parent
-                coords_dir = base_dir / "coords"
-                bg_dir = base_dir / "pdf_templates_static" / "notext"
-                
-                pdf_bytes = generate_custom_offer_pdf(
-                    coords_dir=coords_dir,
-                    bg_dir=bg_dir,
-                    dynamic_data=multi_dynamic_data,
-                    additional_pdf=additional_pdf
+                unit = _prepare_firm_work_unit(
+                    firm_index, firm, standard_products, used_brands, used_models,
+                    project_data, analysis_results, profit_margin, modifier_pct,
+                    progression_pct,
                 )
-                
+                pdf_bytes = _render_firm_offer(
+                    unit, project_data, analysis_results, additional_pdf)
                 if not pdf_bytes:
-                    print(f"ERROR: PDF-Generierung fehlgeschlagen für {firm_name}")
                     continue
-                
-                print(f"✓ PDF generiert: {len(pdf_bytes)} bytes")
-                
-                # ZEIGE FINALEN PREIS DER IN PDF IST
-                final_price_in_pdf = multi_dynamic_data.get('FINAL_END_PREIS_FORMATTED')
-                print(f"")
-                print(f"{'*'*60}")
-                print(f"✅ PREIS IN PDF VON {firm_name.upper()}: {final_price_in_pdf}")
-                print(f"{'*'*60}")
-                print(f"")
-                
-            except Exception as pdf_error:
-                print(f"ERROR: PDF-Generierung fehlgeschlagen: {pdf_error}")
-                import traceback
-                traceback.print_exc()
+
+                # 5. Speichere Resultat
+                results.append((firm_name, pdf_bytes))
+
+                # 6. Aktualisiere verwendete Marken/Modelle für nächste Firma
+                _register_used_products(unit.rotated_products, used_brands, used_models)
+
+                print(f"\n✓ Firma {firm_name} abgeschlossen")
+
+            except Exception as e:
+                _report_firm_error(firm_name, e)
                 continue
-            
-            # 5. Speichere Resultat
-            results.append((firm_name, pdf_bytes))
-            
-            # 6. Aktualisiere verwendete Marken/Modelle für nächste Firma
-            used_brands.update(track_used_brands(rotated_products))
-            
-            for category, models in track_used_models(rotated_products).items():
-                if category not in used_models:
-                    used_models[category] = set()
-                used_models[category].update(models)
-            
-            print(f"\n✓ Firma {firm_name} abgeschlossen")
-            
-        except Exception as e:
-            print(f"\n{'!'*80}")
-            print(f"❌ FEHLER BEI FIRMA {firm_name.upper()}")
-            print(f"{'!'*80}")
-            print(f"Fehler-Typ: {type(e).__name__}")
-            print(f"Fehler-Nachricht: {str(e)}")
-            print(f"\nSTACKTRACE:")
-            import traceback
-            traceback.print_exc()
-            print(f"{'!'*80}\n")
-            continue
-    
+            finally:
+                _report_progress(firm_name)
+
+    if progress_bar is not None:
+        try:
+            progress_bar.complete(f"Multi-PDF: {len(results)}/{len(selected_firms)} erfolgreich")
+        except Exception:
+            pass
+
     # FINALE ZUSAMMENFASSUNG
     print(f"\n{'='*80}")
     print(f"MULTI-PDF GENERIERUNG ABGESCHLOSSEN: {len(results)}/{len(selected_firms)} erfolgreich")
     print(f"{'='*80}")
-    
+
     if results:
         print(f"\n📊 PREIS-ÜBERSICHT (KASKADIERUNG):")
         print(f"{'-'*80}")
         for idx, (firm_name, pdf_bytes) in enumerate(results):
             print(f"  {idx+1}. {firm_name}: [PDF generiert - {len(pdf_bytes)} bytes]")
         print(f"{'-'*80}\n")
-    
+
     return results
 
 
@@ -3528,8 +3763,6 @@ def generate_multi_firm_pdf(
     Returns:
         PDF bytes oder None bei Fehler
     """
-    import yaml
-    
     print(f"DEBUG: generate_multi_firm_pdf für {firm_suffix}")
     print(f"DEBUG: coords_dir={coords_dir}, bg_dir={bg_dir}")
     
@@ -3557,9 +3790,8 @@ def generate_multi_firm_pdf(
                 c.showPage()
                 continue
             
-            # Lade Koordinaten
-            with open(yml_file, 'r', encoding='utf-8') as f:
-                coords = yaml.safe_load(f) or []
+            # Lade Koordinaten (geparst nur bei neuer/geänderter Datei)
+            coords = get_yaml_layout(yml_file)
             
             print(f"DEBUG: Seite {page_num}: {len(coords)} Platzhalter aus {yml_file}")
             
@@ -3603,13 +3835,16 @@ def generate_multi_firm_pdf(
                 writer.add_page(overlay_reader.pages[page_num])
                 continue
             
-            # Merge Overlay + Background
-            bg_reader = PdfReader(bg_file)
-            bg_page = bg_reader.pages[0]
+            # Merge Overlay + Background (Background aus dem Prozess-Cache)
+            entry = get_background_page(
+                "multi", [bg_file], lambda bg_file=bg_file: load_pdf_page(bg_file)
+            )
             overlay_page = overlay_reader.pages[page_num]
-            
+            if entry is None:
+                writer.add_page(overlay_page)
+                continue
+            bg_page = add_background_page(writer, entry)
             bg_page.merge_page(overlay_page)
-            writer.add_page(bg_page)
         
         # Optional: Zusatz-PDF anhängen
         if additional_pdf:
@@ -0,0 +1,219 @@
+"""
+pdf_template_engine/image_cache.py
+
+LRU-Cache für dekodierte Bilder (Firmenlogo, Hersteller-Logos, Produktbilder)
+der Overlay-Erzeugung.
+
+Schlüssel ist ein Hash des Bildinhalts (Base64-String bzw. Dateibytes) plus
+die Zielgröße. Bilder, die deutlich größer sind als für die Druckauflösung
+der Zeichenfläche nötig, werden einmalig verkleinert (``PRINT_DPI``), damit
+die PDFs kleiner und schneller geschrieben werden. Der Cache ist über ein
+Byte-Budget (dekodierte Pixelgröße) begrenzt.
+
+Gecacht werden die (ggf. verkleinerten) Bildbytes; jeder Aufruf erhält einen
+eigenen ``ImageReader``, da ein Reader samt Dateiobjekt nicht von mehreren
+Threads gleichzeitig gelesen werden darf.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from reportlab.lib.utils import ImageReader
+
+try:
+    from PIL import Image
+
+    PIL_AVAILABLE = True
+except ImportError:  # pragma: no cover - Pillow ist Teil der Requirements
+    Image = None  # type: ignore
+    PIL_AVAILABLE = False
+
+PRINT_DPI = 300
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+JPEG_QUALITY = 88
+
+
+def _resolve_source(val: Any) -> tuple[str, bytes | str] | None:
+    """Dateipfad, Base64 oder Data-URL -> (Inhalts-Hash, Bytes bzw. Base64-String).
+
+    Base64 wird erst bei einem Cache-Miss dekodiert (siehe :func:`_decode`).
+    """
+    if not val:
+        return None
+    s = str(val).strip()
+
+    # Lokaler Dateipfad (kurze Strings, die auf eine Datei zeigen)
+    if len(s) < 1024:
+        try:
+            p = Path(s)
+            if p.is_file():
+                data = p.read_bytes()
+                return hashlib.blake2b(data, digest_size=16).hexdigest(), data
+        except (OSError, ValueError):
+            pass
+
+    # Data-URL -> Base64 extrahieren
+    if ";base64," in s:
+        s = s.split(";base64,", 1)[1]
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=16).hexdigest(), s
+
+
+def _decode(payload: bytes | str) -> bytes | None:
+    if isinstance(payload, bytes):
+        return payload
+    try:
+        return base64.b64decode(payload) or None
+    except (binascii.Error, ValueError):
+        return None
+
+
+def target_pixels(max_size_pt: tuple[float, float], dpi: int = PRINT_DPI) -> tuple[int, int]:
+    """Zielgröße in Pixeln für eine Zeichenfläche in Punkten (1 pt = 1/72 Zoll)."""
+    return (
+        max(1, int(round(max_size_pt[0] / 72.0 * dpi))),
+        max(1, int(round(max_size_pt[1] / 72.0 * dpi))),
+    )
+
+
+def _prepare_image(
+    payload: bytes | str, max_px: tuple[int, int] | None
+) -> tuple[bytes, int] | None:
+    """Lesbare (ggf. verkleinerte) Bildbytes und geschätzte Speichergröße in Bytes."""
+    raw = _decode(payload)
+    if raw is None:
+        return None
+    if raw.startswith((b"<?xml", b"<svg")):
+        return None  # SVG nicht unterstützt
+
+    if not PIL_AVAILABLE:
+        try:
+            ImageReader(io.BytesIO(raw)).getSize()
+            return raw, len(raw)
+        except Exception:
+            return None
+
+    try:
+        img = Image.open(io.BytesIO(raw))
+        img.load()
+    except Exception:
+        return None
+
+    if max_px is not None and (img.width > max_px[0] or img.height > max_px[1]):
+        has_alpha = img.mode in ("RGBA", "LA", "P") and (
+            img.mode != "P" or "transparency" in img.info
+        )
+        img = img.convert("RGBA" if has_alpha else "RGB")
+        img.thumbnail(max_px, Image.LANCZOS)
+        out = io.BytesIO()
+        if has_alpha:
+            img.save(out, format="PNG", optimize=True)
+        else:
+            # JPEG wird von ReportLab unverändert (DCT) eingebettet
+            img.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        raw = out.getvalue()
+
+    try:
+        width, height = ImageReader(io.BytesIO(raw)).getSize()
+    except Exception:
+        return None
+    bands = len(img.getbands()) if hasattr(img, "getbands") else 4
+    return raw, max(len(raw), width * height * bands)
+
+
+def _reader(data: bytes | None) -> Any:
+    return ImageReader(io.BytesIO(data)) if data is not None else None
+
+
+class DecodedImageCache:
+    """Thread-sicherer LRU-Cache dekodierter Bilder mit Byte-Budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, dpi: int = PRINT_DPI):
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[bytes | None, int]] = OrderedDict()
+        self._current_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_image_reader(
+        self, val: Any, max_size_pt: tuple[float, float] | None = None
+    ) -> Any:
+        """Neuer ImageReader für ``val``; bei ``max_size_pt`` auf Druckauflösung verkleinert.
+
+        Gibt None zurück, wenn das Bild nicht lesbar ist.
+        """
+        source = _resolve_source(val)
+        if source is None:
+            return None
+        digest, payload = source
+        max_px = target_pixels(max_size_pt, self.dpi) if max_size_pt else None
+        key = (digest, max_px)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return _reader(entry[0])
+            self._stats["misses"] += 1
+
+        # Unlesbare Bilder ebenfalls merken (None, 0 Bytes)
+        prepared = _prepare_image(payload, max_px) or (None, 0)
+        data, size = prepared
+        if size > self.max_bytes:
+            return _reader(data)  # zu groß für den Cache, trotzdem verwenden
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = prepared
+                self._current_bytes += size
+            while self._current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+                self._stats["evictions"] += 1
+        return _reader(data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+            for stat in self._stats:
+                self._stats[stat] = 0
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._current_bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+_image_cache = DecodedImageCache()
+
+
+def get_image_reader(val: Any, max_size_pt: tuple[float, float] | None = None) -> Any:
+    return _image_cache.get_image_reader(val, max_size_pt)
+
+
+def configure_image_cache(**kwargs: Any) -> DecodedImageCache:
+    """Ersetzt die prozessweite Instanz (z.B. anderes Byte-Budget/DPI)."""
+    global _image_cache
+    _image_cache = DecodedImageCache(**kwargs)
+    return _image_cache
+
+
+def clear_image_cache() -> None:
+    _image_cache.clear()
+
+
+def get_image_cache_stats() -> dict[str, int]:
+    return _image_cache.get_stats()
@@ -0,0 +1,289 @@
+"""
+pdf_template_engine/placeholder_groups.py
+
+Inkrementelle Auswertung der PDF-Platzhalter.
+
+``build_dynamic_data`` setzt sich aus registrierten Platzhalter-Gruppen
+zusammen (customer, company, energy, product, pricing, charts,
+financing). Jede Gruppe deklariert ihre Eingaben als Pfade:
+
+- ``project_data``, ``project_data.customer_data``, ``analysis_results``,
+  ``company_info`` (beliebig tief, Punkt-getrennt)
+- ``session.<key>`` für Werte aus dem Streamlit-Session-State
+- ``versions.<name>`` für Versionszähler der DB-Daten (Admin-Settings,
+  Produktkatalog, Preismatrix)
+- :class:`KeySearch` für Suchen nach Schlüsseln in beliebiger Tiefe; in den
+  Fingerprint gehen nur die passenden Einträge ein
+
+sowie vorgelagerte Gruppen (``depends_on``), deren Ergebnisse sie liest
+(ändern sich diese, wird die Gruppe ebenfalls neu berechnet).
+Der Evaluator bildet pro Gruppe einen Fingerprint dieser Eingaben und rechnet
+nur Gruppen neu, deren Fingerprint sich geändert hat. Gruppen mit
+``uses_database=True`` (Produktdaten, Admin-Settings) laufen zusätzlich nach
+``db_ttl_seconds`` ab (für Änderungen, die kein Versionszähler erfasst, z.B.
+aus anderen Prozessen) bzw. werden über :meth:`invalidate` verworfen.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_DB_TTL_SECONDS = 60.0
+MAX_ENTRIES_PER_GROUP = 8
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def normalize_search_key(key: Any) -> str:
+    """Schlüssel für :class:`KeySearch`-Vergleiche (nur a-z und 0-9)."""
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+@dataclass(frozen=True)
+class KeySearch:
+    """Eingabe einer Gruppe, die unter ``path`` rekursiv nach ``keys`` sucht.
+
+    Der Wert für den Fingerprint sind alle Einträge, deren normalisierter
+    Schlüssel in ``keys`` vorkommt, in Suchreihenfolge (erst die Schlüssel
+    eines Dicts, dann seine Werte). Andere Einträge ändern das Suchergebnis
+    nicht und lösen daher keine Neuberechnung aus.
+    """
+
+    path: str
+    keys: tuple[str, ...]
+
+    def collect(self, root: Any) -> list[tuple[str, Any]]:
+        targets = {normalize_search_key(key) for key in self.keys}
+        found: list[tuple[str, Any]] = []
+        visited: set[int] = set()
+
+        def visit(value: Any) -> None:
+            if isinstance(value, dict):
+                if id(value) in visited:
+                    return
+                visited.add(id(value))
+                for key, item in value.items():
+                    if normalize_search_key(key) in targets:
+                        found.append((str(key), item))
+                for item in value.values():
+                    visit(item)
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                if id(value) in visited:
+                    return
+                visited.add(id(value))
+                for item in value:
+                    visit(item)
+
+        visit(root)
+        return found
+
+
+@dataclass
+class PlaceholderInputs:
+    """Rohdaten eines build_dynamic_data-Aufrufs."""
+
+    project_data: dict[str, Any]
+    analysis_results: dict[str, Any]
+    company_info: dict[str, Any]
+    session_get: Callable[..., Any]
+    versions: dict[str, Any] = field(default_factory=dict)
+
+    def resolve(self, path: str | KeySearch) -> Any:
+        """Wert zu einem Eingabepfad (fehlende Schlüssel -> None)."""
+        if isinstance(path, KeySearch):
+            return path.collect(self.resolve(path.path))
+        if path.startswith("session."):
+            return self.session_get(path[len("session."):], None)
+        head, _, rest = path.partition(".")
+        value: Any = getattr(self, head)
+        for part in rest.split(".") if rest else ():
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+
+
+@dataclass(frozen=True)
+class PlaceholderGroup:
+    """Eine Gruppe von Platzhaltern mit deklarierten Eingaben.
+
+    ``compute(inputs, upstream)`` liefert die Platzhalter der Gruppe;
+    ``upstream`` enthält die Ergebnisse der Gruppen aus ``depends_on``.
+    """
+
+    name: str
+    compute: Callable[[PlaceholderInputs, dict[str, Any]], dict[str, Any]]
+    inputs: tuple[str | KeySearch, ...] = ()
+    depends_on: tuple[str, ...] = ()
+    uses_database: bool = False
+
+
+PLACEHOLDER_GROUPS: dict[str, PlaceholderGroup] = {}
+
+
+def register_placeholder_group(group: PlaceholderGroup) -> PlaceholderGroup:
+    """Registriert (oder ersetzt) eine Gruppe; Auswertung in Registrierungsreihenfolge."""
+    for dependency in group.depends_on:
+        if dependency not in PLACEHOLDER_GROUPS:
+            raise ValueError(
+                f"Gruppe '{group.name}' hängt von unbekannter Gruppe '{dependency}' ab"
+            )
+    PLACEHOLDER_GROUPS[group.name] = group
+    return group
+
+
+def _update_fingerprint(h: Any, value: Any, refs: list[Any] | None) -> None:
+    if isinstance(value, _SCALAR_TYPES):
+        h.update(f"{type(value).__name__}:{value!r};".encode("utf-8", "surrogatepass"))
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for key in sorted(value, key=repr):
+            _update_fingerprint(h, key, refs)
+            _update_fingerprint(h, value[key], refs)
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        if all(isinstance(item, _SCALAR_TYPES) for item in value):
+            h.update(repr(value).encode("utf-8", "surrogatepass"))
+        else:
+            for item in value:
+                _update_fingerprint(h, item, refs)
+        h.update(b"]")
+    elif isinstance(value, (set, frozenset)):
+        h.update(repr(sorted(value, key=repr)).encode("utf-8", "surrogatepass"))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        h.update(b"b:")
+        h.update(bytes(value))
+    elif hasattr(value, "tobytes") and hasattr(value, "dtype"):
+        # numpy-Arrays und -Skalare
+        h.update(f"np:{value.dtype}:{getattr(value, 'shape', ())};".encode())
+        h.update(value.tobytes())
+    elif callable(getattr(value, "job", None)) and hasattr(value, "fig"):
+        # LazyChart (chart_render_service): wird bei jedem Rerun neu angelegt,
+        # der Chart-Key hängt aber nur von Figur und Exportoptionen ab
+        try:
+            h.update(f"chart:{value.job().key()};".encode())
+        except Exception:
+            _update_identity(h, value, refs)
+    else:
+        # Unbekannte Objekte (Figuren, Verbindungen, ...): Identität statt Inhalt
+        _update_identity(h, value, refs)
+
+
+def _update_identity(h: Any, value: Any, refs: list[Any] | None) -> None:
+    # Die id() eines freigegebenen Objekts kann neu vergeben werden; ``refs``
+    # hält das Objekt daher so lange am Leben wie den Cache-Eintrag
+    if refs is not None:
+        refs.append(value)
+    h.update(f"obj:{type(value).__qualname__}@{id(value)};".encode())
+
+
+def fingerprint(*values: Any, refs: list[Any] | None = None) -> str:
+    """Stabiler Inhalts-Hash verschachtelter Python-/numpy-Strukturen.
+
+    Objekte ohne Inhalts-Hash gehen per Identität ein und werden an ``refs``
+    angehängt; wer den Fingerprint speichert, muss sie mit aufbewahren.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for value in values:
+        _update_fingerprint(h, value, refs)
+    return h.hexdigest()
+
+
+class IncrementalPlaceholderEvaluator:
+    """Wertet die Gruppen aus und cacht deren Ergebnisse je Fingerprint."""
+
+    def __init__(
+        self,
+        groups: dict[str, PlaceholderGroup] | None = None,
+        db_ttl_seconds: float = DEFAULT_DB_TTL_SECONDS,
+    ):
+        self._groups = PLACEHOLDER_GROUPS if groups is None else groups
+        self.db_ttl_seconds = db_ttl_seconds
+        self._lock = threading.Lock()
+        # Gruppe -> OrderedDict[Fingerprint -> (Zeitpunkt, Ergebnis, Referenzen)]
+        self._cache: dict[
+            str, OrderedDict[str, tuple[float, dict[str, Any], list[Any]]]] = {}
+        self._stats = {"hits": 0, "recomputed": 0}
+        self.last_recomputed: list[str] = []
+
+    def _lookup(self, group: PlaceholderGroup, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entries = self._cache.get(group.name)
+            if not entries or key not in entries:
+                return None
+            created, outputs, _refs = entries[key]
+            if group.uses_database and time.monotonic() - created > self.db_ttl_seconds:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return outputs
+
+    def _store(
+        self, group: PlaceholderGroup, key: str, outputs: dict[str, Any], refs: list[Any]
+    ) -> None:
+        with self._lock:
+            entries = self._cache.setdefault(group.name, OrderedDict())
+            entries[key] = (time.monotonic(), outputs, refs)
+            while len(entries) > MAX_ENTRIES_PER_GROUP:
+                entries.popitem(last=False)
+
+    def evaluate(self, inputs: PlaceholderInputs) -> dict[str, Any]:
+        """Alle Gruppen auswerten; liefert ein neues (veränderbares) Dict."""
+        result: dict[str, Any] = {}
+        group_outputs: dict[str, dict[str, Any]] = {}
+        # Fingerprints der Ergebnisse, soweit andere Gruppen davon abhängen
+        output_keys: dict[str, str] = {}
+        output_refs: dict[str, list[Any]] = {}
+        groups = list(self._groups.values())
+        needed = {dep for group in groups for dep in group.depends_on}
+        recomputed: list[str] = []
+        for group in groups:
+            refs: list[Any] = []
+            key = fingerprint(
+                group.name,
+                [inputs.resolve(path) for path in group.inputs],
+                [output_keys[dep] for dep in group.depends_on],
+                refs=refs,
+            )
+            for dep in group.depends_on:
+                refs.extend(output_refs[dep])
+            outputs = self._lookup(group, key)
+            if outputs is None:
+                upstream: dict[str, Any] = {}
+                for dep in group.depends_on:
+                    upstream.update(group_outputs[dep])
+                outputs = dict(group.compute(inputs, upstream) or {})
+                self._store(group, key, outputs, refs)
+                recomputed.append(group.name)
+            if group.name in needed:
+                group_outputs[group.name] = outputs
+                output_refs[group.name] = []
+                output_keys[group.name] = fingerprint(
+                    outputs, refs=output_refs[group.name])
+            result.update(outputs)
+
+        with self._lock:
+            self._stats["hits"] += len(groups) - len(recomputed)
+            self._stats["recomputed"] += len(recomputed)
+            self.last_recomputed = recomputed
+        return result
+
+    def invalidate(self, group: str | None = None) -> None:
+        with self._lock:
+            if group is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(group, None)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["entries"] = {name: len(e) for name, e in self._cache.items()}
+            stats["last_recomputed"] = list(self.last_recomputed)
+        return stats
@@ -10,10 +10,21 @@ from __future__ import annotations
 
 import math
 import re
+from collections.abc import Sequence
 from contextlib import suppress
 from functools import lru_cache
 from typing import Any
 
+from .placeholder_groups import (
+    PLACEHOLDER_GROUPS,
+    IncrementalPlaceholderEvaluator,
+    KeySearch,
+    PlaceholderGroup,
+    PlaceholderInputs,
+    normalize_search_key,
+    register_placeholder_group,
+)
+
 try:
     from ..calculations import perform_calculations
 except Exception:
@@ -676,88 +687,57 @@ def fmt_number(
         )
 
 
-def build_dynamic_data(
-    project_data: dict[str, Any] | None,
-    analysis_results: dict[str, Any] | None,
-    company_info: dict[str, Any] | None = None,
-) -> dict[str, str]:
-    """Erzeugt ein Dictionary mit dynamischen Werten für die Overlays."""
-    import re  # Import re at the beginning of the function
+def _parse_float(val: Any) -> float | None:
+    """Tolerante Zahl-zu-Float Konvertierung: akzeptiert "10,0", "10.0", "10
+    kWh", "10,00 kWh"."""
+    if val is None:
+        return None
+    try:
+        if isinstance(val, int | float):
+            return float(val)
+        s = str(val).strip()
+        # Einheiten entfernen
+        s = re.sub(r"[^0-9,\.\-]", "", s)
+        # Komma in Punkt wandeln
+        s = s.replace(",", ".")
+        return float(s) if s not in {"", "-", "."} else None
+    except Exception:
+        return None
 
-    # Dies ist dein vollständiger Originalcode. Die einzige Änderung ist der
-    # Block ganz am Ende.
-    project_data = project_data or {}
-    analysis_results = analysis_results or {}
-    company_info = company_info or {}
 
-    customer = (
-        project_data.get("customer_data", {}) if isinstance(project_data, dict) else {}
-    )
-    project_details = (
-        project_data.get("project_details", {})
-        if isinstance(project_data, dict)
-        else {}
-    )
+# Ersatz für st.session_state in Worker-Prozessen (siehe use_session_snapshot)
+_session_override: dict[str, Any] | None = None
 
+
+def _get_session_state() -> Any:
+    if _session_override is not None:
+        return _session_override
     try:
         from streamlit import session_state as st_session_state  # type: ignore
     except Exception:  # pragma: no cover - Streamlit nicht verfügbar
         st_session_state = {}  # type: ignore
+    return st_session_state
 
-    session_state = st_session_state  # type: ignore
-
-    def as_str(v: Any) -> str:
-        return "" if v is None else str(v)
 
-    def session_get(key: str, default: Any = None) -> Any:
-        getter = getattr(session_state, "get", None)
-        if callable(getter):
-            with suppress(Exception):
-                return getter(key, default)
-        if isinstance(session_state, dict):
-            return session_state.get(key, default)
+def _session_get(key: str, default: Any = None) -> Any:
+    session_state = _get_session_state()
+    getter = getattr(session_state, "get", None)
+    if callable(getter):
         with suppress(Exception):
-            return getattr(session_state, key)
-        return default
+            return getter(key, default)
+    if isinstance(session_state, dict):
+        return session_state.get(key, default)
+    with suppress(Exception):
+        return getattr(session_state, key)
+    return default
 
-    first = as_str(customer.get("first_name") or "").strip()
-    last = as_str(customer.get("last_name") or "").strip()
-    full_name = f"{first} {last}".strip()
 
-    result: dict[str, str] = {
-        "customer_name": full_name,
-        "customer_street": f"{as_str(customer.get('address'))} {as_str(customer.get('house_number'))}".strip(),
-        "customer_city_zip": f"{as_str(customer.get('zip_code'))} {as_str(customer.get('city'))}".strip(),
-        "customer_phone": as_str(
-            customer.get("phone_mobile") or customer.get("phone_landline")
-        ),
-        "customer_email": as_str(customer.get("email")),
-        "company_name": as_str(company_info.get("name")),
-        "company_street": as_str(company_info.get("street")),
-        "company_city_zip": f"{as_str(company_info.get('zip_code'))} {as_str(company_info.get('city'))}".strip(),
-        "company_phone": as_str(company_info.get("phone")),
-        "company_email": as_str(company_info.get("email")),
-        "company_logo_b64": as_str(company_info.get("logo_base64")),
-    }
+def _format_customer(customer: dict[str, Any]) -> dict[str, str]:
+    """Formatierte Kundenangaben (Name inkl. Anrede/Titel, Adresse, Kontakt)."""
 
-    # Tolerante Zahl-zu-Float Konvertierung: akzeptiert "10,0", "10.0", "10
-    # kWh", "10,00 kWh"
-    def parse_float(val: Any) -> float | None:
-        if val is None:
-            return None
-        try:
-            if isinstance(val, int | float):
-                return float(val)
-            s = str(val).strip()
-            # Einheiten entfernen
-            s = re.sub(r"[^0-9,\.\-]", "", s)
-            # Komma in Punkt wandeln
-            s = s.replace(",", ".")
-            return float(s) if s not in {"", "-", "."} else None
-        except Exception:
-            return None
+    def as_str(v: Any) -> str:
+        return "" if v is None else str(v)
 
-    # Kundendaten korrekt aus den echten Keys aufbauen
     first = as_str(customer.get("first_name") or "").strip()
     last = as_str(customer.get("last_name") or "").strip()
     salutation = as_str(customer.get("salutation") or "").strip()
@@ -765,43 +745,78 @@ def build_dynamic_data(
     if title.lower() in {"", "(kein)", "keine", "none", "null"}:
         title = ""
     name_parts = [p for p in [salutation, title, first, last] if p]
-    full_name = " ".join(name_parts)
 
     street = as_str(customer.get("address") or "").strip()
     house_no = as_str(customer.get("house_number") or "").strip()
-    street_full = (street + (" " + house_no if house_no else "")).strip()
     zip_code = as_str(customer.get("zip_code") or "").strip()
     city = as_str(customer.get("city") or "").strip()
-    city_zip = (f"{zip_code} {city}").strip()
-    phone = as_str(
-        customer.get("phone_mobile") or customer.get("phone_landline") or ""
-    ).strip()
-    email = as_str(customer.get("email") or "").strip()
+    return {
+        "first": first,
+        "last": last,
+        "salutation": salutation,
+        "full_name": " ".join(name_parts),
+        "street_full": (street + (" " + house_no if house_no else "")).strip(),
+        "city": city,
+        "city_zip": (f"{zip_code} {city}").strip(),
+        "phone": as_str(
+            customer.get("phone_mobile") or customer.get("phone_landline") or ""
+        ).strip(),
+        "email": as_str(customer.get("email") or "").strip(),
+    }
+
+
+def _changed_placeholders(
+    result: dict[str, str], upstream: dict[str, str]
+) -> dict[str, str]:
+    """Nur die Platzhalter, die eine Kern-Gruppe gegenüber ``upstream`` setzt."""
+    return {
+        key: value
+        for key, value in result.items()
+        if key not in upstream or upstream[key] != value
+    }
+
+
+def _build_energy_placeholders(
+    project_data: dict[str, Any] | None,
+    analysis_results: dict[str, Any] | None,
+) -> dict[str, str]:
+    """Gruppe "energy": Basisdaten für Seite 1, Energieflüsse und Einsparungen.
+
+    Legt außerdem die Standardwerte der Kern-Platzhalter an, die die Gruppen
+    "product" und "pricing" anschließend überschreiben.
+    """
+    project_data = project_data or {}
+    analysis_results = analysis_results or {}
+
+    customer = (
+        project_data.get("customer_data", {}) if isinstance(project_data, dict) else {}
+    )
+    project_details = (
+        project_data.get("project_details", {})
+        if isinstance(project_data, dict)
+        else {}
+    )
 
+    def as_str(v: Any) -> str:
+        return "" if v is None else str(v)
+
+    parse_float = _parse_float
+
+    # Kundendaten korrekt aus den echten Keys aufbauen
+    customer_fields = _format_customer(customer)
+    first = customer_fields["first"]
+    last = customer_fields["last"]
+    salutation = customer_fields["salutation"]
+    full_name = customer_fields["full_name"]
+    city = customer_fields["city"]
+
+    # customer_* und company_* liefern die Gruppen "customer"/"company"
     result: dict[str, str] = {
-        "customer_name": full_name,
-        "customer_street": street_full,
-        "customer_city_zip": city_zip,
-        "customer_phone": phone,
-        "customer_email": email,
         "anrede_kunde": "",
         "kunde_vorname_und_nachname": "",
         "kunde_wohnort": "",
         "kWp_anlage_anlage": "",
         "langes_datum_heute": "",
-        # Firma (für Platzhalter rechts)
-        "company_name": as_str(company_info.get("name") or ""),
-        "company_street": as_str(company_info.get("street") or ""),
-        "company_city_zip": as_str(
-            (
-                f"{company_info.get('zip_code', '')} {company_info.get('city', '')}"
-            ).strip()
-        ),
-        "company_phone": as_str(company_info.get("phone") or ""),
-        "company_email": as_str(company_info.get("email") or ""),
-        "company_website": as_str(company_info.get("website") or ""),
-        # Firmenlogo (Base64) für Overlay-Header auf Seiten 1-6
-        "company_logo_b64": as_str(company_info.get("logo_base64") or ""),
         # Seite 4 – Defaults, damit keine Platzhaltertexte stehen bleiben
         "module_manufacturer": "",
         "module_model": "",
@@ -1083,186 +1098,6 @@ def build_dynamic_data(
     if self_cons is not None:
         result["self_consumption_percent"] = fmt_number(self_cons, 0, "%")
 
-    # Amortisationszeit (Jahre) für Seite 1 – hole Wert robust aus allen
-    # relevanten Quellen
-    amortization_keys = [
-        "amortization_time_years",
-        "amortization_time",
-        "amortization_years",
-        "amortisation_time",
-        "amortisation_years",
-        "amortisationszeit",
-        "amortisationszeit_jahre",
-        "amortisation_jahre",
-        "amortisation (jahre)",
-        "amortisation jahre",
-        "payback_time_years",
-        "payback_time",
-        "payback_period",
-        "payback_period_years",
-        "payback_years",
-        "payback",
-    ]
-
-    session_project_data = session_get("project_data")
-    session_project_details = (
-        session_project_data.get("project_details")
-        if isinstance(session_project_data, dict)
-        else None
-    )
-
-    candidate_sources: list[Any] = [
-        analysis_results,
-        project_details,
-        project_data if isinstance(project_data, dict) else None,
-        (
-            project_data.get("analysis_results")
-            if isinstance(project_data, dict)
-            else None
-        ),
-        session_get("analysis_results"),
-        session_get("calculation_results"),
-        session_get("solar_calculator_analysis"),
-        session_get("solar_calculator_final_pricing_values"),
-        session_get("solar_calculator_results"),
-        session_get("financial_dashboard_data"),
-        session_get("live_pricing_calculations"),
-        session_get("final_pricing_data"),
-        session_get("complete_pricing_data"),
-        session_get("simple_pricing_data"),
-        session_project_data,
-        session_project_details,
-    ]
-
-    method_keys = [
-        "amortization_method",
-        "amortization_method_display",
-        "amortization_method_label",
-        "amortisation_method",
-        "amortisationsmethode",
-        "amortization_method_code",
-    ]
-
-    def extract_numeric_from_sources(
-        keys: list[str], sources: list[Any]
-    ) -> float | None:
-        visited: set[int] = set()
-        normalized_targets = {
-            re.sub(r"[^a-z0-9]", "", (key or "").lower()) for key in keys
-        }
-
-        def normalize_key(raw_key: Any) -> str:
-            return re.sub(r"[^a-z0-9]", "", str(raw_key).lower())
-
-        def _extract(source: Any) -> float | None:
-            if source is None:
-                return None
-
-            if isinstance(source, list | tuple):
-                obj_id = id(source)
-                if obj_id in visited:
-                    return None
-                visited.add(obj_id)
-                for item in source:
-                    found = _extract(item)
-                    if found is not None:
-                        return found
-                return None
-
-            if not isinstance(source, dict):
-                return None
-
-            obj_id = id(source)
-            if obj_id in visited:
-                return None
-            visited.add(obj_id)
-
-            for raw_key, raw_value in source.items():
-                norm_key = normalize_key(raw_key)
-                if norm_key in normalized_targets:
-                    val = parse_float(raw_value)
-                    if val is not None and val > 0 and math.isfinite(val):
-                        return val
-
-            for raw_value in source.values():
-                found = _extract(raw_value)
-                if found is not None:
-                    return found
-
-            return None
-
-        for src in sources:
-            found = _extract(src)
-            if found is not None:
-                return found
-        return None
-
-    def extract_string_from_sources(keys: list[str], sources: list[Any]) -> str | None:
-        normalized_targets = {
-            re.sub(r"[^a-z0-9]", "", (key or "").lower()) for key in keys if key
-        }
-        visited: set[int] = set()
-
-        def _extract(source: Any) -> str | None:
-            if source is None:
-                return None
-            obj_id = id(source)
-            if obj_id in visited:
-                return None
-            visited.add(obj_id)
-
-            if isinstance(source, dict):
-                for raw_key, raw_value in source.items():
-                    norm_key = re.sub(r"[^a-z0-9]", "", str(raw_key).lower())
-                    if norm_key in normalized_targets and raw_value not in (None, ""):
-                        return str(raw_value).strip()
-                for raw_value in source.values():
-                    found = _extract(raw_value)
-                    if found:
-                        return found
-            elif isinstance(source, (list, tuple, set)):
-                for item in source:
-                    found = _extract(item)
-                    if found:
-                        return found
-            return None
-
-        for src in sources:
-            found = _extract(src)
-            if found:
-                return found
-        return None
-
-    amortization_method_raw = extract_string_from_sources(
-        method_keys, candidate_sources
-    )
-
-    def _normalize_method_token(value: str | None) -> str:
-        if not value:
-            return ""
-        return re.sub(r"[^a-z0-9]", "", value.lower())
-
-    method_label_map = {
-        "classic": "Klassisch (Investition ÷ Jährliche Vorteile)",
-        "klassisch": "Klassisch (Investition ÷ Jährliche Vorteile)",
-        "klassischinvestitionjahrlichevorteile": "Klassisch (Investition ÷ Jährliche Vorteile)",
-        "electricitycosts": "Stromkosten-Vergleich",
-        "stromkostenvergleich": "Stromkosten-Vergleich",
-        "stromkosten": "Stromkosten-Vergleich",
-    }
-
-    amortization_method_code = _normalize_method_token(amortization_method_raw)
-    amortization_method_label = method_label_map.get(amortization_method_code)
-    if not amortization_method_label and amortization_method_raw:
-        amortization_method_label = amortization_method_raw.strip()
-    if amortization_method_code == "":
-        amortization_method_code = None
-
-    amort_years = extract_numeric_from_sources(amortization_keys, candidate_sources)
-    amortization_years_value: float | None = None
-    if amort_years is not None and amort_years > 0 and math.isfinite(amort_years):
-        amortization_years_value = amort_years
-
     # Seite 2: Energieflüsse (Jahr 1)
     monthly_direct_sc = (
         analysis_results.get("monthly_direct_self_consumption_kwh", []) or []
@@ -2002,7 +1837,38 @@ def build_dynamic_data(
         f"  Einkommensteuersatz: {
             einkommensteuer_satz * 100 if einkommensteuer_satz <= 1 else einkommensteuer_satz:.1f}%"
     )
-    # --- Ende Kernblock ---
+
+    return result
+
+
+def _build_product_placeholders(
+    project_data: dict[str, Any] | None,
+    analysis_results: dict[str, Any] | None,
+    upstream: dict[str, str],
+) -> dict[str, str]:
+    """Gruppe "product": Modul-, Wechselrichter- und Speicherdetails, Dach,
+    Finanzierungswunsch, Logos und Dienstleistungen (Seiten 3-6).
+
+    Baut auf den Werten der Gruppe "energy" auf und liefert nur geänderte
+    oder neue Platzhalter.
+    """
+    import re  # Import re at the beginning of the function
+
+    project_data = project_data or {}
+    analysis_results = analysis_results or {}
+
+    project_details = (
+        project_data.get("project_details", {})
+        if isinstance(project_data, dict)
+        else {}
+    )
+
+    def as_str(v: Any) -> str:
+        return "" if v is None else str(v)
+
+    parse_float = _parse_float
+
+    result: dict[str, str] = dict(upstream)
 
     # Seite 4: Produktdetails für Modul / WR / Speicher
     # Wir versuchen, Produktdetails aus der lokalen DB zu laden (optional),
@@ -3466,10 +3332,9 @@ def build_dynamic_data(
         # Nur wenn in übergebenen Daten nichts gefunden: Session State prüfen
         if vat_amount is None:
             try:
-                import streamlit as st
-
-                if hasattr(st, "session_state") and "project_data" in st.session_state:
-                    session_project_details = st.session_state.project_data.get(
+                session_project_data = _session_get("project_data")
+                if isinstance(session_project_data, dict):
+                    session_project_details = session_project_data.get(
                         "project_details", {}
                     )
 
@@ -4760,16 +4625,13 @@ def build_dynamic_data(
     # Merge mit aktueller Session-State Konfiguration (falls UI Änderungen noch
     # nicht in project_data übernommen wurden). Session-Werte überschreiben.
     try:  # defensiv – funktioniert auch außerhalb Streamlit-Kontext
-        import streamlit as st  # type: ignore
-
-        if "pdf_design_config" in st.session_state:
-            session_cfg = st.session_state.get("pdf_design_config") or {}
-            if isinstance(session_cfg, dict) and session_cfg:
-                # Session überschreibt vorhandene Keys (nur nicht-None Werte)
-                merged = dict(design_cfg)
-                for _k, _v in session_cfg.items():
-                    merged[_k] = _v
-                design_cfg = merged
+        session_cfg = _session_get("pdf_design_config") or {}
+        if isinstance(session_cfg, dict) and session_cfg:
+            # Session überschreibt vorhandene Keys (nur nicht-None Werte)
+            merged = dict(design_cfg)
+            for _k, _v in session_cfg.items():
+                merged[_k] = _v
+            design_cfg = merged
     except Exception:
         pass
     checkmarks_on = bool(design_cfg.get("service_checkmarks_enabled", True))
@@ -4872,7 +4734,274 @@ def build_dynamic_data(
                 custom_entries.append(p)
     result["service_custom_entries_joined"] = " | ".join(custom_entries)
 
-    # === NEUE FORMATIERTE PRODUKTWERTE FÜR SEITE 6 ===
+    return _changed_placeholders(result, upstream)
+
+
+# Schlüssel, nach denen die Gruppe "pricing" in allen Quellen (rekursiv) sucht
+_AMORTIZATION_KEYS = (
+    "amortization_time_years",
+    "amortization_time",
+    "amortization_years",
+    "amortisation_time",
+    "amortisation_years",
+    "amortisationszeit",
+    "amortisationszeit_jahre",
+    "amortisation_jahre",
+    "amortisation (jahre)",
+    "amortisation jahre",
+    "payback_time_years",
+    "payback_time",
+    "payback_period",
+    "payback_period_years",
+    "payback_years",
+    "payback",
+)
+_AMORTIZATION_METHOD_KEYS = (
+    "amortization_method",
+    "amortization_method_display",
+    "amortization_method_label",
+    "amortisation_method",
+    "amortisationsmethode",
+    "amortization_method_code",
+)
+_INVESTMENT_KEYS = (
+    "final_modified_price_net",
+    "final_offer_price_net",
+    "final_price_net",
+    "final_price",
+    "finale_summe_netto",
+    "netto_mit_provision",
+    "total_investment_netto",
+    "investment_total_netto",
+    "solarcalculator_final_price_net",
+    "angebot_netto",
+    "angebotssumme_netto",
+    "pricing_net_total",
+    "final_end_preis",
+    "final_end_preis_netto",
+)
+_ANNUAL_SAVINGS_KEYS = (
+    "annual_total_savings_year1_label",
+    "total_annual_savings_eur",
+    "annual_total_savings_eur",
+    "annual_savings_total_euro",
+    "annual_total_benefits_eur",
+    "annual_total_benefit_eur",
+    "annual_total_savings",
+    "annual_savings",
+)
+_ANNUAL_SAVINGS_COMPONENT_KEYS = (
+    "annual_electricity_cost_savings_self_consumption_year1",
+    "annual_feed_in_revenue_year1",
+    "tax_benefits_eur",
+    "tax_benefit_feed_in_year1",
+    "annual_battery_discharge_value_year1",
+    "annual_battery_surplus_feed_in_value_year1",
+    "battery_usage_savings_eur",
+    "battery_surplus_feed_in_eur",
+)
+_ANNUAL_SAVINGS_FALLBACK_KEYS = (
+    "annual_financial_benefit_year1",
+    "annual_financial_benefit",
+    "annual_total_savings_year1",
+    "annual_total_savings_euro",
+)
+_PRICING_SEARCH_KEYS = (
+    _AMORTIZATION_KEYS
+    + _AMORTIZATION_METHOD_KEYS
+    + _INVESTMENT_KEYS
+    + _ANNUAL_SAVINGS_KEYS
+    + _ANNUAL_SAVINGS_COMPONENT_KEYS
+    + _ANNUAL_SAVINGS_FALLBACK_KEYS
+)
+
+
+def _build_pricing_placeholders(
+    project_data: dict[str, Any] | None,
+    analysis_results: dict[str, Any] | None,
+    upstream: dict[str, str],
+) -> dict[str, str]:
+    """Gruppe "pricing": Preisstruktur (Seiten 6-7), Amortisation und Aliase.
+
+    Baut auf den Gruppen "energy" und "product" auf und liefert nur geänderte
+    oder neue Platzhalter.
+    """
+    import re  # Import re at the beginning of the function
+
+    project_data = project_data or {}
+    analysis_results = analysis_results or {}
+
+    project_details = (
+        project_data.get("project_details", {})
+        if isinstance(project_data, dict)
+        else {}
+    )
+
+    session_state = _get_session_state()
+
+    session_get = _session_get
+
+    parse_float = _parse_float
+
+    result: dict[str, str] = dict(upstream)
+
+    # Amortisationszeit (Jahre) für Seite 1 – hole Wert robust aus allen
+    # relevanten Quellen
+    amortization_keys = _AMORTIZATION_KEYS
+
+    session_project_data = session_get("project_data")
+    session_project_details = (
+        session_project_data.get("project_details")
+        if isinstance(session_project_data, dict)
+        else None
+    )
+
+    candidate_sources: list[Any] = [
+        analysis_results,
+        project_details,
+        project_data if isinstance(project_data, dict) else None,
+        (
+            project_data.get("analysis_results")
+            if isinstance(project_data, dict)
+            else None
+        ),
+        session_get("analysis_results"),
+        session_get("calculation_results"),
+        session_get("solar_calculator_analysis"),
+        session_get("solar_calculator_final_pricing_values"),
+        session_get("solar_calculator_results"),
+        session_get("financial_dashboard_data"),
+        session_get("live_pricing_calculations"),
+        session_get("final_pricing_data"),
+        session_get("complete_pricing_data"),
+        session_get("simple_pricing_data"),
+        session_project_data,
+        session_project_details,
+    ]
+
+    method_keys = _AMORTIZATION_METHOD_KEYS
+
+    # Gleiche Normalisierung wie KeySearch, damit die deklarierte Eingabe
+    # der Gruppe genau die hier gefundenen Einträge erfasst
+    normalize_key = normalize_search_key
+
+    def extract_numeric_from_sources(
+        keys: Sequence[str], sources: list[Any]
+    ) -> float | None:
+        visited: set[int] = set()
+        normalized_targets = {normalize_key(key) for key in keys}
+
+        def _extract(source: Any) -> float | None:
+            if source is None:
+                return None
+
+            if isinstance(source, list | tuple):
+                obj_id = id(source)
+                if obj_id in visited:
+                    return None
+                visited.add(obj_id)
+                for item in source:
+                    found = _extract(item)
+                    if found is not None:
+                        return found
+                return None
+
+            if not isinstance(source, dict):
+                return None
+
+            obj_id = id(source)
+            if obj_id in visited:
+                return None
+            visited.add(obj_id)
+
+            for raw_key, raw_value in source.items():
+                norm_key = normalize_key(raw_key)
+                if norm_key in normalized_targets:
+                    val = parse_float(raw_value)
+                    if val is not None and val > 0 and math.isfinite(val):
+                        return val
+
+            for raw_value in source.values():
+                found = _extract(raw_value)
+                if found is not None:
+                    return found
+
+            return None
+
+        for src in sources:
+            found = _extract(src)
+            if found is not None:
+                return found
+        return None
+
+    def extract_string_from_sources(
+        keys: Sequence[str], sources: list[Any]
+    ) -> str | None:
+        normalized_targets = {normalize_key(key) for key in keys if key}
+        visited: set[int] = set()
+
+        def _extract(source: Any) -> str | None:
+            if source is None:
+                return None
+            obj_id = id(source)
+            if obj_id in visited:
+                return None
+            visited.add(obj_id)
+
+            if isinstance(source, dict):
+                for raw_key, raw_value in source.items():
+                    norm_key = normalize_key(raw_key)
+                    if norm_key in normalized_targets and raw_value not in (None, ""):
+                        return str(raw_value).strip()
+                for raw_value in source.values():
+                    found = _extract(raw_value)
+                    if found:
+                        return found
+            elif isinstance(source, (list, tuple, set)):
+                for item in source:
+                    found = _extract(item)
+                    if found:
+                        return found
+            return None
+
+        for src in sources:
+            found = _extract(src)
+            if found:
+                return found
+        return None
+
+    amortization_method_raw = extract_string_from_sources(
+        method_keys, candidate_sources
+    )
+
+    def _normalize_method_token(value: str | None) -> str:
+        if not value:
+            return ""
+        return re.sub(r"[^a-z0-9]", "", value.lower())
+
+    method_label_map = {
+        "classic": "Klassisch (Investition ÷ Jährliche Vorteile)",
+        "klassisch": "Klassisch (Investition ÷ Jährliche Vorteile)",
+        "klassischinvestitionjahrlichevorteile": "Klassisch (Investition ÷ Jährliche Vorteile)",
+        "electricitycosts": "Stromkosten-Vergleich",
+        "stromkostenvergleich": "Stromkosten-Vergleich",
+        "stromkosten": "Stromkosten-Vergleich",
+    }
+
+    amortization_method_code = _normalize_method_token(amortization_method_raw)
+    amortization_method_label = method_label_map.get(amortization_method_code)
+    if not amortization_method_label and amortization_method_raw:
+        amortization_method_label = amortization_method_raw.strip()
+    if amortization_method_code == "":
+        amortization_method_code = None
+
+    amort_years = extract_numeric_from_sources(amortization_keys, candidate_sources)
+    amortization_years_value: float | None = None
+    if amort_years is not None and amort_years > 0 and math.isfinite(amort_years):
+        amortization_years_value = amort_years
+
+
+    # === NEUE FORMATIERTE PRODUKTWERTE FÜR SEITE 6 ===
     try:
         # 1. Module Anzahl Format "28 x"
         pv_count_raw = (
@@ -5933,22 +6062,7 @@ def build_dynamic_data(
     # --- Finale Amortisationsbewertung für Seite 1 ---
     try:
         final_price_sources = [result] + candidate_sources
-        price_keys = [
-            "final_modified_price_net",
-            "final_offer_price_net",
-            "final_price_net",
-            "final_price",
-            "finale_summe_netto",
-            "netto_mit_provision",
-            "total_investment_netto",
-            "investment_total_netto",
-            "solarcalculator_final_price_net",
-            "angebot_netto",
-            "angebotssumme_netto",
-            "pricing_net_total",
-            "final_end_preis",
-            "final_end_preis_netto",
-        ]
+        price_keys = _INVESTMENT_KEYS
         final_investment_amount = extract_numeric_from_sources(
             price_keys, final_price_sources
         )
@@ -5980,16 +6094,7 @@ def build_dynamic_data(
                     break
 
         savings_sources = [result] + candidate_sources
-        savings_keys_primary = [
-            "annual_total_savings_year1_label",
-            "total_annual_savings_eur",
-            "annual_total_savings_eur",
-            "annual_savings_total_euro",
-            "annual_total_benefits_eur",
-            "annual_total_benefit_eur",
-            "annual_total_savings",
-            "annual_savings",
-        ]
+        savings_keys_primary = _ANNUAL_SAVINGS_KEYS
         annual_savings_amount = extract_numeric_from_sources(
             savings_keys_primary, savings_sources
         )
@@ -5999,16 +6104,7 @@ def build_dynamic_data(
             or annual_savings_amount <= 0
             or not math.isfinite(annual_savings_amount)
         ):
-            component_keys = [
-                "annual_electricity_cost_savings_self_consumption_year1",
-                "annual_feed_in_revenue_year1",
-                "tax_benefits_eur",
-                "tax_benefit_feed_in_year1",
-                "annual_battery_discharge_value_year1",
-                "annual_battery_surplus_feed_in_value_year1",
-                "battery_usage_savings_eur",
-                "battery_surplus_feed_in_eur",
-            ]
+            component_keys = _ANNUAL_SAVINGS_COMPONENT_KEYS
             component_sum = 0.0
             for key in component_keys:
                 candidate_value = parse_float(result.get(key))
@@ -6035,12 +6131,7 @@ def build_dynamic_data(
             or annual_savings_amount <= 0
             or not math.isfinite(annual_savings_amount)
         ):
-            fallback_savings_keys = [
-                "annual_financial_benefit_year1",
-                "annual_financial_benefit",
-                "annual_total_savings_year1",
-                "annual_total_savings_euro",
-            ]
+            fallback_savings_keys = _ANNUAL_SAVINGS_FALLBACK_KEYS
             annual_savings_amount = extract_numeric_from_sources(
                 fallback_savings_keys, savings_sources
             )
@@ -6095,6 +6186,166 @@ def build_dynamic_data(
     if amortization_method_code:
         result["amortization_method_code"] = amortization_method_code
 
+    def _format_feed_in_value(value: Any) -> str:
+        if isinstance(value, str) and value.strip():
+            cleaned = value.strip()
+            if any(token in cleaned for token in ("Cent", "€/kWh", "ct/kWh")):
+                return cleaned
+        numeric_value = parse_float(value)
+        if numeric_value is None:
+            return str(value)
+        if numeric_value < 1.0:
+            return fmt_number(numeric_value * 100.0, 2, " Cent / kWh")
+        return fmt_number(numeric_value, 2, " €/kWh")
+
+    def _format_amort_value(value: Any) -> str:
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+        numeric_value = parse_float(value)
+        if numeric_value is None:
+            return str(value)
+        return fmt_number(numeric_value, 2, " Jahre")
+
+    def _assign_alias(
+        target_key: str, source_keys: tuple[str, ...], formatter=None
+    ) -> None:
+        for source_key in source_keys:
+            candidate = result.get(source_key)
+            if candidate in (None, ""):
+                continue
+            if formatter:
+                try:
+                    result[target_key] = formatter(candidate)
+                except Exception:
+                    result[target_key] = str(candidate)
+            else:
+                result[target_key] = str(candidate)
+            break
+
+    # Seite 7: verbinde neue Platzhalter mit bestehenden Kennzahlen
+    _assign_alias(
+        "annual_electricity_produce",
+        ("annual_pv_production_kwh", "pv_prod_kwh_short"),
+    )
+    _assign_alias(
+        "eigenverbrauch_quote_%",
+        ("self_consumption_percent",),
+    )
+    _assign_alias(
+        "autarkie_grad_%",
+        ("self_supply_rate_percent",),
+    )
+    _assign_alias(
+        "annual_euro_savings",
+        (
+            "total_annual_savings_eur",
+            "annual_total_benefits_eur",
+            "annual_total_savings_eur",
+        ),
+    )
+    _assign_alias(
+        "on_grid_tariffs",
+        (
+            "feed_in_tariff_text",
+            "feed_in_tariff_eur_per_kwh",
+            "einspeiseverguetung_eur_per_kwh",
+        ),
+        formatter=_format_feed_in_value,
+    )
+    _assign_alias(
+        "amortisation_time",
+        ("amortization_time", "amortization_time_years"),
+        formatter=_format_amort_value,
+    )
+
+    return _changed_placeholders(result, upstream)
+
+
+def _build_customer_placeholders(
+    inputs: PlaceholderInputs, upstream: dict[str, str]
+) -> dict[str, str]:
+    """Gruppe "customer": Anschrift und Kontakt des Kunden."""
+    customer = inputs.project_data.get("customer_data", {}) or {}
+    fields = _format_customer(customer)
+    return {
+        "customer_name": fields["full_name"],
+        "customer_street": fields["street_full"],
+        "customer_city_zip": fields["city_zip"],
+        "customer_phone": fields["phone"],
+        "customer_email": fields["email"],
+    }
+
+
+def _build_company_placeholders(
+    inputs: PlaceholderInputs, upstream: dict[str, str]
+) -> dict[str, str]:
+    """Gruppe "company": Firmenangaben und Logo für die Kopfzeilen."""
+    company_info = inputs.company_info
+
+    def as_str(v: Any) -> str:
+        return "" if v is None else str(v)
+
+    return {
+        # Firma (für Platzhalter rechts)
+        "company_name": as_str(company_info.get("name") or ""),
+        "company_street": as_str(company_info.get("street") or ""),
+        "company_city_zip": as_str(
+            (
+                f"{company_info.get('zip_code', '')} {company_info.get('city', '')}"
+            ).strip()
+        ),
+        "company_phone": as_str(company_info.get("phone") or ""),
+        "company_email": as_str(company_info.get("email") or ""),
+        "company_website": as_str(company_info.get("website") or ""),
+        # Firmenlogo (Base64) für Overlay-Header auf Seiten 1-6
+        "company_logo_b64": as_str(company_info.get("logo_base64") or ""),
+    }
+
+
+def _build_energy_group(inputs: PlaceholderInputs, upstream: dict[str, str]) -> dict[str, str]:
+    return _build_energy_placeholders(inputs.project_data, inputs.analysis_results)
+
+
+def _build_product_group(inputs: PlaceholderInputs, upstream: dict[str, str]) -> dict[str, str]:
+    return _build_product_placeholders(
+        inputs.project_data, inputs.analysis_results, upstream
+    )
+
+
+def _build_pricing_group(inputs: PlaceholderInputs, upstream: dict[str, str]) -> dict[str, str]:
+    return _build_pricing_placeholders(
+        inputs.project_data, inputs.analysis_results, upstream
+    )
+
+
+# Quellen der Monatsreihen für das Chart auf Seite 1 (in Suchreihenfolge)
+_CHART_PRODUCTION_KEYS = (
+    "monthly_productions_sim",
+    "monthly_production_kwh",
+    "monthly_production_data",
+    "monthly_production",
+    "monthly_production_profile_kwh",
+)
+_CHART_CONSUMPTION_KEYS = (
+    "monthly_consumption_sim",
+    "monthly_consumption_kwh",
+    "monthly_consumption_data",
+    "monthly_consumption",
+    "monthly_consumption_profile_kwh",
+)
+_CHART_SERIES_KEYS = _CHART_PRODUCTION_KEYS + _CHART_CONSUMPTION_KEYS
+
+
+def _build_chart_placeholders(
+    inputs: PlaceholderInputs, upstream: dict[str, str]
+) -> dict[str, str]:
+    """Gruppe "charts": Monatsreihen (Produktion/Verbrauch) für das Chart auf Seite 1."""
+    project_data = inputs.project_data
+    analysis_results = inputs.analysis_results
+    project_details = project_data.get("project_details", {}) or {}
+    session_get = _session_get
+    result: dict[str, str] = {}
+
     try:
         default_month_labels = [
             "Jan",
@@ -6166,7 +6417,7 @@ def build_dynamic_data(
                     return [float(num.replace(",", ".")) for num in numbers[:12]]
             return []
 
-        def _extract_monthly_series(keys: list[str]) -> list[float]:
+        def _extract_monthly_series(keys: Sequence[str]) -> list[float]:
             for key in keys:
                 sources: tuple[Any, ...] = (
                     analysis_results.get(key),
@@ -6184,24 +6435,8 @@ def build_dynamic_data(
                         return [max(float(v), 0.0) for v in normalized[:12]]
             return []
 
-        monthly_prod = _extract_monthly_series(
-            [
-                "monthly_productions_sim",
-                "monthly_production_kwh",
-                "monthly_production_data",
-                "monthly_production",
-                "monthly_production_profile_kwh",
-            ]
-        )
-        monthly_cons = _extract_monthly_series(
-            [
-                "monthly_consumption_sim",
-                "monthly_consumption_kwh",
-                "monthly_consumption_data",
-                "monthly_consumption",
-                "monthly_consumption_profile_kwh",
-            ]
-        )
+        monthly_prod = _extract_monthly_series(_CHART_PRODUCTION_KEYS)
+        monthly_cons = _extract_monthly_series(_CHART_CONSUMPTION_KEYS)
 
         if len(monthly_prod) == 12 and len(monthly_cons) == 12:
             result["chart_monthly_prod_series"] = ",".join(
@@ -6215,6 +6450,36 @@ def build_dynamic_data(
     except Exception as chart_err:
         print(f"WARN: Monatsdaten für Seite 1 Chart nicht verfügbar: {chart_err}")
 
+    return result
+
+
+# Schlüssel, unter denen Zahlungsdaten bzw. der Projektgesamtbetrag liegen
+_PAYMENT_DATA_KEYS = ("pdf_payment_data", "payment_data", "selected_payment_data")
+_PAYMENT_TOTAL_KEYS = (
+    "final_end_preis",
+    "final_end_preis_formatted",
+    "simple_endergebnis_brutto",
+    "simple_endergebnis_brutto_formatted",
+    "final_end_preis_netto",
+    "total_amount",
+    "project_total",
+    "ui_total_amount",
+    "total_investment_brutto",
+    "total_cost",
+)
+
+
+def _build_financing_placeholders(
+    inputs: PlaceholderInputs, upstream: dict[str, str]
+) -> dict[str, str]:
+    """Gruppe "financing": Zahlungsplan (Seite 8); Gesamtbetrag aus "pricing"."""
+    project_data = inputs.project_data
+    analysis_results = inputs.analysis_results
+    project_details = project_data.get("project_details", {}) or {}
+    session_get = _session_get
+    parse_float = _parse_float
+    result: dict[str, str] = {}
+
     try:
         payment_data_candidates: list[dict[str, Any]] = []
 
@@ -6229,28 +6494,16 @@ def build_dynamic_data(
                     payment_data_candidates.append(candidate)
 
         if isinstance(project_data, dict):
-            for candidate_key in (
-                "pdf_payment_data",
-                "payment_data",
-                "selected_payment_data",
-            ):
+            for candidate_key in _PAYMENT_DATA_KEYS:
                 _collect_candidate(project_data, candidate_key)
 
             project_details_dict = project_data.get("project_details")
             if isinstance(project_details_dict, dict):
-                for candidate_key in (
-                    "pdf_payment_data",
-                    "payment_data",
-                    "selected_payment_data",
-                ):
+                for candidate_key in _PAYMENT_DATA_KEYS:
                     _collect_candidate(project_details_dict, candidate_key)
 
         if isinstance(analysis_results, dict):
-            for candidate_key in (
-                "pdf_payment_data",
-                "payment_data",
-                "selected_payment_data",
-            ):
+            for candidate_key in _PAYMENT_DATA_KEYS:
                 _collect_candidate(analysis_results, candidate_key)
 
         payment_data: dict[str, Any] | None = None
@@ -6275,25 +6528,14 @@ def build_dynamic_data(
                 def _resolve_total_amount() -> float:
                     total_candidates: list[Any] = []
                     for source in (
-                        result,
+                        upstream,
                         project_details,
                         project_data,
                         analysis_results,
                     ):
                         if isinstance(source, dict):
                             total_candidates.extend(
-                                [
-                                    source.get("final_end_preis"),
-                                    source.get("final_end_preis_formatted"),
-                                    source.get("simple_endergebnis_brutto"),
-                                    source.get("simple_endergebnis_brutto_formatted"),
-                                    source.get("final_end_preis_netto"),
-                                    source.get("total_amount"),
-                                    source.get("project_total"),
-                                    source.get("ui_total_amount"),
-                                    source.get("total_investment_brutto"),
-                                    source.get("total_cost"),
-                                ]
+                                source.get(key) for key in _PAYMENT_TOTAL_KEYS
                             )
                     for value in total_candidates:
                         parsed_total = parse_float(value)
@@ -6370,76 +6612,604 @@ def build_dynamic_data(
     except Exception as payment_err:
         print(f"WARN: Zahlungsdaten für Seite 8 nicht verfügbar: {payment_err}")
 
-    def _format_feed_in_value(value: Any) -> str:
-        if isinstance(value, str) and value.strip():
-            cleaned = value.strip()
-            if any(token in cleaned for token in ("Cent", "€/kWh", "ct/kWh")):
-                return cleaned
-        numeric_value = parse_float(value)
-        if numeric_value is None:
-            return str(value)
-        if numeric_value < 1.0:
-            return fmt_number(numeric_value * 100.0, 2, " Cent / kWh")
-        return fmt_number(numeric_value, 2, " €/kWh")
+    return result
 
-    def _format_amort_value(value: Any) -> str:
-        if isinstance(value, str) and value.strip():
-            return value.strip()
-        numeric_value = parse_float(value)
-        if numeric_value is None:
-            return str(value)
-        return fmt_number(numeric_value, 2, " Jahre")
 
-    def _assign_alias(
-        target_key: str, source_keys: tuple[str, ...], formatter=None
-    ) -> None:
-        for source_key in source_keys:
-            candidate = result.get(source_key)
-            if candidate in (None, ""):
-                continue
-            if formatter:
-                try:
-                    result[target_key] = formatter(candidate)
-                except Exception:
-                    result[target_key] = str(candidate)
-            else:
-                result[target_key] = str(candidate)
-            break
+# Session-Keys, die die Produkt- bzw. Preis-Gruppe liest (Zwischenstände der UI)
+_PRODUCT_SESSION_KEYS = (
+    "pdf_design_config",
+    "project_data",
+)
+_PRICING_SESSION_KEYS = (
+    "analysis_results",
+    "calculation_results",
+    "complete_pricing_data",
+    "final_pricing_data",
+    "financial_dashboard_data",
+    "live_pricing_calculations",
+    "pricing_display",
+    "project_data",
+    "simple_pricing_data",
+    "solar_calculator_analysis",
+    "solar_calculator_final_pricing_values",
+    "solar_calculator_results",
+)
+# Alle Session-Keys, von denen die Angebotswerte abhängen
+_CORE_SESSION_KEYS = tuple(sorted(set(_PRODUCT_SESSION_KEYS + _PRICING_SESSION_KEYS)))
+# Schlüssel, die die Gruppen "energy", "product" und "pricing" direkt lesen
+# (unter analysis_results, project_data bzw. project_data.project_details)
+_ENERGY_ANALYSIS_KEYS = (
+    "aktueller_strompreis_fuer_hochrechnung_euro_kwh",
+    "anlage_kwp",
+    "annual_consumption",
+    "annual_consumption_kwh",
+    "annual_consumption_kwh_yr",
+    "annual_pv_production_kwh",
+    "annual_storage_charge_kwh",
+    "annual_storage_discharge_kwh",
+    "annual_yield_kwh",
+    "autarky_percent",
+    "battery_capacity_kwh",
+    "direktverbrauch_anteil_pv_produktion_pct",
+    "einspeiseverguetung_eur_per_kwh",
+    "electricity_price_eur_per_kwh",
+    "electricity_price_increase",
+    "electricity_price_increase_annual_percent",
+    "grid_bezug_kwh",
+    "grid_feed_in_kwh",
+    "grid_purchase_kwh",
+    "income_tax_rate",
+    "irr_percent",
+    "jahresstromverbrauch_fuer_hochrechnung_kwh",
+    "lcoe_euro_per_kwh",
+    "module_quantity",
+    "monthly_direct_self_consumption_kwh",
+    "monthly_feed_in_kwh",
+    "monthly_storage_charge_kwh",
+    "monthly_storage_discharge_for_sc_kwh",
+    "netzeinspeisung_kwh",
+    "selected_storage_storage_power_kw",
+    "self_consumption_percent",
+    "self_sufficiency_percent",
+    "self_supply_rate_percent",
+    "sim_annual_yield_kwh",
+    "speichernutzung_anteil_pv_produktion_pct",
+    "total_consumption_kwh_yr",
+)
+_ENERGY_PROJECT_KEYS = (
+    "anlage_kwp",
+    "annual_consumption",
+    "annual_consumption_kwh",
+    "customer_data",
+    "einspeise_art",
+    "electricity_price_eur_per_kwh",
+    "electricity_price_increase_annual_percent",
+    "electricity_price_kwh",
+    "electricity_price_per_kwh",
+    "income_tax_rate",
+    "stromkosten_haushalt_euro_monat",
+    "stromkosten_heizung_euro_monat",
+)
+_ENERGY_DETAIL_KEYS = (
+    "anlage_kwp",
+    "annual_consumption_kwh",
+    "annual_consumption_kwh_yr",
+    "battery_capacity_kwh",
+    "consumption_heating_kwh_yr",
+    "electricity_price_increase_annual_percent",
+    "income_tax_rate",
+    "inverter_power_kw",
+    "module_quantity",
+    "selected_inverter_power_kw",
+    "selected_inverter_power_kw_single",
+    "selected_inverter_quantity",
+    "selected_module_capacity_w",
+    "selected_storage_capacity_kwh",
+    "selected_storage_name",
+    "selected_storage_storage_power_kw",
+    "stromkosten_haushalt_euro_monat",
+    "stromkosten_heizung_euro_monat",
+)
+_PRODUCT_ANALYSIS_KEYS = (
+    "aktueller_strompreis_fuer_hochrechnung_euro_kwh",
+    "alternative_investment_interest_rate_percent",
+    "anlage_kwp",
+    "annual_co2_savings_kg",
+    "annual_direct_self_consumption_kwh",
+    "annual_feed_in_kwh",
+    "annual_grid_feed_in_kwh",
+    "annual_production_kwh",
+    "annual_pv_generation_kwh",
+    "annual_pv_production_kwh",
+    "annual_self_consumption_kwh",
+    "annual_storage_charge_kwh",
+    "annual_storage_discharge_kwh",
+    "annual_yield_kwh",
+    "ausrichtung",
+    "baseline_co2_without_pv_kg",
+    "battery_capacity_kwh",
+    "battery_charge_kwh",
+    "battery_cover_consumption_kwh",
+    "battery_discharge_for_sc_kwh",
+    "co2_annual_savings_kg",
+    "co2_baseline_emissions_kg",
+    "co2_baseline_per_capita_tons",
+    "co2_einsparung_jahr_kg",
+    "co2_emission_factor_export",
+    "co2_emission_factor_grid",
+    "co2_export_factor_kg_per_kwh",
+    "co2_footprint_reduction_percent",
+    "co2_grid_factor_kg_per_kwh",
+    "co2_household_without_pv_kg",
+    "co2_lca_factor_kg_per_kwh",
+    "co2_per_car_km_kg",
+    "co2_per_tree_kg_pa",
+    "co2_pv_factor_kg_per_kwh",
+    "co2_reduction_percent",
+    "co2_savings_kg_per_year",
+    "consumption_battery_kwh",
+    "consumption_direct_kwh",
+    "cost_of_capital_percent",
+    "direct_consumption_kwh",
+    "direct_self_consumption_kwh",
+    "einspeiseverguetung_eur_per_kwh",
+    "electricity_price_eur_per_kwh",
+    "electricity_price_increase_annual_percent",
+    "electricity_price_kwh",
+    "electricity_price_per_kwh",
+    "energy_supplier",
+    "environmental_co2_savings_kg_year",
+    "feed_in_kwh",
+    "feed_in_tariff_eur_per_kwh",
+    "feed_in_tariff_year1_eur_per_kwh",
+    "final_price",
+    "grid_feed_in_kwh",
+    "income_tax_rate",
+    "inverter_manufacturer",
+    "inverter_model",
+    "maintenance_costs_percent",
+    "maintenance_percent_invest_pa",
+    "module_manufacturer",
+    "module_model",
+    "monthly_direct_self_consumption_kwh",
+    "monthly_feed_in_kwh",
+    "monthly_pv_production_kwh",
+    "netzeinspeisung_kwh",
+    "orientation",
+    "orientation_text",
+    "pdf_design_config",
+    "production_kwh",
+    "pv_annual_generation_kwh",
+    "pv_total_production_kwh",
+    "self_consumption_kwh",
+    "self_consumption_total_kwh",
+    "simulation_period_years",
+    "storage_capacity_kwh",
+    "storage_cycles",
+    "storage_dod_percent",
+    "storage_extension_module_kwh",
+    "storage_manufacturer",
+    "storage_max_capacity_kwh",
+    "storage_model",
+    "subtotal_netto",
+    "total_investment_brutto",
+    "total_investment_netto",
+    "total_self_consumption_kwh",
+)
+_PRODUCT_PROJECT_KEYS = (
+    "anlage_kwp",
+    "annual_direct_self_consumption_kwh",
+    "annual_feed_in_kwh",
+    "annual_grid_feed_in_kwh",
+    "annual_production_kwh",
+    "annual_pv_generation_kwh",
+    "annual_pv_production_kwh",
+    "annual_self_consumption_kwh",
+    "annual_yield_kwh",
+    "ausrichtung",
+    "baseline_co2_without_pv_kg",
+    "battery_cover_consumption_kwh",
+    "battery_discharge_for_sc_kwh",
+    "co2_baseline_emissions_kg",
+    "co2_emission_factor_export",
+    "co2_emission_factor_grid",
+    "co2_export_factor_kg_per_kwh",
+    "co2_grid_factor_kg_per_kwh",
+    "co2_household_without_pv_kg",
+    "co2_lca_factor_kg_per_kwh",
+    "co2_pv_factor_kg_per_kwh",
+    "consumption_battery_kwh",
+    "consumption_direct_kwh",
+    "cost_of_capital_percent",
+    "customer_data",
+    "dach_art",
+    "dach_typ",
+    "dachtyp",
+    "direct_consumption_kwh",
+    "direct_self_consumption_kwh",
+    "einspeise_art",
+    "electricity_price_increase_annual_percent",
+    "electricity_price_kwh",
+    "electricity_price_per_kwh",
+    "energy_supplier",
+    "feed_in_kwh",
+    "financing_leasing_required",
+    "financing_needed",
+    "financing_requested",
+    "financing_type",
+    "finanzierung_leasing_gewuenscht",
+    "grid_feed_in_kwh",
+    "heatpump_offer",
+    "inclusion_options",
+    "income_tax_rate",
+    "netzeinspeisung_kwh",
+    "orientation",
+    "pdf_design_config",
+    "pdf_services",
+    "production_kwh",
+    "pv_annual_generation_kwh",
+    "pv_total_production_kwh",
+    "roof_covering",
+    "roof_covering_type",
+    "roof_inclination",
+    "roof_inclination_deg",
+    "roof_material",
+    "roof_orientation",
+    "roof_structure",
+    "roof_type",
+    "self_consumption_kwh",
+    "self_consumption_total_kwh",
+    "simulation_period_years",
+    "stromanbieter",
+    "total_pages",
+    "total_self_consumption_kwh",
+)
+_PRODUCT_DETAIL_KEYS = (
+    "annual_direct_self_consumption_kwh",
+    "annual_feed_in_kwh",
+    "annual_grid_feed_in_kwh",
+    "annual_production_kwh",
+    "annual_pv_generation_kwh",
+    "annual_pv_production_kwh",
+    "annual_self_consumption_kwh",
+    "annual_yield_kwh",
+    "ausrichtung",
+    "baseline_co2_without_pv_kg",
+    "battery_capacity_kwh",
+    "battery_cover_consumption_kwh",
+    "battery_discharge_for_sc_kwh",
+    "co2_baseline_emissions_kg",
+    "co2_emission_factor_export",
+    "co2_emission_factor_grid",
+    "co2_export_factor_kg_per_kwh",
+    "co2_grid_factor_kg_per_kwh",
+    "co2_household_without_pv_kg",
+    "co2_lca_factor_kg_per_kwh",
+    "co2_pv_factor_kg_per_kwh",
+    "consumption_battery_kwh",
+    "consumption_direct_kwh",
+    "customer_data",
+    "dach_art",
+    "dach_typ",
+    "dachtyp",
+    "direct_consumption_kwh",
+    "direct_self_consumption_kwh",
+    "extension_module_kwh",
+    "feed_in_kwh",
+    "final_modified_price_net",
+    "final_offer_price_net",
+    "final_price_with_provision",
+    "financing_leasing_required",
+    "financing_needed",
+    "financing_type",
+    "formatted_final_modified_vat_amount",
+    "grid_feed_in_kwh",
+    "include_storage",
+    "income_tax_rate",
+    "inverter_brand_logo_b64",
+    "inverter_image_b64",
+    "inverter_manufacturer",
+    "inverter_power",
+    "inverter_power_kw",
+    "inverter_power_w",
+    "max_capacity_kwh",
+    "module_brand_logo_b64",
+    "module_cell_technology",
+    "module_cell_type",
+    "module_guarantee_combined",
+    "module_image_b64",
+    "module_manufacturer",
+    "module_model",
+    "module_product_warranty_years",
+    "module_quantity",
+    "module_structure",
+    "module_version",
+    "netzeinspeisung_kwh",
+    "orientation",
+    "production_kwh",
+    "pv_annual_generation_kwh",
+    "pv_total_production_kwh",
+    "roof_covering",
+    "roof_covering_type",
+    "roof_inclination",
+    "roof_inclination_deg",
+    "roof_material",
+    "roof_orientation",
+    "roof_structure",
+    "roof_type",
+    "selected_inverter_id",
+    "selected_inverter_name",
+    "selected_inverter_power_kw",
+    "selected_inverter_power_kw_single",
+    "selected_inverter_power_w",
+    "selected_inverter_quantity",
+    "selected_module_capacity_w",
+    "selected_module_id",
+    "selected_module_name",
+    "selected_storage_capacity_kwh",
+    "selected_storage_id",
+    "selected_storage_name",
+    "selected_storage_power_kw",
+    "selected_storage_storage_power_kw",
+    "self_consumption_kwh",
+    "self_consumption_total_kwh",
+    "storage_brand_logo_b64",
+    "storage_extension_module_size_kwh",
+    "storage_image_b64",
+    "storage_manufacturer",
+    "storage_max_size_kwh",
+    "total_self_consumption_kwh",
+)
+_PRICING_ANALYSIS_KEYS = (
+    "annual_yield_kwh",
+    "inverter_total_power_kw",
+    "pv_modules_count_with_unit",
+    "storage_capacity_kwh",
+    "total_investment_netto",
+)
+_PRICING_PROJECT_KEYS = (
+    "analysis_results",
+    "complete_pricing_data",
+    "final_pricing_data",
+    "simple_pricing_data",
+)
+_PRICING_DETAIL_KEYS = (
+    "annual_consumption_kwh",
+    "battery_capacity_kwh",
+    "component_base_price_net",
+    "ersparte_mehrwertsteuer",
+    "ersparte_mehrwertsteuer_formatted",
+    "extra_services_total",
+    "extra_services_total_formatted",
+    "extras_total",
+    "final_modified_price_net",
+    "final_offer_price_gross",
+    "final_offer_price_net",
+    "final_price_brutto",
+    "final_price_net",
+    "final_price_netto",
+    "final_price_with_provision",
+    "formatted_final_end_preis",
+    "formatted_final_investment",
+    "formatted_final_pricing",
+    "formatted_final_with_provision",
+    "formatted_minus_mwst",
+    "formatted_minus_rabatt",
+    "formatted_plus_aufpreis",
+    "formatted_preis_mit_mwst",
+    "formatted_zubehor_preis",
+    "formatted_zwischensumme_preis",
+    "inverter_power_kw",
+    "minus_mehrwertsteuer",
+    "module_quantity",
+    "preis_mit_mwst",
+    "selected_inverter_power_kw",
+    "selected_storage_capacity_kwh",
+    "storage_capacity_kwh",
+    "total_discounts",
+    "total_investment_netto",
+    "total_surcharges",
+    "vat_savings",
+    "vat_savings_formatted",
+    "zubehor_total",
+    "zwischensumme_brutto",
+    "zwischensumme_final",
+    "zwischensumme_final_formatted",
+)
 
-    # Seite 7: verbinde neue Platzhalter mit bestehenden Kennzahlen
-    _assign_alias(
-        "annual_electricity_produce",
-        ("annual_pv_production_kwh", "pv_prod_kwh_short"),
+
+def _paths(prefix: str, keys: Sequence[str]) -> tuple[str, ...]:
+    """Eingabepfade ``<prefix>.<key>`` für register_placeholder_group."""
+    return tuple(f"{prefix}.{key}" for key in keys)
+
+
+register_placeholder_group(
+    PlaceholderGroup(
+        "customer", _build_customer_placeholders, inputs=("project_data.customer_data",)
     )
-    _assign_alias(
-        "eigenverbrauch_quote_%",
-        ("self_consumption_percent",),
+)
+register_placeholder_group(
+    PlaceholderGroup("company", _build_company_placeholders, inputs=("company_info",))
+)
+register_placeholder_group(
+    PlaceholderGroup(
+        "energy",
+        _build_energy_group,
+        inputs=_paths("analysis_results", _ENERGY_ANALYSIS_KEYS)
+        + _paths("project_data", _ENERGY_PROJECT_KEYS)
+        + _paths("project_data.project_details", _ENERGY_DETAIL_KEYS)
+        + (
+            "project_data.consumption_data.annual_consumption",
+            "versions.admin_settings",
+            "versions.product_catalog",
+        ),
+        uses_database=True,
     )
-    _assign_alias(
-        "autarkie_grad_%",
-        ("self_supply_rate_percent",),
+)
+register_placeholder_group(
+    PlaceholderGroup(
+        "product",
+        _build_product_group,
+        inputs=_paths("analysis_results", _PRODUCT_ANALYSIS_KEYS)
+        + _paths("project_data", _PRODUCT_PROJECT_KEYS)
+        + _paths("project_data.project_details", _PRODUCT_DETAIL_KEYS)
+        + ("versions.admin_settings", "versions.product_catalog")
+        + _paths("session", _PRODUCT_SESSION_KEYS),
+        depends_on=("energy",),
+        uses_database=True,
     )
-    _assign_alias(
-        "annual_euro_savings",
-        (
-            "total_annual_savings_eur",
-            "annual_total_benefits_eur",
-            "annual_total_savings_eur",
+)
+register_placeholder_group(
+    PlaceholderGroup(
+        "pricing",
+        _build_pricing_group,
+        inputs=_paths("analysis_results", _PRICING_ANALYSIS_KEYS)
+        + _paths("project_data", _PRICING_PROJECT_KEYS)
+        + _paths("project_data.project_details", _PRICING_DETAIL_KEYS)
+        + (
+            # Die Preisgruppe sucht Beträge in beliebiger Tiefe
+            KeySearch("analysis_results", _PRICING_SEARCH_KEYS),
+            KeySearch("project_data", _PRICING_SEARCH_KEYS),
+            "versions.admin_settings",
+            "versions.product_catalog",
+            "versions.price_matrix",
+        )
+        + _paths("session", _PRICING_SESSION_KEYS),
+        depends_on=("energy", "product"),
+        uses_database=True,
+    )
+)
+register_placeholder_group(
+    PlaceholderGroup(
+        "charts",
+        _build_chart_placeholders,
+        inputs=_paths("analysis_results", _CHART_SERIES_KEYS)
+        + _paths("project_data", _CHART_SERIES_KEYS)
+        + _paths("project_data.project_details", _CHART_SERIES_KEYS)
+        + _paths("session", _CHART_SERIES_KEYS)
+        + (
+            "analysis_results.month_names_short_list_chart",
+            "analysis_results.month_names_short_list",
+            "project_data.month_names_short_list_chart",
+            "project_data.project_details.month_names_short_list_chart",
         ),
     )
-    _assign_alias(
-        "on_grid_tariffs",
-        (
-            "feed_in_tariff_text",
-            "feed_in_tariff_eur_per_kwh",
-            "einspeiseverguetung_eur_per_kwh",
+)
+register_placeholder_group(
+    PlaceholderGroup(
+        "financing",
+        _build_financing_placeholders,
+        inputs=_paths("analysis_results", _PAYMENT_DATA_KEYS + _PAYMENT_TOTAL_KEYS)
+        + _paths("project_data", _PAYMENT_DATA_KEYS + _PAYMENT_TOTAL_KEYS)
+        + _paths(
+            "project_data.project_details", _PAYMENT_DATA_KEYS + _PAYMENT_TOTAL_KEYS
+        )
+        + (
+            "project_data.selected_payment_variant_key",
+            "project_data.selected_payment_variant",
+            "project_data.project_details.selected_payment_variant_key",
+            "session.pdf_payment_data",
+            "session.selected_payment_variant_key",
+            "session.payment_include_amounts",
+            "versions.admin_settings",
         ),
-        formatter=_format_feed_in_value,
+        depends_on=("energy", "product", "pricing"),
+        uses_database=True,
     )
-    _assign_alias(
-        "amortisation_time",
-        ("amortization_time", "amortization_time_years"),
-        formatter=_format_amort_value,
+)
+
+_placeholder_evaluator = IncrementalPlaceholderEvaluator()
+
+
+def _data_versions() -> dict[str, Any]:
+    """Versionszähler der DB-Daten, die in die Gruppen-Fingerprints eingehen."""
+    versions: dict[str, Any] = {}
+    try:
+        from database import get_admin_settings_version
+
+        versions["admin_settings"] = get_admin_settings_version()
+    except Exception:
+        versions["admin_settings"] = None
+    try:
+        from product_db import get_product_catalog_version
+
+        versions["product_catalog"] = get_product_catalog_version()
+    except Exception:
+        versions["product_catalog"] = None
+    try:
+        from price_matrix_store import get_matrix_generation
+
+        versions["price_matrix"] = get_matrix_generation()
+    except Exception:
+        versions["price_matrix"] = None
+    return versions
+
+
+def build_dynamic_data(
+    project_data: dict[str, Any] | None,
+    analysis_results: dict[str, Any] | None,
+    company_info: dict[str, Any] | None = None,
+) -> dict[str, str]:
+    """Erzeugt ein Dictionary mit dynamischen Werten für die Overlays.
+
+    Die Werte setzen sich aus den registrierten Platzhalter-Gruppen
+    zusammen; neu berechnet werden nur Gruppen, deren Eingaben sich seit dem
+    letzten Aufruf geändert haben (siehe placeholder_groups).
+    """
+    inputs = PlaceholderInputs(
+        project_data=project_data if isinstance(project_data, dict) else {},
+        analysis_results=analysis_results if isinstance(analysis_results, dict) else {},
+        company_info=company_info if isinstance(company_info, dict) else {},
+        session_get=_session_get,
+        versions=_data_versions(),
     )
+    return _placeholder_evaluator.evaluate(inputs)
 
-    return result
+
+def _session_input_keys() -> list[str]:
+    """Session-Keys, die die registrierten Gruppen lesen."""
+    keys = {
+        path[len("session."):]
+        for group in PLACEHOLDER_GROUPS.values()
+        for path in group.inputs
+        if isinstance(path, str) and path.startswith("session.")
+    }
+    return sorted(keys)
+
+
+def snapshot_session_inputs() -> dict[str, Any]:
+    """Picklebare Kopie der Session-Werte, die build_dynamic_data liest.
+
+    Für Worker-Prozesse ohne Zugriff auf den Streamlit-Session-State; dort
+    stellt :func:`use_session_snapshot` die Werte wieder bereit.
+    """
+    import pickle
+
+    missing = object()
+    snapshot: dict[str, Any] = {}
+    for key in _session_input_keys():
+        value = _session_get(key, missing)
+        if value is missing:
+            continue
+        try:
+            pickle.dumps(value)
+        except Exception as pickle_err:
+            print(f"WARN: Session-Wert '{key}' nicht übertragbar: {pickle_err}")
+            continue
+        snapshot[key] = value
+    return snapshot
+
+
+def use_session_snapshot(snapshot: dict[str, Any] | None) -> None:
+    """Liest Session-Werte künftig aus ``snapshot`` (None: wieder st.session_state)."""
+    global _session_override
+    _session_override = None if snapshot is None else dict(snapshot)
+
+
+def invalidate_placeholder_cache(group: str | None = None) -> None:
+    """Verwirft gecachte Gruppenergebnisse (z.B. nach Produkt-/Admin-Änderungen)."""
+    _placeholder_evaluator.invalidate(group)
+
+
+def get_placeholder_cache_stats() -> dict[str, Any]:
+    return _placeholder_evaluator.get_stats()
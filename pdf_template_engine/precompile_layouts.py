@@ -0,0 +1,15 @@
+"""
+pdf_template_engine/precompile_layouts.py
+
+Deploy-Schritt: kompiliert alle Koordinaten-Layouts in JSON-Bundles.
+
+    python -m pdf_template_engine.precompile_layouts            # Standard-Sets
+    python -m pdf_template_engine.precompile_layouts coords_wp  # einzelnes Set
+"""
+
+import sys
+
+from .coords_cache import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -39,9 +39,12 @@ from __future__ import annotations
 import csv
 import io
 import sqlite3
+import threading
+import time
 from datetime import datetime
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from database import get_db_connection
@@ -222,6 +225,7 @@ def set_active_matrix(matrix_id: int) -> bool:
             (matrix_id,
              ))
         conn.commit()
+        invalidate_matrix_cache()
         ok = cur.rowcount > 0
         conn.close()
         return ok
@@ -256,6 +260,7 @@ def delete_matrix(matrix_id: int) -> bool:
         cur = conn.cursor()
         cur.execute("DELETE FROM price_matrix_sets WHERE id=?", (matrix_id,))
         conn.commit()
+        invalidate_matrix_cache()
         ok = cur.rowcount > 0
         conn.close()
         return ok
@@ -364,6 +369,7 @@ def add_row(
              label))
         row_id = cur.lastrowid
         conn.commit()
+        invalidate_matrix_cache()
         conn.close()
         return row_id
     except Exception as e:
@@ -397,6 +403,7 @@ def add_column(
              label))
         col_id = cur.lastrowid
         conn.commit()
+        invalidate_matrix_cache()
         conn.close()
         return col_id
     except Exception as e:
@@ -426,6 +433,7 @@ def remove_row(row_id: int) -> bool:
             (matrix_id,
              pos))
         conn.commit()
+        invalidate_matrix_cache()
         conn.close()
         return True
     except Exception as e:
@@ -454,6 +462,7 @@ def remove_column(column_id: int) -> bool:
             (matrix_id,
              pos))
         conn.commit()
+        invalidate_matrix_cache()
         conn.close()
         return True
     except Exception as e:
@@ -508,6 +517,7 @@ def set_cell_value(
                  value,
                  raw_input))
         conn.commit()
+        invalidate_matrix_cache()
         conn.close()
         return True
     except Exception as e:
@@ -694,63 +704,248 @@ def import_matrix_csv(
         # Positionen neu sortieren
         _recalc_positions(cur, 'price_matrix_rows', matrix_id)
         conn.commit()
+        invalidate_matrix_cache()
         conn.close()
         return matrix_id
     except Exception as e:
         print(f"price_matrix_store.import_matrix_csv Fehler: {e}")
         return None
 
-# Hilfsfunktion für Preisermittlung (einfacher Prototyp)
+# --- Kompilierte Matrix für Preis-Lookups ---
+# get_matrix_full() baut bei jedem Aufruf einen DataFrame aus vier Abfragen.
+# Für Lookups wird die Matrix einmal in Arrays übersetzt und prozessweit
+# gecacht; Schreibfunktionen dieses Moduls verwerfen den Cache, die TTL deckt
+# Änderungen aus anderen Prozessen ab.
+MATRIX_CACHE_TTL_SECONDS = 60.0
+
+
+def _parse_row_key(label: Any) -> float | None:
+    try:
+        return float(str(label).replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def _cell_to_float(cell_obj: dict[str, Any] | None) -> float:
+    if cell_obj is None:
+        return np.nan
+    raw = cell_obj.get("value")
+    if raw is None:
+        raw = cell_obj.get("raw_input") or None
+    if raw is None:
+        return np.nan
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return np.nan  # Formeln/Texte liefern keinen Preis
+
+
+class CompiledPriceMatrix:
+    """Dichte Float-Matrix mit Label-Indexen für schnelle Preis-Lookups.
+
+    - ``row_index`` / ``column_index``: Label -> Position (erstes Vorkommen)
+    - ``row_keys``: numerische Zeilenlabels aufsteigend sortiert;
+      ``row_key_positions[i]`` ist die größte Zeilenposition unter allen Labels
+      ``<= row_keys[i]``. Damit liefert ein ``searchsorted`` dasselbe Ergebnis
+      wie der bisherige Scan ("letzte Zeile mit Wert <= Ziel").
+    - ``values``: Preise als ``float``, NaN für leere/nicht numerische Zellen
+    """
+
+    __slots__ = ("matrix_id", "meta", "row_labels", "column_labels",
+                 "row_index", "column_index", "row_keys", "row_key_positions",
+                 "values")
+
+    def __init__(self, full: dict[str, Any]):
+        self.matrix_id = full["meta"]["id"]
+        self.meta = full["meta"]
+        rows, cols, cells = full["rows"], full["columns"], full["cells"]
+        if not rows or not cols:
+            rows, cols = [], []  # wie leerer DataFrame: keine Treffer
+        self.row_labels = [r["label"] for r in rows]
+        self.column_labels = [c["label"] for c in cols]
+        self.row_index: dict[str, int] = {}
+        for pos, label in enumerate(self.row_labels):
+            self.row_index.setdefault(label, pos)
+        self.column_index: dict[str, int] = {}
+        for pos, label in enumerate(self.column_labels):
+            self.column_index.setdefault(label, pos)
+
+        self.values = np.full((len(rows), len(cols)), np.nan, dtype=float)
+        for ri, r in enumerate(rows):
+            for ci, c in enumerate(cols):
+                self.values[ri, ci] = _cell_to_float(cells.get((r["id"], c["id"])))
+
+        keyed = [(key, pos) for pos, label in enumerate(self.row_labels)
+                 if (key := _parse_row_key(label)) is not None and not np.isnan(key)]
+        keyed.sort(key=lambda kp: kp[0])
+        self.row_keys = np.array([k for k, _ in keyed], dtype=float)
+        self.row_key_positions = np.maximum.accumulate(
+            np.array([p for _, p in keyed], dtype=np.int64)) if keyed else np.array([], dtype=np.int64)
+
+    def resolve_row(self, row_label: Any) -> tuple[int | None, str | None, str | None]:
+        """(Position, verwendetes Label, Floor-Quelle) für ein Zeilenlabel."""
+        if isinstance(row_label, str) and row_label in self.row_index:
+            return self.row_index[row_label], row_label, None
+        target = _parse_row_key(row_label)
+        if target is None or np.isnan(target) or not len(self.row_keys):
+            return None, None, None
+        i = int(np.searchsorted(self.row_keys, target, side="right")) - 1
+        if i < 0:
+            return None, None, None
+        pos = int(self.row_key_positions[i])
+        label = self.row_labels[pos]
+        return pos, label, (label if str(label) != str(row_label) else None)
+
+    def lookup(self, row_label: Any, column_label: Any) -> float | None:
+        row_pos = self.resolve_row(row_label)[0]
+        col_pos = self.column_index.get(column_label) if isinstance(column_label, str) else None
+        if row_pos is None or col_pos is None:
+            return None
+        value = self.values[row_pos, col_pos]
+        return None if np.isnan(value) else float(value)
+
+    def lookup_many(self, row_labels: list[Any], column_labels: list[Any]) -> np.ndarray:
+        """Preise für alle Kombinationen (Zeilen x Spalten), NaN ohne Treffer."""
+        result = np.full((len(row_labels), len(column_labels)), np.nan, dtype=float)
+        if not len(self.row_labels) or not len(self.column_labels):
+            return result
+        col_pos = np.array([
+            self.column_index.get(c, -1) if isinstance(c, str) else -1
+            for c in column_labels], dtype=np.int64)
+        row_pos = np.full(len(row_labels), -1, dtype=np.int64)
+        numeric = np.full(len(row_labels), np.nan, dtype=float)
+        for i, label in enumerate(row_labels):
+            if isinstance(label, str) and label in self.row_index:
+                row_pos[i] = self.row_index[label]
+            else:
+                key = _parse_row_key(label)
+                if key is not None:
+                    numeric[i] = key  # NaN-Ziele bleiben ohne Treffer
+        todo = (row_pos < 0) & ~np.isnan(numeric)
+        if todo.any() and len(self.row_keys):
+            idx = np.searchsorted(self.row_keys, numeric[todo], side="right") - 1
+            found = np.where(idx >= 0, self.row_key_positions[np.maximum(idx, 0)], -1)
+            row_pos[todo] = found
+        rows_ok = row_pos >= 0
+        cols_ok = col_pos >= 0
+        if rows_ok.any() and cols_ok.any():
+            result[np.ix_(rows_ok, cols_ok)] = self.values[
+                np.ix_(row_pos[rows_ok], col_pos[cols_ok])]
+        return result
+
+
+class _MatrixCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compiled: dict[int, tuple[float, CompiledPriceMatrix]] = {}
+        self._active: tuple[float, int | None] | None = None
+        # Wird bei jeder Invalidierung erhöht (Teil abgeleiteter Cache-Schlüssel)
+        self._generation = 0
+        self._stats = {"hits": 0, "compiles": 0}
+
+    def get(self, matrix_id: int) -> CompiledPriceMatrix | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._compiled.get(matrix_id)
+            if entry is not None and now - entry[0] < MATRIX_CACHE_TTL_SECONDS:
+                self._stats["hits"] += 1
+                return entry[1]
+            generation = self._generation
+        full = get_matrix_full(matrix_id)
+        if not full:
+            return None
+        compiled = CompiledPriceMatrix(full)
+        with self._lock:
+            self._stats["compiles"] += 1
+            # Während des Kompilierens invalidiert -> Stand evtl. veraltet,
+            # nur an den Aufrufer geben, nicht cachen
+            if generation == self._generation:
+                self._compiled[matrix_id] = (now, compiled)
+        return compiled
+
+    def get_active_id(self, load: Any) -> int | None:
+        now = time.monotonic()
+        with self._lock:
+            if self._active is not None and now - self._active[0] < MATRIX_CACHE_TTL_SECONDS:
+                return self._active[1]
+            generation = self._generation
+        active_id = load()
+        with self._lock:
+            if generation == self._generation:
+                self._active = (now, active_id)
+        return active_id
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._compiled.clear()
+            self._active = None
+            self._generation += 1
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["matrices"] = len(self._compiled)
+        return stats
+
+
+_matrix_cache = _MatrixCache()
+
+
+def get_compiled_matrix(matrix_id: int) -> CompiledPriceMatrix | None:
+    return _matrix_cache.get(matrix_id)
+
+
+def get_cached_active_matrix_id() -> int | None:
+    """Wie get_active_matrix_id(), aber gecacht (für Berechnungspfade)."""
+    return _matrix_cache.get_active_id(get_active_matrix_id)
+
+
+def get_matrix_meta(matrix_id: int) -> dict[str, Any] | None:
+    """Metadaten (pricing_mode, include_*) aus der kompilierten Matrix."""
+    compiled = _matrix_cache.get(matrix_id)
+    return dict(compiled.meta) if compiled else None
+
+
+def invalidate_matrix_cache() -> None:
+    _matrix_cache.invalidate()
+
+
+def get_matrix_generation() -> int:
+    """Zähler, der bei jeder Matrix-Änderung (invalidate_matrix_cache) steigt."""
+    return _matrix_cache.generation
+
+
+def get_matrix_cache_stats() -> dict[str, int]:
+    return _matrix_cache.get_stats()
 
 
 def lookup_price(
         matrix_id: int,
         row_label: str,
         column_label: str) -> float | None:
-    full = get_matrix_full(matrix_id)
-    if not full:
+    # Zeilen-Label exakte Suche, sonst nächst kleinere Zahl falls numerisch
+    compiled = _matrix_cache.get(matrix_id)
+    if compiled is None:
         return None
-    df = full['wide']
-    if df.empty:
+    return compiled.lookup(row_label, column_label)
+
+
+def lookup_prices(
+        matrix_id: int,
+        row_labels: list[Any],
+        column_labels: list[str]) -> np.ndarray | None:
+    """Batch-Lookup, z.B. Modulanzahlen x Speichermodelle (Multi-Angebot,
+    Schnellkalkulation). Liefert ein Array ``len(row_labels) x len(column_labels)``
+    mit NaN für Kombinationen ohne Preis, oder None ohne Matrix."""
+    compiled = _matrix_cache.get(matrix_id)
+    if compiled is None:
         return None
-    # Zeilen-Label exakte Suche, sonst nächst kleinere Zahl falls numerisch
-    chosen_row_label = None
-    floor_source_label = None
-    if row_label in df.index:
-        row_series = df.loc[row_label]
-        chosen_row_label = row_label
-    else:
-        # Falls numerisch: floor matching
-        try:
-            target = float(str(row_label).replace(',', '.'))
-            numeric_index = []
-            for idx in df.index:
-                try:
-                    numeric_index.append(
-                        (float(str(idx).replace(',', '.')), idx))
-                except ValueError:
-                    pass
-            candidates = [idx for val, idx in numeric_index if val <= target]
-            if candidates:
-                chosen_label = candidates[-1]
-                floor_source_label = chosen_label if str(
-                    chosen_label) != str(row_label) else None
-                row_series = df.loc[chosen_label]
-                chosen_row_label = chosen_label
-            else:
-                return None
-        except ValueError:
-            return None
-    # Spalten Lookup direkt
-    if column_label in df.columns:
-        v = row_series.get(column_label)
-        if pd.isna(v):
-            return None
-        try:
-            return float(v)
-        except Exception:
-            return None
-    return None
+    return compiled.lookup_many(list(row_labels), list(column_labels))
 
 
 def lookup_price_with_meta(
@@ -765,33 +960,13 @@ def lookup_price_with_meta(
           'column_used': Optional[str]
         }
     """
-    value = lookup_price(matrix_id, row_label, column_label)
-    full = get_matrix_full(matrix_id)
+    compiled = _matrix_cache.get(matrix_id)
+    value = None
     row_used = None
     row_floor_source = None
-    if full and full['wide'] is not None and not full['wide'].empty:
-        df = full['wide']
-        # Wiederhole Row-Logik für Metainfo (leicht redundant, aber klar)
-        if row_label in df.index:
-            row_used = row_label
-        else:
-            try:
-                target = float(str(row_label).replace(',', '.'))
-                numeric_index = []
-                for idx in df.index:
-                    try:
-                        numeric_index.append(
-                            (float(str(idx).replace(',', '.')), idx))
-                    except ValueError:
-                        pass
-                candidates = [idx for val,
-                              idx in numeric_index if val <= target]
-                if candidates:
-                    row_used = candidates[-1]
-                    if str(row_used) != str(row_label):
-                        row_floor_source = row_used
-            except ValueError:
-                pass
+    if compiled is not None:
+        value = compiled.lookup(row_label, column_label)
+        _, row_used, row_floor_source = compiled.resolve_row(row_label)
     return {
         'value': value,
         'row_used': row_used,
@@ -827,6 +1002,7 @@ def update_matrix_pricing_mode(
                 ', '.join(fields)}, updated_at=CURRENT_TIMESTAMP WHERE id=?",
             params)
         conn.commit()
+        invalidate_matrix_cache()
         ok = cur.rowcount > 0
         conn.close()
         return ok
@@ -851,5 +1027,11 @@ __all__ = [
     'export_matrix_csv',
     'import_matrix_csv',
     'lookup_price',
+    'lookup_prices',
     'lookup_price_with_meta',
+    'get_compiled_matrix',
+    'get_cached_active_matrix_id',
+    'get_matrix_meta',
+    'invalidate_matrix_cache',
+    'get_matrix_generation',
     'update_matrix_pricing_mode']
@@ -18,7 +18,12 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
-from .pricing_cache import CacheLevel, PerformanceMetrics, PricingCache
+from .pricing_cache import (
+    CacheLevel,
+    PerformanceMetrics,
+    PricingCache,
+    PricingCacheManager,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +43,7 @@ class BenchmarkResult:
     cache_hit_rate: float
     memory_usage_mb: float
     timestamp: datetime = field(default_factory=datetime.now)
+    details: dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -331,12 +337,16 @@ class CacheBenchmark:
     def benchmark_cache_invalidation(
             self,
             num_entries: int = 1000,
-            invalidation_patterns: list[str] = None) -> BenchmarkResult:
+            invalidation_patterns: list[str] = None,
+            dependency_entries: int = 0) -> BenchmarkResult:
         """Benchmark cache invalidation performance
 
         Args:
             num_entries: Number of cache entries to create
             invalidation_patterns: Patterns to test for invalidation
+            dependency_entries: If > 0, additionally compare product
+                invalidation via the dependency index with a pattern scan
+                on a pricing cache of this size (stored in ``details``)
 
         Returns:
             BenchmarkResult with invalidation performance metrics
@@ -379,6 +389,11 @@ class CacheBenchmark:
         ops_per_second = len(invalidation_patterns) / \
             (total_duration_ms / 1000) if total_duration_ms > 0 else 0.0
 
+        details = {}
+        if dependency_entries > 0:
+            details = self.benchmark_dependency_invalidation(
+                num_entries=dependency_entries)
+
         return BenchmarkResult(
             operation_name="cache_invalidation",
             total_operations=len(invalidation_patterns),
@@ -390,9 +405,93 @@ class CacheBenchmark:
             std_dev_ms=std_dev,
             operations_per_second=ops_per_second,
             cache_hit_rate=0.0,  # Not applicable for invalidation
-            memory_usage_mb=self._estimate_memory_usage()
+            memory_usage_mb=self._estimate_memory_usage(),
+            details=details
         )
 
+    def benchmark_dependency_invalidation(
+            self,
+            num_entries: int = 100_000,
+            num_products: int = 1000,
+            num_invalidations: int = 20) -> dict[str, Any]:
+        """Compare indexed product invalidation with a full pattern scan
+
+        Builds a separate pricing cache with ``num_entries`` entries (half
+        component, a quarter each system and final pricing, linked by
+        dependencies) and invalidates single products once through the
+        dependency index and once by scanning all keys.
+
+        Args:
+            num_entries: Total number of cache entries
+            num_products: Number of distinct product ids
+            num_invalidations: Products invalidated per method
+
+        Returns:
+            Average milliseconds per product invalidation for both methods
+        """
+        cache = PricingCache(max_size=num_entries * 2,
+                             enable_monitoring=False)
+        manager = PricingCacheManager(cache)
+
+        num_components = num_entries // 2
+        num_systems = (num_entries - num_components) // 2
+        quantities = max(1, num_components // num_products)
+
+        component_keys = []
+        for i in range(num_components):
+            product_id = i % num_products
+            key = manager.generate_component_key(product_id, i // num_products)
+            manager.cache_component_pricing(key, {"price": float(i)})
+            component_keys.append((product_id, i // num_products, key))
+
+        for i in range(num_systems):
+            picked = [component_keys[(i * 7919 + j * 104729) % num_components]
+                      for j in range(3)]
+            components = [{"product_id": pid, "quantity": qty}
+                          for pid, qty, _ in picked]
+            system_key = manager.generate_system_key(components, "pv")
+            manager.cache_system_pricing(
+                system_key, {"total": float(i)}, [key for _, _, key in picked])
+            final_key = manager.generate_final_key(
+                {"components": components, "vat_rate": 19.0 + i % 3,
+                 "modifications": {"discount": i}})
+            manager.cache_final_pricing(final_key, {"total": float(i)},
+                                        system_key)
+
+        total_entries = sum(
+            stats.total_entries for stats in cache.get_stats().values())
+
+        def measure(invalidate, product_ids) -> tuple[float, int]:
+            durations = []
+            invalidated = 0
+            for product_id in product_ids:
+                op_start = time.perf_counter()
+                invalidated += invalidate(product_id)
+                durations.append((time.perf_counter() - op_start) * 1000)
+            return statistics.mean(durations), invalidated
+
+        indexed_ms, indexed_count = measure(
+            manager.invalidate_product_cache,
+            range(num_invalidations))
+        scan_ms, scan_count = measure(
+            lambda product_id: cache.invalidate_by_pattern(
+                f":p={product_id}:"),
+            range(num_invalidations, 2 * num_invalidations))
+
+        logger.info(
+            f"Dependency invalidation at {total_entries} entries: "
+            f"{indexed_ms:.3f} ms indexed vs {scan_ms:.3f} ms pattern scan")
+
+        return {
+            "entries": total_entries,
+            "quantities_per_product": quantities,
+            "indexed_avg_ms": indexed_ms,
+            "indexed_invalidated": indexed_count,
+            "pattern_scan_avg_ms": scan_ms,
+            "pattern_scan_invalidated": scan_count,
+            "speedup": scan_ms / indexed_ms if indexed_ms > 0 else 0.0,
+        }
+
     def run_comprehensive_benchmark(self) -> PerformanceReport:
         """Run comprehensive benchmark suite
 
@@ -186,7 +186,7 @@ class DatabaseBenchmark:
     Comprehensive benchmarking suite for database operations.
     """
 
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, use_connection_pool: bool = False):
         if db_path is None:
             try:
                 from database import DB_PATH
@@ -196,11 +196,15 @@ class DatabaseBenchmark:
         else:
             self.db_path = db_path
 
+        self.use_connection_pool = use_connection_pool
         self.monitor = PerformanceMonitor()
         self.results: list[BenchmarkResult] = []
 
     def _get_connection(self):
-        """Get database connection"""
+        """Get database connection (pooled per thread if enabled)"""
+        if self.use_connection_pool:
+            from db_pool import get_connection
+            return get_connection(self.db_path, row_factory=sqlite3.Row)
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
@@ -392,6 +396,21 @@ class DatabaseBenchmark:
         self.results.append(result)
         return result
 
+    def benchmark_connection_modes(
+            self, iterations: int = 200) -> dict[str, BenchmarkResult]:
+        """Compare per-query latency of fresh vs. pooled connections"""
+        original_mode = self.use_connection_pool
+        results = {}
+        try:
+            for mode, pooled in (("direct", False), ("pooled", True)):
+                self.use_connection_pool = pooled
+                result = self.benchmark_product_queries(iterations)
+                result.test_name = f"product_queries_{mode}"
+                results[mode] = result
+        finally:
+            self.use_connection_pool = original_mode
+        return results
+
     def run_full_benchmark_suite(self) -> dict[str, BenchmarkResult]:
         """Run complete benchmark suite"""
         print("Starting comprehensive database benchmark suite...")
@@ -411,6 +430,11 @@ class DatabaseBenchmark:
         print("Running concurrent access benchmark...")
         results['concurrent_access'] = self.benchmark_concurrent_access(5, 20)
 
+        # Fresh vs. pooled connections
+        print("Running connection mode benchmark...")
+        for mode, result in self.benchmark_connection_modes(100).items():
+            results[f'product_queries_{mode}'] = result
+
         return results
 
     def generate_performance_report(self) -> str:
@@ -6,10 +6,15 @@ and error monitoring and alerting for pricing issues.
 
 from __future__ import annotations
 
+import atexit
+import itertools
 import json
 import logging
 import sqlite3
 import threading
+import time
+import weakref
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -136,25 +141,84 @@ class AuditQuery:
     order_desc: bool = True
 
 
+_INSERT_EVENT_SQL = """
+    INSERT INTO audit_events (
+        event_id, event_type, severity, message, user_id, session_id,
+        component, operation, before_data, after_data, context_data,
+        timestamp, correlation_id, duration_ms, memory_usage_mb
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_EVENT_COLUMNS = (
+    "event_id", "event_type", "severity", "message", "user_id", "session_id",
+    "component", "operation", "before_data", "after_data", "context_data",
+    "timestamp", "correlation_id", "duration_ms", "memory_usage_mb")
+
+
 class PricingAuditLogger:
-    """Comprehensive audit logging system for pricing operations"""
+    """Comprehensive audit logging system for pricing operations
+
+    By default events are written behind: log_event() only appends the row
+    to a bounded in-memory queue, and a background writer inserts queued
+    rows with executemany() in one transaction per batch. A batch is written
+    once ``batch_size`` rows are queued or ``flush_interval_seconds`` have
+    passed, and the queue is drained by flush()/close() and at interpreter
+    exit. query_events() and get_event_statistics() flush first, so they
+    always see every logged event. When the queue is full the calling thread
+    writes the pending rows itself (back-pressure, counted in
+    get_writer_metrics()).
+
+    ``async_writes=False`` restores synchronous one-transaction-per-event
+    writes (used by tests that inspect the database directly).
+    """
 
     def __init__(self, db_path: str = "data/pricing_audit.db",
-                 max_log_size_mb: int = 100, retention_days: int = 90):
+                 max_log_size_mb: int = 100, retention_days: int = 90,
+                 async_writes: bool = True, batch_size: int = 200,
+                 flush_interval_seconds: float = 1.0,
+                 max_queue_size: int = 10000):
         """Initialize audit logger
 
         Args:
             db_path: Path to audit database
             max_log_size_mb: Maximum log size in MB before rotation
             retention_days: Number of days to retain audit logs
+            async_writes: Write events from a background writer thread
+            batch_size: Rows per write transaction (async mode)
+            flush_interval_seconds: Maximum time a row waits in the queue
+            max_queue_size: Queued rows before callers write themselves
         """
         self.db_path = Path(db_path)
         self.max_log_size_mb = max_log_size_mb
         self.retention_days = retention_days
+        self.async_writes = async_writes
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_queue_size = max(self.batch_size, max_queue_size)
         self.logger = logging.getLogger(f"{__name__}.PricingAuditLogger")
 
         # Thread safety
         self._lock = threading.Lock()
+        self._event_seq = itertools.count(1)
+
+        # Write-behind queue; _write_lock serialises batch writes so a
+        # flush() returns only after in-flight batches are committed
+        self._queue: deque[tuple] = deque()
+        self._queue_cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._writer_thread: threading.Thread | None = None
+        self._writer_metrics = {
+            "events_enqueued": 0,
+            "events_written": 0,
+            "events_dropped": 0,
+            "batches_written": 0,
+            "max_queue_depth": 0,
+            "backpressure_events": 0,
+            "total_write_ms": 0.0,
+            "last_batch_size": 0,
+            "last_write_ms": 0.0,
+        }
 
         # Initialize database
         self._init_database()
@@ -173,6 +237,21 @@ class PricingAuditLogger:
             "average_duration_ms": 0.0
         }
 
+        if self.async_writes:
+            # The writer thread and the exit hook only hold weak
+            # references; queued rows of a discarded logger are written by
+            # the finalizer
+            self._finalizer = weakref.finalize(
+                self, _drain_queue, str(self.db_path), self._queue)
+            self._finalizer.atexit = False  # _close_open_loggers handles exit
+            self._writer_thread = threading.Thread(
+                target=_run_writer,
+                args=(weakref.ref(self),),
+                name="PricingAuditWriter",
+                daemon=True)
+            self._writer_thread.start()
+            _open_async_loggers.add(self)
+
     def _init_database(self):
         """Initialize audit database"""
         try:
@@ -292,44 +371,24 @@ class PricingAuditLogger:
             event: Audit event to log
 
         Returns:
-            True if successful, False otherwise
+            True if the event was stored (or queued), False otherwise
         """
         try:
             with self._lock:
                 # Generate event ID if not provided
                 if not event.event_id:
-                    event.event_id = f"{
-                        event.event_type.value}_{
-                        datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-
-                # Store in database
-                with sqlite3.connect(str(self.db_path)) as conn:
-                    event_data = event.to_dict()
-
-                    conn.execute(
-                        """
-                        INSERT INTO audit_events (
-                            event_id, event_type, severity, message, user_id, session_id,
-                            component, operation, before_data, after_data, context_data,
-                            timestamp, correlation_id, duration_ms, memory_usage_mb
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (event_data["event_id"],
-                         event_data["event_type"],
-                            event_data["severity"],
-                            event_data["message"],
-                            event_data["user_id"],
-                            event_data["session_id"],
-                            event_data["component"],
-                            event_data["operation"],
-                            event_data["before_data"],
-                            event_data["after_data"],
-                            event_data["context_data"],
-                            event_data["timestamp"],
-                            event_data["correlation_id"],
-                            event_data["duration_ms"],
-                            event_data["memory_usage_mb"]))
-                    conn.commit()
+                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+                    event.event_id = (f"{event.event_type.value}_{timestamp}_"
+                                      f"{next(self._event_seq)}")
+
+                event_data = event.to_dict()
+                row = tuple(event_data[column] for column in _EVENT_COLUMNS)
+
+                if self.async_writes and not self._closed:
+                    self._enqueue(row)
+                else:
+                    with self._write_lock:
+                        self._write_batch([row])
 
                 # Update performance metrics
                 self._update_performance_metrics(event)
@@ -346,6 +405,172 @@ class PricingAuditLogger:
             self.logger.error(f"Failed to log audit event: {e}")
             return False
 
+    def _enqueue(self, row: tuple):
+        """Queue a row for the background writer"""
+        with self._queue_cond:
+            full = len(self._queue) >= self.max_queue_size
+            if not full:
+                self._queue.append(row)
+                metrics = self._writer_metrics
+                metrics["events_enqueued"] += 1
+                metrics["max_queue_depth"] = max(
+                    metrics["max_queue_depth"], len(self._queue))
+                # Wake the writer for the first row (starts the flush
+                # interval) and for a full batch
+                if len(self._queue) in (1, self.batch_size):
+                    self._queue_cond.notify()
+                return
+            self._writer_metrics["backpressure_events"] += 1
+
+        # Writer is behind: write the backlog and this row in the caller
+        self.flush()
+        with self._write_lock:
+            self._write_batch([row])
+
+    def _take_batch(self) -> list[tuple]:
+        """Pop up to batch_size queued rows"""
+        with self._queue_cond:
+            count = min(self.batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _writer_loop(self) -> bool:
+        """Background writer: flush on batch size or time threshold
+
+        Writes batches until the queue has been empty for
+        ``_WRITER_IDLE_SECONDS``, so _run_writer can drop its strong
+        reference in between.
+
+        Returns:
+            False once the logger is closed and the queue is drained
+        """
+        while True:
+            with self._queue_cond:
+                if not self._queue:
+                    if self._closed:
+                        return False
+                    self._queue_cond.wait(_WRITER_IDLE_SECONDS)
+                    if not self._queue:
+                        return not self._closed
+                deadline = time.monotonic() + self.flush_interval_seconds
+                while (len(self._queue) < self.batch_size
+                       and not self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._queue_cond.wait(remaining)
+
+            with self._write_lock:
+                batch = self._take_batch()
+                if batch:
+                    self._write_batch(batch)
+
+    def _write_batch(self, rows: list[tuple]) -> None:
+        """Insert rows in one transaction
+
+        If the batch violates a constraint (e.g. a duplicate event_id), the
+        rows are retried one by one so only the offending rows are dropped.
+
+        Raises:
+            sqlite3.Error: In synchronous mode (single rows); batch failures
+                of the background writer are logged and counted instead
+        """
+        start = time.perf_counter()
+        conn = None
+        written = len(rows)
+        try:
+            conn = sqlite3.connect(str(self.db_path))
+            try:
+                with conn:
+                    conn.executemany(_INSERT_EVENT_SQL, rows)
+            except sqlite3.IntegrityError:
+                if not self.async_writes or len(rows) == 1:
+                    raise
+                written = self._write_rows(conn, rows)
+        except sqlite3.Error as e:
+            self._writer_metrics["events_dropped"] += len(rows)
+            if not self.async_writes:
+                raise
+            self.logger.error(
+                f"Failed to write {len(rows)} audit events: {e}")
+            return
+        finally:
+            if conn is not None:
+                conn.close()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        metrics = self._writer_metrics
+        metrics["events_written"] += written
+        metrics["batches_written"] += 1
+        metrics["total_write_ms"] += elapsed_ms
+        metrics["last_batch_size"] = len(rows)
+        metrics["last_write_ms"] = elapsed_ms
+
+    def _write_rows(self, conn: sqlite3.Connection, rows: list[tuple]) -> int:
+        """Insert rows one transaction each, dropping rows that fail
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        for row in rows:
+            try:
+                with conn:
+                    conn.execute(_INSERT_EVENT_SQL, row)
+            except sqlite3.Error as e:
+                self._writer_metrics["events_dropped"] += 1
+                self.logger.error(
+                    f"Failed to write audit event {row[0]}: {e}")
+            else:
+                written += 1
+        return written
+
+    def flush(self) -> int:
+        """Write all queued events and wait for in-flight batches
+
+        Returns:
+            Number of events written by this call
+        """
+        written = 0
+        with self._write_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return written
+                self._write_batch(batch)
+                written += len(batch)
+
+    def close(self):
+        """Stop the background writer after draining the queue"""
+        if self._closed:
+            return
+        with self._queue_cond:
+            self._closed = True
+            self._queue_cond.notify_all()
+        if self._writer_thread is not None:
+            self._writer_thread.join(timeout=10)
+            _open_async_loggers.discard(self)
+        self.flush()
+        if self.async_writes:
+            self._finalizer.detach()
+
+    def get_writer_metrics(self) -> dict[str, Any]:
+        """Get write-behind queue metrics
+
+        Returns:
+            Queue depth, batch counts, write latency and back-pressure
+            counters
+        """
+        with self._queue_cond:
+            metrics = dict(self._writer_metrics)
+            metrics["queue_depth"] = len(self._queue)
+        batches = metrics["batches_written"]
+        metrics["async_writes"] = self.async_writes
+        metrics["avg_batch_size"] = (
+            metrics["events_written"] / batches if batches else 0.0)
+        metrics["avg_write_ms"] = (
+            metrics["total_write_ms"] / batches if batches else 0.0)
+        return metrics
+
     def _update_performance_metrics(self, event: AuditEvent):
         """Update performance metrics"""
         self._performance_metrics["total_events"] += 1
@@ -413,6 +638,8 @@ class PricingAuditLogger:
             List of matching audit events
         """
         try:
+            self.flush()
+
             with sqlite3.connect(str(self.db_path)) as conn:
                 conn.row_factory = sqlite3.Row
 
@@ -461,8 +688,7 @@ class PricingAuditLogger:
                 # Add ordering
                 order_direction = "DESC" if query.order_desc else "ASC"
                 sql_parts.append(
-                    f"ORDER BY {
-                        query.order_by} {order_direction}")
+                    f"ORDER BY {query.order_by} {order_direction}")
 
                 # Add limit and offset
                 sql_parts.append("LIMIT ? OFFSET ?")
@@ -495,6 +721,7 @@ class PricingAuditLogger:
             Dictionary with statistics
         """
         try:
+            self.flush()
             start_time = datetime.now() - timedelta(hours=hours)
 
             with sqlite3.connect(str(self.db_path)) as conn:
@@ -551,7 +778,8 @@ class PricingAuditLogger:
                     "average_duration_ms": avg_duration,
                     "error_count": error_count,
                     "error_rate_percent": error_rate,
-                    "performance_metrics": self._performance_metrics.copy()
+                    "performance_metrics": self._performance_metrics.copy(),
+                    "writer_metrics": self.get_writer_metrics()
                 }
 
         except Exception as e:
@@ -944,6 +1172,52 @@ _calculation_logger_instance = None
 _monitor_instance = None
 
 
+# Idle time after which the writer thread releases its logger reference
+_WRITER_IDLE_SECONDS = 1.0
+
+# Async loggers that are still open; drained at interpreter exit. A WeakSet
+# so the exit hook does not keep discarded loggers alive.
+_open_async_loggers: weakref.WeakSet[PricingAuditLogger] = weakref.WeakSet()
+
+
+def _run_writer(logger_ref: weakref.ref) -> None:
+    """Writer thread body; holds the logger strongly only while writing"""
+    while True:
+        audit_logger = logger_ref()
+        if audit_logger is None or not audit_logger._writer_loop():
+            return
+        del audit_logger
+
+
+def _drain_queue(db_path: str, queue: deque) -> None:
+    """Finalizer: write rows still queued by a discarded logger"""
+    rows = []
+    while queue:
+        try:
+            rows.append(queue.popleft())
+        except IndexError:
+            break
+    if not rows:
+        return
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            with conn:
+                conn.executemany(_INSERT_EVENT_SQL, rows)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.getLogger(__name__).error(
+            f"Failed to write {len(rows)} audit events: {e}")
+
+
+@atexit.register
+def _close_open_loggers() -> None:
+    """Drain the queues of all open async loggers"""
+    for audit_logger in list(_open_async_loggers):
+        audit_logger.close()
+
+
 def get_audit_logger() -> PricingAuditLogger:
     """Get global audit logger instance"""
     global _audit_logger_instance
@@ -47,6 +47,7 @@ class CacheEntry:
     dependencies: list[str] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
     ttl_seconds: int | None = None
+    tags: tuple[str, ...] = ()
 
     def is_expired(self) -> bool:
         """Check if cache entry is expired"""
@@ -123,7 +124,10 @@ class PricingCache:
 
         # Dependency tracking
         self._dependencies: dict[str, list[str]] = defaultdict(list)
-        self._reverse_dependencies: dict[str, list[str]] = defaultdict(list)
+        self._reverse_dependencies: dict[str, set[str]] = defaultdict(set)
+
+        # Tag index (e.g. "product:123", "system_type:pv") -> cache keys
+        self._tag_index: dict[str, set[str]] = defaultdict(set)
 
         # Performance monitoring
         self._stats: dict[CacheLevel, CacheStats] = {
@@ -180,6 +184,7 @@ class PricingCache:
                 # Check if expired
                 if entry.is_expired():
                     del cache[key]
+                    self._unindex(entry)
                     stats.misses += 1
                     stats.evictions += 1
                     stats.total_entries = len(cache)
@@ -212,7 +217,8 @@ class PricingCache:
             value: Any,
             level: CacheLevel = CacheLevel.FINAL,
             ttl: int | None = None,
-            dependencies: list[str] | None = None) -> None:
+            dependencies: list[str] | None = None,
+            tags: list[str] | tuple[str, ...] | None = None) -> None:
         """Put value in cache
 
         Args:
@@ -221,6 +227,7 @@ class PricingCache:
             level: Cache level
             ttl: Time-to-live in seconds (uses default if None)
             dependencies: List of dependency keys
+            tags: Index tags for invalidate_by_tag (e.g. "product:123")
         """
         with self._lock:
             metric = self._start_performance_metric(f"cache_put_{level.value}")
@@ -241,17 +248,24 @@ class PricingCache:
                     created_at=datetime.now(),
                     last_accessed=datetime.now(),
                     dependencies=dependencies or [],
-                    ttl_seconds=ttl
+                    ttl_seconds=ttl,
+                    tags=tuple(tags or ())
                 )
 
                 # Add to cache
+                previous = cache.get(key)
                 cache[key] = entry
+                if previous is not None:
+                    for tag in set(previous.tags) - set(entry.tags):
+                        self._tag_index.get(tag, set()).discard(key)
+                for tag in entry.tags:
+                    self._tag_index[tag].add(key)
 
                 # Update dependency tracking
                 if dependencies:
                     self._dependencies[key] = dependencies
                     for dep in dependencies:
-                        self._reverse_dependencies[dep].append(key)
+                        self._reverse_dependencies[dep].add(key)
 
                 # Enforce size limits
                 max_size = config["max_size"]
@@ -293,7 +307,7 @@ class PricingCache:
                     stats = self._stats[cache_level]
 
                     if key in cache:
-                        del cache[key]
+                        self._unindex(cache.pop(key))
                         stats.evictions += 1
                         stats.total_entries = len(cache)
                         invalidated_count += 1
@@ -304,15 +318,16 @@ class PricingCache:
 
                 # Cascade invalidation to dependents
                 if cascade and key in self._reverse_dependencies:
-                    for dependent_key in self._reverse_dependencies[key]:
+                    for dependent_key in list(self._reverse_dependencies[key]):
                         invalidated_count += self.invalidate(
                             dependent_key, cascade=True)
 
                 # Clean up dependency tracking
                 if key in self._dependencies:
                     for dep in self._dependencies[key]:
-                        if key in self._reverse_dependencies[dep]:
-                            self._reverse_dependencies[dep].remove(key)
+                        dependents = self._reverse_dependencies.get(dep)
+                        if dependents is not None:
+                            dependents.discard(key)
                     del self._dependencies[key]
 
                 if key in self._reverse_dependencies:
@@ -325,12 +340,40 @@ class PricingCache:
                 if self.enable_monitoring:
                     self._performance_metrics.append(metric)
 
+    def invalidate_by_tag(self, tag: str, cascade: bool = True) -> int:
+        """Invalidate all entries indexed under a tag
+
+        Only the tagged keys (and, with ``cascade``, their dependents) are
+        visited, independent of the total cache size.
+
+        Args:
+            tag: Tag given to put() (e.g. "product:123")
+            cascade: Whether to cascade invalidation to dependents
+
+        Returns:
+            Number of entries invalidated
+        """
+        with self._lock:
+            keys = self._tag_index.pop(tag, None)
+            if not keys:
+                return 0
+
+            invalidated_count = 0
+            for key in keys:
+                invalidated_count += self.invalidate(key, cascade=cascade)
+
+            logger.info(
+                f"Invalidated {invalidated_count} entries for tag: {tag}")
+            return invalidated_count
+
     def invalidate_by_pattern(
             self,
             pattern: str,
             level: CacheLevel | None = None) -> int:
         """Invalidate cache entries matching pattern
 
+        Scans every key; prefer invalidate_by_tag for known dependencies.
+
         Args:
             pattern: Pattern to match (simple string contains)
             level: Specific cache level (all levels if None)
@@ -373,6 +416,10 @@ class PricingCache:
                 stats = self._stats[cache_level]
 
                 cleared_count += len(cache)
+                if level is not None:
+                    for entry in list(cache.values()):
+                        del cache[entry.key]
+                        self._unindex(entry)
                 cache.clear()
                 stats.total_entries = 0
 
@@ -385,6 +432,7 @@ class PricingCache:
             if level is None:
                 self._dependencies.clear()
                 self._reverse_dependencies.clear()
+                self._tag_index.clear()
 
             return cleared_count
 
@@ -443,7 +491,7 @@ class PricingCache:
                 ]
 
                 for key in expired_keys:
-                    del cache[key]
+                    self._unindex(cache.pop(key))
                     cleaned_count += 1
 
                 stats.evictions += len(expired_keys)
@@ -457,16 +505,32 @@ class PricingCache:
         if self.strategy == CacheStrategy.LRU or self.strategy == CacheStrategy.HYBRID:
             # Remove least recently used (first item in OrderedDict)
             if cache:
-                key, _ = cache.popitem(last=False)
+                key, entry = cache.popitem(last=False)
+                self._unindex(entry)
                 stats.evictions += 1
                 logger.debug(f"Evicted LRU entry: {key}")
         elif self.strategy == CacheStrategy.TTL:
             # Remove oldest entry
             if cache:
-                key, _ = cache.popitem(last=False)
+                key, entry = cache.popitem(last=False)
+                self._unindex(entry)
                 stats.evictions += 1
                 logger.debug(f"Evicted oldest entry: {key}")
 
+    def _unindex(self, entry: CacheEntry) -> None:
+        """Remove a dropped entry from the tag index"""
+        if not entry.tags:
+            return
+        # The same key may still be cached on another level
+        if any(entry.key in cache for cache in self._caches.values()):
+            return
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(entry.key)
+                if not keys:
+                    del self._tag_index[tag]
+
     def _start_performance_metric(
             self, operation_name: str) -> PerformanceMetrics:
         """Start performance metric tracking"""
@@ -477,7 +541,14 @@ class PricingCache:
 
 
 class PricingCacheManager:
-    """Manager for pricing cache with intelligent key generation and invalidation"""
+    """Manager for pricing cache with intelligent key generation and invalidation
+
+    Keys are structured as ``<type>:<system_type>:p=<product ids>:<hash>``
+    (component keys: ``component:p=<id>:q=<quantity>:<hash>``). The cache_*
+    methods derive index tags from them, so product and system invalidation
+    only visit the affected entries: product -> component keys -> system
+    keys (via their component dependencies) -> final keys.
+    """
 
     def __init__(self, cache: PricingCache | None = None):
         """Initialize cache manager
@@ -509,7 +580,8 @@ class PricingCacheManager:
             "quantity": quantity,
             "modifications": modifications or {}
         }
-        return self._hash_key_data(key_data)
+        return (f"component:p={self._key_part(product_id)}:"
+                f"q={self._key_part(quantity)}:{self._hash_key_data(key_data)}")
 
     def generate_system_key(self, components: list[dict[str, Any]],
                             system_type: str = "pv") -> str:
@@ -533,7 +605,8 @@ class PricingCacheManager:
             "system_type": system_type,
             "components": sorted_components
         }
-        return self._hash_key_data(key_data)
+        return self._structured_key(
+            "system", system_type, sorted_components, key_data)
 
     def generate_final_key(self, calculation_data: dict[str, Any]) -> str:
         """Generate cache key for final pricing calculation
@@ -555,7 +628,9 @@ class PricingCacheManager:
             "vat_rate": calculation_data.get("vat_rate", 19.0),
             "system_type": calculation_data.get("system_type", "pv")
         }
-        return self._hash_key_data(normalized_data)
+        return self._structured_key(
+            "final", normalized_data["system_type"],
+            normalized_data["components"], normalized_data)
 
     def cache_component_pricing(self, key: str, pricing_data: Any,
                                 dependencies: list[str] | None = None) -> None:
@@ -570,7 +645,8 @@ class PricingCacheManager:
             key,
             pricing_data,
             CacheLevel.COMPONENT,
-            dependencies=dependencies)
+            dependencies=dependencies,
+            tags=self.tags_for_key(key))
 
     def cache_system_pricing(self, key: str, pricing_data: Any,
                              component_keys: list[str] | None = None) -> None:
@@ -585,7 +661,8 @@ class PricingCacheManager:
             key,
             pricing_data,
             CacheLevel.SYSTEM,
-            dependencies=component_keys)
+            dependencies=component_keys,
+            tags=self.tags_for_key(key))
 
     def cache_final_pricing(self, key: str, pricing_data: Any,
                             system_key: str | None = None) -> None:
@@ -601,7 +678,8 @@ class PricingCacheManager:
             key,
             pricing_data,
             CacheLevel.FINAL,
-            dependencies=dependencies)
+            dependencies=dependencies,
+            tags=self.tags_for_key(key))
 
     def get_component_pricing(self, key: str) -> Any | None:
         """Get cached component pricing"""
@@ -624,8 +702,8 @@ class PricingCacheManager:
         Returns:
             Number of entries invalidated
         """
-        pattern = f"product_id\":{product_id}"
-        return self.cache.invalidate_by_pattern(pattern)
+        return self.cache.invalidate_by_tag(
+            f"product:{self._key_part(product_id)}")
 
     def invalidate_system_cache(self, system_type: str) -> int:
         """Invalidate all cache entries for a system type
@@ -636,8 +714,46 @@ class PricingCacheManager:
         Returns:
             Number of entries invalidated
         """
-        pattern = f"system_type\":\"{system_type}\""
-        return self.cache.invalidate_by_pattern(pattern)
+        return self.cache.invalidate_by_tag(
+            f"system_type:{self._key_part(system_type)}")
+
+    def tags_for_key(self, key: str) -> list[str]:
+        """Index tags encoded in a structured cache key
+
+        Args:
+            key: Key from one of the generate_*_key methods
+
+        Returns:
+            Tags such as "product:123" and "system_type:pv" (empty for
+            unstructured keys)
+        """
+        parts = key.split(":")
+        if parts[0] == "component" and len(parts) == 4:
+            return [f"product:{parts[1][2:]}"]
+        if parts[0] in ("system", "final") and len(parts) == 4:
+            tags = [f"system_type:{parts[1]}"]
+            if parts[2] != "p=":
+                tags.extend(
+                    f"product:{product_id}"
+                    for product_id in parts[2][2:].split(","))
+            return tags
+        return []
+
+    def _structured_key(self, key_type: str, system_type: str,
+                        components: list[dict[str, Any]],
+                        key_data: dict[str, Any]) -> str:
+        """Build ``<type>:<system_type>:p=<ids>:<hash>``"""
+        product_ids = sorted({
+            self._key_part(comp.get('product_id'))
+            for comp in components if comp.get('product_id') is not None
+        })
+        return (f"{key_type}:{self._key_part(system_type)}:"
+                f"p={','.join(product_ids)}:{self._hash_key_data(key_data)}")
+
+    @staticmethod
+    def _key_part(value: Any) -> str:
+        """Key segment without the separators used by structured keys"""
+        return str(value).replace(":", "_").replace(",", "_")
 
     def _hash_key_data(self, key_data: dict[str, Any]) -> str:
         """Generate hash from key data
@@ -1,12 +1,16 @@
 # product_db.py
 # Modul zur Verwaltung der Produktdatenbank (SQLite)
+import contextlib
 import os
 import sqlite3
 import sys  # KORREKTUR: sys-Modul importieren
+import threading
 import traceback
 from datetime import datetime
 from typing import Any
 
+from db_pool import run_schema_init_once
+
 # Datenbankverbindung und Verfügbarkeitsstatus
 DB_AVAILABLE = False
 get_db_connection_safe_pd = None
@@ -193,12 +197,170 @@ def _migrate_product_table_columns(conn: sqlite3.Connection):
     conn.commit()
 
 
+# Versionszähler des Produktkatalogs: wird nach jedem Schreibzugriff
+# erhöht, damit In-Memory-Indexe (z.B. product_rotation_engine) neu laden.
+_catalog_version = 0
+_catalog_version_lock = threading.Lock()
+
+
+def _bump_catalog_version() -> None:
+    global _catalog_version
+    with _catalog_version_lock:
+        _catalog_version += 1
+
+
+def get_product_catalog_version() -> int:
+    """Zähler, der sich bei jeder Produktänderung in diesem Prozess erhöht."""
+    return _catalog_version
+
+
+# Rückgabe des Katalog-Caches, wenn er nicht lesen konnte (-> direkt per SQL)
+_CACHE_UNAVAILABLE = object()
+
+# SQLite-NOCASE faltet nur ASCII; für identische Sortierung wie in SQL
+_ASCII_LOWER = str.maketrans(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+class ProductCatalogCache:
+    """Optionaler In-Memory-Snapshot der Tabelle products.
+
+    Für langlebige Prozesse (z.B. ``calculation_worker``), die dieselben
+    Produkte bei jeder Berechnung erneut lesen. Der Snapshot wird neu geladen,
+    sobald sich ``get_product_catalog_version()`` (Schreibzugriffe in diesem
+    Prozess) oder ``PRAGMA data_version`` (Commits anderer Verbindungen und
+    Prozesse) ändert. Rückgaben sind Kopien.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._conn_key: tuple | None = None
+        self._version: tuple | None = None
+        self._products: list[dict[str, Any]] = []
+        self._by_id: dict[int, dict[str, Any]] = {}
+        self._by_model: dict[str, dict[str, Any]] = {}
+        self._stats = {"hits": 0, "reloads": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        import database
+
+        try:
+            st = os.stat(database.DB_PATH)
+            conn_key = (database.DB_PATH, st.st_dev, st.st_ino)
+        except OSError:
+            conn_key = (database.DB_PATH, None, None)
+        if self._conn is None or self._conn_key != conn_key:
+            self._close()
+            conn = sqlite3.connect(
+                database.DB_PATH, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._conn, self._conn_key = conn, conn_key
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            with contextlib.suppress(Exception):
+                self._conn.close()
+        self._conn = None
+        self._conn_key = None
+        self._version = None
+
+    def _refresh(self) -> None:
+        conn = self._connection()
+        version = (
+            get_product_catalog_version(),
+            conn.execute("PRAGMA data_version").fetchone()[0],
+        )
+        if version == self._version:
+            self._stats["hits"] += 1
+            return
+        _ensure_product_table(conn)
+        rows = conn.execute("SELECT * FROM products").fetchall()
+        products = [dict(row) for row in rows]
+        products.sort(key=lambda p: (p.get("model_name") or "").translate(_ASCII_LOWER))
+        self._products = products
+        self._by_id = {p["id"]: p for p in products}
+        # Wie die SQL-Abfrage (Tabellenreihenfolge) gewinnt bei Namen, die sich
+        # nur in Groß-/Kleinschreibung unterscheiden, der erste Treffer; die
+        # Sortierung oben ist stabil
+        self._by_model = {}
+        for p in products:
+            self._by_model.setdefault(
+                (p.get("model_name") or "").translate(_ASCII_LOWER), p)
+        # Version nach dem Laden erneut lesen: _ensure_product_table kann selbst
+        # schreiben und würde sonst einen zweiten Reload auslösen
+        self._version = (
+            get_product_catalog_version(),
+            conn.execute("PRAGMA data_version").fetchone()[0],
+        )
+        self._stats["reloads"] += 1
+
+    def _read(self, fn):
+        with self._lock:
+            try:
+                self._refresh()
+            except sqlite3.Error as e:
+                print(f"product_db.ProductCatalogCache: SQLite Fehler: {e}")
+                self._close()
+                return _CACHE_UNAVAILABLE
+            return fn()
+
+    def list_products(self, category: str | None = None,
+                      company_id: int | None = None) -> Any:
+        return self._read(lambda: [
+            dict(p) for p in self._products
+            if (not category or p.get("category") == category)
+            and (company_id is None or p.get("company_id") == company_id)
+        ])
+
+    def get_product_by_id(self, product_id: int) -> Any:
+        product = self._read(lambda: self._by_id.get(product_id))
+        return dict(product) if isinstance(product, dict) else product
+
+    def get_product_by_model_name(self, model_name: str) -> Any:
+        product = self._read(
+            lambda: self._by_model.get(model_name.translate(_ASCII_LOWER)))
+        return dict(product) if isinstance(product, dict) else product
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+            stats["products"] = len(self._products)
+        return stats
+
+
+_catalog_cache: ProductCatalogCache | None = None
+
+
+def enable_product_catalog_cache(enabled: bool = True) -> ProductCatalogCache | None:
+    """Schaltet den In-Memory-Snapshot für list_products/get_product_by_* ein oder aus."""
+    global _catalog_cache
+    if enabled:
+        if _catalog_cache is None:
+            _catalog_cache = ProductCatalogCache()
+    elif _catalog_cache is not None:
+        with _catalog_cache._lock:
+            _catalog_cache._close()
+        _catalog_cache = None
+    return _catalog_cache
+
+
+def get_product_catalog_cache_stats() -> dict[str, Any] | None:
+    return _catalog_cache.get_stats() if _catalog_cache is not None else None
+
+
+def _ensure_product_table(conn: sqlite3.Connection):
+    """create_product_table inkl. Spalten-Migration einmal pro Datenbankdatei."""
+    run_schema_init_once(conn, "products", create_product_table)
+
+
 def add_product(product_data: dict[str, Any]) -> int | None:
     conn = get_db_connection_safe_pd()
     if conn is None:
         print("product_db.add_product: DB nicht verfügbar.")
         return None
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     now_iso = datetime.now().isoformat()
     all_db_columns = {
@@ -256,6 +418,7 @@ def add_product(product_data: dict[str, Any]) -> int | None:
             f"INSERT INTO products ({fields}) VALUES ({placeholders})", list(
                 insert_data.values()))
         conn.commit()
+        _bump_catalog_version()
         product_id = cursor.lastrowid
         print(
             f"product_db.add_product: Produkt '{
@@ -280,7 +443,7 @@ def update_product(product_id: int | float,
     if conn is None:
         print("product_db.update_product: DB nicht verfügbar.")
         return False
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     now_iso = datetime.now().isoformat()
     if 'last_updated' in product_data:
@@ -325,6 +488,7 @@ def update_product(product_id: int | float,
                 ', '.join(fields_to_set)} WHERE id=?",
             values)
         conn.commit()
+        _bump_catalog_version()
         if cursor.rowcount > 0:
             print(
                 f"product_db.update_product: Produkt ID {product_id} erfolgreich aktualisiert.")
@@ -347,11 +511,12 @@ def delete_product(product_id: int | float) -> bool:
     if conn is None:
         print("product_db.delete_product: DB nicht verfügbar.")
         return False
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM products WHERE id=?", (int(product_id),))
         conn.commit()
+        _bump_catalog_version()
         deleted_count = cursor.rowcount
         if deleted_count > 0:
             print(
@@ -372,11 +537,15 @@ def delete_product(product_id: int | float) -> bool:
 
 def list_products(category: str | None = None, company_id: int |
                   None = None) -> list[dict[str, Any]]:
+    if _catalog_cache is not None and DB_AVAILABLE:
+        cached = _catalog_cache.list_products(category, company_id)
+        if cached is not _CACHE_UNAVAILABLE:
+            return cached
     conn = get_db_connection_safe_pd()
     if conn is None:
         print("product_db.list_products: DB nicht verfügbar.")
         return []
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     query = "SELECT * FROM products"
     params: list[Any] = []
@@ -407,11 +576,15 @@ def list_products(category: str | None = None, company_id: int |
 
 
 def get_product_by_id(product_id: int | float) -> dict[str, Any] | None:
+    if _catalog_cache is not None and DB_AVAILABLE:
+        cached = _catalog_cache.get_product_by_id(int(product_id))
+        if cached is not _CACHE_UNAVAILABLE:
+            return cached
     conn = get_db_connection_safe_pd()
     if conn is None:
         print("product_db.get_product_by_id: DB nicht verfügbar.")
         return None
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT * FROM products WHERE id=?", (int(product_id),))
@@ -430,11 +603,15 @@ def get_product_by_model_name(model_name: str) -> dict[str, Any] | None:
     if not model_name or not model_name.strip():
         print("product_db.get_product_by_model_name: Modellname darf nicht leer sein.")
         return None
+    if _catalog_cache is not None and DB_AVAILABLE:
+        cached = _catalog_cache.get_product_by_model_name(model_name.strip())
+        if cached is not _CACHE_UNAVAILABLE:
+            return cached
     conn = get_db_connection_safe_pd()
     if conn is None:
         print("product_db.get_product_by_model_name: DB nicht verfügbar.")
         return None
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -458,7 +635,7 @@ def get_product_id_by_model_name(model_name: str) -> int | None:
     if conn is None:
         print("product_db.get_product_id_by_model_name: DB nicht verfügbar.")
         return None
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -487,7 +664,7 @@ def list_product_categories() -> list[str]:
     if conn is None:
         print("product_db.list_product_categories: DB nicht verfügbar.")
         return []
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     try:
         cursor.execute(
@@ -627,7 +804,7 @@ def set_product_margin(
         print("product_db.set_product_margin: DB nicht verfügbar.")
         return False
 
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     now_iso = datetime.now().isoformat()
 
@@ -646,6 +823,7 @@ def set_product_margin(
         """, (margin_type, margin_value, priority, now_iso, int(product_id)))
 
         conn.commit()
+        _bump_catalog_version()
 
         if cursor.rowcount > 0:
             print(
@@ -754,7 +932,7 @@ def update_product_purchase_price(
         print("product_db.update_product_purchase_price: DB nicht verfügbar.")
         return False
 
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     now_iso = datetime.now().isoformat()
 
@@ -778,6 +956,7 @@ def update_product_purchase_price(
         """, (purchase_price_net, now_iso, int(product_id)))
 
         conn.commit()
+        _bump_catalog_version()
 
         if cursor.rowcount > 0:
             print(
@@ -1043,7 +1222,7 @@ def clear_all_products() -> bool:
         print("product_db.clear_all_products: DB nicht verfügbar.")
         return False
 
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
 
     try:
@@ -1058,6 +1237,7 @@ def clear_all_products() -> bool:
         cursor.execute("DELETE FROM sqlite_sequence WHERE name='products'")
 
         conn.commit()
+        _bump_catalog_version()
 
         print(
             f"product_db.clear_all_products: {count_before} Produkte erfolgreich gelöscht.")
@@ -1124,7 +1304,7 @@ def get_products_by_calculate_per(calculate_per: str) -> list[dict[str, Any]]:
     if conn is None:
         return []
 
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
 
     try:
@@ -1160,7 +1340,7 @@ def update_product_pricing_fields(
     if conn is None:
         return False
 
-    create_product_table(conn)
+    _ensure_product_table(conn)
     cursor = conn.cursor()
     now_iso = datetime.now().isoformat()
 
@@ -1206,6 +1386,7 @@ def update_product_pricing_fields(
                 ', '.join(fields_to_set)} WHERE id=?",
             values)
         conn.commit()
+        _bump_catalog_version()
 
         if cursor.rowcount > 0:
             # Log changes
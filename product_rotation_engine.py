@@ -14,29 +14,22 @@ Logik:
 import streamlit as st
 from typing import Dict, Set, List, Optional, Tuple
 from dataclasses import dataclass
+import bisect
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 
-def load_all_products() -> Dict[str, List[dict]]:
-    """
-    Lade alle Produkte aus der Datenbank oder Session State
-    
-    Returns:
-        {
-            'pv_modules': [...],
-            'inverters': [...],
-            'battery_storage': [...]
-        }
-    """
+def _load_products_from_db() -> Optional[Dict[str, List[dict]]]:
+    """Produkte aus product_db im einheitlichen Format (None, wenn leer/nicht verfügbar)."""
     products = {
         'pv_modules': [],
         'inverters': [],
         'battery_storage': []
     }
     
-    # 1. PRIMÄR: Lade aus Produktdatenbank-Modul
     try:
         import product_db  # ← RICHTIGER Modulname!
         logger.info(f"✅ product_db Modul importiert")
@@ -112,8 +105,17 @@ def load_all_products() -> Dict[str, List[dict]]:
         logger.error(f"❌ Produktdatenbank konnte nicht geladen werden: {e}")
         import traceback
         logger.error(traceback.format_exc())
+    return None
+
+
+def _load_products_from_session() -> Dict[str, List[dict]]:
+    """Fallback: Produktlisten aus dem Streamlit Session State."""
+    products = {
+        'pv_modules': [],
+        'inverters': [],
+        'battery_storage': []
+    }
     
-    # 2. FALLBACK: Session State
     try:
         # Versuche aus Session State zu laden (wenn in Streamlit)
         import streamlit as st
@@ -141,6 +143,26 @@ def load_all_products() -> Dict[str, List[dict]]:
     return products
 
 
+def load_all_products() -> Dict[str, List[dict]]:
+    """
+    Lade alle Produkte aus der Datenbank oder Session State
+    
+    Returns:
+        {
+            'pv_modules': [...],
+            'inverters': [...],
+            'battery_storage': [...]
+        }
+    """
+    # 1. PRIMÄR: Lade aus Produktdatenbank-Modul
+    products = _load_products_from_db()
+    if products is not None:
+        return products
+    
+    # 2. FALLBACK: Session State
+    return _load_products_from_session()
+
+
 @dataclass
 class ProductSpecs:
     """Produkt-Spezifikationen für Matching"""
@@ -150,6 +172,158 @@ class ProductSpecs:
     tolerance: float = 0.1  # ±10% Toleranz
 
 
+# Spec-Feld je Kategorie: (Schlüssel im Produkt, Alternativ-Schlüssel, Attribut in ProductSpecs)
+_SPEC_FIELDS = {
+    'pv_modules': ('power_w', 'Leistung_W', 'power_w'),
+    'inverters': ('power_kw', 'Leistung_kW', 'power_kw'),
+    'battery_storage': ('capacity_kwh', 'Kapazität_kWh', 'capacity_kwh'),
+}
+_SPEC_UNITS = {'pv_modules': 'W', 'inverters': 'kW', 'battery_storage': 'kWh'}
+
+# Prozess-Snapshot des Katalogs; wird über den Versionszähler in product_db
+# bei Schreibzugriffen verworfen, die TTL deckt Änderungen anderer Prozesse ab.
+CATALOG_TTL_SECONDS = 60.0
+
+
+class _BrandIndex:
+    """Produkte einer Marke; Spec-Werte sortiert für Bereichsabfragen."""
+
+    __slots__ = ('products', 'spec_values', 'spec_positions')
+
+    def __init__(self, products: List[dict], spec_keys: Optional[Tuple[str, str, str]]):
+        self.products = products
+        entries = []
+        if spec_keys:
+            key, alt_key, _ = spec_keys
+            for position, product in enumerate(products):
+                value = product.get(key) or product.get(alt_key)
+                if not value:
+                    continue  # wie bisher: 0/None zählt nicht als Match
+                try:
+                    entries.append((float(value), position))
+                except (TypeError, ValueError):
+                    continue
+        entries.sort()
+        self.spec_values = [value for value, _ in entries]
+        self.spec_positions = [position for _, position in entries]
+
+
+class ProductCatalog:
+    """Unveränderlicher Index über die Produkte aus :func:`load_all_products`.
+
+    Hält je Kategorie die sortierten Marken und je Marke die Produkte in
+    Datenbank-Reihenfolge samt sortierter Spec-Werte (Leistung W/kW,
+    Kapazität kWh), sodass ±Toleranz-Suchen per bisect laufen.
+    """
+
+    def __init__(self, products: Dict[str, List[dict]], version: Optional[int] = None):
+        self.version = version
+        self.products = products
+        self._brands: Dict[str, List[str]] = {}
+        self._by_brand: Dict[str, Dict[str, _BrandIndex]] = {}
+        for category, items in products.items():
+            grouped: Dict[str, List[dict]] = {}
+            for product in items:
+                brand = product.get('brand') or product.get('Marke')
+                grouped.setdefault(brand, []).append(product)
+            spec_keys = _SPEC_FIELDS.get(category)
+            self._by_brand[category] = {
+                brand: _BrandIndex(brand_products, spec_keys)
+                for brand, brand_products in grouped.items()
+            }
+            self._brands[category] = sorted(b for b in grouped if b)
+
+    def has_category(self, category: str) -> bool:
+        return category in self._by_brand
+
+    def brands(self, category: str, exclude_brands: Optional[Set[str]] = None) -> List[str]:
+        brands = self._brands.get(category, [])
+        if not exclude_brands:
+            return list(brands)
+        return [b for b in brands if b not in exclude_brands]
+
+    def brand_products(self, category: str, brand: str) -> List[dict]:
+        index = self._by_brand.get(category, {}).get(brand)
+        return index.products if index else []
+
+    def find_by_spec(
+        self,
+        category: str,
+        brand: str,
+        target: Optional[float],
+        tolerance: float,
+        used_models: Set[str],
+    ) -> Optional[dict]:
+        """Erstes (in DB-Reihenfolge) unbenutztes Produkt mit Spec in target ±tolerance."""
+        index = self._by_brand.get(category, {}).get(brand)
+        if index is None or not target:
+            return None
+        low = target * (1 - tolerance)
+        high = target * (1 + tolerance)
+        start = bisect.bisect_left(index.spec_values, low)
+        stop = bisect.bisect_right(index.spec_values, high)
+        best = None
+        for position in index.spec_positions[start:stop]:
+            if best is not None and position >= best:
+                continue
+            product = index.products[position]
+            if (product.get('model') or product.get('Modell')) in used_models:
+                continue
+            best = position
+        return index.products[best] if best is not None else None
+
+
+_catalog_lock = threading.Lock()
+_catalog_cache: Optional[Tuple[float, ProductCatalog]] = None
+_catalog_stats = {'builds': 0, 'hits': 0}
+
+
+def _product_db_version() -> Optional[int]:
+    try:
+        import product_db
+        return product_db.get_product_catalog_version()
+    except Exception:
+        return None
+
+
+def get_product_catalog() -> ProductCatalog:
+    """Katalog-Snapshot aus der Produktdatenbank (einmal geladen, versioniert).
+
+    Ist die Datenbank leer oder nicht verfügbar, wird ein ungecachter Katalog
+    aus dem Session State gebaut (dessen Listen sich jederzeit ändern können).
+    """
+    global _catalog_cache
+    version = _product_db_version()
+    with _catalog_lock:
+        cached = _catalog_cache
+        if (cached is not None and cached[1].version == version
+                and time.monotonic() - cached[0] < CATALOG_TTL_SECONDS):
+            _catalog_stats['hits'] += 1
+            return cached[1]
+
+    products = _load_products_from_db()
+    if products is None:
+        return ProductCatalog(_load_products_from_session())
+
+    catalog = ProductCatalog(products, version)
+    with _catalog_lock:
+        _catalog_cache = (time.monotonic(), catalog)
+        _catalog_stats['builds'] += 1
+    return catalog
+
+
+def invalidate_product_catalog() -> None:
+    """Verwirft den Katalog-Snapshot (z.B. nach direkten DB-Änderungen)."""
+    global _catalog_cache
+    with _catalog_lock:
+        _catalog_cache = None
+
+
+def get_product_catalog_stats() -> Dict[str, int]:
+    with _catalog_lock:
+        return dict(_catalog_stats)
+
+
 def get_available_brands(category: str, exclude_brands: Set[str] = None) -> List[str]:
     """
     Hole alle verfügbaren Marken aus Produktdatenbank für eine Kategorie
@@ -161,27 +335,14 @@ def get_available_brands(category: str, exclude_brands: Set[str] = None) -> List
     Returns:
         Liste von Marken-Namen
     """
-    # load_all_products() ist bereits in DIESEM Modul definiert (Zeile 22)!
-    # KEIN Import notwendig!
+    catalog = get_product_catalog()
     
-    exclude_brands = exclude_brands or set()
-    
-    # Lade alle Produkte aus Datenbank
-    all_products = load_all_products()
-    
-    if category not in all_products:
+    if not catalog.has_category(category):
         logger.warning(f"Kategorie {category} nicht in Produktdatenbank gefunden")
         return []
     
-    # Extrahiere eindeutige Marken
-    brands = set()
-    for product in all_products[category]:
-        brand = product.get('brand') or product.get('Marke')
-        if brand and brand not in exclude_brands:
-            brands.add(brand)
-    
-    brands_list = sorted(list(brands))
-    logger.info(f"Gefundene Marken für {category}: {brands_list}")
+    brands_list = catalog.brands(category, exclude_brands)
+    logger.debug(f"Gefundene Marken für {category}: {brands_list}")
     
     return brands_list
 
@@ -202,66 +363,35 @@ def get_product_by_specs(
         used_models: Bereits verwendete Produktmodelle (zur Vermeidung von Duplikaten)
     
     Returns:
-        Produkt-Dict oder None
+        Produkt-Dict (Kopie) oder None
     """
-    # load_all_products() ist bereits in DIESEM Modul definiert!
-    
     used_models = used_models or set()
     
-    all_products = load_all_products()
+    catalog = get_product_catalog()
     
-    if category not in all_products:
+    if not catalog.has_category(category):
         return None
     
-    # Filtere nach Marke
-    brand_products = [p for p in all_products[category] 
-                      if (p.get('brand') or p.get('Marke')) == brand]
+    brand_products = catalog.brand_products(category, brand)
     
     if not brand_products:
         logger.warning(f"Keine Produkte für Marke {brand} in {category}")
         return None
     
-    # Finde passendes Produkt nach Specs
-    for product in brand_products:
-        model = product.get('model') or product.get('Modell')
-        
-        # Überspringe bereits verwendete Modelle
-        if model in used_models:
-            continue
-        
-        # PV Module: Leistung in W
-        if category == 'pv_modules' and specs.power_w:
-            product_power = product.get('power_w') or product.get('Leistung_W')
-            if product_power:
-                min_power = specs.power_w * (1 - specs.tolerance)
-                max_power = specs.power_w * (1 + specs.tolerance)
-                if min_power <= product_power <= max_power:
-                    logger.info(f"Gefunden: {brand} {model} mit {product_power}W (Ziel: {specs.power_w}W)")
-                    return product
-        
-        # Wechselrichter: Leistung in kW
-        elif category == 'inverters' and specs.power_kw:
-            product_power = product.get('power_kw') or product.get('Leistung_kW')
-            if product_power:
-                min_power = specs.power_kw * (1 - specs.tolerance)
-                max_power = specs.power_kw * (1 + specs.tolerance)
-                if min_power <= product_power <= max_power:
-                    logger.info(f"Gefunden: {brand} {model} mit {product_power}kW (Ziel: {specs.power_kw}kW)")
-                    return product
-        
-        # Batteriespeicher: Kapazität in kWh
-        elif category == 'battery_storage' and specs.capacity_kwh:
-            product_capacity = product.get('capacity_kwh') or product.get('Kapazität_kWh')
-            if product_capacity:
-                min_capacity = specs.capacity_kwh * (1 - specs.tolerance)
-                max_capacity = specs.capacity_kwh * (1 + specs.tolerance)
-                if min_capacity <= product_capacity <= max_capacity:
-                    logger.info(f"Gefunden: {brand} {model} mit {product_capacity}kWh (Ziel: {specs.capacity_kwh}kWh)")
-                    return product
+    # Finde passendes Produkt nach Specs (Bereichsabfrage im Index)
+    spec_keys = _SPEC_FIELDS.get(category)
+    target = getattr(specs, spec_keys[2]) if spec_keys else None
+    product = catalog.find_by_spec(category, brand, target, specs.tolerance, used_models)
+    if product is not None:
+        value = product.get(spec_keys[0]) or product.get(spec_keys[1])
+        logger.info(
+            f"Gefunden: {brand} {product.get('model') or product.get('Modell')} "
+            f"mit {value}{_SPEC_UNITS[category]} (Ziel: {target}{_SPEC_UNITS[category]})")
+        return dict(product)
     
     # Kein passendes Produkt gefunden - nehme erstes verfügbares
     logger.warning(f"Kein exaktes Match für {brand} in {category}, nehme erstes verfügbares")
-    return brand_products[0] if brand_products else None
+    return dict(brand_products[0])
 
 
 def find_matching_brands_for_inverter_and_battery(
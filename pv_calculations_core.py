@@ -21,6 +21,8 @@ from typing import Any
 import numpy as np
 import numpy_financial as npf
 
+from monte_carlo_engine import MonteCarloConfig, run_monte_carlo
+
 # Konstanten
 LIFESPAN_YEARS = 25
 DISCOUNT_RATE = 0.04
@@ -622,56 +624,35 @@ class PVCalculationsAdvanced:
         if base_investment <= 0 or base_annual_benefit <= 0:
             return {"error": "Ungültige Basisdaten für Simulation"}
 
-        np.random.seed(42)  # Für reproduzierbare Ergebnisse
-        npv_distribution = []
-
-        for _ in range(n_simulations):
-            # Parameter variieren (normalverteilt)
-            investment = max(
-                0,
-                np.random.normal(
-                    base_investment,
-                    base_investment *
-                    0.1))
-            annual_benefit = max(
-                0,
-                np.random.normal(
-                    base_annual_benefit,
-                    base_annual_benefit *
-                    0.15))
-            discount_rate = max(0, np.random.normal(0.04, 0.01))
-
-            # NPV berechnen
-            npv = -investment
-            for year in range(1, self.years + 1):
-                npv += annual_benefit / (1 + discount_rate) ** year
-
-            npv_distribution.append(npv)
-
-        npv_array = np.array(npv_distribution)
-
-        # Statistiken berechnen
-        npv_mean = np.mean(npv_array)
-        npv_std = np.std(npv_array)
-
-        # Konfidenzintervall
-        alpha = (100 - confidence_level) / 2
-        npv_lower = np.percentile(npv_array, alpha)
-        npv_upper = np.percentile(npv_array, 100 - alpha)
-
-        # Value at Risk (5% Quantil)
-        var_5 = np.percentile(npv_array, 5)
-
-        # Erfolgswahrscheinlichkeit (NPV > 0)
-        success_prob = (npv_array > 0).sum() / n_simulations * 100
+        config = MonteCarloConfig(lifetime_years=self.years)
+        price_increase_pct = calc_results.get(
+            "electricity_price_increase_rate_effective_percent")
+        if price_increase_pct is not None:
+            config.price_increase_mean = safe_float(price_increase_pct) / 100
+
+        mc_results = run_monte_carlo(
+            {
+                "total_investment_netto": base_investment,
+                "annual_financial_benefit_year1": base_annual_benefit,
+            },
+            n_simulations,
+            confidence_level,
+            config=config,
+            include_distribution=False,
+        )
 
         return {
-            "npv_mean": round(npv_mean, 2),
-            "npv_std": round(npv_std, 2),
-            "npv_lower_bound": round(npv_lower, 2),
-            "npv_upper_bound": round(npv_upper, 2),
-            "var_5": round(var_5, 2),
-            "success_probability": round(success_prob, 1),
+            "npv_mean": round(mc_results["npv_mean"], 2),
+            "npv_std": round(mc_results["npv_std"], 2),
+            "npv_lower_bound": round(mc_results["npv_lower_bound"], 2),
+            "npv_upper_bound": round(mc_results["npv_upper_bound"], 2),
+            "var_5": round(mc_results["var_5"], 2),
+            "cvar_5": round(mc_results["cvar_5"], 2),
+            "success_probability": round(mc_results["success_probability"], 1),
+            "percentiles": {
+                p: round(v, 2) for p, v in mc_results["percentiles"].items()
+            },
+            "histogram": mc_results["histogram"],
             "simulations_count": n_simulations,
             "confidence_level": confidence_level
         }
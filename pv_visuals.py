@@ -14,6 +14,8 @@ from typing import Any
 import plotly.graph_objects as go
 import streamlit as st
 
+from chart_export_cache import export_figure_bytes
+
 # Import der verbesserten Styling-Funktionen (Task 4.1-4.3)
 from chart_styling_improvements import (
     FONT_SIZE_DATA_LABEL,
@@ -63,8 +65,8 @@ def _export_plotly_fig_to_bytes_pv_viz(
     try:
         # Erhöhe die Skalierung und definiere eine Standardgröße für bessere
         # Qualität im PDF
-        img_bytes = fig.to_image(format="png", scale=2, width=900, height=550)
-        return img_bytes
+        return export_figure_bytes(
+            fig, format="png", scale=2, width=900, height=550)
     except Exception:
         # Fehlerbehandlung wurde aus der Originaldatei übernommen
         # Im Idealfall würde dieser Fehler an eine zentrale Logging-Stelle gemeldet
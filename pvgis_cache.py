@@ -0,0 +1,320 @@
+"""
+Persistenter PVGIS-Antwort-Cache
+================================
+
+Speichert PVGIS-Ergebnisse normiert auf 1 kWp in einer SQLite-Datei im
+Datenverzeichnis. Der Schlüssel wird aus quantisierten Standortdaten
+(Lat/Lon auf 0,01°), Neigung, Azimut und Systemverlust gebildet, sodass
+leicht verschobene Koordinaten denselben Eintrag treffen. Erträge werden
+beim Auslesen linear auf die angefragte Anlagenleistung skaliert.
+
+Betriebsarten (``PVGIS_CACHE_MODE`` oder :func:`configure_pvgis_cache`):
+- ``online``  Cache zuerst, bei Miss PVGIS-Abruf und Speicherung (Standard)
+- ``record``  wie ``online``, zusätzlich Ablage als JSON-Fixture
+- ``replay``  nur Fixtures/Cache, niemals Netzwerk (offline, deterministisch)
+- ``off``     Cache deaktiviert, jeder Aufruf geht an PVGIS
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_CACHE_PATH = os.path.join(DATA_DIR, "pvgis_cache.db")
+DEFAULT_FIXTURE_DIR = os.path.join(DATA_DIR, "pvgis_fixtures")
+DEFAULT_TTL_SECONDS = 90 * 24 * 3600  # TMY-Daten ändern sich kaum
+
+CACHE_MODES = ("online", "record", "replay", "off")
+
+# Felder, die mit der Anlagenleistung skaliert werden
+_SCALED_LIST_FIELDS = ("monthly_production_kwh", "hourly_production_kwh")
+_SCALED_SCALAR_FIELDS = ("annual_production_kwh",)
+
+
+def make_cache_key(
+    latitude: float,
+    longitude: float,
+    tilt: float,
+    azimuth: float,
+    system_loss_percent: float,
+    include_hourly: bool = False,
+    hourly_reference_year: int | None = None,
+    coord_precision: int = 2,
+) -> str:
+    """Bildet den quantisierten Cache-Schlüssel (unabhängig von der kWp)."""
+    parts = [
+        f"lat={round(float(latitude), coord_precision):.{coord_precision}f}",
+        f"lon={round(float(longitude), coord_precision):.{coord_precision}f}",
+        f"tilt={int(round(float(tilt)))}",
+        f"aspect={int(round(float(azimuth)))}",
+        f"loss={round(float(system_loss_percent), 1):.1f}",
+    ]
+    if include_hourly:
+        parts.append(f"hourly={hourly_reference_year}")
+    return "|".join(parts)
+
+
+def scale_result(normalized: dict[str, Any], peak_power_kwp: float) -> dict[str, Any]:
+    """Skaliert ein auf 1 kWp normiertes Ergebnis auf die Anlagenleistung."""
+    scaled = dict(normalized)
+    for field in _SCALED_LIST_FIELDS:
+        values = normalized.get(field)
+        if isinstance(values, list):
+            scaled[field] = [float(v) * peak_power_kwp for v in values]
+    for field in _SCALED_SCALAR_FIELDS:
+        value = normalized.get(field)
+        if isinstance(value, (int, float)):
+            scaled[field] = float(value) * peak_power_kwp
+    return scaled
+
+
+def normalize_result(result: dict[str, Any], peak_power_kwp: float) -> dict[str, Any]:
+    """Gegenstück zu :func:`scale_result` (Ergebnis -> 1 kWp)."""
+    if peak_power_kwp <= 0:
+        raise ValueError("peak_power_kwp muss positiv sein")
+    return scale_result(result, 1.0 / peak_power_kwp)
+
+
+class PVGISCache:
+    """SQLite-gestützter PVGIS-Cache mit TTL, Statistiken und Fixture-Replay."""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        mode: str = "online",
+        fixture_dir: str = DEFAULT_FIXTURE_DIR,
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unbekannter PVGIS-Cache-Modus: {mode}")
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.mode = mode
+        self.fixture_dir = fixture_dir
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "fixture_hits": 0,
+            "errors": 0,
+        }
+
+    # --- intern -----------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._initialized:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pvgis_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _fixture_path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.fixture_dir, f"pvgis_{digest}.json")
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    # --- öffentliche API ---------------------------------------------------
+
+    @property
+    def network_allowed(self) -> bool:
+        return self.mode != "replay"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Liefert den normierten (1 kWp) Eintrag oder ``None``."""
+        if self.mode == "off":
+            return None
+
+        if self.mode == "replay":
+            fixture = self.load_fixture(key)
+            if fixture is not None:
+                self._count("fixture_hits")
+                self._count("hits")
+                return fixture
+
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT payload, created_at FROM pvgis_cache WHERE cache_key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    payload, created_at = row
+                    # Im Replay-Modus sind auch abgelaufene Einträge besser als nichts
+                    if (
+                        self.mode != "replay"
+                        and self.ttl_seconds
+                        and time.time() - created_at > self.ttl_seconds
+                    ):
+                        self._count("expired")
+                        self._count("misses")
+                        return None
+                    conn.execute(
+                        "UPDATE pvgis_cache SET hit_count = hit_count + 1 WHERE cache_key = ?",
+                        (key,),
+                    )
+                    conn.commit()
+                    self._count("hits")
+                    return json.loads(payload)
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError, json.JSONDecodeError) as e:
+            self._count("errors")
+            print(f"PVGIS-Cache: Lesefehler für '{key}': {e}")
+
+        self._count("misses")
+        return None
+
+    def put(self, key: str, normalized: dict[str, Any]) -> None:
+        """Speichert einen auf 1 kWp normierten Eintrag."""
+        if self.mode == "off":
+            return
+        payload = json.dumps(normalized)
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pvgis_cache (cache_key, payload, created_at, hit_count) "
+                    "VALUES (?, ?, ?, 0)",
+                    (key, payload, time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            self._count("stores")
+        except (sqlite3.Error, OSError) as e:
+            self._count("errors")
+            print(f"PVGIS-Cache: Schreibfehler für '{key}': {e}")
+
+        if self.mode == "record":
+            self.save_fixture(key, normalized)
+
+    def load_fixture(self, key: str) -> dict[str, Any] | None:
+        path = self._fixture_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f).get("result")
+        except (OSError, json.JSONDecodeError) as e:
+            self._count("errors")
+            print(f"PVGIS-Cache: Fixture '{path}' nicht lesbar: {e}")
+            return None
+
+    def save_fixture(self, key: str, normalized: dict[str, Any]) -> None:
+        try:
+            os.makedirs(self.fixture_dir, exist_ok=True)
+            with open(self._fixture_path(key), "w", encoding="utf-8") as f:
+                json.dump({"cache_key": key, "result": normalized}, f)
+        except OSError as e:
+            self._count("errors")
+            print(f"PVGIS-Cache: Fixture für '{key}' nicht speicherbar: {e}")
+
+    def purge_expired(self) -> int:
+        """Entfernt abgelaufene Einträge und gibt deren Anzahl zurück."""
+        if not self.ttl_seconds:
+            return 0
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM pvgis_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def clear(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM pvgis_cache")
+            conn.commit()
+        finally:
+            conn.close()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for stat in self._stats:
+                self._stats[stat] = 0
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["mode"] = self.mode
+        stats["ttl_seconds"] = self.ttl_seconds
+        try:
+            conn = self._connect()
+            try:
+                stats["entries"] = conn.execute(
+                    "SELECT COUNT(*) FROM pvgis_cache"
+                ).fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            stats["entries"] = None
+        return stats
+
+
+_pvgis_cache: PVGISCache | None = None
+_pvgis_cache_lock = threading.Lock()
+
+
+def get_pvgis_cache() -> PVGISCache:
+    """Prozessweite Cache-Instanz (konfiguriert über Umgebungsvariablen)."""
+    global _pvgis_cache
+    if _pvgis_cache is None:
+        with _pvgis_cache_lock:
+            if _pvgis_cache is None:
+                ttl_days = os.environ.get("PVGIS_CACHE_TTL_DAYS")
+                _pvgis_cache = PVGISCache(
+                    db_path=os.environ.get("PVGIS_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    ttl_seconds=(
+                        int(float(ttl_days) * 24 * 3600)
+                        if ttl_days
+                        else DEFAULT_TTL_SECONDS
+                    ),
+                    mode=os.environ.get("PVGIS_CACHE_MODE", "online").lower(),
+                    fixture_dir=os.environ.get("PVGIS_FIXTURE_DIR", DEFAULT_FIXTURE_DIR),
+                )
+    return _pvgis_cache
+
+
+def configure_pvgis_cache(**kwargs: Any) -> PVGISCache:
+    """Ersetzt die prozessweite Instanz (z.B. Replay-Modus in Tests)."""
+    global _pvgis_cache
+    with _pvgis_cache_lock:
+        _pvgis_cache = PVGISCache(**kwargs)
+    return _pvgis_cache
+
+
+def get_pvgis_cache_stats() -> dict[str, Any]:
+    return get_pvgis_cache().get_stats()
@@ -1,41 +1,71 @@
-# scenario_manager.py (Placeholder Modul)
-# Imports für zukünftige Funktionen
-from typing import Any  # KORREKTUR: Dict und List hinzugefügt
+# scenario_manager.py
+"""
+Szenarien auf Basis der Ergebnisse von ``perform_calculations`` (A.7,
+Features 9, 10).
 
-# Streamlit ist hier erforderlich, da st.warning verwendet wird.
-import streamlit as st
+Alle Szenarien laufen gemeinsam als Batch durch ``scenario_sweep``; die
+Basis wird aus dem Ergebnis-Dict (``analysis_results``) abgeleitet, optional
+ergänzt um ``project_details`` und ``global_constants`` im selben Dict.
+"""
 
-# from analysis import calculate_economics # Benötigt die Wirtschafts-Berechnungen
-# from ai_models import predict_yield # Benötigt KI-Modelle
+from collections.abc import Iterable
+from typing import Any
+
+import pandas as pd
+
+from scenario_sweep import SweepBase, run_scenario_sweep
+
+
+def _sweep_base(base_project_data: dict[str, Any]) -> SweepBase:
+    return SweepBase.from_results(
+        base_project_data,
+        base_project_data.get("project_details"),
+        base_project_data.get("global_constants"),
+    )
+
+
+def sweep_project(
+        base_project_data: dict[str, Any],
+        grid: dict[str, Iterable[Any]],
+        years: int | None = None) -> pd.DataFrame:
+    """Bewertet ein Parameterraster (kartesisches Produkt) als DataFrame."""
+    return run_scenario_sweep(_sweep_base(base_project_data), grid, years=years)
 
 
-# Dieses Modul verwaltet die Szenarien (A.7, Features 9, 10)
 # Beispiel: Funktion zur Simulation eines spezifischen Szenarios (z.B.
 # mit/ohne Speicher)
 def simulate_scenario(
         base_project_data: dict[str, Any], scenario_options: dict[str, Any]) -> dict[str, Any]:
-    """Placeholder Funktion zur Simulation eines Szenarios."""
-    print("scenario_manager: Placeholder simulate_scenario called")  # Debugging
-    st.warning("Szenarien-Simulation ist ein Platzhalter.")  # Info
-    # Hier kommt die Logik zur Anpassung der Basisdaten basierend auf Szenario-Optionen
-    # und dann der Aufruf der Analysefunktionen mit den angepassten Daten.
-    # Rückgabe sind die Ergebnisse für dieses Szenario.
+    """Simuliert ein Szenario; ``scenario_options`` enthält ``name`` und
+    Sweep-Parameter (z.B. ``storage_kwh``, ``anlage_kwp``)."""
+    row = run_scenario_sweep(
+        _sweep_base(base_project_data), scenarios=[scenario_options]).iloc[0]
     return {
         "scenario_name": scenario_options.get(
             "name",
             "Unbekanntes Szenario"),
-        "results": {
-            "placeholder": "Daten hier"}}  # Dummy Ergebnis
+        "results": row.drop("scenario").to_dict()}
 
-# Beispiel: Funktion zur Generierung mehrerer Vergleichsszenarien
 
+def comparison_scenario_options(base: SweepBase) -> list[dict[str, Any]]:
+    """Kernszenarien: Basis, mit/ohne Speicher, größere Anlage, finanziert."""
+    storage_kwh = base.storage_kwh if base.storage_kwh > 0 else round(base.anlage_kwp)
+    return [
+        {"name": "Basis Szenario"},
+        {"name": "Szenario ohne Speicher", "storage_kwh": 0.0},
+        {"name": "Szenario mit Speicher", "storage_kwh": storage_kwh},
+        {"name": "Größere Anlage (+30 % kWp)", "anlage_kwp": base.anlage_kwp * 1.3},
+        {"name": "Vollfinanzierung", "financed_share": 1.0},
+    ]
 
+
+# Beispiel: Funktion zur Generierung mehrerer Vergleichsszenarien
 def generate_comparison_scenarios(
         base_project_data: dict[str, Any]) -> list[dict[str, Any]]:
-    """Placeholder Funktion zur Generierung vordefinierter Vergleichsszenarien."""
-    print("scenario_manager: Placeholder generate_comparison_scenarios called")  # Debugging
-    st.warning("Generierung von Vergleichsszenarien ist ein Platzhalter.")  # Info
-    # Hier kommt die Logik zur Definition und Simulation der 4-5 Kernszenarien (mit/ohne Speicher, mit/ohne EV/WP)
-    # Nutzt simulate_scenario
-    return [{"scenario_name": "Basis Szenario (Placeholder)", "results": {}},
-            {"scenario_name": "Szenario mit Speicher (Placeholder)", "results": {}}]  # Dummy Liste
+    """Simuliert die vordefinierten Vergleichsszenarien in einem Durchlauf."""
+    base = _sweep_base(base_project_data)
+    frame = run_scenario_sweep(base, scenarios=comparison_scenario_options(base))
+    return [
+        {"scenario_name": row.pop("scenario"), "results": row}
+        for row in frame.to_dict("records")
+    ]
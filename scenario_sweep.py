@@ -0,0 +1,505 @@
+"""
+Vektorisierte Szenario-Sweeps für Sensitivitätsraster
+=====================================================
+
+Bewertet beliebige Kombinationen aus Anlagengröße, Speichergröße,
+Strompreissteigerung, Diskontierungs- und Finanzierungszins (plus
+Förderquote, Fremdkapitalanteil und Ertrags-/Kostenfaktoren) in einem
+Durchlauf über :func:`cashflow_projection.project_cash_flows_batch`.
+
+Ergebnis ist ein "tidy" DataFrame mit einer Zeile je Szenario: zuerst die
+Parameter (:data:`SWEEP_PARAMETERS`), danach die Kennzahlen (NPV, IRR,
+Amortisation, ROI, ...). ``scenario_manager``, die Sensitivitäts- und
+Förderszenarien im ``AdvancedCalculationsIntegrator`` und die
+Szenario-/ROI-Diagramme in ``analysis`` lesen aus diesem Format.
+
+Die Energiebilanz je Szenario folgt dem Monatsmodell aus
+``perform_calculations`` (Direktverbrauch, Speicherladung aus Überschuss,
+zeitversetzte Nutzung) und wird auf das Basisergebnis kalibriert: im
+Basisszenario entsprechen Eigenverbrauch und Einspeisung exakt den Werten
+aus ``perform_calculations``, Abweichungen davon skalieren relativ.
+
+Beispiel::
+
+    base = SweepBase.from_results(calc_results, project_details)
+    df = run_scenario_sweep(base, {
+        "anlage_kwp": np.arange(5, 20.5, 0.5),
+        "price_increase": np.linspace(0.0, 0.06, 13),
+    })
+    heatmap = df.pivot(index="price_increase", columns="anlage_kwp", values="roi_percent")
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from cashflow_projection import break_even_years, irr, npv, project_cash_flows_batch
+
+# Parameter, die je Szenario variiert werden können (Raten als Dezimalwert)
+SWEEP_PARAMETERS = (
+    "anlage_kwp",
+    "storage_kwh",
+    "price_increase",
+    "discount_rate",
+    "financing_rate",
+    "financed_share",
+    "subsidy_share",
+    "production_factor",
+    "investment_factor",
+)
+
+# Speicherpreis, falls keine Speicherkosten im Ergebnis stehen (€/kWh netto)
+DEFAULT_STORAGE_COST_PER_KWH = 600.0
+
+_FLAT_MONTHS = np.full(12, 1 / 12)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(max(value, low), high)
+
+
+def _float(value: Any, default: float = 0.0) -> float:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return default
+    return result if np.isfinite(result) else default
+
+
+def _monthly(values: Any, annual: float) -> np.ndarray:
+    """12 Monatswerte; fehlen sie, wird ``annual`` gleichmäßig verteilt."""
+    if isinstance(values, (list, tuple, np.ndarray)) and len(values) == 12:
+        return np.array([_float(v) for v in values])
+    return _FLAT_MONTHS * annual
+
+
+@dataclass
+class SweepBase:
+    """Basisprojekt, um das herum variiert wird (Raten als Dezimalwert)."""
+
+    anlage_kwp: float
+    investment: float
+    monthly_production_kwh: np.ndarray
+    monthly_consumption_kwh: np.ndarray
+    electricity_price: float
+    feed_in_tariff: float
+    storage_kwh: float = 0.0
+    storage_cost_per_kwh: float = DEFAULT_STORAGE_COST_PER_KWH
+    # Ist-Werte aus perform_calculations für die Kalibrierung (None = Modell)
+    self_consumption_kwh: float | None = None
+    feed_in_kwh: float | None = None
+    full_feed_in: bool = False
+    years: int = 20
+    price_increase: float = 0.03
+    discount_rate: float = 0.04
+    financing_rate: float = 0.04
+    financed_share: float = 0.0
+    financing_years: int = 10
+    subsidy_share: float = 0.0
+    production_factor: float = 1.0
+    investment_factor: float = 1.0
+    degradation: float = 0.005
+    inflation: float = 0.02
+    feed_in_tariff_after: float = 0.03
+    feed_in_tariff_years: int = 20
+    tax_rate: float = 0.0
+    maintenance_year1: float = 0.0
+    maintenance_increase: float = 0.0
+    # Monatsmodell (global_constants)
+    direct_fraction: float = 0.35
+    storage_efficiency: float = 0.9
+    evening_shift_fraction: float = 0.5
+    storage_min_usage_share: float = 0.25
+
+    @classmethod
+    def from_results(
+        cls,
+        calc_results: Mapping[str, Any],
+        project_details: Mapping[str, Any] | None = None,
+        global_constants: Mapping[str, Any] | None = None,
+        **overrides: Any,
+    ) -> SweepBase:
+        """Basis aus dem Ergebnis von ``perform_calculations``.
+
+        Alle Raten und Mengen werden aus den Zeitreihen des Ergebnisses
+        abgeleitet (z.B. Degradation aus ``annual_productions_sim``), damit das
+        Basisszenario dieselben Cashflows liefert. ``overrides`` setzen
+        einzelne Felder direkt.
+        """
+        r = calc_results or {}
+        details = project_details if isinstance(project_details, Mapping) else {}
+        constants = global_constants if isinstance(global_constants, Mapping) else {}
+
+        kwp = _float(r.get("anlage_kwp"), _float(details.get("anlage_kwp")))
+        production = _float(r.get("annual_pv_production_kwh"))
+        consumption = _float(r.get("total_consumption_kwh_yr"))
+        prices = r.get("annual_elec_prices_sim") or []
+        electricity_price = _float(
+            prices[0] if prices else r.get(
+                "aktueller_strompreis_fuer_hochrechnung_euro_kwh"), 0.30)
+        tariffs = r.get("annual_feed_in_tariffs_sim") or []
+        feed_in_tariff = _float(
+            r.get("einspeiseverguetung_eur_per_kwh"),
+            _float(tariffs[0]) if tariffs else 0.0)
+
+        productions = r.get("annual_productions_sim") or []
+        degradation = (
+            1.0 - _float(productions[1]) / _float(productions[0])
+            if len(productions) > 1 and _float(productions[0]) > 0 else 0.005)
+        maintenance = r.get("annual_maintenance_costs_sim") or []
+        maintenance_increase = (
+            _float(maintenance[1]) / _float(maintenance[0]) - 1.0
+            if len(maintenance) > 1 and _float(maintenance[0]) > 0 else 0.0)
+        feed_in_revenue = _float(r.get("annual_feed_in_revenue_year1"))
+        tax_rate = (
+            _float(r.get("tax_benefit_feed_in_year1")) / feed_in_revenue
+            if feed_in_revenue > 0 else 0.0)
+
+        storage_kwh = (
+            _float(details.get("selected_storage_storage_power_kw"))
+            if details.get("include_storage") else 0.0)
+        storage_cost = _float(r.get("cost_storage_aufpreis_product_db_netto"))
+        storage_cost_per_kwh = (
+            storage_cost / storage_kwh if storage_kwh > 0 and storage_cost > 0
+            else DEFAULT_STORAGE_COST_PER_KWH)
+
+        values: dict[str, Any] = {
+            "anlage_kwp": kwp,
+            "investment": _float(r.get("total_investment_netto")),
+            "monthly_production_kwh": _monthly(
+                r.get("monthly_productions_sim"), production),
+            "monthly_consumption_kwh": _monthly(
+                r.get("monthly_consumption_sim"), consumption),
+            "electricity_price": electricity_price,
+            "feed_in_tariff": feed_in_tariff,
+            "storage_kwh": storage_kwh,
+            "storage_cost_per_kwh": storage_cost_per_kwh,
+            "self_consumption_kwh": (
+                _float(r["eigenverbrauch_pro_jahr_kwh"])
+                if "eigenverbrauch_pro_jahr_kwh" in r else None),
+            "feed_in_kwh": (
+                _float(r["netzeinspeisung_kwh"])
+                if "netzeinspeisung_kwh" in r else None),
+            "full_feed_in": str(details.get("feed_in_type", "") or "").lower().startswith("voll"),
+            "years": int(_float(r.get("simulation_period_years_effective"), 20) or 20),
+            "price_increase": _float(
+                r.get("electricity_price_increase_rate_effective_percent"), 3.0) / 100.0,
+            "discount_rate": _float(
+                constants.get("loan_interest_rate_percent"), 4.0) / 100.0,
+            "financing_rate": _float(
+                constants.get("loan_interest_rate_percent"), 4.0) / 100.0,
+            "degradation": degradation,
+            "inflation": _float(constants.get("inflation_rate_percent"), 2.0) / 100.0,
+            "feed_in_tariff_after": _float(
+                constants.get("marktwert_strom_eur_per_kwh_after_eeg"), 0.03),
+            "feed_in_tariff_years": int(_float(
+                constants.get("einspeiseverguetung_period_years"), 20)),
+            "tax_rate": tax_rate,
+            "maintenance_year1": _float(maintenance[0]) if maintenance else 0.0,
+            "maintenance_increase": maintenance_increase,
+            "direct_fraction": _clamp(
+                _float(constants.get("direct_sc_fraction_cap"), 0.35), 0.05, 0.85),
+            "storage_efficiency": _float(constants.get("storage_efficiency"), 0.9),
+            "evening_shift_fraction": _clamp(
+                _float(constants.get("evening_shift_fraction"), 0.5), 0.1, 0.9),
+            "storage_min_usage_share": _clamp(
+                _float(constants.get("storage_min_usage_share_of_charge"), 0.25), 0.05, 0.9),
+        }
+        benefit_year1 = _float(r.get("annual_financial_benefit_year1"))
+        if production <= 0 < benefit_year1:
+            # Ohne Ertragsdaten: Nutzen des ersten Jahres als Einsparung zum
+            # Preis von 1 €/kWh, die mit der Anlagengröße skaliert
+            values.update({
+                "monthly_production_kwh": _FLAT_MONTHS * benefit_year1,
+                "monthly_consumption_kwh": _FLAT_MONTHS * benefit_year1,
+                "electricity_price": 1.0,
+                "feed_in_tariff": 0.0,
+                "feed_in_tariff_after": 0.0,
+                "self_consumption_kwh": benefit_year1,
+                "feed_in_kwh": 0.0,
+                "tax_rate": 0.0,
+            })
+        if values["anlage_kwp"] <= 0:
+            values["anlage_kwp"] = 1.0  # Bezugsgröße für die Skalierung
+        values.update(overrides)
+        return cls(**values)
+
+    def defaults(self) -> dict[str, float]:
+        """Basiswerte der variierbaren Parameter."""
+        return {name: float(getattr(self, name)) for name in SWEEP_PARAMETERS}
+
+
+def expand_grid(grid: Mapping[str, Iterable[Any]]) -> dict[str, np.ndarray]:
+    """Kartesisches Produkt eines Parameterrasters als gleich lange Vektoren."""
+    _check_parameters(grid)
+    axes = [np.asarray(list(values), dtype=float).ravel() for values in grid.values()]
+    if not axes:
+        return {}
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return {name: m.ravel() for name, m in zip(grid, mesh, strict=True)}
+
+
+def _check_parameters(names: Iterable[str]) -> None:
+    unknown = sorted(set(names) - set(SWEEP_PARAMETERS) - {"name"})
+    if unknown:
+        raise ValueError(
+            f"Unbekannte Sweep-Parameter: {', '.join(unknown)} "
+            f"(erlaubt: {', '.join(SWEEP_PARAMETERS)})")
+
+
+def _energy_balance(
+    base: SweepBase, kwp: np.ndarray, storage_kwh: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Eigenverbrauch und Einspeisung (kWh/a) je Szenario nach dem Monatsmodell."""
+    scale = kwp / base.anlage_kwp if base.anlage_kwp > 0 else np.zeros_like(kwp)
+    prod = scale[:, None] * base.monthly_production_kwh[None, :]
+    cons = np.broadcast_to(base.monthly_consumption_kwh[None, :], prod.shape)
+
+    direct = np.minimum(np.minimum(prod, cons), prod * base.direct_fraction)
+    surplus = np.maximum(prod - direct, 0.0)
+    rest = np.maximum(cons - direct, 0.0)
+    charge = np.minimum(surplus, np.maximum(storage_kwh, 0.0)[:, None])
+    charge_net = charge * base.storage_efficiency
+    has_charge = (charge_net > 0) & (cons > 0)
+    # Abendverschiebung, wenn der Verbrauch bereits direkt gedeckt ist
+    potential = np.where(
+        (rest <= 0) & has_charge,
+        np.minimum(cons * base.evening_shift_fraction, charge_net), rest)
+    usage = np.minimum(charge_net, potential)
+    min_usage = np.minimum(
+        np.minimum(charge_net * base.storage_min_usage_share, charge_net), cons)
+    usage = np.where((usage <= 0) & has_charge, np.maximum(usage, min_usage), usage)
+    feed_in = np.maximum(surplus - charge, 0.0)
+
+    self_consumption = direct.sum(axis=1) + usage.sum(axis=1)
+    feed_in_total = feed_in.sum(axis=1)
+    if base.full_feed_in:
+        return np.zeros_like(self_consumption), prod.sum(axis=1)
+    return self_consumption, feed_in_total
+
+
+def _calibrated_energy_balance(
+    base: SweepBase, kwp: np.ndarray, storage_kwh: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Monatsmodell, skaliert auf die Ist-Werte des Basisszenarios."""
+    self_consumption, feed_in = _energy_balance(base, kwp, storage_kwh)
+    base_sc, base_feed = _energy_balance(
+        base, np.array([base.anlage_kwp]), np.array([base.storage_kwh]))
+    production = (
+        kwp / base.anlage_kwp if base.anlage_kwp > 0 else np.zeros_like(kwp)
+    ) * float(base.monthly_production_kwh.sum())
+    if base.self_consumption_kwh is not None and base_sc[0] > 0:
+        self_consumption = self_consumption * (base.self_consumption_kwh / base_sc[0])
+    if base.feed_in_kwh is not None and base_feed[0] > 0:
+        feed_in = feed_in * (base.feed_in_kwh / base_feed[0])
+    self_consumption = np.minimum(self_consumption, production)
+    feed_in = np.minimum(feed_in, production - self_consumption)
+    return self_consumption, feed_in
+
+
+def _scenario_parameters(
+    base: SweepBase,
+    grid: Mapping[str, Iterable[Any]] | None,
+    scenarios: Iterable[Mapping[str, Any]] | None,
+) -> tuple[dict[str, np.ndarray], list[str] | None]:
+    defaults = base.defaults()
+    if scenarios is not None:
+        scenarios = list(scenarios)
+        for scenario in scenarios:
+            _check_parameters(scenario)
+        names = [str(s.get("name", f"Szenario {i + 1}")) for i, s in enumerate(scenarios)]
+        params = {
+            name: np.array([_float(s.get(name, default), default) for s in scenarios])
+            for name, default in defaults.items()
+        }
+        return params, names
+    expanded = expand_grid(grid or {})
+    n = len(next(iter(expanded.values()))) if expanded else 1
+    params = {
+        name: expanded.get(name, np.full(n, default))
+        for name, default in defaults.items()
+    }
+    return params, None
+
+
+def _evaluate(
+    base: SweepBase,
+    params: dict[str, np.ndarray],
+    years: int,
+) -> dict[str, np.ndarray]:
+    kwp = params["anlage_kwp"]
+    storage = params["storage_kwh"]
+
+    # Investition: PV anteilig nach kWp, Speicher nach kWh, dann Faktoren.
+    # Ohne ausgewiesenen Speicherpreis (im Matrixpreis enthalten) kann der
+    # Standardpreis die Investition übersteigen; der Speicheranteil wird daher
+    # begrenzt, damit das Basisszenario genau ``base.investment`` kostet.
+    storage_cost_per_kwh = base.storage_cost_per_kwh
+    if base.storage_kwh > 0:
+        storage_cost_per_kwh = min(
+            storage_cost_per_kwh, max(base.investment, 0.0) / base.storage_kwh)
+    storage_cost_base = base.storage_kwh * storage_cost_per_kwh
+    pv_cost_per_kwp = (
+        max(base.investment - storage_cost_base, 0.0) / base.anlage_kwp
+        if base.anlage_kwp > 0 else 0.0)
+    gross_investment = (
+        pv_cost_per_kwp * kwp + storage_cost_per_kwh * storage
+    ) * params["investment_factor"]
+    investment = gross_investment * (1.0 - params["subsidy_share"])
+    financed = investment * params["financed_share"]
+
+    unscaled_production = (
+        kwp / base.anlage_kwp if base.anlage_kwp > 0 else np.zeros_like(kwp)
+    ) * float(base.monthly_production_kwh.sum())
+    production_kwh = unscaled_production * params["production_factor"]
+    self_consumption, feed_in = _calibrated_energy_balance(base, kwp, storage)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        self_share = np.where(
+            unscaled_production > 0, self_consumption / unscaled_production, 0.0)
+        feed_share = np.where(
+            unscaled_production > 0, feed_in / unscaled_production, 0.0)
+
+    projection = project_cash_flows_batch(
+        years=years,
+        investment=investment,
+        production_kwh=production_kwh,
+        self_consumption_share=self_share,
+        feed_in_share=feed_share,
+        electricity_price=base.electricity_price,
+        price_increase=params["price_increase"],
+        degradation=base.degradation,
+        feed_in_tariff=base.feed_in_tariff,
+        feed_in_tariff_after=base.feed_in_tariff_after,
+        feed_in_tariff_years=base.feed_in_tariff_years,
+        tax_rate=base.tax_rate,
+        maintenance_year1=(
+            base.maintenance_year1 * kwp / base.anlage_kwp
+            if base.anlage_kwp > 0 else np.zeros_like(kwp)),
+        maintenance_increase=base.maintenance_increase,
+        discount_rate=params["discount_rate"],
+        inflation=base.inflation,
+    )
+
+    # Finanzierung: Annuitätendarlehen über financing_years, Eigenanteil in Jahr 0
+    flows = projection.cash_flows()
+    rate = params["financing_rate"]
+    term = max(1, min(int(base.financing_years), years)) if years > 0 else 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity_factor = np.where(
+            np.abs(rate) > 1e-12, rate / (1.0 - np.power(1.0 + rate, -term)), 1.0 / max(term, 1))
+    annuity = financed * annuity_factor
+    flows[:, 0] += financed
+    flows[:, 1:term + 1] -= annuity[:, None]
+
+    discount = params["discount_rate"]
+    cumulative = np.cumsum(flows, axis=1)
+    equity = -flows[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(investment > 0, cumulative[:, -1] / investment * 100.0, np.nan)
+    benefit = projection.metric("benefit")
+    return {
+        "investment": investment,
+        "subsidy_eur": gross_investment * params["subsidy_share"],
+        "equity": equity,
+        "loan_annuity": annuity,
+        "annual_production_kwh": production_kwh,
+        "self_consumption_kwh": self_consumption * params["production_factor"],
+        "feed_in_kwh": feed_in * params["production_factor"],
+        "annual_benefit_year1": benefit[:, 0] if years > 0 else np.zeros_like(kwp),
+        "total_benefit": benefit.sum(axis=1),
+        "npv": npv(discount, flows),
+        "irr_percent": irr(flows) * 100.0,
+        "payback_years": break_even_years(cumulative[:, 1:], flows[:, 1:], fractional=True),
+        "roi_percent": roi,
+        "cumulative_cash_flow_end": cumulative[:, -1],
+        "lcoe_euro_per_kwh": projection.lcoe(),
+        "_cumulative": cumulative,
+    }
+
+
+def run_scenario_sweep(
+    base: SweepBase,
+    grid: Mapping[str, Iterable[Any]] | None = None,
+    scenarios: Iterable[Mapping[str, Any]] | None = None,
+    years: int | None = None,
+) -> pd.DataFrame:
+    """Bewertet ein Parameterraster (kartesisch) oder eine Szenarioliste.
+
+    Args:
+        base: Basisprojekt, nicht variierte Parameter kommen von hier
+        grid: ``{"anlage_kwp": [...], "price_increase": [...], ...}``
+        scenarios: alternativ Liste von Dicts je Szenario, optional mit
+            ``"name"`` (ergibt eine Spalte ``scenario``)
+        years: Betrachtungszeitraum, Standard ``base.years``
+
+    Returns:
+        DataFrame mit einer Zeile je Szenario, Spalten :data:`SWEEP_PARAMETERS`
+        gefolgt von den Kennzahlen.
+    """
+    params, names = _scenario_parameters(base, grid, scenarios)
+    metrics = _evaluate(base, params, base.years if years is None else int(years))
+    metrics.pop("_cumulative")
+    frame = pd.DataFrame({**params, **metrics})
+    if names is not None:
+        frame.insert(0, "scenario", names)
+    return frame
+
+
+def scenario_cash_flow_table(
+    base: SweepBase,
+    grid: Mapping[str, Iterable[Any]] | None = None,
+    scenarios: Iterable[Mapping[str, Any]] | None = None,
+    years: int | None = None,
+) -> pd.DataFrame:
+    """Kumulierte Cashflows im Langformat (Zeile je Szenario und Jahr, inkl. Jahr 0)."""
+    params, names = _scenario_parameters(base, grid, scenarios)
+    horizon = base.years if years is None else int(years)
+    cumulative = _evaluate(base, params, horizon)["_cumulative"]
+    n, periods = cumulative.shape
+    flows = np.diff(cumulative, axis=1, prepend=0.0)
+    frame = pd.DataFrame({
+        "scenario_index": np.repeat(np.arange(n), periods),
+        "year": np.tile(np.arange(periods), n),
+        "cash_flow": flows.ravel(),
+        "cumulative_cash_flow": cumulative.ravel(),
+    })
+    if names is not None:
+        frame.insert(0, "scenario", np.repeat(names, periods))
+    return frame
+
+
+def kwp_axis(
+    anlage_kwp: float, low: float = 0.5, high: float = 2.0, points: int = 31
+) -> np.ndarray:
+    """Anlagengrößen von ``low`` bis ``high`` x Basis, ohne doppelte Werte.
+
+    Gerundet wird auf eine Nachkommastelle mehr als die Schrittweite, so dass
+    auch Balkonanlagen unter 2 kWp eindeutige Spalten ergeben.
+    """
+    values = np.linspace(low, high, points) * max(float(anlage_kwp), 0.0)
+    step = values[1] - values[0] if points > 1 else 0.0
+    decimals = max(1, int(np.ceil(-np.log10(step))) + 1) if step > 0 else 1
+    return np.unique(np.round(values, decimals))
+
+
+def roi_heat_map(
+    base: SweepBase,
+    kwp_values: Iterable[float],
+    price_increases: Iterable[float],
+    years: int | None = None,
+) -> pd.DataFrame:
+    """ROI (%) als Matrix: Zeilen Strompreissteigerung, Spalten kWp."""
+    frame = run_scenario_sweep(
+        base,
+        {
+            "anlage_kwp": np.unique(np.asarray(list(kwp_values), dtype=float)),
+            "price_increase": np.unique(np.asarray(list(price_increases), dtype=float)),
+        },
+        years=years,
+    )
+    return frame.pivot(index="price_increase", columns="anlage_kwp", values="roi_percent")
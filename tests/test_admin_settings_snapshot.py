@@ -0,0 +1,61 @@
+"""Tests für den Snapshot der Admin-Einstellungen in database.py."""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+database = pytest.importorskip("database")
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "settings.db")
+    monkeypatch.setattr(database, "DB_PATH", path)
+    database.invalidate_admin_settings_cache(close=True)
+    database.init_db()
+    yield path
+    database.invalidate_admin_settings_cache(close=True)
+
+
+def test_values_are_served_from_snapshot(db_path):
+    assert database.save_admin_setting("global_constants", {"vat_rate_percent": 19})
+    assert database.save_admin_setting("active_company_id", "3")
+
+    assert database.load_admin_setting("global_constants") == {"vat_rate_percent": 19}
+    reloads = database.get_admin_settings_cache_stats()["reloads"]
+    assert database.load_admin_setting("global_constants")["vat_rate_percent"] == 19
+    assert database.load_admin_setting("active_company_id") == 3
+    assert database.load_admin_setting("fehlt", "default") == "default"
+    assert database.get_admin_settings_cache_stats()["reloads"] == reloads
+
+
+def test_returned_containers_are_copies(db_path):
+    database.save_admin_setting("title_options", ["Dr.", "Prof."])
+    options = database.load_admin_setting("title_options")
+    options.append("Mag.")
+    assert database.load_admin_setting("title_options") == ["Dr.", "Prof."]
+
+
+def test_writes_from_other_connections_bump_version(db_path):
+    database.save_admin_setting("salutation_options", ["Herr", "Frau"])
+    assert database.load_admin_setting("salutation_options") == ["Herr", "Frau"]
+
+    # z.B. anderer Streamlit-Prozess oder Import-Skript mit direktem SQL
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "UPDATE admin_settings SET value = '[\"Familie\"]' WHERE key = 'salutation_options'")
+    conn.commit()
+    conn.close()
+
+    assert database.load_admin_setting("salutation_options") == ["Familie"]
+
+
+def test_changed_db_path_uses_new_database(db_path, tmp_path, monkeypatch):
+    database.save_admin_setting("theme", "dunkel")
+    assert database.load_admin_setting("theme") == "dunkel"
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "andere.db"))
+    assert database.load_admin_setting("theme", "hell") == "hell"
@@ -0,0 +1,75 @@
+"""Tests für den Cache vorbereiteter PDF-Hintergrundseiten."""
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+background_cache = pytest.importorskip("pdf_template_engine.background_cache")
+dynamic_overlay = pytest.importorskip("pdf_template_engine.dynamic_overlay")
+
+from pypdf import PdfReader  # noqa: E402
+from reportlab.lib.pagesizes import A4  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+
+def _pdf(texts):
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    for text in texts:
+        c.drawString(100, 700, text)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    background_cache.clear_background_cache()
+    yield
+    background_cache.clear_background_cache()
+
+
+@pytest.fixture
+def bg_dir(tmp_path):
+    for page in range(1, 9):
+        (tmp_path / f"nt_nt_{page:02d}.pdf").write_bytes(_pdf([f"HG{page}"]))
+    return tmp_path
+
+
+def _page_texts(pdf_bytes):
+    return [page.extract_text() for page in PdfReader(io.BytesIO(pdf_bytes)).pages]
+
+
+def test_backgrounds_are_built_once_and_not_mutated(bg_dir):
+    first = dynamic_overlay.merge_with_background(
+        _pdf([f"ErstesAngebot{i}" for i in range(8)]), bg_dir)
+    second = dynamic_overlay.merge_with_background(
+        _pdf([f"ZweitesAngebot{i}" for i in range(8)]), bg_dir)
+
+    assert background_cache.get_background_cache_stats()["builds"] == 8
+    assert background_cache.get_background_cache_stats()["hits"] == 8
+    texts = _page_texts(second)
+    assert all(f"HG{i + 1}" in t and "Erstes" not in t for i, t in enumerate(texts))
+    assert "ErstesAngebot0" in _page_texts(first)[0]
+
+
+def test_cached_merge_matches_uncached(bg_dir):
+    overlay = _pdf([f"Overlay{i}" for i in range(8)])
+    uncached = dynamic_overlay.merge_with_background(overlay, bg_dir, use_cache=False)
+    cached = dynamic_overlay.merge_with_background(overlay, bg_dir)
+    assert _page_texts(cached) == _page_texts(uncached)
+
+
+def test_changed_background_is_reloaded(bg_dir):
+    overlay = _pdf(["x"] * 8)
+    dynamic_overlay.merge_with_background(overlay, bg_dir)
+    path = bg_dir / "nt_nt_02.pdf"
+    path.write_bytes(_pdf(["NeuerHintergrund"]))
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+
+    texts = _page_texts(dynamic_overlay.merge_with_background(overlay, bg_dir))
+    assert "NeuerHintergrund" in texts[1]
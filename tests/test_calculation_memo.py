@@ -0,0 +1,163 @@
+"""Tests für die Memoisierung von perform_calculations."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("numpy")
+
+import calculation_memo  # noqa: E402
+import calculations  # noqa: E402
+import price_matrix_store  # noqa: E402
+from calculation_memo import (  # noqa: E402
+    CalculationMemo,
+    configure_calculation_memo,
+    make_fingerprint,
+)
+
+
+@pytest.fixture
+def memo(monkeypatch):
+    """Eigene Memo-Instanz, feste Versionen, gezählte Berechnungen."""
+    instance = configure_calculation_memo(max_entries=4, ttl_seconds=None)
+    settings_version = {"value": 1}
+    calls = []
+
+    def fake_uncached(project_data, texts, errors_list, sim=None, incr=None):
+        calls.append(project_data)
+        errors_list.append("Hinweis")
+        kwp = project_data["project_details"].get("anlage_kwp", 0)
+        return {
+            "calculation_errors": errors_list,
+            "anlage_kwp": kwp,
+            "cash_flows": [kwp * i for i in range(3)],
+            "simulation_duration_user": sim,
+        }
+
+    monkeypatch.setattr(calculations, "_perform_calculations_uncached", fake_uncached)
+    monkeypatch.setattr(calculations, "_DATABASE_AVAILABLE", True)
+    monkeypatch.setattr(
+        calculations, "get_admin_settings_version", lambda: settings_version["value"])
+    monkeypatch.setattr(price_matrix_store, "get_cached_active_matrix_id", lambda: None)
+    monkeypatch.delenv("CALCULATION_MEMO_DISABLED", raising=False)
+    yield instance, calls, settings_version
+    configure_calculation_memo()
+
+
+def _project(kwp=10.0):
+    return {
+        "customer_data": {"name": "Muster"},
+        "project_details": {"anlage_kwp": kwp, "module_quantity": 20},
+        "economic_data": {},
+    }
+
+
+def test_identical_inputs_compute_once(memo):
+    instance, calls, _ = memo
+    first_errors, second_errors = [], []
+
+    first = calculations.perform_calculations(_project(), {}, first_errors)
+    second = calculations.perform_calculations(_project(), {}, second_errors)
+
+    assert len(calls) == 1
+    assert second == {**first, "calculation_errors": second_errors}
+    # Meldungen der Berechnung landen auch bei einem Treffer beim Aufrufer
+    assert second_errors == ["Hinweis"]
+    assert second["calculation_errors"] is second_errors
+    stats = instance.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+def test_callers_cannot_poison_cache(memo):
+    _, calls, _ = memo
+
+    first = calculations.perform_calculations(_project(), {}, [])
+    first["anlage_kwp"] = -1
+    first["cash_flows"].append(999)
+    second = calculations.perform_calculations(_project(), {}, [])
+    second["cash_flows"].clear()
+    third = calculations.perform_calculations(_project(), {}, [])
+
+    assert len(calls) == 1
+    assert third["anlage_kwp"] == 10.0
+    assert third["cash_flows"] == [0.0, 10.0, 20.0]
+
+
+def test_inputs_and_versions_are_part_of_the_key(memo):
+    _, calls, settings_version = memo
+
+    calculations.perform_calculations(_project(), {}, [])
+    calculations.perform_calculations(_project(12.0), {}, [])
+    calculations.perform_calculations(_project(), {}, [], simulation_duration_user=25)
+    calculations.perform_calculations(_project(), {"label": "x"}, [])
+    assert len(calls) == 4
+
+    settings_version["value"] += 1
+    calculations.perform_calculations(_project(), {}, [])
+    assert len(calls) == 5
+
+
+def test_matrix_edits_and_text_edits_change_the_key(memo):
+    _, calls, _ = memo
+    texts = {"label": "a"}
+
+    calculations.perform_calculations(_project(), texts, [])
+    price_matrix_store.invalidate_matrix_cache()  # z.B. set_cell_value
+    calculations.perform_calculations(_project(), texts, [])
+    assert len(calls) == 2
+
+    texts["label"] = "b"  # dasselbe Dict, geänderter Inhalt
+    calculations.perform_calculations(_project(), texts, [])
+    calculations.perform_calculations(_project(), texts, [])
+    assert len(calls) == 3
+
+
+def test_bypass_flag_and_env(memo, monkeypatch):
+    instance, calls, _ = memo
+
+    calculations.perform_calculations(_project(), {}, [])
+    calculations.perform_calculations(_project(), {}, [], use_cache=False)
+    monkeypatch.setenv("CALCULATION_MEMO_DISABLED", "1")
+    calculations.perform_calculations(_project(), {}, [])
+
+    assert len(calls) == 3
+    assert instance.get_stats()["bypassed"] == 2
+
+
+def test_unreadable_admin_settings_are_not_cached(memo, monkeypatch):
+    _, calls, _ = memo
+    monkeypatch.setattr(calculations, "get_admin_settings_version", lambda: None)
+
+    calculations.perform_calculations(_project(), {}, [])
+    calculations.perform_calculations(_project(), {}, [])
+
+    assert len(calls) == 2
+
+
+def test_lru_and_ttl(monkeypatch):
+    memo = CalculationMemo(max_entries=2, ttl_seconds=10)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    memo.get("a")
+    memo.put("c", 3)
+
+    assert memo.get("b") is None
+    assert memo.get("a") == 1
+
+    base = calculation_memo.time.monotonic()
+    monkeypatch.setattr(calculation_memo.time, "monotonic", lambda: base + 11)
+    assert memo.get("c") is None
+    stats = memo.get_stats()
+    assert stats["evictions"] == 1 and stats["expired"] == 1
+
+
+def test_fingerprint_is_order_independent():
+    np = pytest.importorskip("numpy")
+
+    assert make_fingerprint({"a": 1, "b": [1, 2]}) == make_fingerprint({"b": [1, 2], "a": 1})
+    assert make_fingerprint({"x": np.float64(1.5)}) == make_fingerprint({"x": 1.5})
+    assert make_fingerprint({"a": 1}) != make_fingerprint({"a": 2})
@@ -0,0 +1,176 @@
+"""Tests für den dauerhaften Rechen-Worker und den Produktkatalog-Cache."""
+
+import io
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from calculation_worker import (  # noqa: E402
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    PROGRESS_PREFIX,
+    CalculationWorker,
+)
+
+
+def _run(worker, lines):
+    out = io.StringIO()
+    worker.serve_stream(io.StringIO("".join(line + "\n" for line in lines)), out)
+    worker.close(wait=True)
+    messages, progress = [], []
+    for line in out.getvalue().splitlines():
+        if line.startswith(PROGRESS_PREFIX):
+            progress.append(json.loads(line[len(PROGRESS_PREFIX):]))
+        else:
+            messages.append(json.loads(line))
+    return {m["id"]: m for m in messages}, progress
+
+
+def test_requests_run_concurrently_and_match_by_id():
+    started = threading.Barrier(2, timeout=2)
+
+    def slow(params, progress):
+        started.wait()
+        time.sleep(0.05 if params["n"] == 1 else 0)
+        return params["n"] * 2
+
+    worker = CalculationWorker({"double": slow}, max_workers=2)
+    responses, _ = _run(worker, [
+        json.dumps({"id": "a", "method": "double", "params": {"n": 1}}),
+        json.dumps({"id": "b", "method": "double", "params": {"n": 2}}),
+    ])
+
+    assert responses["a"]["result"] == 2
+    assert responses["b"]["result"] == 4
+
+
+def test_progress_events_carry_request_id():
+    def job(params, progress):
+        for i in range(3):
+            progress(i + 1, 3, f"Schritt {i + 1}")
+        return "fertig"
+
+    responses, progress = _run(CalculationWorker({"job": job}), [
+        json.dumps({"id": 7, "method": "job"})])
+
+    assert responses[7]["result"] == "fertig"
+    assert [p["current"] for p in progress] == [1, 2, 3]
+    assert all(p["id"] == 7 for p in progress)
+    assert progress[-1]["percentage"] == 100.0
+
+
+def test_errors_are_reported_per_request():
+    def failing(params, progress):
+        raise ValueError("kaputt")
+
+    worker = CalculationWorker({"fail": failing})
+    out = io.StringIO()
+    worker.serve_stream(io.StringIO(
+        "kein json\n"
+        + json.dumps({"id": 1, "method": "fehlt"}) + "\n"
+        + json.dumps({"id": 2, "method": "fail"}) + "\n"
+        + json.dumps({"id": 3, "method": "ping"}) + "\n"), out)
+    worker.close(wait=True)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    by_id = {m["id"]: m for m in lines}
+
+    assert by_id[None]["error"]["code"] == PARSE_ERROR
+    assert by_id[1]["error"]["code"] == METHOD_NOT_FOUND
+    assert by_id[2]["error"]["message"] == "kaputt"
+    assert by_id[3]["result"] == {"pong": True}
+    assert worker.get_stats()["errors"] == 3
+
+
+def test_system_exit_in_handler_releases_request():
+    def exiting(params, progress):
+        raise SystemExit(3)
+
+    worker = CalculationWorker({"exit": exiting})
+    responses, _ = _run(worker, [json.dumps({"id": 1, "method": "exit"})])
+
+    assert responses[1]["error"]["message"] == "3"
+    assert worker.get_stats()["in_flight"] == 0
+
+
+def test_shutdown_stops_reading():
+    responses, _ = _run(CalculationWorker({}), [
+        json.dumps({"id": 1, "method": "shutdown"}),
+        json.dumps({"id": 2, "method": "ping"}),
+    ])
+
+    assert responses[1]["result"] == {"stopping": True}
+    assert 2 not in responses
+
+
+def test_numpy_results_are_serialized():
+    np = pytest.importorskip("numpy")
+
+    responses, _ = _run(CalculationWorker({
+        "arr": lambda params, progress: {"x": np.arange(3), "y": np.float64(1.5)}}),
+        [json.dumps({"id": 1, "method": "arr"})])
+
+    assert responses[1]["result"] == {"x": [0, 1, 2], "y": 1.5}
+
+
+# --- Produktkatalog-Cache ---------------------------------------------------
+
+@pytest.fixture
+def product_db_mod(tmp_path, monkeypatch):
+    database = pytest.importorskip("database")
+    product_db = pytest.importorskip("product_db")
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "products.db"))
+    database.init_db()
+    product_db.enable_product_catalog_cache(True)
+    yield product_db
+    product_db.enable_product_catalog_cache(False)
+
+
+def test_catalog_cache_serves_copies_and_sees_other_writers(product_db_mod):
+    pid = product_db_mod.add_product(
+        {"category": "Modul", "model_name": "Alpha 430", "price_euro": 100.0})
+    product_db_mod.add_product({"category": "Modul", "model_name": "beta 440"})
+
+    product = product_db_mod.get_product_by_id(pid)
+    assert product["model_name"] == "Alpha 430"
+    product["price_euro"] = 0
+    assert product_db_mod.get_product_by_id(pid)["price_euro"] == 100.0
+    assert product_db_mod.get_product_by_model_name("alpha 430")["id"] == pid
+    assert [p["model_name"] for p in product_db_mod.list_products("Modul")] == [
+        "Alpha 430", "beta 440"]
+
+    reloads = product_db_mod.get_product_catalog_cache_stats()["reloads"]
+    product_db_mod.get_product_by_id(pid)
+    assert product_db_mod.get_product_catalog_cache_stats()["reloads"] == reloads
+
+    # Schreibzugriff eines anderen Prozesses (direktes SQL)
+    import database
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute("UPDATE products SET price_euro = 80 WHERE id = ?", (pid,))
+    conn.commit()
+    conn.close()
+
+    assert product_db_mod.get_product_by_id(pid)["price_euro"] == 80
+
+
+def test_catalog_cache_returns_first_of_case_duplicates(product_db_mod):
+    first = product_db_mod.add_product({"category": "Modul", "model_name": "Gamma 450"})
+    import database
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute(
+        "INSERT INTO products (category, model_name) VALUES ('Modul', 'GAMMA 450')")
+    conn.commit()
+    conn.close()
+
+    product_db_mod.enable_product_catalog_cache(False)
+    from_sql = product_db_mod.get_product_by_model_name("gamma 450")["id"]
+    product_db_mod.enable_product_catalog_cache(True)
+
+    assert from_sql == first
+    assert product_db_mod.get_product_by_model_name("gamma 450")["id"] == first
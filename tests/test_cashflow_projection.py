@@ -0,0 +1,130 @@
+"""Tests für den vektorisierten Cashflow-Rechenkern."""
+
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+
+from cashflow_projection import (  # noqa: E402
+    growth_index,
+    irr,
+    npv,
+    project_cash_flows,
+    project_cash_flows_batch,
+    project_savings,
+)
+
+PARAMS = {
+    "years": 25,
+    "investment": 18000.0,
+    "production_kwh": 9500.0,
+    "self_consumption_share": 0.35,
+    "feed_in_share": 0.65,
+    "electricity_price": 0.32,
+    "price_increase": 0.03,
+    "degradation": 0.005,
+    "feed_in_tariff": 0.081,
+    "feed_in_tariff_after": 0.03,
+    "feed_in_tariff_years": 20,
+    "tax_rate": 0.3,
+    "maintenance_year1": 150.0,
+    "maintenance_increase": 0.02,
+    "discount_rate": 0.04,
+    "inflation": 0.02,
+}
+
+
+def _loop_reference(p):
+    """Jahresschleife, wie sie vorher in perform_calculations stand."""
+    flows = [-p["investment"]]
+    productions, maintenance = [], []
+    for year in range(1, p["years"] + 1):
+        production = p["production_kwh"] * (1 - p["degradation"]) ** (year - 1)
+        price = p["electricity_price"] * (1 + p["price_increase"]) ** (year - 1)
+        tariff = (p["feed_in_tariff"] if year <= p["feed_in_tariff_years"]
+                  else p["feed_in_tariff_after"])
+        revenue = production * p["feed_in_share"] * tariff
+        benefit = (production * p["self_consumption_share"] * price
+                   + revenue + revenue * p["tax_rate"])
+        maint = p["maintenance_year1"] * (1 + p["maintenance_increase"]) ** (year - 1)
+        productions.append(production)
+        maintenance.append(maint)
+        flows.append(benefit - maint)
+    return flows, productions, maintenance
+
+
+def test_matches_year_loop():
+    projection = project_cash_flows(**PARAMS)
+    flows, productions, maintenance = _loop_reference(PARAMS)
+
+    assert projection.values.shape[:2] == (1, 25)
+    np.testing.assert_allclose(projection.cash_flows()[0], flows)
+    np.testing.assert_allclose(projection.metric("production_kwh")[0], productions)
+    np.testing.assert_allclose(
+        projection.cumulative_cash_flows()[0], np.cumsum(flows))
+
+    rate = PARAMS["discount_rate"]
+    expected_npv = sum(cf / (1 + rate) ** t for t, cf in enumerate(flows))
+    assert projection.npv()[0] == pytest.approx(expected_npv)
+
+    discounted_kwh = sum(p / (1 + rate) ** y for y, p in enumerate(productions, 1))
+    discounted_cost = PARAMS["investment"] + sum(
+        m / (1 + rate) ** y for y, m in enumerate(maintenance, 1))
+    assert projection.lcoe()[0] == pytest.approx(discounted_cost / discounted_kwh)
+
+
+def test_irr_and_npv_helpers():
+    # 1000 heute, 10 Jahre je 150: IRR ~ 8.14 %
+    flows = [-1000.0] + [150.0] * 10
+    rate = irr(flows)
+    assert rate == pytest.approx(0.08144, abs=1e-4)
+    assert npv(rate, flows) == pytest.approx(0.0, abs=1e-6)
+    assert math.isnan(irr([100.0, 50.0]))
+
+    batch = irr(np.array([flows, [-1000.0] + [100.0] * 10]))
+    assert batch.shape == (2,)
+    assert batch[1] == pytest.approx(0.0, abs=1e-8)
+
+
+def test_irr_outside_former_bracket():
+    # Negativer letzter Cashflow (Rückbau): Nullstellen bei 10 % und 20 %,
+    # an beiden Rändern des Suchintervalls ist der Barwert negativ
+    teardown = [-100.0, 230.0, -132.0]
+    assert irr(teardown) == pytest.approx(0.10, abs=1e-8)
+    # Zinsfuß über 1000 %
+    assert irr([-1.0, 50.0]) == pytest.approx(49.0, rel=1e-8)
+
+    batch = irr(np.array([teardown, [-1.0, 50.0, 0.0], [100.0, 50.0, 10.0]]))
+    assert batch[:2] == pytest.approx([0.10, 49.0], rel=1e-8)
+    assert math.isnan(batch[2])
+
+
+def test_batch_matches_single_runs():
+    rates = np.array([0.0, 0.02, 0.04, 0.06])
+    batch = project_cash_flows_batch(**{**PARAMS, "price_increase": rates})
+
+    assert batch.values.shape[:2] == (4, 25)
+    for row, rate in enumerate(rates):
+        single = project_cash_flows(**{**PARAMS, "price_increase": rate})
+        np.testing.assert_allclose(batch.values[row], single.values[0])
+    assert np.all(np.diff(batch.npv()) > 0)
+
+
+def test_break_even_and_growth_index():
+    projection = project_savings(
+        investment=1000.0, annual_savings=300.0, years=10)
+    assert projection.break_even_years()[0] == 4
+    assert projection.break_even_years(fractional=True)[0] == pytest.approx(10 / 3)
+
+    never = project_savings(investment=1e6, annual_savings=1.0, years=10)
+    assert math.isinf(never.break_even_years()[0])
+
+    np.testing.assert_allclose(
+        growth_index(0.1, 3)[0], [1.0, 1.1, 1.21])
+    np.testing.assert_allclose(
+        growth_index([[0.1, 0.2, 0.3]], 3)[0], [1.0, 1.1, 1.32])
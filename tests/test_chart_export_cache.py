@@ -0,0 +1,140 @@
+"""Tests für den gemeinsamen Cache exportierter Diagramm-Bilder."""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chart_export_cache import ChartExportCache, make_chart_key  # noqa: E402
+
+
+class FakeFigure:
+    """Minimaler Ersatz für go.Figure (to_json/to_image)."""
+
+    def __init__(self, spec, delay=0.0, fail=False):
+        self.spec = spec
+        self.delay = delay
+        self.fail = fail
+        self.renders = 0
+
+    def to_json(self):
+        return f'{{"data": "{self.spec}"}}'
+
+    def to_image(self, format="png", width=None, height=None, scale=None):
+        self.renders += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise ValueError("Kaleido nicht installiert")
+        return f"{self.spec}|{format}|{width}x{height}@{scale}".encode()
+
+
+def test_key_depends_on_export_parameters():
+    base = make_chart_key("{}", "png", 800, 480, 1.5)
+    assert base == make_chart_key("{}", "png", 800, 480, 1.5)
+    assert base != make_chart_key("{}", "png", 900, 550, 2)
+    assert base != make_chart_key("{}", "svg", 800, 480, 1.5)
+
+
+def test_memory_hit_renders_once(tmp_path):
+    cache = ChartExportCache(cache_dir=str(tmp_path))
+    fig = FakeFigure("a")
+
+    first = cache.get_or_render(fig, width=800, height=480, scale=1.5)
+    second = cache.get_or_render(FakeFigure("a"), width=800, height=480, scale=1.5)
+
+    assert first == second
+    assert fig.renders == 1
+    stats = cache.get_stats()
+    assert stats["renders"] == 1
+    assert stats["memory_hits"] == 1
+
+
+def test_disk_survives_new_instance(tmp_path):
+    ChartExportCache(cache_dir=str(tmp_path)).get_or_render(FakeFigure("a"))
+
+    fig = FakeFigure("a")
+    cache = ChartExportCache(cache_dir=str(tmp_path))
+    data = cache.get_or_render(fig)
+
+    assert fig.renders == 0
+    assert data.startswith(b"a|png")
+    assert cache.get_stats()["disk_hits"] == 1
+    files = [f for _, _, names in os.walk(tmp_path) for f in names]
+    assert len(files) == 1 and not files[0].endswith(".tmp")
+
+
+def test_memory_lru_bounded(tmp_path):
+    cache = ChartExportCache(cache_dir=None, max_memory_entries=2)
+
+    for spec in ("a", "b", "c"):
+        cache.get_or_render(FakeFigure(spec))
+
+    stats = cache.get_stats()
+    assert stats["memory_entries"] == 2
+    fig = FakeFigure("a")
+    cache.get_or_render(fig)
+    assert fig.renders == 1
+
+
+def test_render_errors_propagate_and_are_not_cached(tmp_path):
+    cache = ChartExportCache(cache_dir=str(tmp_path))
+
+    with pytest.raises(ValueError):
+        cache.get_or_render(FakeFigure("a", fail=True))
+
+    fig = FakeFigure("a")
+    cache.get_or_render(fig)
+    assert fig.renders == 1
+    assert cache.get_stats()["render_errors"] == 1
+
+
+def test_concurrent_requests_render_once(tmp_path):
+    cache = ChartExportCache(cache_dir=str(tmp_path))
+    fig = FakeFigure("a", delay=0.1)
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_render(fig)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert fig.renders == 1
+    assert len(set(results)) == 1 and len(results) == 8
+
+
+def test_prune_disk(tmp_path):
+    cache = ChartExportCache(cache_dir=str(tmp_path), max_disk_bytes=1)
+    for spec in ("a", "b", "c"):
+        cache.get_or_render(FakeFigure(spec))
+
+    assert cache.prune_disk() == 3
+
+
+def test_prune_keeps_recently_hit_files(tmp_path):
+    cache = ChartExportCache(cache_dir=str(tmp_path), max_disk_bytes=10**9)
+    keys = []
+    for spec in ("a", "b", "c"):
+        fig = FakeFigure(spec)
+        cache.get_or_render(fig)
+        keys.append(make_chart_key(fig.to_json()))
+    old = time.time() - 3600
+    for key in keys:
+        os.utime(cache._path(key, "png"), (old, old))
+
+    # Treffer von der Platte frischt die mtime auf
+    cache.clear_memory()
+    assert cache.lookup(keys[0]) is not None
+    size = os.path.getsize(cache._path(keys[0], "png"))
+    cache.max_disk_bytes = size
+
+    assert cache.prune_disk() == 2
+    assert os.path.exists(cache._path(keys[0], "png"))
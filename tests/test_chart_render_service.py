@@ -0,0 +1,263 @@
+"""Tests für den dauerhaften Diagramm-Renderer (Batch-Export)."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chart_render_service  # noqa: E402
+from chart_export_cache import ChartExportCache  # noqa: E402
+from chart_render_service import (  # noqa: E402
+    ChartJob,
+    ChartRenderService,
+    LazyChart,
+    get_last_pdf_timing,
+    track_pdf_timing,
+)
+
+
+class FakeFigure:
+    def __init__(self, spec, fail=False):
+        self.spec = spec
+        self.fail = fail
+        self.to_image_calls = 0
+
+    def to_json(self):
+        return f'{{"data": "{self.spec}"}}'
+
+    def to_image(self, format="png", width=None, height=None, scale=None):
+        self.to_image_calls += 1
+        if self.fail:
+            raise ValueError("Kaleido nicht installiert")
+        return f"{self.spec}|{width}".encode()
+
+
+class FakeKaleido:
+    """Async-Ersatz für kaleido.Kaleido mit n parallelen Tabs."""
+
+    instances = []
+
+    def __init__(self, n=1, timeout=None):
+        self.n = n
+        self.opened = 0
+        self.active = 0
+        self.max_active = 0
+        self.closed = False
+        FakeKaleido.instances.append(self)
+
+    async def open(self):
+        self.opened += 1
+
+    async def close(self):
+        self.closed = True
+
+    async def calc_fig(self, fig, opts=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(getattr(fig, "delay", 0.05))
+        self.active -= 1
+        if self.closed:
+            raise RuntimeError("browser closed")
+        if fig.fail:
+            raise ValueError("render failed")
+        return f"{fig.spec}|{opts.get('width')}".encode()
+
+
+@pytest.fixture
+def service(tmp_path):
+    FakeKaleido.instances = []
+    svc = ChartRenderService(
+        workers=4,
+        cache=ChartExportCache(cache_dir=str(tmp_path)),
+        kaleido_factory=FakeKaleido,
+    )
+    yield svc
+    svc.close()
+
+
+def test_batch_renders_concurrently_in_one_browser(service):
+    jobs = {f"chart_{i}": ChartJob(FakeFigure(i), width=800) for i in range(8)}
+
+    start = time.perf_counter()
+    result = service.render_batch(jobs)
+    elapsed = time.perf_counter() - start
+
+    assert result == {f"chart_{i}": f"{i}|800".encode() for i in range(8)}
+    assert len(FakeKaleido.instances) == 1
+    assert FakeKaleido.instances[0].max_active > 1
+    assert elapsed < 8 * 0.05
+
+
+def test_batch_uses_cache_and_dedupes(service):
+    service.render_batch({"a": ChartJob(FakeFigure("x"))})
+
+    result = service.render_batch({
+        "a": ChartJob(FakeFigure("x")),
+        "b": ChartJob(FakeFigure("y")),
+        "c": ChartJob(FakeFigure("y")),
+    })
+
+    assert result["b"] == result["c"]
+    stats = service.get_stats()
+    assert stats["cache_hits"] == 1
+    assert stats["renders"] == 2  # x einmal, y einmal
+    assert stats["browser_starts"] == 1
+
+
+def test_batch_reports_errors_per_chart(service):
+    errors = {}
+    result = service.render_batch(
+        {"ok": ChartJob(FakeFigure("a")), "bad": ChartJob(FakeFigure("b", fail=True))},
+        errors,
+    )
+
+    assert set(result) == {"ok"}
+    assert isinstance(errors["bad"], ValueError)
+    assert service.get_stats()["render_errors"] == 1
+
+
+def test_single_render_goes_through_warm_browser(service):
+    fig = FakeFigure("a")
+    assert service.render(fig, width=900) == b"a|900"
+    assert service.render(fig, width=900) == b"a|900"
+
+    assert fig.to_image_calls == 0
+    assert service.get_stats()["browser_starts"] == 1
+
+
+def test_fallback_to_to_image_when_browser_unavailable(tmp_path):
+    def broken_factory(**kwargs):
+        raise RuntimeError("Chrome nicht gefunden")
+
+    svc = ChartRenderService(
+        cache=ChartExportCache(cache_dir=None), kaleido_factory=broken_factory)
+    try:
+        fig = FakeFigure("a")
+        assert svc.render_batch({"a": ChartJob(fig, width=10)}) == {"a": b"a|10"}
+        assert fig.to_image_calls == 1
+
+        with pytest.raises(ValueError):
+            svc.render(FakeFigure("b", fail=True))
+        assert "Chrome" in svc.get_stats()["unavailable_reason"]
+    finally:
+        svc.close()
+
+
+def test_failed_batch_does_not_kill_running_batches(service):
+    slow = FakeFigure("slow")
+    slow.delay = 0.3
+    results = {}
+    thread = threading.Thread(target=lambda: results.update(
+        service.render_batch({"slow": ChartJob(slow, width=10)})))
+    thread.start()
+    time.sleep(0.1)
+
+    errors = {}
+    assert service.render_batch(
+        {"bad": ChartJob(FakeFigure("bad", fail=True))}, errors) == {}
+    assert isinstance(errors["bad"], ValueError)
+    thread.join()
+
+    assert results == {"slow": b"slow|10"}
+    assert FakeKaleido.instances[0].closed
+    # Der nächste Batch startet einen neuen Browser
+    assert service.render_batch({"c": ChartJob(FakeFigure("c"), width=1)}) == {"c": b"c|1"}
+    assert service.get_stats()["browser_starts"] == 2
+
+
+def test_warm_open_is_retried_after_backoff(tmp_path, monkeypatch):
+    monkeypatch.setattr(chart_render_service, "WARM_RETRY_INITIAL_SECONDS", 0.2)
+    attempts = []
+
+    def flaky_factory(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            raise RuntimeError("Chrome nicht gefunden")
+        return FakeKaleido(**kwargs)
+
+    svc = ChartRenderService(
+        cache=ChartExportCache(cache_dir=None), kaleido_factory=flaky_factory)
+    try:
+        fig = FakeFigure("a")
+        assert svc.render(fig) == b"a|None"
+        assert fig.to_image_calls == 1
+        # Während der Wartezeit kein neuer Startversuch
+        svc.render(FakeFigure("b"))
+        assert len(attempts) == 1
+
+        time.sleep(0.25)
+        fig = FakeFigure("c")
+        assert svc.render(fig) == b"c|None"
+        assert fig.to_image_calls == 0
+        stats = svc.get_stats()
+        assert stats["browser_starts"] == 1
+        assert stats["unavailable_reason"] is None
+    finally:
+        svc.close()
+
+
+def test_materialize_replaces_only_selected_figures(service, monkeypatch):
+    monkeypatch.setattr(chart_render_service, "_render_service", service)
+    results = {
+        "a_chart_bytes": FakeFigure("a"),
+        "b_chart_bytes": b"fertig",
+        "c_chart_bytes": FakeFigure("c"),
+        "d_chart_bytes": FakeFigure("d", fail=True),
+    }
+
+    chart_render_service.materialize_chart_bytes(
+        results, ["a_chart_bytes", "b_chart_bytes", "d_chart_bytes"])
+
+    assert results["a_chart_bytes"] == b"a|800"
+    assert results["b_chart_bytes"] == b"fertig"
+    assert isinstance(results["c_chart_bytes"], FakeFigure)
+    assert "d_chart_bytes" not in results
+
+
+def test_lazy_charts_render_only_when_materialized(service, monkeypatch):
+    monkeypatch.setattr(chart_render_service, "_render_service", service)
+    figs = {key: FakeFigure(key) for key in ("a", "b", "c")}
+    results = {
+        "a_chart_bytes": LazyChart(figs["a"], width=640),
+        "b_chart_bytes": LazyChart(figs["b"]),
+        "c_chart_bytes": LazyChart(figs["c"]),
+    }
+    # Analyse-Seite: Handles anlegen kostet keinen Renderer
+    assert FakeKaleido.instances == []
+
+    chart_render_service.materialize_chart_bytes(
+        results, ["a_chart_bytes", "b_chart_bytes"])
+
+    # Handles behalten ihre eigenen Exportparameter
+    assert results["a_chart_bytes"] == b"a|640"
+    assert results["b_chart_bytes"] == b"b|800"
+    assert isinstance(results["c_chart_bytes"], LazyChart)
+    stats = service.get_stats()
+    assert stats["batches"] == 1 and stats["renders"] == 2
+
+    assert results["c_chart_bytes"].to_bytes() == b"c|800"
+    assert LazyChart(FakeFigure("x", fail=True)).to_bytes() is None
+
+
+def test_pdf_timing_reports_chart_share(service):
+    @track_pdf_timing("inner")
+    def inner():
+        service.render_batch({"a": ChartJob(FakeFigure("a"))})
+
+    @track_pdf_timing("outer")
+    def outer():
+        inner()
+        time.sleep(0.02)
+
+    outer()
+
+    timing = get_last_pdf_timing()
+    assert timing["label"] == "outer"
+    assert timing["charts"] == 1
+    assert 0 < timing["chart_render_s"] < timing["total_s"]
+    assert 0 < timing["chart_share"] < 1
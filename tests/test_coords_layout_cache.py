@@ -0,0 +1,87 @@
+"""Tests für die kompilierten, gecachten Koordinaten-Layouts."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+coords_cache = pytest.importorskip("pdf_template_engine.coords_cache")
+dynamic_overlay = pytest.importorskip("pdf_template_engine.dynamic_overlay")
+
+LAYOUT = """Text: ERSTELLT FÜR:
+Position: (48.0, 70.0, 220.0, 87.0)
+Schriftart: Helvetica-Bold
+Schriftgröße: 20,5
+Farbe: 0x1F2A44
+----------------------------------------
+Text: anrede_kunde
+Position: (49.0, 87.0, 220.0, 105.0)
+"""
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    coords_cache.clear_layout_cache()
+    yield
+    coords_cache.clear_layout_cache()
+
+
+@pytest.fixture
+def layout_dir(tmp_path):
+    coords = tmp_path / "coords"
+    coords.mkdir()
+    (coords / "seite1.yml").write_text(LAYOUT, encoding="utf-8")
+    return coords
+
+
+def test_parse_coords_file_format_unchanged(layout_dir):
+    elements = dynamic_overlay.parse_coords_file(layout_dir / "seite1.yml")
+    assert elements == [
+        {
+            "text": "ERSTELLT FÜR:",
+            "position": (48.0, 70.0, 220.0, 87.0),
+            "font": "Helvetica-Bold",
+            "font_size": 20.5,
+            "color": 0x1F2A44,
+        },
+        {"text": "anrede_kunde", "position": (49.0, 87.0, 220.0, 105.0)},
+    ]
+    assert dynamic_overlay.parse_coords_file(layout_dir / "fehlt.yml") == []
+
+
+def test_cached_layout_is_reused_and_copies_are_independent(layout_dir):
+    path = layout_dir / "seite1.yml"
+    first = dynamic_overlay.parse_coords_file(path)
+    first[0]["position"] = (0.0, 0.0, 0.0, 0.0)
+    second = dynamic_overlay.parse_coords_file(path)
+
+    assert second[0]["position"] == (48.0, 70.0, 220.0, 87.0)
+    stats = coords_cache.get_layout_cache_stats()
+    assert stats["compiled"] == 1
+    assert stats["hits"] == 1
+
+
+def test_changed_file_is_recompiled(layout_dir):
+    path = layout_dir / "seite1.yml"
+    assert len(dynamic_overlay.parse_coords_file(path)) == 2
+    path.write_text(LAYOUT + "----------\nText: neu\n", encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+
+    assert dynamic_overlay.parse_coords_file(path)[-1] == {"text": "neu"}
+    assert coords_cache.get_layout_cache_stats()["compiled"] == 2
+
+
+def test_precompiled_bundle_avoids_parsing(layout_dir, monkeypatch):
+    assert coords_cache.main([str(layout_dir)]) == 0
+    assert coords_cache.bundle_path_for(layout_dir).exists()
+
+    def fail(_path):
+        raise AssertionError("Layout sollte aus dem Bundle kommen")
+
+    monkeypatch.setattr(coords_cache, "compile_coords_file", fail)
+    elements = dynamic_overlay.parse_coords_file(layout_dir / "seite1.yml")
+
+    assert elements[0]["font_size"] == 20.5
+    assert coords_cache.get_layout_cache_stats()["bundle_hits"] == 1
@@ -0,0 +1,102 @@
+"""Tests für den thread-lokalen SQLite-Verbindungspool (db_pool.py)."""
+
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+db_pool = pytest.importorskip("db_pool")
+
+
+@pytest.fixture
+def pool():
+    return db_pool.SQLiteConnectionPool()
+
+
+def test_close_returns_connection_to_pool(pool, tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = pool.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.close()
+    conn.close()  # doppeltes close() ist harmlos
+
+    again = pool.connect(path)
+    assert again is conn
+    assert again.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert again.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    # verschachtelte Aufrufe erhalten eigene Verbindungen
+    nested = pool.connect(path)
+    assert nested is not again
+    stats = pool.get_stats()
+    assert stats["created"] == 2 and stats["reused"] == 1
+
+
+def test_uncommitted_changes_are_rolled_back_on_close(pool, tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = pool.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.row_factory = None
+    conn.close()
+
+    conn = pool.connect(path)
+    assert isinstance(conn.execute("SELECT COUNT(*) AS n FROM t").fetchone(), sqlite3.Row)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_connections_are_per_thread(pool, tmp_path):
+    path = str(tmp_path / "pool.db")
+    main_conn = pool.connect(path)
+    main_conn.close()
+    seen = []
+
+    def worker():
+        conn = pool.connect(path)
+        seen.append(conn)
+        conn.execute("SELECT 1").fetchone()
+        conn.close()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen[0] is not main_conn
+
+
+def test_schema_init_runs_once_per_database(pool, tmp_path):
+    calls = []
+    for name in ("a.db", "a.db", "b.db"):
+        conn = pool.connect(str(tmp_path / name))
+        pool.run_schema_init_once(conn, "products", calls.append)
+        conn.close()
+    assert len(calls) == 2
+
+    pool.reset()
+    conn = pool.connect(str(tmp_path / "a.db"))
+    pool.run_schema_init_once(conn, "products", calls.append)
+    assert len(calls) == 3
+
+    plain = sqlite3.connect(":memory:")
+    pool.run_schema_init_once(plain, "products", calls.append)
+    pool.run_schema_init_once(plain, "products", calls.append)
+    assert len(calls) == 5
+
+
+def test_product_db_uses_pooled_connections(tmp_path, monkeypatch):
+    database = pytest.importorskip("database")
+    product_db = pytest.importorskip("product_db")
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "app.db"))
+
+    product_id = product_db.add_product(
+        {"category": "Modul", "model_name": "Pool-Modul 450", "brand": "Test"})
+    assert product_id
+    created = db_pool.get_connection_pool_stats()["created"]
+    for _ in range(5):
+        assert product_db.get_product_by_id(product_id)["model_name"] == "Pool-Modul 450"
+        assert product_db.list_products(category="Modul")
+    assert db_pool.get_connection_pool_stats()["created"] == created
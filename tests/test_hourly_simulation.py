@@ -0,0 +1,98 @@
+"""Tests für die stündliche Eigenverbrauchs- und Speichersimulation."""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hourly_simulation import (  # noqa: E402
+    HOURS_PER_YEAR,
+    aggregate_monthly,
+    build_load_profile,
+    clamped_cumsum,
+    fold_hourly_series,
+    run_hourly_self_consumption,
+    simulate_battery_dispatch,
+    synthesize_hourly_pv,
+)
+
+MONTHLY_PV = [300, 450, 700, 900, 1050, 1100, 1100, 950, 750, 500, 320, 250]
+
+
+def _reference_soc(delta, lower, upper, initial):
+    soc, x = [], initial
+    for value in delta:
+        x = min(upper, max(lower, x + value))
+        soc.append(x)
+    return np.array(soc)
+
+
+def test_clamped_cumsum_matches_sequential_recursion():
+    rng = np.random.default_rng(7)
+    delta = rng.normal(0.0, 2.0, HOURS_PER_YEAR)
+    result = clamped_cumsum(delta, 0.0, 10.0, initial=3.0)
+    assert np.allclose(result, _reference_soc(delta, 0.0, 10.0, 3.0))
+
+
+@pytest.mark.parametrize("profile", ["H0", "G0"])
+def test_load_profile_is_normalized(profile):
+    load = build_load_profile(4500.0, profile)
+    assert load.shape == (HOURS_PER_YEAR,)
+    assert load.sum() == pytest.approx(4500.0)
+    assert (load > 0).all()
+
+
+def test_synthetic_pv_preserves_monthly_sums():
+    pv = synthesize_hourly_pv(MONTHLY_PV, latitude=51.0)
+    assert aggregate_monthly(pv) == pytest.approx(MONTHLY_PV)
+    # Nachts keine Erzeugung
+    assert pv[0] == 0.0
+
+
+def test_fold_hourly_series_drops_leap_day():
+    series = np.arange(8784, dtype=float)
+    folded = fold_hourly_series(series)
+    assert folded.size == HOURS_PER_YEAR
+    assert folded[59 * 24] == series[60 * 24]
+
+
+def test_battery_dispatch_energy_balance():
+    pv = synthesize_hourly_pv(MONTHLY_PV)
+    load = build_load_profile(4500.0, "H0")
+    flows = simulate_battery_dispatch(pv, load, 8.0, round_trip_efficiency=0.9,
+                                      max_power_kw=4.0)
+    eta = np.sqrt(0.9)
+    assert np.allclose(flows["direct"] + flows["charge"] / eta + flows["feed_in"], pv)
+    assert np.allclose(flows["direct"] + flows["discharge"] + flows["grid"], load)
+    assert flows["soc"].min() >= 0.0 and flows["soc"].max() <= 8.0 + 1e-9
+    assert (flows["charge"] <= 4.0 * eta + 1e-9).all()
+
+
+def test_storage_increases_autarky():
+    without = run_hourly_self_consumption(4500.0, MONTHLY_PV)
+    with_storage = run_hourly_self_consumption(
+        4500.0, MONTHLY_PV, storage_capacity_kwh=8.0, storage_max_power_kw=4.0
+    )
+    assert with_storage["autarky_percent"] > without["autarky_percent"]
+    assert sum(without["monthly_storage_charge_kwh"]) == 0.0
+    for key in (
+        "monthly_direct_self_consumption_kwh",
+        "monthly_storage_charge_kwh",
+        "monthly_storage_discharge_for_sc_kwh",
+        "monthly_feed_in_kwh",
+        "monthly_grid_bezug_kwh",
+    ):
+        assert len(with_storage[key]) == 12
+
+
+def test_hourly_year_runs_in_milliseconds():
+    start = time.perf_counter()
+    for _ in range(20):
+        run_hourly_self_consumption(
+            4500.0, MONTHLY_PV, storage_capacity_kwh=10.0, storage_max_power_kw=5.0
+        )
+    assert (time.perf_counter() - start) / 20 < 0.05
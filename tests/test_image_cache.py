@@ -0,0 +1,95 @@
+"""Tests für den Bild-Cache der Overlays und den Logo-Cache in brand_logo_db."""
+
+import base64
+import io
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+image_cache = pytest.importorskip("pdf_template_engine.image_cache")
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png_b64(size=(1200, 600), color=(200, 30, 30, 255)):
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, color).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def test_same_content_is_served_from_cache():
+    cache = image_cache.DecodedImageCache()
+    logo = _png_b64()
+    first = cache.get_image_reader(logo, (60.0, 30.0))
+    second = cache.get_image_reader("data:image/png;base64," + logo, (60.0, 30.0))
+
+    assert cache.get_stats()["hits"] == 1
+    # Jeder Aufruf bekommt einen eigenen Reader (eigenes Dateiobjekt)
+    assert first is not second and first.fp is not second.fp
+    assert first.getSize() == second.getSize()
+    assert cache.get_image_reader("kein bild", (60.0, 30.0)) is None
+
+
+def test_logo_is_downscaled_to_print_resolution():
+    cache = image_cache.DecodedImageCache(dpi=300)
+    reader = cache.get_image_reader(_png_b64(), (60.0, 30.0))
+    # 60 x 30 pt bei 300 dpi = 250 x 125 px, Seitenverhältnis bleibt erhalten
+    assert reader.getSize() == (250, 125)
+    assert cache.get_image_reader(_png_b64(size=(100, 50)), (60.0, 30.0)).getSize() == (100, 50)
+
+
+def test_cached_image_can_be_read_from_several_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = image_cache.DecodedImageCache()
+    logo = _png_b64(size=(400, 200))
+    expected = cache.get_image_reader(logo).getRGBData()
+
+    def read(_):
+        return cache.get_image_reader(logo).getRGBData()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert all(data == expected for data in pool.map(read, range(32)))
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = image_cache.DecodedImageCache(max_bytes=3 * 100 * 100 * 4)
+    images = [_png_b64(size=(100, 100), color=(i, 0, 0, 255)) for i in range(4)]
+    for img in images[:3]:
+        cache.get_image_reader(img)
+    cache.get_image_reader(images[0])  # zuletzt benutzt
+    cache.get_image_reader(images[3])
+
+    stats = cache.get_stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    hits_before = stats["hits"]
+    cache.get_image_reader(images[0])
+    assert cache.get_stats()["hits"] == hits_before + 1
+
+
+def test_brand_logo_lookup_is_cached_until_write(tmp_path, monkeypatch):
+    brand_logo_db = pytest.importorskip("brand_logo_db")
+    db_path = str(tmp_path / "logos.db")
+    connects = []
+
+    def connect():
+        connects.append(1)
+        return sqlite3.connect(db_path)
+
+    monkeypatch.setattr(brand_logo_db, "DB_AVAILABLE", True)
+    monkeypatch.setattr(brand_logo_db, "get_db_connection", connect)
+    brand_logo_db.invalidate_logo_cache()
+
+    assert brand_logo_db.add_brand_logo("Huawei", _png_b64(size=(10, 10)))
+    assert "HuaweiWR" in brand_logo_db.get_logos_for_brands(["HuaweiWR"])
+    calls = len(connects)
+    brand_logo_db.get_logos_for_brands(["Huawei"])
+    assert len(connects) == calls
+
+    brand_logo_db.deactivate_brand_logo("Huawei")
+    assert brand_logo_db.get_logos_for_brands(["Huawei"]) == {}
+    brand_logo_db.invalidate_logo_cache()
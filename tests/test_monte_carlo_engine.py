@@ -0,0 +1,80 @@
+"""Tests für die vektorisierte Monte-Carlo-Risikoanalyse."""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monte_carlo_engine import (  # noqa: E402
+    MonteCarloConfig,
+    draw_correlated_normals,
+    run_monte_carlo,
+    simulate_npv,
+)
+
+BASE = {"total_investment_netto": 20000.0, "annual_financial_benefit_year1": 1500.0}
+
+
+def test_deterministic_npv_matches_closed_form():
+    config = MonteCarloConfig(
+        investment_rel_std=0.0, yield_rel_std=0.0, price_increase_std=0.0,
+        degradation_mean=0.0, degradation_std=0.0, discount_rate_std=0.0,
+        lifetime_years=20,
+    )
+    npv = simulate_npv(20000.0, 1500.0, 10, config)["npv"]
+    expected = -20000.0 + sum(1500.0 / 1.04**y for y in range(1, 21))
+    assert np.allclose(npv, expected)
+
+
+def test_results_are_reproducible_without_global_seed():
+    np.random.seed(0)
+    state_before = np.random.get_state()[1].copy()
+    first = run_monte_carlo(BASE, 5000)
+    second = run_monte_carlo(BASE, 5000)
+    assert first["npv_mean"] == second["npv_mean"]
+    assert np.array_equal(np.random.get_state()[1], state_before)
+
+
+def test_correlated_draws_follow_matrix():
+    config = MonteCarloConfig(correlations={("price_increase", "discount_rate"): 0.6})
+    z = draw_correlated_normals(
+        np.random.default_rng(1), 200000, config.correlation_matrix())
+    assert np.corrcoef(z[:, 2], z[:, 4])[0, 1] == pytest.approx(0.6, abs=0.01)
+
+
+def test_invalid_correlation_raises():
+    config = MonteCarloConfig(correlations={("yield", "degradation"): 1.5})
+    with pytest.raises(ValueError):
+        simulate_npv(1.0, 1.0, 10, config)
+
+
+def test_summary_contains_risk_metrics():
+    result = run_monte_carlo(BASE, 20000, confidence_level=90)
+    assert result["npv_lower_bound"] < result["npv_mean"] < result["npv_upper_bound"]
+    assert result["cvar_5"] <= result["var_5"]
+    assert result["percentiles"][5] == pytest.approx(result["var_5"])
+    assert sum(result["histogram"]["counts"]) == 20000
+    assert len(result["histogram"]["bin_edges"]) == 51
+    assert len(result["sensitivity_analysis"]) == 5
+
+
+def test_100k_simulations_run_well_under_a_second():
+    start = time.perf_counter()
+    run_monte_carlo(BASE, 100000)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_integrator_returns_histogram_instead_of_samples():
+    calculations = pytest.importorskip("calculations")
+
+    result = calculations.AdvancedCalculationsIntegrator().run_monte_carlo_simulation(
+        BASE, 100_000, 95)
+
+    assert "npv_distribution" not in result
+    assert sum(result["histogram"]["counts"]) == 100_000
+    assert len(result["histogram"]["bin_edges"]) == len(result["histogram"]["counts"]) + 1
+    assert result["percentiles"]
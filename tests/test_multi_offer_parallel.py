@@ -0,0 +1,157 @@
+"""Tests für die parallele Multi-Firmen-PDF-Erzeugung."""
+
+import io
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+dynamic_overlay = pytest.importorskip("pdf_template_engine.dynamic_overlay")
+import pdf_template_engine.placeholders as placeholders  # noqa: E402
+from pypdf import PdfReader  # noqa: E402
+
+SESSION = {
+    "pdf_payment_data": {"variant_1": {}},
+    "selected_payment_variant_key": "variant_1",
+    "final_pricing_data": {"final_price_with_provision": 23456.0},
+}
+PROJECT = {
+    "customer_data": {"first_name": "Max", "last_name": "Muster"},
+    "project_details": {"module_quantity": 20, "final_offer_price_net": 20000.0},
+}
+ANALYSIS = {"anlage_kwp": 8.8}
+
+
+class _BrokenFirm(dict):
+    """Firma, deren PDF-Erzeugung (auch im Worker) fehlschlägt."""
+
+    def copy(self):
+        raise RuntimeError("Firmendaten unvollständig")
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Rotation und Preisberechnung (laufen im Hauptprozess) als Fakes.
+
+    Die PDF-Erzeugung inkl. build_dynamic_data läuft unverändert in den
+    Worker-Prozessen; der Session-State kommt über den Snapshot dorthin.
+    """
+    import price_modification_engine
+    import product_rotation_engine
+
+    rotations = []
+
+    def fake_rotate(standard_products, used_brands, firm_index, used_models):
+        brand = f"Marke{len(used_brands)}"
+        rotations.append((firm_index, brand))
+        return {"pv_modules": {"model_name": f"Modul{firm_index}", "brand": brand}}
+
+    def fake_price(**kwargs):
+        base = kwargs["base_price_override"]
+        price = base * (1 + kwargs["modifier_pct"] / 100)
+        price *= (1 + kwargs["progression_pct"] / 100) ** kwargs["firm_index"]
+        return {"modified_price": price, "base_price": base,
+                "modifier_applied": (price / base - 1) * 100}
+
+    monkeypatch.setattr(product_rotation_engine, "rotate_products", fake_rotate)
+    monkeypatch.setattr(price_modification_engine, "calculate_price_with_products", fake_price)
+    placeholders.use_session_snapshot(SESSION)
+    yield rotations
+    placeholders.use_session_snapshot(None)
+
+
+def _run(firms, parallel):
+    return dynamic_overlay.generate_multi_offer_pdfs(
+        firms, {}, PROJECT, ANALYSIS, {}, modifier_pct=15.0, progression_pct=5.0,
+        parallel=parallel, max_workers=2, mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _texts(results):
+    return [
+        (name, [page.extract_text() for page in PdfReader(io.BytesIO(pdf)).pages])
+        for name, pdf in results
+    ]
+
+
+def _final_brands(rotations):
+    return dict(rotations)  # letzte Rotation je Firma
+
+
+def test_spawn_worker_sees_session_state(pipeline):
+    expected = placeholders.build_dynamic_data(PROJECT, ANALYSIS, {"name": "Firma"})
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=dynamic_overlay._init_multi_offer_worker,
+        initargs=(PROJECT, ANALYSIS, None, placeholders.snapshot_session_inputs()),
+    ) as executor:
+        in_worker = executor.submit(
+            placeholders.build_dynamic_data, PROJECT, ANALYSIS, {"name": "Firma"}).result()
+
+    assert in_worker == expected
+    placeholders.use_session_snapshot(None)
+    assert placeholders.build_dynamic_data(PROJECT, ANALYSIS, {"name": "Firma"}) != expected
+
+
+def test_parallel_output_matches_sequential(pipeline):
+    firms = [{"name": f"Firma {i}"} for i in range(4)]
+    sequential = _run(firms, parallel=False)
+    sequential_brands = _final_brands(pipeline)
+    pipeline.clear()
+    parallel = _run(firms, parallel=True)
+
+    assert [name for name, _ in parallel] == ["Firma 0", "Firma 1", "Firma 2", "Firma 3"]
+    assert _texts(parallel) == _texts(sequential)
+    # Marken-Rotation wurde vorab in Reihenfolge bestimmt
+    assert _final_brands(pipeline) == sequential_brands
+    assert len(set(sequential_brands.values())) == 4
+
+
+class _RecordingProgress:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, value, text):
+        self.updates.append(value)
+
+    def complete(self, text):
+        pass
+
+
+def test_failed_firm_does_not_consume_brand(pipeline, monkeypatch):
+    firms = [{"name": "Firma 0"}, _BrokenFirm(name="Firma 1"), {"name": "Firma 2"}]
+    sequential = _run(firms, parallel=False)
+    sequential_brands = _final_brands(pipeline)
+    pipeline.clear()
+    progress = _RecordingProgress()
+    monkeypatch.setattr(dynamic_overlay, "_create_multi_offer_progress", lambda total: progress)
+    parallel = _run(firms, parallel=True)
+
+    # Neu erzeugte Firmen melden ihren Fortschritt nur einmal
+    assert progress.updates == [1, 2, 3]
+
+    assert [name for name, _ in parallel] == ["Firma 0", "Firma 2"]
+    assert _texts(parallel) == _texts(sequential)
+    assert _final_brands(pipeline) == sequential_brands
+    assert sequential_brands[2] == sequential_brands[1]
+
+
+def test_several_failures_prepare_each_firm_at_most_twice(pipeline):
+    firms = [{"name": "Firma 0"}, _BrokenFirm(name="Firma 1"), _BrokenFirm(name="Firma 2"),
+             {"name": "Firma 3"}, {"name": "Firma 4"}]
+    sequential = _run(firms, parallel=False)
+    sequential_brands = _final_brands(pipeline)
+    pipeline.clear()
+    parallel = _run(firms, parallel=True)
+
+    # Vorläufig + höchstens einmal neu nach den Fehlschlägen davor
+    preparations = [firm_index for firm_index, _ in pipeline]
+    assert max(preparations.count(i) for i in range(len(firms))) == 2
+    assert [name for name, _ in parallel] == ["Firma 0", "Firma 3", "Firma 4"]
+    assert _texts(parallel) == _texts(sequential)
+    assert _final_brands(pipeline) == sequential_brands
@@ -0,0 +1,300 @@
+"""Tests für die inkrementelle Auswertung der Platzhalter-Gruppen."""
+
+import gc
+import os
+import sys
+import weakref
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+placeholder_groups = pytest.importorskip("pdf_template_engine.placeholder_groups")
+from pdf_template_engine.placeholder_groups import (  # noqa: E402
+    IncrementalPlaceholderEvaluator,
+    PlaceholderGroup,
+    PlaceholderInputs,
+    fingerprint,
+)
+
+
+def _inputs(project_data, session=None, analysis_results=None, versions=None):
+    session = session or {}
+    return PlaceholderInputs(
+        project_data=project_data,
+        analysis_results=analysis_results or {},
+        company_info={},
+        session_get=lambda key, default=None: session.get(key, default),
+        versions=versions or {},
+    )
+
+
+def _groups(calls):
+    def customer(inputs, upstream):
+        calls.append("customer")
+        return {"customer_name": inputs.project_data["customer_data"]["name"]}
+
+    def price(inputs, upstream):
+        calls.append("price")
+        return {"price": inputs.project_data["project_details"]["price"]}
+
+    def payment(inputs, upstream):
+        calls.append("payment")
+        return {"deposit": upstream["price"] * 0.3}
+
+    return {
+        "customer": PlaceholderGroup("customer", customer, inputs=("project_data.customer_data",)),
+        "price": PlaceholderGroup(
+            "price", price, inputs=("project_data.project_details", "session.pricing")
+        ),
+        "payment": PlaceholderGroup("payment", payment, depends_on=("price",)),
+    }
+
+
+def test_fingerprint_detects_nested_changes():
+    data = {"a": [1, 2, {"b": np.arange(3.0)}]}
+    before = fingerprint(data)
+    assert fingerprint({"a": [1, 2, {"b": np.arange(3.0)}]}) == before
+    data["a"][2]["b"][1] = 5.0
+    assert fingerprint(data) != before
+
+
+def test_only_groups_with_changed_inputs_are_recomputed():
+    calls = []
+    evaluator = IncrementalPlaceholderEvaluator(groups=_groups(calls))
+    project = {"customer_data": {"name": "A"}, "project_details": {"price": 100.0}}
+
+    assert evaluator.evaluate(_inputs(project)) == {
+        "customer_name": "A", "price": 100.0, "deposit": 30.0}
+    calls.clear()
+
+    project["customer_data"]["name"] = "B"
+    assert evaluator.evaluate(_inputs(project))["customer_name"] == "B"
+    assert calls == ["customer"]
+
+    calls.clear()
+    project["project_details"]["price"] = 200.0
+    assert evaluator.evaluate(_inputs(project))["deposit"] == 60.0
+    assert calls == ["price", "payment"]
+
+    calls.clear()
+    evaluator.evaluate(_inputs(project, session={"pricing": {"rabatt": 5}}))
+    assert calls == ["price"]  # gleicher Preis -> Zahlungsplan bleibt gecacht
+
+
+def test_database_groups_expire(monkeypatch):
+    calls = []
+    groups = {"db": PlaceholderGroup(
+        "db", lambda i, u: calls.append(1) or {"x": 1}, uses_database=True)}
+    evaluator = IncrementalPlaceholderEvaluator(groups=groups, db_ttl_seconds=10)
+    clock = [1000.0]
+    monkeypatch.setattr(placeholder_groups.time, "monotonic", lambda: clock[0])
+
+    evaluator.evaluate(_inputs({}))
+    evaluator.evaluate(_inputs({}))
+    clock[0] += 11
+    evaluator.evaluate(_inputs({}))
+    assert len(calls) == 2
+
+
+def test_database_groups_follow_data_versions():
+    calls = []
+    groups = {"db": PlaceholderGroup(
+        "db", lambda i, u: calls.append(1) or {"x": 1},
+        inputs=("versions.admin_settings",), uses_database=True)}
+    evaluator = IncrementalPlaceholderEvaluator(groups=groups)
+
+    evaluator.evaluate(_inputs({}, versions={"admin_settings": 1}))
+    evaluator.evaluate(_inputs({}, versions={"admin_settings": 1}))
+    evaluator.evaluate(_inputs({}, versions={"admin_settings": 2}))
+    assert len(calls) == 2
+
+
+def test_upstream_contains_only_declared_dependencies():
+    seen = []
+    groups = {
+        "a": PlaceholderGroup("a", lambda i, u: {"a": 1}),
+        "b": PlaceholderGroup("b", lambda i, u: {"b": 2}),
+        "c": PlaceholderGroup(
+            "c", lambda i, u: seen.append(dict(u)) or {"c": 3}, depends_on=("b",)),
+    }
+    IncrementalPlaceholderEvaluator(groups=groups).evaluate(_inputs({}))
+    assert seen == [{"b": 2}]
+
+
+def test_lazy_charts_are_fingerprinted_by_chart_key():
+    chart_render_service = pytest.importorskip("chart_render_service")
+    go = pytest.importorskip("plotly.graph_objects")
+
+    def chart(y):
+        return chart_render_service.LazyChart(go.Figure(go.Bar(y=y)))
+
+    calls = []
+    groups = {"charts": PlaceholderGroup(
+        "charts", lambda i, u: calls.append(1) or {}, inputs=("analysis_results",))}
+    evaluator = IncrementalPlaceholderEvaluator(groups=groups)
+
+    # Jeder Rerun legt neue LazyChart-Objekte an
+    evaluator.evaluate(_inputs({}, analysis_results={"chart_bytes": chart([1, 2])}))
+    evaluator.evaluate(_inputs({}, analysis_results={"chart_bytes": chart([1, 2])}))
+    assert len(calls) == 1
+    evaluator.evaluate(_inputs({}, analysis_results={"chart_bytes": chart([1, 3])}))
+    assert len(calls) == 2
+
+
+def test_identity_keyed_objects_cannot_be_confused():
+    class Handle:
+        pass
+
+    calls = []
+    groups = {"h": PlaceholderGroup(
+        "h", lambda i, u: calls.append(1) or {}, inputs=("analysis_results",))}
+    evaluator = IncrementalPlaceholderEvaluator(groups=groups)
+    handle = Handle()
+    alive = weakref.ref(handle)
+    evaluator.evaluate(_inputs({}, analysis_results={"h": handle}))
+
+    # Der Cache-Eintrag hält das Objekt, seine id() wird nicht neu vergeben
+    del handle
+    gc.collect()
+    assert alive() is not None
+    evaluator.evaluate(_inputs({}, analysis_results={"h": Handle()}))
+    assert len(calls) == 2
+
+
+def test_build_dynamic_data_recomputes_company_group_only():
+    placeholders = pytest.importorskip("pdf_template_engine.placeholders")
+    project = {"customer_data": {"first_name": "Max", "last_name": "Muster"},
+               "project_details": {"module_quantity": 20}}
+    first = placeholders.build_dynamic_data(project, {}, {"name": "Firma A"})
+    second = placeholders.build_dynamic_data(project, {}, {"name": "Firma B"})
+
+    assert placeholders.get_placeholder_cache_stats()["last_recomputed"] == ["company"]
+    assert first["company_name"] == "Firma A" and second["company_name"] == "Firma B"
+    assert second["customer_name"] == "Max Muster"
+    second["customer_name"] = "geändert"
+    assert placeholders.build_dynamic_data(project, {}, {"name": "Firma B"})[
+        "customer_name"] == "Max Muster"
+
+
+def test_build_dynamic_data_pricing_change_keeps_energy_and_products(monkeypatch):
+    placeholders = pytest.importorskip("pdf_template_engine.placeholders")
+    session = {}
+    monkeypatch.setattr(
+        placeholders, "_session_get", lambda key, default=None: session.get(key, default))
+    project = {"customer_data": {"first_name": "Max", "last_name": "Muster"},
+               "project_details": {"module_quantity": 20}}
+    placeholders.build_dynamic_data(project, {}, {"name": "Firma A"})
+
+    session["final_pricing_data"] = {"final_price_with_provision": 21000.0}
+    placeholders.build_dynamic_data(project, {}, {"name": "Firma A"})
+    recomputed = placeholders.get_placeholder_cache_stats()["last_recomputed"]
+    assert "pricing" in recomputed
+    assert "energy" not in recomputed and "product" not in recomputed
+
+
+def test_key_search_fingerprints_only_matching_entries():
+    calls = []
+    group = PlaceholderGroup(
+        "total",
+        lambda inputs, upstream: calls.append("total") or {},
+        inputs=(placeholder_groups.KeySearch("analysis_results", ("Total-Price",)),),
+    )
+    evaluator = IncrementalPlaceholderEvaluator(groups={"total": group})
+    results = {"nested": [{"total_price": 100.0}], "other": 1}
+    evaluator.evaluate(_inputs({}, analysis_results=results))
+
+    results["other"] = 2
+    evaluator.evaluate(_inputs({}, analysis_results=results))
+    assert calls == ["total"]
+
+    results["nested"][0]["total_price"] = 120.0
+    evaluator.evaluate(_inputs({}, analysis_results=results))
+    assert calls == ["total", "total"]
+
+
+class _RecordingDict(dict):
+    """Dict, das gelesene Schlüssel als Eingabepfade mitschreibt."""
+
+    def __init__(self, data, path, reads):
+        super().__init__(data)
+        self._path = path
+        self._reads = reads
+
+    def _read(self, key, value):
+        if key == "project_details" and isinstance(value, dict):
+            return _RecordingDict(value, f"{self._path}.{key}", self._reads)
+        self._reads.add(f"{self._path}.{key}")
+        return value
+
+    def __getitem__(self, key):
+        if key not in self.keys():
+            self._reads.add(f"{self._path}.{key}")
+        return self._read(key, super().__getitem__(key))
+
+    def get(self, key, default=None):
+        return self._read(key, super().get(key, default))
+
+    def items(self):
+        self._reads.add(f"{self._path}.*")
+        return super().items()
+
+    def values(self):
+        self._reads.add(f"{self._path}.*")
+        return super().values()
+
+
+def test_placeholder_groups_read_only_declared_inputs():
+    placeholders = pytest.importorskip("pdf_template_engine.placeholders")
+    project = {
+        "customer_data": {"first_name": "Max", "last_name": "Muster"},
+        "project_details": {"module_quantity": 20, "selected_module_capacity_w": 440,
+                            "include_storage": True, "annual_consumption_kwh": 4500},
+        "consumption_data": {"annual_consumption": 4500},
+    }
+    analysis = {"anlage_kwp": 8.8, "annual_pv_production_kwh": 8000.0,
+                "total_investment_netto": 15000.0, "self_supply_rate_percent": 60.0,
+                "monthly_productions_sim": [700.0] * 12,
+                "monthly_consumption_sim": [375.0] * 12}
+    upstream = {}
+    for name in ("energy", "product", "pricing", "charts", "financing"):
+        group = placeholders.PLACEHOLDER_GROUPS[name]
+        reads = set()
+        inputs = PlaceholderInputs(
+            project_data=_RecordingDict(project, "project_data", reads),
+            analysis_results=_RecordingDict(analysis, "analysis_results", reads),
+            company_info={},
+            session_get=lambda key, default=None: default,
+        )
+        upstream.update(group.compute(inputs, dict(upstream)))
+        declared = set()
+        for path in group.inputs:
+            if isinstance(path, placeholder_groups.KeySearch):
+                declared.update({f"{path.path}.*", f"{path.path}.project_details.*"})
+            else:
+                declared.add(path)
+        undeclared = {
+            read for read in reads
+            if not any(read == path or read.startswith(f"{path}.") for path in declared)
+        }
+        assert not undeclared, f"{name}: {sorted(undeclared)}"
+
+
+def test_build_dynamic_data_unrelated_result_key_recomputes_nothing(monkeypatch):
+    placeholders = pytest.importorskip("pdf_template_engine.placeholders")
+    monkeypatch.setattr(placeholders, "_session_get", lambda key, default=None: default)
+    project = {"customer_data": {"first_name": "Max", "last_name": "Muster"},
+               "project_details": {"module_quantity": 20}}
+    analysis = {"anlage_kwp": 8.8, "total_investment_netto": 15000.0}
+    placeholders.build_dynamic_data(project, analysis, {"name": "Firma A"})
+
+    analysis["debug_trace"] = ["neu"]
+    placeholders.build_dynamic_data(project, analysis, {"name": "Firma A"})
+    assert placeholders.get_placeholder_cache_stats()["last_recomputed"] == []
+
+    analysis["total_investment_netto"] = 16000.0
+    placeholders.build_dynamic_data(project, analysis, {"name": "Firma A"})
+    recomputed = placeholders.get_placeholder_cache_stats()["last_recomputed"]
+    assert "pricing" in recomputed
+    assert "energy" not in recomputed and "charts" not in recomputed
@@ -0,0 +1,85 @@
+"""Tests für die kompilierte Preismatrix in price_matrix_store."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+database = pytest.importorskip("database")
+pms = pytest.importorskip("price_matrix_store")
+
+CSV = """ROW_LABEL;Ohne Speicher;Speicher 10kWh
+10;10000;18000
+12;11500;
+16;14000;=FORMEL
+20;16500;25000
+"""
+
+
+@pytest.fixture
+def matrix_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "matrix.db"))
+    pms.invalidate_matrix_cache()
+    mid = pms.import_matrix_csv("Test", CSV)
+    assert pms.set_active_matrix(mid)
+    yield mid
+    pms.invalidate_matrix_cache()
+
+
+def test_floor_match_and_meta(matrix_id):
+    assert pms.lookup_price(matrix_id, "12", "Ohne Speicher") == 11500.0
+    assert pms.lookup_price(matrix_id, "15", "Ohne Speicher") == 11500.0
+    assert pms.lookup_price(matrix_id, "99", "Speicher 10kWh") == 25000.0
+    assert pms.lookup_price(matrix_id, "9", "Ohne Speicher") is None
+    assert pms.lookup_price(matrix_id, "12", "Speicher 10kWh") is None  # leer
+    assert pms.lookup_price(matrix_id, "16", "Speicher 10kWh") is None  # Formel
+    assert pms.lookup_price(matrix_id, "abc", "Ohne Speicher") is None
+    assert pms.lookup_price_with_meta(matrix_id, "17", "Ohne Speicher") == {
+        'value': 14000.0, 'row_used': '16', 'row_floor_source': '16',
+        'column_used': 'Ohne Speicher'}
+    assert pms.get_matrix_cache_stats()["compiles"] == 1
+
+
+def test_batch_lookup(matrix_id):
+    prices = pms.lookup_prices(
+        matrix_id, [10, "13", 25, 5], ["Ohne Speicher", "Speicher 10kWh", "Fehlt"])
+    expected = np.array([
+        [10000.0, 18000.0, np.nan],
+        [11500.0, np.nan, np.nan],
+        [16500.0, 25000.0, np.nan],
+        [np.nan, np.nan, np.nan],
+    ])
+    np.testing.assert_array_equal(prices, expected)
+
+
+def test_writes_invalidate_compiled_matrix(matrix_id):
+    assert pms.lookup_price(matrix_id, "20", "Ohne Speicher") == 16500.0
+    full = pms.get_matrix_full(matrix_id)
+    row_20 = next(r["id"] for r in full["rows"] if r["label"] == "20")
+    col = next(c["id"] for c in full["columns"] if c["label"] == "Ohne Speicher")
+    assert pms.set_cell_value(matrix_id, row_20, col, 17000.0)
+    assert pms.lookup_price(matrix_id, "22", "Ohne Speicher") == 17000.0
+
+    assert pms.add_row(matrix_id, "24")
+    assert pms.lookup_price_with_meta(matrix_id, "30", "Ohne Speicher")["row_used"] == "24"
+    assert pms.remove_column(col)
+    assert pms.lookup_price(matrix_id, "22", "Ohne Speicher") is None
+    assert pms.get_cached_active_matrix_id() == matrix_id
+
+
+def test_compile_overlapping_invalidate_is_not_cached(matrix_id, monkeypatch):
+    load_full = pms.get_matrix_full
+
+    def racing_load(mid):
+        full = load_full(mid)
+        pms.invalidate_matrix_cache()  # Schreibzugriff während des Kompilierens
+        return full
+
+    monkeypatch.setattr(pms, "get_matrix_full", racing_load)
+    generation = pms.get_matrix_generation()
+    assert pms.lookup_price(matrix_id, "10", "Ohne Speicher") == 10000.0
+    assert pms.get_matrix_generation() == generation + 1
+    assert pms.get_matrix_cache_stats()["matrices"] == 0
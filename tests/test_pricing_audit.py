@@ -112,7 +112,8 @@ class TestPricingAuditLogger:
         # Create temporary database
         self.temp_dir = tempfile.mkdtemp()
         self.db_path = Path(self.temp_dir) / "test_audit.db"
-        self.audit_logger = PricingAuditLogger(str(self.db_path))
+        self.audit_logger = PricingAuditLogger(
+            str(self.db_path), async_writes=False)
 
     def teardown_method(self):
         """Cleanup test environment"""
@@ -312,6 +313,149 @@ class TestPricingAuditLogger:
         assert len(received_events) == 1
 
 
+class TestAuditWriteBehind:
+    """Test batched background writes of PricingAuditLogger"""
+
+    def setup_method(self):
+        """Setup test environment"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.temp_dir) / "test_audit.db"
+        self.audit_logger = PricingAuditLogger(
+            str(self.db_path), batch_size=50, flush_interval_seconds=60)
+
+    def teardown_method(self):
+        """Cleanup test environment"""
+        import shutil
+        self.audit_logger.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _count_rows(self):
+        with sqlite3.connect(str(self.db_path)) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM audit_events").fetchone()[0]
+
+    def _event(self, i):
+        return AuditEvent(
+            event_type=AuditEventType.PRICE_CALCULATION,
+            severity=AuditSeverity.INFO,
+            message=f"Calculation {i}")
+
+    def test_events_are_queued_until_flush(self):
+        """Test that log_event does not write synchronously"""
+        for i in range(3):
+            assert self.audit_logger.log_event(self._event(i))
+
+        assert self._count_rows() == 0
+        assert self.audit_logger.get_writer_metrics()["queue_depth"] == 3
+
+        assert self.audit_logger.flush() == 3
+        assert self._count_rows() == 3
+
+    def test_query_sees_unflushed_events(self):
+        """Test read-your-writes for queued events"""
+        for i in range(3):
+            self.audit_logger.log_event(self._event(i))
+
+        results = self.audit_logger.query_events(AuditQuery())
+
+        assert len(results) == 3
+        assert self.audit_logger.get_event_statistics()["total_events"] == 3
+
+    def test_batch_size_triggers_write(self):
+        """Test that a full batch is written by the background writer"""
+        import time
+
+        for i in range(120):
+            self.audit_logger.log_event(self._event(i))
+
+        deadline = time.time() + 5
+        while self._count_rows() < 100 and time.time() < deadline:
+            time.sleep(0.01)
+
+        metrics = self.audit_logger.get_writer_metrics()
+        assert self._count_rows() >= 100
+        assert metrics["batches_written"] >= 2
+        assert metrics["avg_batch_size"] > 1
+
+    def test_close_drains_queue(self):
+        """Test that shutdown writes pending events"""
+        for i in range(10):
+            self.audit_logger.log_event(self._event(i))
+
+        self.audit_logger.close()
+
+        assert self._count_rows() == 10
+        # Events logged after close are written synchronously
+        self.audit_logger.log_event(self._event(10))
+        assert self._count_rows() == 11
+
+    def test_flush_interval_writes_without_full_batch(self):
+        """Test that a single event is written after flush_interval_seconds"""
+        import time
+
+        audit_logger = PricingAuditLogger(
+            str(self.db_path), batch_size=50, flush_interval_seconds=0.2)
+        try:
+            audit_logger.log_event(self._event(0))
+
+            deadline = time.time() + 3
+            while self._count_rows() < 1 and time.time() < deadline:
+                time.sleep(0.02)
+
+            assert self._count_rows() == 1
+            assert audit_logger.get_writer_metrics()["queue_depth"] == 0
+        finally:
+            audit_logger.close()
+
+    def test_discarded_logger_is_collected_and_drained(self):
+        """Test that open loggers are not kept alive and lose no rows"""
+        import gc
+        import time
+        import weakref
+
+        audit_logger = PricingAuditLogger(
+            str(self.db_path), batch_size=50, flush_interval_seconds=0.1)
+        audit_logger.log_event(self._event(0))
+        ref = weakref.ref(audit_logger)
+        del audit_logger
+
+        deadline = time.time() + 5
+        while ref() is not None and time.time() < deadline:
+            gc.collect()
+            time.sleep(0.05)
+
+        assert ref() is None
+        assert self._count_rows() == 1
+
+    def test_duplicate_event_id_drops_only_that_row(self):
+        """Test that one constraint violation does not drop the whole batch"""
+        for i in range(5):
+            event = self._event(i)
+            event.event_id = "duplicate" if i in (1, 3) else f"event_{i}"
+            self.audit_logger.log_event(event)
+
+        self.audit_logger.flush()
+
+        metrics = self.audit_logger.get_writer_metrics()
+        assert self._count_rows() == 4
+        assert metrics["events_written"] == 4
+        assert metrics["events_dropped"] == 1
+
+    def test_backpressure_when_queue_full(self):
+        """Test that callers write themselves when the queue is full"""
+        # Without a running writer the queue is only drained by callers
+        with patch.object(PricingAuditLogger, "_writer_loop", return_value=False):
+            audit_logger = PricingAuditLogger(
+                str(self.db_path), batch_size=5, max_queue_size=5)
+        for i in range(6):
+            audit_logger.log_event(self._event(i))
+
+        metrics = audit_logger.get_writer_metrics()
+        assert metrics["backpressure_events"] == 1
+        assert self._count_rows() == 6
+        audit_logger.close()
+
+
 class TestPricingCalculationLogger:
     """Test PricingCalculationLogger class"""
 
@@ -325,6 +469,7 @@ class TestPricingCalculationLogger:
     def teardown_method(self):
         """Cleanup test environment"""
         import shutil
+        self.audit_logger.close()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
 
     def test_log_calculation_start(self):
@@ -469,6 +614,7 @@ class TestPricingMonitor:
     def teardown_method(self):
         """Cleanup test environment"""
         import shutil
+        self.audit_logger.close()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
 
     def test_error_rate_alert(self):
@@ -757,6 +903,7 @@ class TestIntegration:
     def teardown_method(self):
         """Cleanup test environment"""
         import shutil
+        self.audit_logger.close()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
 
     def test_complete_calculation_audit_workflow(self):
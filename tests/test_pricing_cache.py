@@ -336,8 +336,49 @@ class TestPricingCacheManager:
         # Invalidate specific product
         invalidated = self.manager.invalidate_product_cache(123)
 
-        # Should invalidate at least one entry
-        assert invalidated >= 0  # Pattern matching might not find exact matches
+        assert invalidated == 1
+        assert self.manager.get_component_pricing(key1) is None
+        assert self.manager.get_component_pricing(key2) == {"price": 200}
+
+    def test_product_invalidation_cascades_to_dependents(self):
+        """Test product invalidation through the dependency index"""
+        components = [{"product_id": 123, "quantity": 5},
+                      {"product_id": 456, "quantity": 3}]
+        comp_123 = self.manager.generate_component_key(123, 5)
+        comp_456 = self.manager.generate_component_key(456, 3)
+        comp_789 = self.manager.generate_component_key(789, 1)
+        system_key = self.manager.generate_system_key(components, "pv")
+        final_key = self.manager.generate_final_key(
+            {"components": components, "vat_rate": 19.0})
+
+        self.manager.cache_component_pricing(comp_123, {"price": 100})
+        self.manager.cache_component_pricing(comp_456, {"price": 200})
+        self.manager.cache_component_pricing(comp_789, {"price": 300})
+        self.manager.cache_system_pricing(
+            system_key, {"total": 1000}, [comp_123, comp_456])
+        self.manager.cache_final_pricing(final_key, {"total": 1190},
+                                         system_key)
+
+        invalidated = self.manager.invalidate_product_cache(123)
+
+        assert invalidated == 3
+        assert self.manager.get_component_pricing(comp_123) is None
+        assert self.manager.get_system_pricing(system_key) is None
+        assert self.manager.get_final_pricing(final_key) is None
+        assert self.manager.get_component_pricing(comp_456) == {"price": 200}
+        assert self.manager.get_component_pricing(comp_789) == {"price": 300}
+
+    def test_structured_key_tags(self):
+        """Test tags derived from structured keys"""
+        components = [{"product_id": 2, "quantity": 1},
+                      {"product_id": 1, "quantity": 4}]
+        component_key = self.manager.generate_component_key(7, 2)
+        system_key = self.manager.generate_system_key(components, "pv")
+
+        assert self.manager.tags_for_key(component_key) == ["product:7"]
+        assert self.manager.tags_for_key(system_key) == [
+            "system_type:pv", "product:1", "product:2"]
+        assert self.manager.tags_for_key("plain_key") == []
 
     def test_system_cache_invalidation(self):
         """Test system-specific cache invalidation"""
@@ -352,8 +393,9 @@ class TestPricingCacheManager:
         # Invalidate specific system
         invalidated = self.manager.invalidate_system_cache("pv")
 
-        # Should invalidate at least one entry
-        assert invalidated >= 0
+        assert invalidated == 1
+        assert self.manager.get_system_pricing(key_pv) is None
+        assert self.manager.get_system_pricing(key_hp) == {"total": 2000}
 
 
 class TestPerformanceMonitoring:
@@ -455,6 +497,16 @@ class TestCacheBenchmark:
         assert result.total_operations == 2  # Number of patterns
         assert result.avg_duration_ms >= 0
 
+    def test_dependency_invalidation_benchmark(self):
+        """Test indexed vs pattern-scan invalidation comparison"""
+        details = self.benchmark.benchmark_dependency_invalidation(
+            num_entries=2000, num_products=50, num_invalidations=5)
+
+        assert details["entries"] == 2000
+        assert details["indexed_invalidated"] > 0
+        assert details["pattern_scan_invalidated"] > 0
+        assert details["indexed_avg_ms"] >= 0
+
     def test_comprehensive_benchmark(self):
         """Test comprehensive benchmark suite"""
         report = self.benchmark.run_comprehensive_benchmark()
@@ -0,0 +1,78 @@
+"""Tests für den In-Memory-Produktkatalog der Produkt-Rotation."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pre = pytest.importorskip("product_rotation_engine")
+
+
+def _catalog_data():
+    return {
+        'pv_modules': [
+            {'brand': 'A', 'model': 'A-500', 'power_w': 500},
+            {'brand': 'A', 'model': 'A-430', 'power_w': 430},
+            {'brand': 'A', 'model': 'A-420', 'power_w': 420},
+            {'brand': 'A', 'model': 'A-0', 'power_w': 0},
+            {'brand': 'B', 'model': 'B-440', 'Leistung_W': 440},
+        ],
+        'inverters': [{'brand': 'A', 'model': 'A-WR10', 'power_kw': 10.0}],
+        'battery_storage': [{'brand': 'C', 'model': 'C-10', 'capacity_kwh': 10.0}],
+    }
+
+
+@pytest.fixture
+def catalog_source(monkeypatch):
+    state = {'version': 1, 'loads': 0}
+
+    def load():
+        state['loads'] += 1
+        return _catalog_data()
+
+    monkeypatch.setattr(pre, '_load_products_from_db', load)
+    monkeypatch.setattr(pre, '_product_db_version', lambda: state['version'])
+    pre.invalidate_product_catalog()
+    yield state
+    pre.invalidate_product_catalog()
+
+
+def test_range_lookup_keeps_database_order(catalog_source):
+    specs = pre.ProductSpecs(power_w=425)
+    # 430 und 420 liegen in ±10 %, A-430 steht in der DB-Reihenfolge vorne
+    assert pre.get_product_by_specs('pv_modules', 'A', specs)['model'] == 'A-430'
+    assert pre.get_product_by_specs('pv_modules', 'A', specs, {'A-430'})['model'] == 'A-420'
+    # kein Treffer -> erstes Produkt der Marke
+    assert pre.get_product_by_specs(
+        'pv_modules', 'A', specs, {'A-430', 'A-420'})['model'] == 'A-500'
+    assert pre.get_product_by_specs('pv_modules', 'B', specs)['model'] == 'B-440'
+    assert pre.get_product_by_specs('pv_modules', 'X', specs) is None
+
+
+def test_brands_and_rotation_use_cached_snapshot(catalog_source):
+    assert pre.get_available_brands('pv_modules') == ['A', 'B']
+    assert pre.get_available_brands('pv_modules', {'A'}) == ['B']
+
+    rotated = pre.rotate_products(
+        {'pv_modules': {'power_w': 440}, 'inverters': {'power_kw': 10.0},
+         'battery_storage': {'capacity_kwh': 10.0}},
+        used_brands={'A'},
+    )
+    assert rotated['pv_modules']['model'] == 'B-440'
+    assert rotated['battery_storage']['model'] == 'C-10'
+    assert catalog_source['loads'] == 1
+
+    rotated['pv_modules']['model'] = 'geändert'
+    assert pre.get_product_by_specs(
+        'pv_modules', 'B', pre.ProductSpecs(power_w=440))['model'] == 'B-440'
+
+
+def test_product_db_write_invalidates_snapshot(catalog_source):
+    pre.get_available_brands('inverters')
+    pre.get_available_brands('inverters')
+    assert catalog_source['loads'] == 1
+    catalog_source['version'] += 1  # z.B. product_db.add_product
+    pre.get_available_brands('inverters')
+    assert catalog_source['loads'] == 2
@@ -0,0 +1,126 @@
+"""Tests für den persistenten PVGIS-Cache und die Offline-Replay-Funktion."""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pvgis_cache  # noqa: E402
+from pvgis_cache import (  # noqa: E402
+    PVGISCache,
+    configure_pvgis_cache,
+    make_cache_key,
+    normalize_result,
+    scale_result,
+)
+
+NORMALIZED = {
+    "monthly_production_kwh": [30.0, 45.0, 80.0, 105.0, 125.0, 130.0,
+                               132.0, 115.0, 88.0, 60.0, 33.0, 25.0],
+    "annual_production_kwh": 968.0,
+    "specific_yield_kwh_kwp_pa": 968.0,
+    "pvgis_source": "PVGIS-SARAH2",
+}
+
+
+@pytest.fixture(autouse=True)
+def _reset_global_cache():
+    yield
+    pvgis_cache._pvgis_cache = None
+
+
+def test_cache_key_quantizes_coordinates():
+    key_a = make_cache_key(51.12341, 9.00449, 30, 0, 14.0)
+    key_b = make_cache_key(51.1249, 9.0041, 30.2, 0.4, 14.04)
+    assert key_a == key_b
+    assert key_a != make_cache_key(51.14, 9.0, 30, 0, 14.0)
+
+
+def test_scale_and_normalize_are_inverse():
+    scaled = scale_result(NORMALIZED, 9.8)
+    assert scaled["annual_production_kwh"] == pytest.approx(968.0 * 9.8)
+    assert scaled["specific_yield_kwh_kwp_pa"] == 968.0
+    assert normalize_result(scaled, 9.8)["monthly_production_kwh"] == pytest.approx(
+        NORMALIZED["monthly_production_kwh"]
+    )
+
+
+def test_ttl_and_statistics(tmp_path):
+    cache = PVGISCache(db_path=str(tmp_path / "cache.db"), ttl_seconds=60)
+    key = make_cache_key(51.0, 9.0, 30, 0, 14.0)
+    assert cache.get(key) is None
+    cache.put(key, NORMALIZED)
+    assert cache.get(key) == NORMALIZED
+
+    with patch("pvgis_cache.time.time", return_value=10**12):
+        assert cache.get(key) is None
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["expired"] == 1
+    assert stats["entries"] == 1
+
+
+def test_cache_directory_is_created(tmp_path):
+    cache = PVGISCache(db_path=str(tmp_path / "neu" / "cache.db"))
+    key = make_cache_key(51.0, 9.0, 30, 0, 14.0)
+    cache.put(key, NORMALIZED)
+    assert cache.get(key) == NORMALIZED
+
+
+def test_record_then_replay_offline(tmp_path):
+    key = make_cache_key(48.1, 11.6, 35, -45, 14.0)
+    recorder = PVGISCache(
+        db_path=str(tmp_path / "rec.db"), mode="record", fixture_dir=str(tmp_path / "fx")
+    )
+    recorder.put(key, NORMALIZED)
+
+    replay = PVGISCache(
+        db_path=str(tmp_path / "other.db"), mode="replay", fixture_dir=str(tmp_path / "fx")
+    )
+    assert not replay.network_allowed
+    assert replay.get(key) == NORMALIZED
+    assert replay.get_stats()["fixture_hits"] == 1
+
+
+def _pvgis_response():
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = {
+        "outputs": {
+            "monthly": [{"E_m": v} for v in NORMALIZED["monthly_production_kwh"]],
+            "totals": {"fixed": {"E_y": 968.0, "Yield_y": 968.0}},
+        },
+        "meta": {"source": "PVGIS-SARAH2"},
+    }
+    return response
+
+
+def test_get_pvgis_data_hits_cache_and_rescales(tmp_path):
+    calculations = pytest.importorskip("calculations")
+    configure_pvgis_cache(db_path=str(tmp_path / "cache.db"))
+
+    with patch.object(calculations.requests, "get", return_value=_pvgis_response()) as get:
+        first = calculations.get_pvgis_data(51.001, 9.002, 10.0, 30, 0)
+        second = calculations.get_pvgis_data(51.003, 9.004, 5.0, 30, 0)
+
+    assert get.call_count == 1
+    assert get.call_args.kwargs["params"]["peakpower"] == 1.0
+    assert first["annual_production_kwh"] == pytest.approx(9680.0)
+    assert second["annual_production_kwh"] == pytest.approx(4840.0)
+
+
+def test_get_pvgis_data_replay_without_fixture_stays_offline(tmp_path):
+    calculations = pytest.importorskip("calculations")
+    configure_pvgis_cache(
+        db_path=str(tmp_path / "cache.db"), mode="replay", fixture_dir=str(tmp_path / "fx")
+    )
+    errors = []
+    with patch.object(calculations.requests, "get") as get:
+        assert calculations.get_pvgis_data(51.0, 9.0, 10.0, 30, 0, errors_list=errors) is None
+    get.assert_not_called()
+    assert errors
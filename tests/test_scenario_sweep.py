@@ -0,0 +1,169 @@
+"""Tests für die Szenario-Sweeps."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+import scenario_manager  # noqa: E402
+from cashflow_projection import project_cash_flows  # noqa: E402
+from scenario_sweep import (  # noqa: E402
+    SweepBase,
+    kwp_axis,
+    roi_heat_map,
+    run_scenario_sweep,
+    scenario_cash_flow_table,
+)
+
+MONTHLY_SHARE = [0.03, 0.05, 0.08, 0.11, 0.13, 0.14, 0.13, 0.12, 0.09, 0.06, 0.04, 0.02]
+
+
+def _results():
+    """Ausschnitt eines perform_calculations-Ergebnisses (10 kWp, 20 Jahre)."""
+    projection = project_cash_flows(
+        years=20, investment=18000.0, production_kwh=9500.0,
+        self_consumption_share=3000 / 9500, feed_in_share=6500 / 9500,
+        electricity_price=0.32, price_increase=0.03, degradation=0.005,
+        feed_in_tariff=0.081, feed_in_tariff_after=0.03, feed_in_tariff_years=20,
+        maintenance_year1=150.0, maintenance_increase=0.02,
+        discount_rate=0.04, inflation=0.02)
+    return {
+        "anlage_kwp": 10.0,
+        "total_investment_netto": 18000.0,
+        "annual_pv_production_kwh": 9500.0,
+        "total_consumption_kwh_yr": 4500.0,
+        "monthly_productions_sim": [s * 9500 for s in MONTHLY_SHARE],
+        "monthly_consumption_sim": [375.0] * 12,
+        "eigenverbrauch_pro_jahr_kwh": 3000.0,
+        "netzeinspeisung_kwh": 6500.0,
+        "einspeiseverguetung_eur_per_kwh": 0.081,
+        "simulation_period_years_effective": 20,
+        "electricity_price_increase_rate_effective_percent": 3.0,
+        "annual_elec_prices_sim": projection.metric("electricity_price")[0].tolist(),
+        "annual_productions_sim": projection.metric("production_kwh")[0].tolist(),
+        "annual_maintenance_costs_sim": projection.metric("maintenance")[0].tolist(),
+        "annual_benefits_sim": projection.metric("benefit")[0].tolist(),
+        "npv_value": float(projection.npv()[0]),
+    }
+
+
+def test_base_scenario_reproduces_calculation():
+    results = _results()
+    base = SweepBase.from_results(results)
+    row = run_scenario_sweep(base, scenarios=[{"name": "Basis"}]).iloc[0]
+
+    assert row["scenario"] == "Basis"
+    assert row["npv"] == pytest.approx(results["npv_value"])
+    assert row["total_benefit"] == pytest.approx(sum(results["annual_benefits_sim"]))
+    assert row["self_consumption_kwh"] == pytest.approx(3000.0)
+
+
+def test_grid_is_cartesian_and_pivots_to_heat_map():
+    base = SweepBase.from_results(_results())
+    kwp = np.arange(5.0, 20.5, 0.5)
+    price = np.linspace(0.0, 0.06, 13)
+    frame = run_scenario_sweep(base, {"anlage_kwp": kwp, "price_increase": price})
+
+    assert len(frame) == len(kwp) * len(price)
+    heat_map = frame.pivot(index="price_increase", columns="anlage_kwp", values="roi_percent")
+    assert heat_map.shape == (len(price), len(kwp))
+    # Höhere Preissteigerung -> höherer ROI bei jeder Anlagengröße
+    assert (heat_map.diff().iloc[1:] > 0).all().all()
+
+
+def test_storage_financing_and_subsidy_effects():
+    base = SweepBase.from_results(_results())
+    frame = run_scenario_sweep(base, scenarios=[
+        {"name": "Basis"},
+        {"name": "Speicher", "storage_kwh": 8.0},
+        # Kredit zum Diskontzins ändert den Kapitalwert nicht
+        {"name": "Kredit", "financed_share": 1.0, "financing_rate": 0.04},
+        {"name": "Zuschuss", "subsidy_share": 0.1},
+    ]).set_index("scenario")
+
+    assert frame.loc["Speicher", "self_consumption_kwh"] > frame.loc["Basis", "self_consumption_kwh"]
+    assert frame.loc["Speicher", "investment"] == pytest.approx(18000.0 + 8 * 600.0)
+    assert frame.loc["Kredit", "npv"] == pytest.approx(frame.loc["Basis", "npv"])
+    assert frame.loc["Kredit", "equity"] == pytest.approx(0.0)
+    assert frame.loc["Zuschuss", "npv"] == pytest.approx(frame.loc["Basis", "npv"] + 1800.0)
+
+    table = scenario_cash_flow_table(base, scenarios=[{"name": "Basis"}])
+    assert list(table["year"]) == list(range(21))
+    assert table["cumulative_cash_flow"].iloc[0] == pytest.approx(-18000.0)
+
+
+def test_unknown_parameter_is_rejected():
+    base = SweepBase.from_results(_results())
+    with pytest.raises(ValueError):
+        run_scenario_sweep(base, {"kwp": [5, 10]})
+
+
+def test_scenario_manager_uses_sweep():
+    scenarios = scenario_manager.generate_comparison_scenarios(_results())
+    names = [s["scenario_name"] for s in scenarios]
+
+    assert names[0] == "Basis Szenario" and len(scenarios) == 5
+    assert scenarios[0]["results"]["npv"] == pytest.approx(_results()["npv_value"])
+
+    single = scenario_manager.simulate_scenario(
+        _results(), {"name": "Größer", "anlage_kwp": 12.0})
+    assert single["scenario_name"] == "Größer"
+    assert single["results"]["anlage_kwp"] == 12.0
+
+
+@pytest.mark.parametrize("kwp", [0.6, 1.0, 1.5, 10.0])
+def test_roi_heat_map_for_small_systems(kwp):
+    base = SweepBase.from_results({**_results(), "anlage_kwp": kwp})
+    axis = kwp_axis(base.anlage_kwp)
+    assert len(axis) == 31
+    assert len(np.unique(axis)) == len(axis)
+
+    heat_map = roi_heat_map(base, axis, np.linspace(0.0, 0.06, 13), years=20)
+    assert heat_map.shape == (13, 31)
+
+
+def test_base_row_matches_perform_calculations_with_storage(monkeypatch):
+    calculations = pytest.importorskip("calculations")
+    products = {
+        1: {"id": 1, "model_name": "Modul 440", "capacity_w": 440.0},
+        2: {"id": 2, "model_name": "Speicher 10", "storage_power_kw": 10.0},
+    }
+    monkeypatch.setattr(calculations, "real_get_product_by_id", products.get)
+    details = {
+        "selected_module_id": 1, "module_quantity": 20,
+        "selected_storage_id": 2, "include_storage": True,
+        "selected_storage_storage_power_kw": 10.0,
+        "annual_consumption_kwh_yr": 4500, "electricity_price_kwh": 0.32,
+        "roof_orientation": "Süd", "roof_inclination_deg": 30,
+    }
+    results = calculations.perform_calculations(
+        {"project_details": details, "customer_data": {}}, {}, [], use_cache=False)
+    # Speicher steckt im Matrixpreis und ist nicht separat ausgewiesen
+    assert not results.get("cost_storage_aufpreis_product_db_netto")
+
+    row = run_scenario_sweep(
+        SweepBase.from_results(results, details), scenarios=[{"name": "Basis"}]).iloc[0]
+    assert row["investment"] == pytest.approx(results["total_investment_netto"])
+    assert row["npv"] == pytest.approx(results["npv_value"])
+
+
+def test_integrator_sweep_uses_admin_constants(monkeypatch):
+    calculations = pytest.importorskip("calculations")
+    constants = {"inflation_rate_percent": 5.0, "einspeiseverguetung_period_years": 12,
+                 "loan_interest_rate_percent": 6.0}
+    monkeypatch.setattr(
+        calculations, "real_load_admin_setting",
+        lambda key, default=None: constants if key == "global_constants" else default)
+
+    integrator = calculations.AdvancedCalculationsIntegrator()
+    base = integrator._sweep_base(_results())
+    assert base.inflation == pytest.approx(0.05)
+    assert base.feed_in_tariff_years == 12
+    assert base.discount_rate == pytest.approx(0.06)
+    assert integrator.calculate_npv_sensitivity(_results(), 0.06) == pytest.approx(
+        run_scenario_sweep(base, {"discount_rate": [0.06]}, years=25)["npv"].iloc[0])